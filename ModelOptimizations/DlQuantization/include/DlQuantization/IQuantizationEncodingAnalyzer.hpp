@@ -42,6 +42,7 @@
 #include "Quantization.hpp"
 #include <cassert>
 #include <cstdint>
+#include <stdexcept>
 
 namespace DlQuantization
 {
@@ -105,6 +106,26 @@ public:
      *
      * @param percentile Percentile value to be used while adjusting min and max
      */
+    /**
+     * @brief Merges the statistics collected by another encoding analyzer of the same type into this one.
+     * Used to combine the statistics of tensor quantizers that observed different shards of the same data.
+     * @param other Encoding analyzer to merge the statistics of
+     */
+    virtual void mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+    {
+        throw std::runtime_error("Merging statistics is not supported by this encoding analyzer");
+    }
+
+    /**
+     * @brief Resets the statistics to empty statistics with the same histogram buckets as another encoding analyzer
+     * of the same type. Encoding analyzers that don't keep a histogram only reset their statistics.
+     * @param other Encoding analyzer to copy the histogram buckets from
+     */
+    virtual void copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+    {
+        throw std::runtime_error("Copying statistics layout is not supported by this encoding analyzer");
+    }
+
     virtual void setPercentileValue(float percentile)
     {
         // TODO - check if there is a better way to do this.
@@ -207,6 +207,21 @@ public:
      */
     std::vector<std::tuple<double, double>> getStatsHistogram();
 
+    /**
+     * Merges the statistics collected by another tensor quantizer into this tensor quantizer.
+     * Both tensor quantizers must use the same quantization scheme.
+     * @param other Tensor quantizer to merge the statistics of
+     */
+    void mergeStats(const TensorQuantizer& other);
+
+    /**
+     * Resets the statistics of this tensor quantizer to empty statistics with the same histogram buckets as another
+     * tensor quantizer, so that statistics collected by both can later be merged without re-bucketing.
+     * Both tensor quantizers must use the same quantization scheme.
+     * @param other Tensor quantizer to copy the histogram buckets from
+     */
+    void copyStatsLayout(const TensorQuantizer& other);
+
     /**
      * @brief Generate per channel encodings of a slice of an input tensor along a pre-specified axis
      * @param input The input tensor
@@ -263,6 +263,23 @@ DTYPE MseEncodingAnalyzer<DTYPE>::_computeMSECost(uint8_t bw, std::vector<std::p
     return weightedSquareErr;
 }
 
+template <typename DTYPE>
+void MseEncodingAnalyzer<DTYPE>::mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const MseEncodingAnalyzer<DTYPE>&>(other);
+    MergePdf(_stats, otherAnalyzer._stats);
+    _statsUpdated = _statsUpdated || otherAnalyzer._statsUpdated;
+}
+
+template <typename DTYPE>
+void MseEncodingAnalyzer<DTYPE>::copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const MseEncodingAnalyzer<DTYPE>&>(other);
+    CopyPdfLayout(_stats, otherAnalyzer._stats);
+    _statsUpdated = false;
+}
+
+
 // Explicit instantiations
 template class MseEncodingAnalyzer<double>;
 
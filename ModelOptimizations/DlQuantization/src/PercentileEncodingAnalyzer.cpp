@@ -212,6 +212,23 @@ float PercentileEncodingAnalyzer<DTYPE>::getPercentileValue()
     return this->_percentile;
 }
 
+template <typename DTYPE>
+void PercentileEncodingAnalyzer<DTYPE>::mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const PercentileEncodingAnalyzer<DTYPE>&>(other);
+    MergePdf(_stats, otherAnalyzer._stats);
+    _statsUpdated = _statsUpdated || otherAnalyzer._statsUpdated;
+}
+
+template <typename DTYPE>
+void PercentileEncodingAnalyzer<DTYPE>::copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const PercentileEncodingAnalyzer<DTYPE>&>(other);
+    CopyPdfLayout(_stats, otherAnalyzer._stats);
+    _statsUpdated = false;
+}
+
+
 // Explicit instantiations
 template class PercentileEncodingAnalyzer<double>;
 
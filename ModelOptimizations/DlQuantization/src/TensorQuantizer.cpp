@@ -236,6 +236,28 @@ std::vector<std::tuple<double, double>> TensorQuantizer::getStatsHistogram()
     return histogram;
 }
 
+void TensorQuantizer::mergeStats(const TensorQuantizer& other)
+{
+    if (_quantScheme != other._quantScheme)
+    {
+        throw std::runtime_error("Cannot merge statistics of tensor quantizers with different quantization schemes");
+    }
+
+    _encodingAnalyzer->mergeStats(*other._encodingAnalyzer);
+    _validStats = _validStats || other._validStats;
+}
+
+void TensorQuantizer::copyStatsLayout(const TensorQuantizer& other)
+{
+    if (_quantScheme != other._quantScheme)
+    {
+        throw std::runtime_error("Cannot copy statistics of tensor quantizers with different quantization schemes");
+    }
+
+    _encodingAnalyzer->copyStatsLayout(*other._encodingAnalyzer);
+    _validStats = false;
+}
+
 void TensorQuantizer::setPercentileValue(float percentile)
 {
     // Set percentile value only when quant scheme is percentile.
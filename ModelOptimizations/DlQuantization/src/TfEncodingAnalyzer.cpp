@@ -101,6 +101,26 @@ TfEncoding TfEncodingAnalyzer<DTYPE>::computeEncoding(uint8_t bw, bool useSymmet
 }
 
 
+template <typename DTYPE>
+void TfEncodingAnalyzer<DTYPE>::mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const TfEncodingAnalyzer<DTYPE>&>(other);
+    _accumulatedStats.min     = std::min(_accumulatedStats.min, otherAnalyzer._accumulatedStats.min);
+    _accumulatedStats.max     = std::max(_accumulatedStats.max, otherAnalyzer._accumulatedStats.max);
+    _statsUpdated             = _statsUpdated || otherAnalyzer._statsUpdated;
+}
+
+template <typename DTYPE>
+void TfEncodingAnalyzer<DTYPE>::copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    // Throws std::bad_cast if the other encoding analyzer is of a different type
+    (void) dynamic_cast<const TfEncodingAnalyzer<DTYPE>&>(other);
+    _accumulatedStats.min = std::numeric_limits<double>::max();
+    _accumulatedStats.max = -std::numeric_limits<double>::max();
+    _statsUpdated         = false;
+}
+
+
 // Explicit instantiations
 template class TfEncodingAnalyzer<double>;
 
@@ -77,6 +77,18 @@ public:
      */
     std::vector<std::tuple<double, double>> getStatsHistogram() const override;
 
+    /**
+     * @brief Merges the statistics collected by another encoding analyzer of the same type into this one
+     * @param other Encoding analyzer to merge the statistics of
+     */
+    void mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other) override;
+
+    /**
+     * @brief Resets the statistics. TF encoding analyzer doesn't keep a histogram
+     * @param other Encoding analyzer of the same type
+     */
+    void copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other) override;
+
     // Minimum range of quantization
     static constexpr double MIN_RANGE = 0.01;
 
@@ -388,6 +388,23 @@ void TfEnhancedEncodingAnalyzer<DTYPE>::getComputedEncodings(int bw, TfEncoding&
 }
 
 
+template <typename DTYPE>
+void TfEnhancedEncodingAnalyzer<DTYPE>::mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const TfEnhancedEncodingAnalyzer<DTYPE>&>(other);
+    MergePdf(_stats, otherAnalyzer._stats);
+    _statsUpdated = _statsUpdated || otherAnalyzer._statsUpdated;
+}
+
+template <typename DTYPE>
+void TfEnhancedEncodingAnalyzer<DTYPE>::copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other)
+{
+    const auto& otherAnalyzer = dynamic_cast<const TfEnhancedEncodingAnalyzer<DTYPE>&>(other);
+    CopyPdfLayout(_stats, otherAnalyzer._stats);
+    _statsUpdated = false;
+}
+
+
 // Explicit instantiations
 template class TfEnhancedEncodingAnalyzer<double>;
 
@@ -93,6 +93,18 @@ public:
      */
     std::vector<std::tuple<double, double>> getStatsHistogram() const override;
 
+    /**
+     * @brief Merges the statistics collected by another encoding analyzer of the same type into this one
+     * @param other Encoding analyzer to merge the statistics of
+     */
+    void mergeStats(const IQuantizationEncodingAnalyzer<DTYPE>& other) override;
+
+    /**
+     * @brief Resets the statistics to an empty PDF with the same buckets as another encoding analyzer
+     * @param other Encoding analyzer to copy the PDF buckets from
+     */
+    void copyStatsLayout(const IQuantizationEncodingAnalyzer<DTYPE>& other) override;
+
 private:
     PDF _stats;
     bool _statsUpdated = false;
@@ -37,6 +37,7 @@
 //==============================================================================
 
 
+#include <algorithm>
 #include <cassert>
 #include <cmath>
 #include <limits>
@@ -286,6 +287,51 @@ void UpdatePdf(const DTYPE* data, int cnt, ComputationMode mode_cpu_gpu, bool si
     pdf.iterations++;
 }
 
+void MergePdf(PDF& dst, const PDF& src)
+{
+    if (src.xLeft.empty() || src.iterations == 0)
+    {
+        return;
+    }
+
+    if (dst.xLeft.empty())
+    {
+        dst = src;
+        return;
+    }
+
+    std::vector<double> srcPdf(src.pdf);
+    if (dst.xLeft != src.xLeft)
+    {
+        // Map the buckets of 'src' onto the buckets of 'dst'
+        double bucketSize = dst.xLeft[1] - dst.xLeft[0];
+        double pdfOffset  = dst.xLeft[0] / bucketSize;
+        std::fill(srcPdf.begin(), srcPdf.end(), 0);
+        for (size_t i = 0; i < src.xLeft.size(); ++i)
+        {
+            int index = round(src.xLeft[i] / bucketSize - pdfOffset);
+            if (index >= 0 && index < PDF_SIZE)
+            {
+                srcPdf[index] += src.pdf[i];
+            }
+        }
+    }
+
+    int iterations = dst.iterations + src.iterations;
+    for (int i = 0; i < PDF_SIZE; ++i)
+    {
+        dst.pdf[i] = (dst.pdf[i] * dst.iterations + srcPdf[i] * src.iterations) / iterations;
+    }
+    dst.iterations = iterations;
+}
+
+void CopyPdfLayout(PDF& dst, const PDF& src)
+{
+    dst.xLeft = src.xLeft;
+    dst.pdf.assign(src.pdf.size(), 0);
+    dst.iterations = 0;
+}
+
 template <typename DTYPE>
 void GetHistogram(const DTYPE* data, int cnt, uint32_t histogram[PDF_SIZE], const DTYPE bucket_size,
                   const DTYPE pdf_offset, const ComputationMode mode_cpu_gpu, const bool is_signed,
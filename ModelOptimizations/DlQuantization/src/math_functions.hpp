@@ -114,6 +114,23 @@ template <typename DTYPE>
 void UpdatePdf(const DTYPE* data, int cnt, ComputationMode mode_cpu_gpu, bool signed_vals, PDF& pdf,
                IAllocator* allocator);
 
+/**
+ * @brief Merge a probability density function into another one, as if all the data averaged into 'src' had been
+ * averaged into 'dst'. If both PDFs share the same buckets, the result is equal to the PDF obtained by
+ * updating 'dst' with the data of 'src' sequentially. Otherwise, the buckets of 'src' are mapped to the buckets
+ * of 'dst' and the buckets outside the range of 'dst' are dropped, as in UpdatePdf.
+ * @param dst PDF to merge into.
+ * @param src PDF to merge.
+ */
+void MergePdf(PDF& dst, const PDF& src);
+
+/**
+ * @brief Initialize a probability density function with the buckets of another PDF, without any data.
+ * @param dst PDF to initialize.
+ * @param src PDF to copy the buckets from.
+ */
+void CopyPdfLayout(PDF& dst, const PDF& src);
+
 /**
  * @brief Create a histogram of a given tensor
  * @param data The data to create histogram from.
@@ -562,6 +562,46 @@ TEST_F(TestTensorQuantizer, SANITY_DequantizePerChannel)
     }
 }
 
+TEST_F(TestTensorQuantizer, SanityTestMergeStats)
+{
+    for (auto quantScheme: {QuantizationMode::QUANTIZATION_TF, QuantizationMode::QUANTIZATION_TF_ENHANCED,
+                            QuantizationMode::QUANTIZATION_PERCENTILE})
+    {
+        // Serial: update stats with all batches in a single tensor quantizer
+        TensorQuantizer serialQuantizer(quantScheme, ROUND_NEAREST);
+        serialQuantizer.updateStats(data4.data(), 2000, false);
+        serialQuantizer.updateStats(data4.data() + 2000, 2000, false);
+        serialQuantizer.updateStats(data4.data() + 4000, 2000, false);
+        TfEncoding expected = serialQuantizer.computeEncoding(8, false);
+
+        // Parallel: seed the histogram layout with the first batch, then update stats of each shard separately
+        TensorQuantizer seedQuantizer(quantScheme, ROUND_NEAREST);
+        seedQuantizer.updateStats(data4.data(), 2000, false);
+
+        TensorQuantizer shard1(quantScheme, ROUND_NEAREST);
+        TensorQuantizer shard2(quantScheme, ROUND_NEAREST);
+        shard1.copyStatsLayout(seedQuantizer);
+        shard2.copyStatsLayout(seedQuantizer);
+        shard1.updateStats(data4.data(), 2000, false);
+        shard1.updateStats(data4.data() + 2000, 2000, false);
+        shard2.updateStats(data4.data() + 4000, 2000, false);
+
+        TensorQuantizer mergedQuantizer(quantScheme, ROUND_NEAREST);
+        mergedQuantizer.mergeStats(shard1);
+        mergedQuantizer.mergeStats(shard2);
+        TfEncoding actual = mergedQuantizer.computeEncoding(8, false);
+
+        EXPECT_TRUE(mergedQuantizer.isEncodingValid);
+        EXPECT_NEAR(actual.min, expected.min, 1e-6);
+        EXPECT_NEAR(actual.max, expected.max, 1e-6);
+        EXPECT_NEAR(actual.delta, expected.delta, 1e-6);
+        EXPECT_EQ(actual.offset, expected.offset);
+    }
+
+    TensorQuantizer tfQuantizer(QuantizationMode::QUANTIZATION_TF, ROUND_NEAREST);
+    EXPECT_THROW(tfQuantizer.mergeStats(*enhancedTensorQuant), std::runtime_error);
+}
+
 #ifdef GPU_QUANTIZATION_ENABLED
 
 TEST_F(TestTensorQuantizer, SanityTestGpu)
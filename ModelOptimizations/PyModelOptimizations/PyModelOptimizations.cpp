@@ -251,6 +251,10 @@ PYBIND11_MODULE(_libpymo, m)
         .def("setUnsignedSymmetric", &DlQuantization::PyTensorQuantizer::setUnsignedSymmetric)
         .def("getUnsignedSymmetric", &DlQuantization::PyTensorQuantizer::getUnsignedSymmetric)
         .def("getStatsHistogram", &DlQuantization::PyTensorQuantizer::getStatsHistogram)
+        .def("mergeStats", [](PyTensorQuantizer& self,
+                              const PyTensorQuantizer& other) { self.mergeStats(other); })
+        .def("copyStatsLayout", [](PyTensorQuantizer& self,
+                                   const PyTensorQuantizer& other) { self.copyStatsLayout(other); })
         .def("setPercentileValue", &DlQuantization::PyTensorQuantizer::setPercentileValue)
         .def("getPercentileValue", &DlQuantization::PyTensorQuantizer::getPercentileValue)
         .def("computePartialEncoding", &DlQuantization::PyTensorQuantizer::computePartialEncoding)
@@ -50,6 +50,7 @@ import  math
 
 from aimet_common.defs import QuantizationDataType, CallbackFunc
 from aimet_common.utils import AimetLogger
+from aimet_common import tracing
 from aimet_common.amp.quantizer_groups import QuantizerGroupBase
 from aimet_common.amp.utils import (
     AMPSearchAlgo,
@@ -159,6 +160,8 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
         self.min_candidate = None
         # Populate final eval score within pareto list
         self._final_eval_score = None
+        # Snapshot of the quantizer state with all quantizer groups set to the baseline candidate
+        self._baseline_snapshot = None
 
         # dict of lists to hold the supported candidates for all the quantizers
         self._supported_candidates_per_quantizer_group = defaultdict(list)
@@ -404,9 +407,44 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
                                str(candidate), str(quantizer_group), str(candidate))
             quantizer_group.set_quantizers_to_candidate(self._module_name_dict, valid_candidate)
 
+        if candidate == self.baseline_candidate:
+            self._restore_baseline()
+        else:
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
+
+    def _restore_baseline(self):
+        """
+        Restores the encodings of the sim computed with all quantizer groups set to the baseline candidate.
+        Recomputes the encodings if the baseline hasn't been snapshotted yet.
+        """
+        if self._baseline_snapshot is not None:
+            self._restore_quantizer_state(self._baseline_snapshot)
+        else:
+            self._sim.compute_encodings(self.algo_params.forward_pass_callback,
+                                        self.algo_params.forward_pass_callback_args)
+
+    def _snapshot_quantizer_state(self):
+        """
+        Takes a snapshot of the quantizer state of the sim which can be restored by _restore_quantizer_state.
+        Subclasses whose sim supports snapshots override this method together with _restore_quantizer_state.
+
+        :return: Snapshot of the quantizer state, or None if the sim doesn't support snapshots
+        """
+        return None
+
+    def _restore_quantizer_state(self, snapshot):
+        """
+        Restores the quantizer state of the sim from a snapshot taken by _snapshot_quantizer_state.
+        Without snapshot support, the encodings are recomputed for the current quantizer settings instead.
+
+        :param snapshot: Snapshot of the quantizer state
+        """
+        # pylint: disable=unused-argument
         self._sim.compute_encodings(self.algo_params.forward_pass_callback,
                                     self.algo_params.forward_pass_callback_args)
 
+    @tracing.traced("AMP.evaluate_model")
     def evaluate_model(self, eval_callback: CallbackFunc) -> float:
         """
         Evaluates a model and assert that the eval score is non-negative.
@@ -472,6 +510,7 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
         :return: Running bit ops value
         """
 
+    @tracing.traced("AMP.set_baseline")
     def set_baseline(
             self,
             fp32_accuracy: float = None,
@@ -493,6 +532,7 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
 
         self.fp32_accuracy = fp32_accuracy
         self.baseline_candidate = baseline_candidate
+        self._baseline_snapshot = None
 
         # If _candidate_mapping_dict is empty, consider baseline_candidate is valid for all quantizer groups
         if not self._candidate_mapping_dict:
@@ -503,6 +543,7 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
 
         # Set all quantizers to baseline's bitwidth
         self._set_all_quantizer_groups_to_candidate(self.baseline_candidate)
+        self._baseline_snapshot = self._snapshot_quantizer_state()
 
         return self.fp32_accuracy, self.baseline_candidate
 
@@ -528,6 +569,7 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
 
         export_list(execution_info, self._results_dir, 'amp_info_list')
 
+    @tracing.traced("AMP.run")
     def run(self,
             allowed_accuracy_drop: Union[None, float],
             search_algo: AMPSearchAlgo = AMPSearchAlgo.Binary):
@@ -603,10 +645,12 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
         logger.info("Time taken by phase2 is (%0.4f) mins", self.time_taken_phase2)
 
         # Run Phase 3 if supported and enabled to reduce the number of converts in the graph
-        self._reduce_mp_convert_ops()
+        with tracing.span("AMP.phase3"):
+            self._reduce_mp_convert_ops()
 
         self._export_amp_execution_info()
 
+    @tracing.traced("AMP.phase1")
     def _create_and_save_accuracy_list(self, baseline_candidate: CANDIDATE_WITH_DTYPE) -> ACCURACY_LIST:
         """
         Create a list of tuples of (quantizer_group, bitwidth, accuracy score)
@@ -704,8 +748,8 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
 
         logger.info('Completed Accuracy list computation')
 
-        # Recompute encodings after last quantizer's bitwidth is set back to self._max_bitwidth
-        self._sim.compute_encodings(self.algo_params.forward_pass_callback, self.algo_params.forward_pass_callback_args)
+        # Restore encodings after last quantizer's bitwidth is set back to self._max_bitwidth
+        self._restore_baseline()
 
         return accuracy_list
 
@@ -739,6 +783,7 @@ class GreedyMixedPrecisionAlgo(abc.ABC): # pylint: disable=too-many-instance-att
         with open(pareto_path_json, 'w', encoding='utf-8') as f:
             json.dump(pareto_list_with_quant_groups_as_list, f, indent=1)
 
+    @tracing.traced("AMP.phase2")
     def _create_pareto_front_list(self, allowed_accuracy_drop: float, accuracy_list: ACCURACY_LIST, fp32_accuracy: float,
                                   baseline_candidate: CANDIDATE_WITH_DTYPE, lowest_candidate: CANDIDATE_WITH_DTYPE,
                                   search_algo: Callable, phase2_reverse: bool) -> List:
@@ -38,16 +38,28 @@
 """Cache Implementation"""
 import abc
 import contextlib
+import dataclasses
+import enum
 import functools
+import hashlib
+import io
 import os
 import pickle
+import shutil
+import time
+import zlib
 from typing import Any, Callable, Optional, Generic, TypeVar
 
+import numpy as np
+
 from aimet_common.utils import AimetLogger
 
 
 _logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Utils)
 
+# Age in seconds after which temporary entry directories are considered to be left behind by crashed processes
+_STALE_TMP_DIR_AGE = 24 * 60 * 60
+
 
 class CacheMiss(FileNotFoundError):
     """Exception to be raised upon cache miss."""
@@ -137,6 +149,133 @@ class _PickleSerializationProtocol(SerializationProtocolBase):
         raise CacheMiss
 
 
+class CompressedPickleSerializationProtocol(SerializationProtocolBase):
+    """
+    Serialization protocol for pickle-serializable objects which compresses the serialized results.
+
+    Contiguous array buffers (e.g. numpy arrays) are serialized out-of-band with pickle protocol 5 and
+    byte-shuffled before compression: grouping the i-th bytes of all elements together lets the
+    sign/exponent bytes of floating point tensors compress far better than the interleaved raw bytes.
+    Framework-specific protocols can override `pickler_cls` to serialize their tensors as arrays.
+    """
+
+    pickler_cls = pickle.Pickler
+
+    def __init__(self, compression_level: int = 6):
+        """
+        :param compression_level: zlib compression level from 0 (no compression) to 9 (best compression).
+        """
+        self._compression_level = compression_level
+
+    @classmethod
+    def _get_filename(cls, working_dir, filename_prefix):
+        """Get the name of the file to save the compressed results to."""
+        return os.path.join(working_dir, f"{filename_prefix}.pkl.z")
+
+    def save(self, obj: Any, working_dir: str, filename_prefix: str) -> None:
+        """
+        Save a pickle-serializable object.
+        :param obj: Object to save.
+        :param working_dir: Directory to save the file.
+        :param filename_prefix: File name prefix.
+        :raises: TypeError if obj is not pickle-serializable.
+        """
+        stream = io.BytesIO()
+        buffers = []
+        try:
+            self.pickler_cls(stream, protocol=5, buffer_callback=buffers.append).dump(obj)
+        except pickle.PicklingError as e:
+            raise TypeError from e
+
+        compressed_buffers = []
+        for buffer in buffers:
+            data = np.frombuffer(buffer.raw(), dtype=np.uint8)
+            itemsize = memoryview(buffer).itemsize
+            if itemsize > 1 and data.size % itemsize == 0:
+                data = data.reshape(-1, itemsize).T
+            else:
+                itemsize = 1
+            compressed_buffers.append((itemsize, zlib.compress(np.ascontiguousarray(data), self._compression_level)))
+
+        filename = self._get_filename(working_dir, filename_prefix)
+        with open(filename, "wb") as f:
+            pickle.dump((zlib.compress(stream.getvalue(), self._compression_level), compressed_buffers), f)
+
+    def load(self, working_dir: str, filename_prefix: str) -> Any:
+        """
+        Load the saved object.
+        :param working_dir: Directory to save the file.
+        :param filename_prefix: File name prefix.
+        :return: Loaded object.
+        :raises: Cache miss if the combination of working_dir and
+            filename_prefix fails to find a previously saved cache entry.
+        """
+        filename = self._get_filename(working_dir, filename_prefix)
+        if not os.path.exists(filename):
+            raise CacheMiss
+
+        with open(filename, "rb") as f:
+            compressed_stream, compressed_buffers = pickle.load(f)
+
+        buffers = []
+        for itemsize, compressed_buffer in compressed_buffers:
+            data = np.frombuffer(zlib.decompress(compressed_buffer), dtype=np.uint8)
+            if itemsize > 1:
+                data = data.reshape(itemsize, -1).T
+            buffers.append(bytearray(np.ascontiguousarray(data)))
+        return pickle.loads(zlib.decompress(compressed_stream), buffers=buffers)
+
+
+def fingerprint(*objs: Any) -> str:
+    """
+    Compute content hash of objects.
+    Supports None, numbers, strings, bytes, enums, dataclasses, numpy arrays, array-likes
+    (objects implementing __array__) and lists, tuples and dicts of them.
+
+    :param objs: Objects to fingerprint.
+    :return: Hex digest of the content of the objects.
+    :raises: TypeError if an object can't be fingerprinted.
+    """
+    hasher = hashlib.sha256()
+    for obj in objs:
+        _update_fingerprint(hasher, obj)
+    return hasher.hexdigest()
+
+
+def _update_fingerprint(hasher, obj: Any):
+    """Update hasher with the content of obj."""
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, enum.Enum)):
+        hasher.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, (bytes, bytearray)):
+        hasher.update(f"bytes:{len(obj)};".encode())
+        hasher.update(obj)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        hasher.update(f"{type(obj).__qualname__}(".encode())
+        for field in dataclasses.fields(obj):
+            _update_fingerprint(hasher, field.name)
+            _update_fingerprint(hasher, getattr(obj, field.name))
+        hasher.update(b")")
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(f"{type(obj).__name__}[{len(obj)}](".encode())
+        for item in obj:
+            _update_fingerprint(hasher, item)
+        hasher.update(b")")
+    elif isinstance(obj, dict):
+        hasher.update(f"dict[{len(obj)}](".encode())
+        for key, value in obj.items():
+            _update_fingerprint(hasher, key)
+            _update_fingerprint(hasher, value)
+        hasher.update(b")")
+    elif isinstance(obj, np.ndarray) or hasattr(obj, "__array__"):
+        array = np.ascontiguousarray(obj)
+        if array.dtype.hasobject:
+            raise TypeError(f"Cannot fingerprint an array of dtype {array.dtype}.")
+        hasher.update(f"ndarray:{array.dtype.str}:{array.shape};".encode())
+        hasher.update(array.reshape(-1).view(np.uint8))
+    else:
+        raise TypeError(f"Cannot fingerprint an object of type {type(obj)}.")
+
+
 class Cache:
     """
     Cache that performs return value caching.
@@ -158,12 +297,23 @@ class Cache:
     Additional pitfall:
       - The original object and the one loaded from the cache are EQUAL but NOT IDENTICAL.
         This is because the caching mechanism is fundamentally based on serialization.
+
+    Each cache entry is stored in its own subdirectory of the cache directory.
+    If the cached function is marked with a fingerprint function or caching is enabled with a context,
+    the entry name is content-addressed, i.e. suffixed with a hash of the context and the fingerprint of
+    the function inputs (e.g. model state, configuration and dataloader), so that results are never reused
+    once the inputs change. Entries are written to a temporary directory and renamed atomically, which
+    makes it safe for multiple processes to share a cache directory.
     """
 
     def __init__(self):
         self._cache_dir = None
+        self._max_cache_size = None
+        self._context = None
+        self._default_protocol = None
 
-    def mark(self, cache_key: str, protocol: SerializationProtocolBase = None):
+    def mark(self, cache_key: str, protocol: SerializationProtocolBase = None,
+             fingerprint_fn: Callable[..., Any] = None):
         """
         Mark functions that are subject to caching.
         The functions decorated with this mark will save/load the outputs
@@ -172,12 +322,11 @@ class Cache:
         :param cache_key: Used as a prefix of the name of the file that
             caches the results of the decorated function.
         :param protocol: Serialization protocol for the return values of the function.
-            By default, we use pickle serialization protocol.
+            By default, we use the default protocol passed to `enable`, or pickle serialization protocol.
+        :param fingerprint_fn: Function that takes the same arguments as the decorated function
+            and returns the content the results depend on. The content should be supported by `fingerprint`.
         :return: A decorator that registers the decorated functions.
         """
-        # Use pickle serialization by default.
-        protocol = protocol or _PickleSerializationProtocol()
-
         def _wrap(fn: Callable, cache_key: str):
             @functools.wraps(fn)
             def caching_helper(*args, **kwargs):
@@ -185,30 +334,115 @@ class Cache:
                 if self._cache_dir is None:
                     return fn(*args, **kwargs)
 
-                working_dir = self._cache_dir
-                filename_prefix = cache_key
+                # Use pickle serialization by default.
+                _protocol = protocol or self._default_protocol or _PickleSerializationProtocol()
+
+                entry_name = cache_key
+                if fingerprint_fn is not None or self._context is not None:
+                    content = fingerprint_fn(*args, **kwargs) if fingerprint_fn else None
+                    entry_name = f"{cache_key}-{fingerprint(self._context, content)[:32]}"
+                working_dir = os.path.join(self._cache_dir, entry_name)
+
                 try:
                     # Try loading the previously evaluated result from cache.
-                    _logger.debug("Loading result of %s from %s.", cache_key, self._cache_dir)
-                    return protocol.load(working_dir, filename_prefix)
-                except CacheMiss:
+                    _logger.debug("Loading result of %s from %s.", cache_key, working_dir)
+                    if not os.path.isdir(working_dir):
+                        raise CacheMiss
+                    ret = _protocol.load(working_dir, cache_key)
+                    # Update modification time of the entry to keep track of least recently used entries
+                    os.utime(working_dir)
+                    return ret
+                except OSError:
+                    # Cache miss, or the entry was evicted by another process while being loaded
                     _logger.debug("Cache miss.")
                     ret = fn(*args, **kwargs)
-                    _logger.debug("Caching result of %s to %s.", cache_key, self._cache_dir)
-                    protocol.save(ret, working_dir, filename_prefix)
+                    _logger.debug("Caching result of %s to %s.", cache_key, working_dir)
+                    self._save_entry(_protocol, ret, working_dir, cache_key)
                     return ret
             return caching_helper
 
         return lambda fn: _wrap(fn, cache_key)
 
+    def _save_entry(self, protocol: SerializationProtocolBase, obj: Any, working_dir: str, filename_prefix: str):
+        """
+        Save a cache entry atomically and evict least recently used entries if the cache exceeds the size limit.
+        """
+        tmp_dir = f"{working_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            protocol.save(obj, tmp_dir, filename_prefix)
+            try:
+                os.rename(tmp_dir, working_dir)
+            except OSError:
+                if not os.path.isdir(working_dir):
+                    raise
+                # Another process has already saved the same entry
+                _logger.debug("Cache entry %s already exists.", working_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if self._max_cache_size is not None:
+            self._evict(keep=working_dir)
+
+    def _evict(self, keep: str):
+        """
+        Remove least recently used entries until the cache directory fits in the size limit.
+        Temporary directories of processes that crashed while saving an entry are removed as well.
+
+        :param keep: Entry that should not be removed.
+        """
+        entries = []
+        total_size = 0
+        now = time.time()
+        for entry in os.scandir(self._cache_dir):
+            try:
+                if not entry.is_dir():
+                    continue
+                if ".tmp-" in entry.name:
+                    if now - entry.stat().st_mtime > _STALE_TMP_DIR_AGE:
+                        _logger.debug("Removing stale temporary directory %s.", entry.path)
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    continue
+                size = sum(os.path.getsize(os.path.join(root, filename))
+                           for root, _, filenames in os.walk(entry.path) for filename in filenames)
+                mtime = entry.stat().st_mtime
+            except OSError:
+                # The entry was evicted by another process
+                continue
+            entries.append((mtime, entry.path, size))
+            total_size += size
+
+        for _, path, size in sorted(entries):
+            if total_size <= self._max_cache_size:
+                break
+            if path == keep:
+                continue
+            _logger.debug("Evicting cache entry %s.", path)
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+        if total_size > self._max_cache_size:
+            _logger.warning("Cache entry %s alone exceeds the cache size limit of %d bytes.",
+                            keep, self._max_cache_size)
+
     @contextlib.contextmanager
-    def enable(self, cache_dir: Optional[str]):
+    def enable(self, cache_dir: Optional[str], max_cache_size: Optional[int] = None, context: Any = None,
+               default_protocol: SerializationProtocolBase = None):
         """
         Enable caching.
 
         :param cache_dir: Directory to read/save the cached results from/to.
+        :param max_cache_size: Maximum size of the cache directory in bytes.
+            Least recently used entries are evicted once the size is exceeded. Unbounded by default.
+        :param context: Content shared by all cached functions (e.g. configuration and dataloader fingerprint)
+            which is hashed into the names of the cache entries. Should be supported by `fingerprint`.
+        :param default_protocol: Serialization protocol for functions marked without a protocol.
         """
         self._cache_dir = cache_dir
+        self._max_cache_size = max_cache_size
+        self._context = context
+        self._default_protocol = default_protocol
         try:
             if self._cache_dir is not None:
                 os.makedirs(self._cache_dir, exist_ok=True)
@@ -216,3 +450,6 @@ class Cache:
             yield
         finally:
             self._cache_dir = None
+            self._max_cache_size = None
+            self._context = None
+            self._default_protocol = None
@@ -88,13 +88,16 @@ class SaveInputOutput:
         with open(file_path, 'wb') as fptr:
             numpy_tensor.tofile(fptr)
 
-    def save(self, input_batch: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]], layer_output_batch: dict):
+    def save(self, input_batch: Union[np.ndarray, List[np.ndarray], Tuple[np.ndarray]], layer_output_batch: dict,
+             save_inputs: bool = True):
         """
         This function saves the input and layer-outputs in the form of raw files. Separate directories are used to store inputs
         and outputs. The correspondence between input and output is obtained using an identical number which is used for naming.
 
         :param input_batch: Inputs for which we want to obtain layer-outputs.
         :param layer_output_batch: Dictionary where key is output-name and value is batch of outputs.
+        :param save_inputs: If False, only the layer-outputs are saved. Used when layer-outputs of the same inputs are
+            saved in several parts.
         :return:
         """
         input_dir = os.path.join(self.dir_path, 'inputs')
@@ -105,14 +108,15 @@ class SaveInputOutput:
         batch_size = len(input_batch[0]) if isinstance(input_batch, (List, Tuple)) else len(input_batch)
 
         for idx in range(batch_size):
-            if isinstance(input_batch, (List, Tuple)):
-                multi_input_dir = os.path.join(input_dir, 'input_' + str(self.input_cntr))
-                os.makedirs(multi_input_dir, exist_ok=True)
-                for i, ith_input_batch in enumerate(input_batch):
-                    SaveInputOutput.save_raw_tensor(ith_input_batch[idx], self.axis_layout, str(i), multi_input_dir)
-            else:
-                input_file_name = 'input_' + str(self.input_cntr)
-                SaveInputOutput.save_raw_tensor(input_batch[idx], self.axis_layout, input_file_name, input_dir)
+            if save_inputs:
+                if isinstance(input_batch, (List, Tuple)):
+                    multi_input_dir = os.path.join(input_dir, 'input_' + str(self.input_cntr))
+                    os.makedirs(multi_input_dir, exist_ok=True)
+                    for i, ith_input_batch in enumerate(input_batch):
+                        SaveInputOutput.save_raw_tensor(ith_input_batch[idx], self.axis_layout, str(i), multi_input_dir)
+                else:
+                    input_file_name = 'input_' + str(self.input_cntr)
+                    SaveInputOutput.save_raw_tensor(input_batch[idx], self.axis_layout, input_file_name, input_dir)
 
             layer_output_dir = os.path.join(output_dir, 'layer_outputs_' + str(self.input_cntr))
             os.makedirs(layer_output_dir, exist_ok=True)
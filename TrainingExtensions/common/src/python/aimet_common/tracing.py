@@ -0,0 +1,274 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+"""
+Low-overhead tracing of AIMET algorithms.
+
+Algorithms are instrumented with named spans and counters. When tracing is disabled (the default), each
+instrumentation point costs a single global lookup. When enabled, spans and counter updates are recorded
+in memory and can be exported to Chrome trace / Perfetto JSON or summarized as a table:
+
+    >>> with tracing.trace("trace.json") as tracer:
+    ...     sim = QuantizationSimModel(model, dummy_input)
+    ...     sim.compute_encodings(forward_pass_callback, None)
+    >>> print(tracer.summary())
+
+The resulting file can be opened in chrome://tracing or https://ui.perfetto.dev
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError: # pragma: no cover
+    resource = None
+
+
+_tracer: Optional["Tracer"] = None
+
+
+def _get_peak_rss_bytes() -> int:
+    """ Peak resident set size of this process in bytes """
+    if resource is None:
+        return 0
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Tracer:
+    """
+    Records spans and counters of traced code
+    """
+    def __init__(self, memory_probes: Dict[str, Callable[[], int]] = None):
+        """
+        :param memory_probes: Dict mapping counter name to function returning the peak memory in bytes.
+            The probes are sampled at the end of every span. Peak host memory is always sampled.
+        """
+        self._memory_probes = {"peak_rss_bytes": _get_peak_rss_bytes, **(memory_probes or {})}
+        self._start = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        # (name, thread id, start us, duration us, args)
+        self._spans: List[tuple] = []
+        # (name, thread id, timestamp us, value)
+        self._counter_events: List[tuple] = []
+        self.counters: Dict[str, float] = defaultdict(int)
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._start) * 1e6
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """
+        Record the duration of a block of code
+
+        :param name: Name of the span
+        :param args: Additional information shown with the span in the trace viewer
+        """
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            self._spans.append((name, threading.get_ident(), start, end - start, args))
+            for counter_name, probe in self._memory_probes.items():
+                self.record_max(counter_name, probe())
+
+    def count(self, name: str, value: float = 1):
+        """
+        Increment a counter
+
+        :param name: Name of the counter
+        :param value: Value to add to the counter
+        """
+        with self._lock:
+            self.counters[name] += value
+            self._counter_events.append((name, threading.get_ident(), self._now_us(), self.counters[name]))
+
+    def record_max(self, name: str, value: float):
+        """
+        Update a counter which keeps track of the maximum of the recorded values, e.g. peak memory
+
+        :param name: Name of the counter
+        :param value: Recorded value
+        """
+        with self._lock:
+            if value > self.counters.get(name, float("-inf")):
+                self.counters[name] = value
+                self._counter_events.append((name, threading.get_ident(), self._now_us(), value))
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Convert the recorded spans and counters to Chrome trace event format
+
+        :return: Dict which can be serialized as Chrome trace / Perfetto JSON
+        """
+        events = [
+            {"name": name, "ph": "X", "pid": self._pid, "tid": tid, "ts": start, "dur": duration,
+             "args": {key: str(value) for key, value in args.items()}}
+            for name, tid, start, duration, args in self._spans
+        ]
+        events += [
+            {"name": name, "ph": "C", "pid": self._pid, "tid": tid, "ts": timestamp, "args": {name: value}}
+            for name, tid, timestamp, value in self._counter_events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        """
+        Save the recorded spans and counters as Chrome trace / Perfetto JSON
+
+        :param path: Path of the JSON file
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self) -> str:
+        """
+        Summarize recorded spans (sorted by total time) and counters as a table
+
+        :return: Summary table
+        """
+        stats = {}
+        for name, _, _, duration, _ in self._spans:
+            num_calls, total, maximum = stats.get(name, (0, 0.0, 0.0))
+            stats[name] = (num_calls + 1, total + duration, max(maximum, duration))
+
+        name_width = max([len(name) for name in stats] + [len(name) for name in self.counters] + [len("Span")])
+        lines = [f"{'Span':<{name_width}} {'Calls':>8} {'Total (s)':>12} {'Mean (ms)':>12} {'Max (ms)':>12}"]
+        for name, (num_calls, total, maximum) in sorted(stats.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<{name_width}} {num_calls:>8} {total / 1e6:>12.3f} "
+                         f"{total / num_calls / 1e3:>12.3f} {maximum / 1e3:>12.3f}")
+
+        lines.append("")
+        lines.append(f"{'Counter':<{name_width}} {'Value':>8}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<{name_width}} {value:>8}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def trace(path: str = None, memory_probes: Dict[str, Callable[[], int]] = None):
+    """
+    Enable tracing for a block of code
+
+    :param path: If provided, the trace is saved to this path as Chrome trace / Perfetto JSON when the block exits
+    :param memory_probes: Dict mapping counter name to function returning the peak memory in bytes,
+        e.g. {"cuda_peak_memory_bytes": torch.cuda.max_memory_allocated}
+    :return: Tracer recording the block of code
+    """
+    global _tracer # pylint: disable=global-statement
+    prev_tracer = _tracer
+    tracer = Tracer(memory_probes)
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = prev_tracer
+        if path is not None:
+            tracer.export_chrome_trace(path)
+
+
+def is_enabled() -> bool:
+    """ Returns True if tracing is enabled """
+    return _tracer is not None
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def span(name: str, **args):
+    """
+    Record the duration of a block of code if tracing is enabled
+
+    :param name: Name of the span
+    :param args: Additional information shown with the span in the trace viewer
+    :return: Context manager
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_CONTEXT
+    return tracer.span(name, **args)
+
+
+def traced(name: str = None):
+    """
+    Decorator that records every call of the decorated function as a span if tracing is enabled
+
+    :param name: Name of the span. Defaults to the qualified name of the function
+    """
+    def decorator(fn: Callable):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1):
+    """
+    Increment a counter if tracing is enabled
+
+    :param name: Name of the counter
+    :param value: Value to add to the counter
+    """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def record_max(name: str, value: float):
+    """
+    Update a counter which keeps track of the maximum of the recorded values if tracing is enabled
+
+    :param name: Name of the counter
+    :param value: Recorded value
+    """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.record_max(name, value)
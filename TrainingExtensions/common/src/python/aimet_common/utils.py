@@ -57,6 +57,8 @@ from tqdm import tqdm
 from bokeh.server.server import Server
 from bokeh.application import Application
 
+from aimet_common import tracing
+
 SAVE_TO_YAML = False
 
 try:
@@ -333,6 +335,8 @@ def save_json_yaml(file_path: str, dict_to_save: dict):
     encoding_file_path_json = file_path
     with open(encoding_file_path_json, 'w') as encoding_fp_json:
         json.dump(dict_to_save, encoding_fp_json, sort_keys=True, indent=4)
+    if tracing.is_enabled():
+        tracing.count("bytes_serialized", os.path.getsize(encoding_file_path_json))
 
     if SAVE_TO_YAML:
         encoding_file_path_yaml = file_path + '.yaml'
@@ -488,7 +492,7 @@ def profile(label: str, file: Union[str, os.PathLike, TextIO] = None, new_file:
     assert hasattr(file, 'write')
 
     try:
-        with Spinner(label):
+        with Spinner(label), tracing.span(label):
             start = time.perf_counter()
             yield
             if cleanup:
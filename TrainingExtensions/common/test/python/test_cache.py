@@ -35,13 +35,18 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 
+import os
 import random
+import shutil
 import tempfile
+import time
 from typing import Callable
+from unittest import mock
 
 import numpy as np
 
-from aimet_common.cache import Cache, SerializationProtocolBase
+from aimet_common import cache as cache_module
+from aimet_common.cache import Cache, SerializationProtocolBase, CompressedPickleSerializationProtocol, fingerprint
 
 
 SEED = 18452
@@ -101,3 +106,163 @@ def test_cache_numpy_array():
     def assert_equal(x, y):
         assert np.array_equal(x, y)
     _test_cache(lambda: np.random.randn(10, 10), assert_equal_fn=assert_equal)
+
+
+def test_cache_compressed():
+    def assert_equal(x, y):
+        assert type(x) == type(y)
+        assert x[0] == y[0]
+        assert all(np.array_equal(a, b) and a.dtype == b.dtype for a, b in zip(x[1], y[1]))
+
+    _test_cache(lambda: ("arrays", [np.random.randn(10, 10).astype(np.float32),
+                                    np.random.randint(0, 255, size=(3, 5), dtype=np.uint8),
+                                    np.arange(7, dtype=np.float16),
+                                    np.array(1.5)]),
+                protocol=CompressedPickleSerializationProtocol(),
+                assert_equal_fn=assert_equal)
+
+
+def test_compressed_protocol_size():
+    array = np.random.randn(256, 256).astype(np.float32).round(2)
+    with tempfile.TemporaryDirectory() as working_dir:
+        CompressedPickleSerializationProtocol().save(array, working_dir, "test")
+        compressed_size = os.path.getsize(os.path.join(working_dir, "test.pkl.z"))
+    assert compressed_size < array.nbytes
+
+
+def test_fingerprint():
+    x = np.random.randn(10, 10)
+    assert fingerprint(x, {"bw": 8}) == fingerprint(x.copy(), {"bw": 8})
+    assert fingerprint(x, {"bw": 8}) != fingerprint(x, {"bw": 4})
+    assert fingerprint(x) != fingerprint(x.astype(np.float32))
+    assert fingerprint(x) != fingerprint(x.reshape(100))
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+
+
+def test_cache_content_addressed():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = Cache()
+
+        call_count = 0
+
+        @cache.mark("test", fingerprint_fn=lambda x: x)
+        def _fn(x):
+            nonlocal call_count
+            call_count += 1
+            return x.sum()
+
+        x = np.random.randn(10, 10)
+        with cache.enable(cache_dir, context="config_0"):
+            assert _fn(x) == x.sum()
+            assert _fn(x.copy()) == x.sum()
+        assert call_count == 1
+
+        # Different input
+        y = np.random.randn(10, 10)
+        with cache.enable(cache_dir, context="config_0"):
+            assert _fn(y) == y.sum()
+        assert call_count == 2
+
+        # Different context
+        with cache.enable(cache_dir, context="config_1"):
+            assert _fn(x) == x.sum()
+        assert call_count == 3
+
+        with cache.enable(cache_dir, context="config_0"):
+            _fn(x)
+            _fn(y)
+        assert call_count == 3
+        assert len(os.listdir(cache_dir)) == 3
+
+
+def test_cache_lru_eviction():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = Cache()
+
+        call_count = 0
+
+        @cache.mark("test", fingerprint_fn=lambda seed: seed)
+        def _fn(seed):
+            nonlocal call_count
+            call_count += 1
+            return np.random.RandomState(seed).randn(1000)
+
+        # Budget fits two entries
+        max_cache_size = 2 * np.random.randn(1000).nbytes + 1000
+        with cache.enable(cache_dir, max_cache_size=max_cache_size):
+            _fn(0)
+            time.sleep(0.01)
+            _fn(1)
+            time.sleep(0.01)
+            _fn(0)  # Cache hit; entry 0 becomes most recently used
+            time.sleep(0.01)
+            _fn(2)  # Evicts entry 1
+            assert call_count == 3
+            assert len(os.listdir(cache_dir)) == 2
+
+            _fn(0)
+            _fn(2)
+            assert call_count == 3
+            _fn(1)
+            assert call_count == 4
+
+
+def test_cache_entry_evicted_while_loading():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = Cache()
+
+        class _EvictedProtocol(CompressedPickleSerializationProtocol):
+            def load(self, working_dir, filename_prefix):
+                # Another process evicts the entry after the protocol has found it
+                shutil.rmtree(working_dir)
+                with open(self._get_filename(working_dir, filename_prefix), "rb"):
+                    pass
+
+        call_count = 0
+
+        @cache.mark("test", _EvictedProtocol(), fingerprint_fn=lambda x: x)
+        def _fn(x):
+            nonlocal call_count
+            call_count += 1
+            return x
+
+        with cache.enable(cache_dir):
+            assert _fn(1) == 1
+            assert _fn(1) == 1
+        assert call_count == 2
+
+
+def test_cache_eviction_robustness():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = Cache()
+
+        @cache.mark("test", fingerprint_fn=lambda seed: seed)
+        def _fn(seed):
+            return np.random.RandomState(seed).randn(1000)
+
+        # Temporary directories left behind by crashed processes are removed once they are stale
+        stale_tmp_dir = os.path.join(cache_dir, "test-stale.tmp-1")
+        fresh_tmp_dir = os.path.join(cache_dir, "test-fresh.tmp-1")
+        for tmp_dir in (stale_tmp_dir, fresh_tmp_dir):
+            os.makedirs(tmp_dir)
+            with open(os.path.join(tmp_dir, "data"), "wb") as f:
+                f.write(bytes(100))
+        stale_time = time.time() - cache_module._STALE_TMP_DIR_AGE - 1
+        os.utime(stale_tmp_dir, (stale_time, stale_time))
+
+        max_cache_size = 2 * np.random.randn(1000).nbytes + 1000
+        with cache.enable(cache_dir, max_cache_size=max_cache_size):
+            _fn(0)
+            assert not os.path.exists(stale_tmp_dir)
+            assert os.path.exists(fresh_tmp_dir)
+
+            # Entries removed by another process while being measured are skipped
+            getsize = os.path.getsize
+            def _getsize(path):
+                if os.path.basename(os.path.dirname(path)).startswith("test-") and ".tmp-" not in path:
+                    raise FileNotFoundError(path)
+                return getsize(path)
+
+            with mock.patch("os.path.getsize", side_effect=_getsize):
+                _fn(1)
+            assert len([name for name in os.listdir(cache_dir) if ".tmp-" not in name]) == 2
@@ -0,0 +1,100 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+import json
+import os
+import tempfile
+import threading
+
+from aimet_common import tracing
+
+
+@tracing.traced()
+def _traced_fn(x):
+    tracing.count("calls")
+    return x + 1
+
+
+def test_tracing_disabled():
+    assert not tracing.is_enabled()
+    with tracing.span("span"):
+        tracing.count("counter")
+        tracing.record_max("max", 1)
+    assert _traced_fn(1) == 2
+
+
+def test_tracing_spans_and_counters():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        trace_path = os.path.join(tmp_dir, "trace.json")
+        with tracing.trace(trace_path, memory_probes={"probe_bytes": lambda: 123}) as tracer:
+            assert tracing.is_enabled()
+            with tracing.span("outer", arg=1):
+                for i in range(3):
+                    assert _traced_fn(i) == i + 1
+                tracing.count("bytes_serialized", 100)
+                tracing.record_max("peak", 5)
+                tracing.record_max("peak", 3)
+
+            thread = threading.Thread(target=_traced_fn, args=(0,))
+            thread.start()
+            thread.join()
+
+        assert not tracing.is_enabled()
+        assert tracer.counters["calls"] == 4
+        assert tracer.counters["bytes_serialized"] == 100
+        assert tracer.counters["peak"] == 5
+        assert tracer.counters["probe_bytes"] == 123
+        assert tracer.counters["peak_rss_bytes"] > 0
+
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+
+    spans = [event for event in events if event["ph"] == "X"]
+    assert sorted(event["name"] for event in spans) == ["_traced_fn"] * 4 + ["outer"]
+    outer, = [event for event in spans if event["name"] == "outer"]
+    assert outer["args"] == {"arg": "1"}
+    for event in spans:
+        if event["tid"] == outer["tid"] and event["name"] == "_traced_fn":
+            assert outer["ts"] <= event["ts"]
+            assert event["ts"] + event["dur"] <= outer["ts"] + outer["dur"]
+    assert len({event["tid"] for event in spans}) == 2
+
+    counter_events = [event for event in events if event["ph"] == "C" and event["name"] == "calls"]
+    assert [event["args"]["calls"] for event in counter_events] == [1, 2, 3, 4]
+
+    summary = tracer.summary()
+    assert "outer" in summary and "_traced_fn" in summary and "bytes_serialized" in summary
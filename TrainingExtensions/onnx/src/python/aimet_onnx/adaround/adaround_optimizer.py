@@ -40,7 +40,6 @@
 from typing import Union, Tuple, Dict, List
 import numpy as np
 import onnx
-from onnx import numpy_helper
 import torch
 import torch.nn.functional as functional
 from torch.utils.data import Dataset
@@ -51,7 +50,7 @@ from aimet_common.utils import AimetLogger
 from aimet_onnx.adaround.activation_sampler import ActivationSampler
 from aimet_onnx.quantsim import QuantizationSimModel
 from aimet_onnx.adaround.utils import ModuleInfo, read_attributes_for_op
-from aimet_onnx.utils import create_input_dict
+from aimet_onnx.utils import create_input_dict, get_tensor_array, set_tensor_array, write_tensor_array_to_file
 # pylint: disable=import-error
 from aimet_torch.adaround.adaround_loss import AdaroundLoss, AdaroundHyperParameters
 from aimet_torch.adaround.adaround_tensor_quantizer import AdaroundTensorQuantizer
@@ -80,7 +79,8 @@ class AdaroundOptimizer:
                         orig_model: ModelProto, quant_model: QuantizationSimModel,
                         act_func: Union[torch.nn.Module, None], cached_dataset: Dataset,
                         opt_params: AdaroundHyperParameters, param_to_adaround_tensor_quantizer: Dict,
-                        use_cuda: bool, device: int = 0, user_onnx_libs: List[str] = None):
+                        use_cuda: bool, device: int = 0, user_onnx_libs: List[str] = None,
+                        external_data_path: str = None):
         """
         Adaround module
 
@@ -96,12 +96,14 @@ class AdaroundOptimizer:
         :param use_cuda: If we should use cuda
         :param device: CUDA device ID
         :param user_onnx_libs: List of paths to all compiled ONNX custom ops libraries
+        :param external_data_path: File to write adarounded weights stored in external files to
         """
         # pylint: disable=too-many-arguments
 
         # Optimize weight rounding
         cls._optimize_rounding(module, quantized_input_name, orig_model, quant_model, act_func, cached_dataset,
-                               opt_params, param_to_adaround_tensor_quantizer, use_cuda, device, user_onnx_libs)
+                               opt_params, param_to_adaround_tensor_quantizer, use_cuda, device, user_onnx_libs,
+                               external_data_path)
 
         # After optimization, set the optimized layer's rounding mode to "Hard rounding"
         param_to_adaround_tensor_quantizer[module.params['weight'].name].use_soft_rounding = False
@@ -112,7 +114,8 @@ class AdaroundOptimizer:
                            orig_model: ModelProto, quant_model: QuantizationSimModel,
                            act_func: Union[None, str], cached_dataset: Dataset,
                            opt_params: AdaroundHyperParameters, param_to_adaround_tensor_quantizer: Dict,
-                           use_cuda: bool, device: int = 0, user_onnx_libs: List[str] = None):
+                           use_cuda: bool, device: int = 0, user_onnx_libs: List[str] = None,
+                           external_data_path: str = None):
         """
         Optimizes the weight rounding of quantized wrapper module
         :param module: Original module
@@ -124,13 +127,14 @@ class AdaroundOptimizer:
         :param opt_params: Optimization parameters
         :param param_to_adaround_tensor_quantizer: Param name to adaround tensor quantizer dictionary
         :param user_onnx_libs: List of paths to all compiled ONNX custom ops libraries
+        :param external_data_path: File to write adarounded weights stored in external files to
         """
         # pylint: disable=too-many-locals, too-many-arguments
         adaround_quantizer = param_to_adaround_tensor_quantizer[module.params['weight'].name]
         torch_device = 'cpu'
         if use_cuda:
             torch_device = 'cuda:' + str(device)
-        weights = torch.from_numpy(numpy_helper.to_array(module.params['weight'].tensor)).to(torch_device)
+        weights = torch.from_numpy(np.array(get_tensor_array(module.params['weight'].tensor))).to(torch_device)
         enable_grad(weights)
 
         # pylint: disable=protected-access
@@ -204,9 +208,9 @@ class AdaroundOptimizer:
 
         adaround_quantizer.use_soft_rounding = True
         adarounded_weights = adaround_quantizer.adaround_weights(weights)
-        weights = adarounded_weights.detach().cpu().numpy().tobytes()
+        weights = adarounded_weights.detach().cpu().numpy()
         weight_name = module.params['weight'].name
-        update_sim_weight(quant_model, weights, weight_name)
+        update_sim_weight(quant_model, weights, weight_name, external_data_path)
 
     @classmethod
     def _compute_recons_metrics(cls, quant_module: ModuleInfo, act_func: Union[None, str], inp_data: torch.Tensor,
@@ -229,7 +233,7 @@ class AdaroundOptimizer:
         torch_device = 'cpu'
         if use_cuda:
             torch_device = 'cuda:' + str(device)
-        weights = torch.from_numpy(numpy_helper.to_array(quant_module.params['weight'].tensor)).to(torch_device)
+        weights = torch.from_numpy(np.array(get_tensor_array(quant_module.params['weight'].tensor))).to(torch_device)
         inp_data = inp_data.to(torch_device)
         # Enable hard rounding and get quantized wrapper module's output
         adaround_quantizer.use_soft_rounding = False
@@ -278,7 +282,7 @@ class AdaroundOptimizer:
                 inp_data = functional.pad(inp_data, pad=torch_padding)
             bias = None
             if 'bias' in quant_module.params:
-                bias = torch.from_numpy(numpy_helper.to_array(quant_module.params['bias'].tensor)).to(device)
+                bias = torch.from_numpy(np.array(get_tensor_array(quant_module.params['bias'].tensor))).to(device)
             out_data = functional.conv2d(inp_data, adarounded_weights, bias=bias, stride=attributes['strides'],
                                          dilation=attributes['dilations'], groups=attributes['group'])
         elif quant_module.type == 'ConvTranspose':
@@ -290,11 +294,11 @@ class AdaroundOptimizer:
                 inp_data = functional.pad(inp_data, pad=torch_padding)
             bias = None
             if 'bias' in quant_module.params:
-                bias = torch.from_numpy(numpy_helper.to_array(quant_module.params['bias'].tensor)).to(device)
+                bias = torch.from_numpy(np.array(get_tensor_array(quant_module.params['bias'].tensor))).to(device)
             out_data = functional.conv_transpose2d(inp_data, adarounded_weights, bias=bias, stride=attributes['strides'],
                                                    dilation=attributes['dilations'], groups=attributes['group'])
         elif quant_module.type in ['Gemm', 'MatMul']:
-            bias = torch.from_numpy(numpy_helper.to_array(quant_module.params['bias'].tensor)).to(device)
+            bias = torch.from_numpy(np.array(get_tensor_array(quant_module.params['bias'].tensor))).to(device)
             out_data = functional.linear(inp_data, adarounded_weights, bias=bias)
 
         else:
@@ -319,16 +323,23 @@ def enable_grad(tensor: torch.Tensor):
     if tensor.is_leaf:
         tensor.requires_grad = True
 
-def update_sim_weight(quant_model: onnx.ModelProto, weights: onnx.TensorProto, weight_name: str):
+def update_sim_weight(quant_model: onnx.ModelProto, weights: np.ndarray, weight_name: str,
+                      external_data_path: str = None):
     """
-    Updates weights in sim for a given name
+    Updates weights in sim for a given name. The files of weights stored in external files, which may be shared with
+    the original model, are not changed. Instead, such weights are appended to external_data_path if it is given, and
+    replaced by in-model data otherwise.
 
     :param quant_model: Quantized model
-    :param weights: Weight tensor
+    :param weights: Weight array
     :param weight_name: Name of the weight to be updated
+    :param external_data_path: File to write weights stored in external files to
     """
     for tensor in quant_model.model.graph.initializer:
         if tensor.name == weight_name:
-            tensor.raw_data = weights
+            if external_data_path and tensor.data_location == onnx.TensorProto.EXTERNAL:
+                write_tensor_array_to_file(tensor, weights, external_data_path)
+            else:
+                set_tensor_array(tensor, weights)
             return
     logger.info("Could not find %s in QuantSim model", weight_name)
@@ -124,7 +124,7 @@ class Adaround:
 
         :param model: Model to Adaround
         :param params: Parameters for Adaround
-        :param path: path where to store parameter encodings
+        :param path: path where to store parameter encodings and, for models with external data, adarounded weights
         :param filename_prefix: Prefix to use for filename of the encodings file
         :param default_param_bw: Default bitwidth (4-31) to use for quantizing layer parameters
         :param param_bw_override_list: List of Tuples. Each Tuple is a param name and the corresponding parameter bitwidth
@@ -173,7 +173,7 @@ class Adaround:
                           The activation quantizers are expected to have been disabled.
         :param model: Original fp32 model from which quant_sim was created.
         :param params: Parameters for Adaround
-        :param path: path where to store parameter encodings
+        :param path: path where to store parameter encodings and, for models with external data, adarounded weights
         :param filename_prefix: Prefix to use for filename of the encodings file
         :param use_cuda: If we should use cuda
         :param device: CUDA device ID
@@ -188,7 +188,16 @@ class Adaround:
         # Get the module - activation function pair using ConnectedGraph
         module_act_func_pair = get_module_act_func_pair(model)
 
-        cls._adaround_model(model, quant_sim, module_act_func_pair, params, use_cuda, device, user_onnx_libs)
+        # Adarounded weights stored in external files are written next to the encodings rather than held in memory
+        external_data_path = None
+        if utils.has_external_data(quant_sim.model.model):
+            os.makedirs(path, exist_ok=True)
+            external_data_path = os.path.join(os.path.abspath(path), filename_prefix + '.data')
+            if os.path.exists(external_data_path):
+                os.remove(external_data_path)
+
+        cls._adaround_model(model, quant_sim, module_act_func_pair, params, use_cuda, device, user_onnx_libs,
+                            external_data_path)
 
         # Export quantization encodings to JSON-formatted file
         cls._export_encodings_to_json(path, filename_prefix, quant_sim)
@@ -199,7 +208,8 @@ class Adaround:
 
     @classmethod
     def _adaround_model(cls, model: onnx_pb.ModelProto, quant_sim: QuantizationSimModel, module_act_func_pair: Dict,
-                        params: AdaroundParameters, use_cuda: bool = True, device: int = 0, user_onnx_libs: List[str] = None):
+                        params: AdaroundParameters, use_cuda: bool = True, device: int = 0, user_onnx_libs: List[str] = None,
+                        external_data_path: str = None):
         """
         Optimize weight rounding of every module (AdaroundSupportedModules) of model in sequential manner
         based on occurrence
@@ -212,6 +222,7 @@ class Adaround:
         :param use_cuda: If we should use cuda
         :param device: CUDA device ID
         :param user_onnx_libs: List of paths to all compiled ONNX custom ops libraries
+        :param external_data_path: File to write adarounded weights stored in external files to
         """
         # pylint: disable=too-many-locals, protected-access
 
@@ -251,7 +262,7 @@ class Adaround:
                     AdaroundOptimizer.adaround_module(model_data.module_to_info[name], quantized_input_name,
                                                       model, quant_sim.model, act_func,
                                                       cached_dataset, opt_params, param_to_tensor_quantizer_dict,
-                                                      use_cuda, device, user_onnx_libs)
+                                                      use_cuda, device, user_onnx_libs, external_data_path)
 
     @staticmethod
     def _compute_param_encodings(quant_sim: QuantizationSimModel, params: AdaroundParameters):
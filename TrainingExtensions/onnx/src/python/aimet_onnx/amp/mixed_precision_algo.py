@@ -42,11 +42,10 @@ from collections import defaultdict, OrderedDict
 import pickle
 import functools
 from typing import Any, Callable, Tuple, List, Dict
-import json
 import numpy as np
 import onnxruntime
 
-from aimet_common.utils import AimetLogger, save_json_yaml
+from aimet_common.utils import AimetLogger
 from aimet_common.defs import CallbackFunc
 from aimet_common.amp.mixed_precision_algo import GreedyMixedPrecisionAlgo as MixedPrecisionAlgo
 from aimet_common.amp.quantizer_groups import reformat_supported_kernels
@@ -60,7 +59,7 @@ from aimet_common.amp.utils import (
 
 from aimet_onnx.amp import utils as mixed_precision_utils
 from aimet_onnx.amp.quantizer_groups import find_quantizer_group, QuantizerGroup, find_supported_candidates
-from aimet_onnx.quantsim import QuantizationSimModel, load_encodings_to_sim
+from aimet_onnx.quantsim import QuantizationSimModel, QuantSimSnapshot
 from aimet_onnx.qc_quantize_op import QcQuantizeOp
 from aimet_onnx.defs import DataLoader
 
@@ -327,8 +326,8 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
                 # compute encodings
                 self._sim.compute_encodings(self.algo_params.forward_pass_callback,
                                             self.algo_params.forward_pass_callback_args)
-                # export encodings
-                self._export_encodings(self._results_dir)
+                # take a snapshot of the parameter encodings
+                param_snapshot = self._sim.snapshot(quantizer_names=self._sim.param_names)
 
                 # disable the parameter quantization
                 disable_quantizers(param_quantizers_qgp)
@@ -337,11 +336,9 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
                 self._sim.compute_encodings(self.algo_params.forward_pass_callback,
                                             self.algo_params.forward_pass_callback_args)
 
-                # export activation encodings
-                self._export_activation_encodings(self._results_dir)
-                # enable the parameter quantization
+                # enable the parameter quantization and bring back the parameter encodings
                 enable_quantizers(param_quantizers_qgp)
-                self._load_param_encodings(self._results_dir)
+                self._sim.restore(param_snapshot)
 
                 # Disable all the quantizers
                 for quantizer_group in quantizer_groups:
@@ -390,68 +387,25 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
                     logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
 
         logger.info('Completed Accuracy list computation')
-        # Recompute encodings after quantizer's bitwidth is set back to self._max_bitwidth
-        self._sim.compute_encodings(self.algo_params.forward_pass_callback, self.algo_params.forward_pass_callback_args)
+        # Restore encodings after quantizer's bitwidth is set back to self._max_bitwidth
+        self._restore_baseline()
         return accuracy_list
 
-    def _export_encodings(self, path: str):
+    def _snapshot_quantizer_state(self) -> QuantSimSnapshot:
         """
-        Export encodings of the sim model to the given path
+        Takes a snapshot of the quantizer state of the sim
 
-        :param path: Encodings will store in the given path/.cache folder
+        :return: Snapshot of the quantizer state
         """
-        results_dir = os.path.join(path, '.cache')
-        if not os.path.exists(results_dir):
-            os.makedirs(results_dir)
-        path = os.path.join(results_dir, 'encodings_with_param.encodings')
-        # pylint: disable=protected-access
-        self._sim._export_encodings(path)
-
-    def _export_activation_encodings(self, path: str):
-        """
-        Export encodings of the sim model to the given path
+        return self._sim.snapshot()
 
-        :param path: Encodings will store in the given path/.cache folder
-        """
-        results_dir = os.path.join(path, '.cache')
-        if not os.path.exists(results_dir):
-            os.makedirs(results_dir)
-        path = os.path.join(results_dir, 'encodings_with_act.encodings')
-        # pylint: disable=protected-access
-        self._sim._export_encodings(path)
-
-    def _load_param_encodings(self, path: str):
+    def _restore_quantizer_state(self, snapshot: QuantSimSnapshot):
         """
-        Loads parameter encodings to the sim model
+        Restores the quantizer state of the sim from a snapshot
 
-        :param path: Folder Path where encodings file is present
+        :param snapshot: Snapshot of the quantizer state
         """
-        param_path = os.path.join(path, '.cache/encodings_with_param.encodings')
-
-        # Load encodings file
-        with open(param_path) as json_file:
-            param_encodings = json.load(json_file)
-
-        # Loading activation encodings also along with param encodings to get compatible with load_encodings_to_sim function
-        # These activation encodings are already present in quantsim model
-        act_path = os.path.join(path, '.cache/encodings_with_act.encodings')
-        with open(act_path) as json_file:
-            act_encodings = json.load(json_file)
-
-        param_encodings['activation_encodings'] = act_encodings['activation_encodings']
-
-        # Save the updated encodings to the file
-        save_json_yaml(param_path, param_encodings)
-        #load encodings
-        load_encodings_to_sim(self._sim, param_path, strict=True)
-
-        # Removing the files created by _export_encodings function
-        os.remove(param_path)
-        if os.path.exists(param_path+".yaml"):
-            os.remove(param_path+".yaml")
-        os.remove(act_path)
-        if os.path.exists(act_path+".yaml"):
-            os.remove(act_path+".yaml")
+        self._sim.restore(snapshot)
 
     def _evaluate_model(self, eval_callback: CallbackFunc) -> float:
         """
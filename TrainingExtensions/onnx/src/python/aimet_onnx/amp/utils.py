@@ -36,19 +36,155 @@
 # =============================================================================
 """ Utilities for mixed precision feature """
 
-from typing import List, Tuple, Dict, Any
-from collections import defaultdict
+import hashlib
+from typing import List, Tuple, Dict, Any, Iterable, Optional
+from collections import defaultdict, OrderedDict
+import numpy as np
+import onnx
+from onnx import helper, ModelProto, TensorProto
 
 # Import AIMET specific modules
 from aimet_common.amp.utils import CANDIDATE_WITH_DTYPE, get_effective_bitwidth
 from aimet_common.cost_calculator import CostCalculator
+from aimet_common.utils import AimetLogger
 from aimet_onnx.meta.connectedgraph import ConnectedGraph
 from aimet_onnx.amp.quantizer_groups import QuantizerGroup
 from aimet_onnx import utils
 from aimet_onnx.quantsim import QuantizationSimModel
 
+logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.MixedPrecision)
 
-def get_activation_shapes(sim: QuantizationSimModel) -> Dict[str, Any]:
+# Domains understood by onnx.shape_inference. Nodes from any other domain (e.g. QcQuantizeOp) are custom ops
+_ONNX_DOMAINS = ('', 'ai.onnx', 'ai.onnx.ml')
+
+# Initializers with at most this many elements are kept when building the shape inference model so that
+# shape-carrying tensors (e.g. Reshape targets) can be propagated. Larger ones are replaced by typed graph inputs.
+_MAX_INLINED_INITIALIZER_SIZE = 1024
+
+# Number of graphs whose activation shapes are kept in memory
+_ACTIVATION_SHAPE_CACHE_SIZE = 16
+_activation_shape_cache: 'OrderedDict[str, Dict[str, Tuple[int, ...]]]' = OrderedDict()
+
+
+def get_activation_shapes(sim: QuantizationSimModel, required_tensors: Optional[Iterable[str]] = None) \
+        -> Dict[str, Any]:
+    """
+    Gets activation shapes of the model through static shape inference, without running the model. Results are
+    cached by graph hash so repeated calls on the same graph return instantly. Falls back to running data through
+    the model if shape inference fails or leaves the shape of any required tensor unresolved, e.g. the outputs of
+    custom ops with multiple outputs or of ops with data-dependent output shapes.
+
+    :param sim: QuantizationSim model
+    :param required_tensors: Names of the tensors whose shapes are needed. Defaults to the outputs of all nodes
+    :return Dict of activation shapes where key is activation name and value is shape
+    """
+    try:
+        activation_shapes = infer_activation_shapes(sim.model.model)
+    except (onnx.shape_inference.InferenceError, ValueError) as e:
+        logger.warning('Shape inference failed (%s), running the model to get activation shapes instead', e)
+        return _get_activation_shapes_by_execution(sim)
+
+    if required_tensors is None:
+        required_tensors = [name for node in sim.model.model.graph.node for name in node.output]
+    unresolved = [name for name in required_tensors if name and name not in activation_shapes]
+    if unresolved:
+        logger.warning('Shape inference could not resolve the shapes of %d tensors (%s), '
+                       'running the model to get activation shapes instead', len(unresolved), ', '.join(unresolved))
+        activation_shapes.update(_get_activation_shapes_by_execution(sim))
+    return activation_shapes
+
+
+def infer_activation_shapes(model: ModelProto, dynamic_size: int = 1) -> Dict[str, Tuple[int, ...]]:
+    """
+    Resolves static shapes of all tensors in the model using onnx.shape_inference. Custom ops (any node outside
+    the ONNX domains, such as QcQuantizeOp) are treated as shape-preserving on their first input.
+
+    :param model: ONNX model
+    :param dynamic_size: Dimension size to use for dynamic axes of graph inputs
+    :return: Dict mapping tensor name to shape. Tensors whose shape could not be fully resolved are omitted,
+        including the outputs of custom ops with multiple outputs
+    """
+    shape_model = _make_shape_inference_model(model, dynamic_size)
+    graph_hash = hashlib.sha256(shape_model.SerializeToString(deterministic=True)).hexdigest()
+    if graph_hash in _activation_shape_cache:
+        _activation_shape_cache.move_to_end(graph_hash)
+        return dict(_activation_shape_cache[graph_hash])
+
+    inferred_model = onnx.shape_inference.infer_shapes(shape_model, strict_mode=False, data_prop=True)
+    graph = inferred_model.graph
+    shapes = {}
+    for value_info in list(graph.input) + list(graph.value_info) + list(graph.output):
+        shape = _get_static_shape(value_info)
+        if shape is not None:
+            shapes[value_info.name] = shape
+    for init in shape_model.graph.initializer:
+        shapes[init.name] = tuple(init.dims)
+
+    _activation_shape_cache[graph_hash] = shapes
+    if len(_activation_shape_cache) > _ACTIVATION_SHAPE_CACHE_SIZE:
+        _activation_shape_cache.popitem(last=False)
+    return dict(shapes)
+
+
+def _make_shape_inference_model(model: ModelProto, dynamic_size: int) -> ModelProto:
+    """
+    Builds a light-weight copy of the model for shape inference. Large initializers are replaced by graph inputs
+    carrying only their type and shape, dynamic input axes are fixed to dynamic_size and custom ops are replaced
+    by Identity nodes.
+
+    :param model: ONNX model
+    :param dynamic_size: Dimension size to use for dynamic axes of graph inputs
+    :return: Model to run shape inference on
+    """
+    initializers = []
+    inputs = []
+    initializer_names = set()
+    for init in model.graph.initializer:
+        initializer_names.add(init.name)
+        if int(np.prod(init.dims)) <= _MAX_INLINED_INITIALIZER_SIZE and \
+                init.data_location != TensorProto.EXTERNAL:
+            initializers.append(init)
+        else:
+            inputs.append(helper.make_tensor_value_info(init.name, init.data_type, list(init.dims)))
+
+    for graph_input in model.graph.input:
+        if graph_input.name in initializer_names:
+            continue
+        graph_input = onnx.ValueInfoProto.FromString(graph_input.SerializeToString())
+        if graph_input.type.HasField('tensor_type'):
+            for dim in graph_input.type.tensor_type.shape.dim:
+                if not dim.HasField('dim_value'):
+                    dim.dim_value = dynamic_size
+        inputs.append(graph_input)
+
+    nodes = []
+    for node in model.graph.node:
+        if node.domain not in _ONNX_DOMAINS and len(node.input) >= 1 and len(node.output) == 1:
+            node = helper.make_node('Identity', [node.input[0]], [node.output[0]], name=node.name)
+        nodes.append(node)
+
+    graph = helper.make_graph(nodes, model.graph.name, inputs, list(model.graph.output), initializer=initializers)
+    return helper.make_model(graph, opset_imports=list(model.opset_import), ir_version=model.ir_version)
+
+
+def _get_static_shape(value_info: onnx.ValueInfoProto) -> Any:
+    """
+    Returns the shape of value_info as a tuple if all dimensions are static, otherwise None
+
+    :param value_info: Value info of a tensor
+    :return: Static shape or None
+    """
+    if not value_info.type.HasField('tensor_type') or not value_info.type.tensor_type.HasField('shape'):
+        return None
+    shape = []
+    for dim in value_info.type.tensor_type.shape.dim:
+        if not dim.HasField('dim_value'):
+            return None
+        shape.append(dim.dim_value)
+    return tuple(shape)
+
+
+def _get_activation_shapes_by_execution(sim: QuantizationSimModel) -> Dict[str, Any]:
     """
     Runs data through the model to get activation shapes
 
@@ -94,10 +230,11 @@ def find_layer_database_for_mac_calculation(sim: QuantizationSimModel) -> Dict[s
                 return param.shape
         return None
 
-    activation_shapes = get_activation_shapes(sim)
     ops = sim.connected_graph.get_all_ops()
     # Either conv or Linear ops are allowed
     allowed_ops = {op.dotted_name for op in ops.values() if op.type in allowed_data_types}
+    activation_shapes = get_activation_shapes(sim, [node.output[0] for node in sim.model.model.graph.node
+                                                    if node.name in allowed_ops])
 
     op_database = {}
     for node in sim.model.model.graph.node:
@@ -40,7 +40,6 @@ from typing import Dict, List, Tuple
 import contextlib
 import numpy as np
 import onnx
-from onnx import numpy_helper
 from onnxruntime.quantization.onnx_quantizer import ONNXModel
 from packaging import version
 
@@ -55,13 +54,14 @@ from aimet_common.utils import AimetLogger
 from aimet_onnx.meta.connectedgraph import ConnectedGraph
 from aimet_onnx.meta.connectedgraph import WEIGHT_INDEX, BIAS_INDEX, RUNNING_MEAN_INDEX, RUNNING_VAR_INDEX
 from aimet_onnx.meta.operations import Op
-from aimet_onnx.utils import get_node_attribute, remove_node, transpose_tensor, ParamUtils, retrieve_constant_input
+from aimet_onnx.utils import get_node_attribute, remove_node, transpose_array, ParamUtils, retrieve_constant_input, \
+    WeightStore, get_tensor_array
 
 # pylint: disable=no-name-in-module, ungrouped-imports
 if version.parse(onnx.__version__) >= version.parse("1.14.0"):
-    from onnx import NodeProto, TensorProto, ModelProto
+    from onnx import NodeProto, ModelProto
 else:
-    from onnx.onnx_pb import NodeProto, TensorProto, ModelProto
+    from onnx.onnx_pb import NodeProto, ModelProto
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.BatchNormFolding)
 
@@ -203,11 +203,14 @@ def is_valid_bn_fold(conv_linear: NodeProto, model: ModelProto, fold_backward: b
     return valid
 
 
-def fold_all_batch_norms_to_weight(model: ModelProto) -> [List]:
+def fold_all_batch_norms_to_weight(model: ModelProto, external_data_path: str = None) -> [List]:
     """
     Fold all possible batch_norm layers in a model into the weight of the corresponding conv layers
 
     :param model: onnx Model to perform BN fold on
+    :param external_data_path: File to write folded params stored in external files to, so that they are held
+        neither in memory nor in the model. The file should not be shared with other models. If None, folded params
+        are stored in the model
     :return: A list of pairs of layers [(Conv/Linear, BN layer that got folded)]
     """
     if isinstance(model, ONNXModel):
@@ -215,19 +218,22 @@ def fold_all_batch_norms_to_weight(model: ModelProto) -> [List]:
     connected_graph = ConnectedGraph(model)
     model = connected_graph.model
     conv_bn_pairs, bn_conv_pairs = find_all_batch_norms_to_fold(connected_graph)
+    # All parameters are read once and written back in a single batch at the end
+    weight_store = WeightStore(model, external_data_path=external_data_path)
     conv_bns = []
     bn_convs = []
     for conv, bn in conv_bn_pairs:
-        bn_layer = _fold_to_weight(model, conv, bn, True)
+        bn_layer = _fold_to_weight(model, conv, bn, True, weight_store)
         conv_bns.append((conv, bn_layer))
         remove_node(bn, model.graph)
 
     for bn, conv in bn_conv_pairs:
-        bn_layer = _fold_to_weight(model, conv, bn, False)
+        bn_layer = _fold_to_weight(model, conv, bn, False, weight_store)
         bn_convs.append((conv, bn_layer))
         remove_node(bn, model.graph)
 
-    _update_standalone_batchnorm_ops(model)
+    _update_standalone_batchnorm_ops(model, weight_store)
+    weight_store.flush()
 
     return conv_bns, bn_convs
 
@@ -235,7 +241,8 @@ def fold_all_batch_norms_to_weight(model: ModelProto) -> [List]:
 def _fold_to_weight(model: ModelProto,
                     conv_linear: NodeProto,
                     bn: NodeProto,
-                    fold_backward: bool):
+                    fold_backward: bool,
+                    weight_store: WeightStore):
     """
     Fold BatchNorm into the weight and bias of the given layer.
 
@@ -243,81 +250,71 @@ def _fold_to_weight(model: ModelProto,
     :param conv_linear: Conv or linear layer to fold BN into.
     :param bn: BatchNorm to fold.
     :param fold_backward: True if the BatchNorm comes after the Conv
+    :param weight_store: Parameters of the model
     """
     # Must convert MatMul layers to Gemm to allow bias
     if conv_linear.op_type == "MatMul":
-        _matmul_to_gemm(conv_linear, model)
+        _matmul_to_gemm(conv_linear, model, weight_store)
 
-    weight = ParamUtils.get_param(model, conv_linear, WEIGHT_INDEX)
-    bias = ParamUtils.get_param(model, conv_linear, BIAS_INDEX)
+    weight = weight_store.get_array(conv_linear.input[WEIGHT_INDEX])
+    bias_name = weight_store.get_param_name(conv_linear, BIAS_INDEX)
     groups = get_node_attribute(conv_linear, "group")
 
-    # If layer doesn't have bias, create a bias initializer and add it to the model, then retrieve it
-    if not bias:
-        bias_data = np.zeros(get_input_output_channels(conv_linear, model)[1])
+    # If layer doesn't have bias, create a bias initializer and add it to the model
+    if bias_name is None:
         bias_name = conv_linear.name + ".bias"
-        bias = numpy_helper.from_array(bias_data.astype(np.float32), name=bias_name)
-        model.graph.initializer.append(bias)
+        bias_data = np.zeros(get_input_output_channels(conv_linear, model)[1], dtype=np.float32)
+        weight_store.set_array(bias_name, bias_data)
         conv_linear.input.append(bias_name)
-        bias = ParamUtils.get_param(model, conv_linear, BIAS_INDEX)
+    bias = weight_store.get_array(bias_name)
 
     # Transpose weights to C, N, H, W from N, C, H, W since axis are flipped for transposed conv
     # However depthwise conv layers are always N, 1, H, W whether transposed-conv or not, so no need to transpose
-    # if conv_linear.type == "ConvTranspose" and conv_linear groups == 1:
+    # The transposed arrays are views, so folding into them updates the original weight
     if conv_linear.op_type == "ConvTranspose" and groups == 1:
-        weight = transpose_tensor(weight, (1, 0, 2, 3))
+        weight = transpose_array(weight, (1, 0, 2, 3))
     # Gemm layers may or may not need to have weights transposed depending on value of transB attribute
     elif conv_linear.op_type in LinearType and not get_node_attribute(conv_linear, "transB"):
-        weight = transpose_tensor(weight, (1, 0))
+        weight = transpose_array(weight, (1, 0))
 
-    channels = weight.dims[0] if fold_backward else weight.dims[1]
-    bn_param = get_bn_params(model, bn, channels)
+    channels = weight.shape[0] if fold_backward else weight.shape[1]
+    bn_param = get_bn_params(model, bn, channels, weight_store)
     bn_layer = copy_bn_params_to_bn_layer(bn, bn_param)
 
     _call_mo_batch_norm_fold(weight, bias, bn_param, fold_backward=fold_backward)
 
-    # Transpose weight back to original configuration
-    if conv_linear.op_type == "ConvTranspose" and groups == 1:
-        weight = transpose_tensor(weight, (1, 0, 2, 3))
-    elif conv_linear.op_type in LinearType and not get_node_attribute(conv_linear, "transB"):
-        weight = transpose_tensor(weight, (1, 0))
-
-    weight_param = ParamUtils.get_param(model, conv_linear, WEIGHT_INDEX)
-    weight_param.raw_data = weight.raw_data
     return bn_layer
 
 
-def _matmul_to_gemm(node: NodeProto, model: ModelProto):
+def _matmul_to_gemm(node: NodeProto, model: ModelProto, weight_store: WeightStore):
     """
     Convert MatMul node to Gemm and initialize bias to zeros
 
     :param node: MatMul node to convert to Gemm
     :param model: model to which the node belongs
+    :param weight_store: Parameters of the model
     """
     assert node.op_type == "MatMul"
 
     weight, transposed = retrieve_constant_input(node, model, WEIGHT_INDEX)
     if transposed:
         node.input[WEIGHT_INDEX] = weight.name
-        model.graph.initializer.remove(weight)
-        weight = transpose_tensor(weight, (1, 0))
-        model.graph.initializer.append(weight)
+        weight_store.set_array(weight.name, transpose_array(weight_store.read_array(weight.name), (1, 0)))
     node.op_type = "Gemm"
     node.name = node.name.replace("MatMul", "Gemm")
     # Create bias vector for Gemm operation
     bias_name = node.name + ".bias"
-    bias_data = np.zeros(weight.dims[1])
-    bias = numpy_helper.from_array(bias_data.astype(np.float32), name=bias_name)
-    model.graph.initializer.append(bias)
+    bias_data = np.zeros(weight_store.read_array(weight.name).shape[1], dtype=np.float32)
+    weight_store.set_array(bias_name, bias_data)
     node.input.append(bias_name)
 
 
-def _call_mo_batch_norm_fold(weight: TensorProto,
-                             bias: TensorProto,
+def _call_mo_batch_norm_fold(weight: np.ndarray,
+                             bias: np.ndarray,
                              bn_params: libpymo.BNParams,
                              fold_backward: bool):
     """
-    Calls C++ batch norm folding API.
+    Calls C++ batch norm folding API. The weight and bias arrays are updated in place.
 
     :param weight: Weight or scale tensor to fold BN into.
     :param bias: Bias tensor to fold BN into.
@@ -326,23 +323,24 @@ def _call_mo_batch_norm_fold(weight: TensorProto,
     """
     weight_tensor = libpymo.TensorParams()
 
-    weight_tensor.data = numpy_helper.to_array(weight).reshape(-1)
-    weight_tensor.shape = np.array(weight.dims)
+    weight_tensor.data = weight.reshape(-1)
+    weight_tensor.shape = np.array(weight.shape)
 
     bias_tensor = libpymo.TensorParams()
 
-    bias_tensor.data = numpy_helper.to_array(bias).reshape(-1)
-    bias_tensor.shape = np.array(bias.dims)
+    bias_tensor.data = bias.reshape(-1)
+    bias_tensor.shape = np.array(bias.shape)
     is_bias_valid = True
 
     with _expand_shape_to_4d(weight_tensor):
         _bias = libpymo.fold(bn_params, weight_tensor, bias_tensor, is_bias_valid, fold_backward)
 
-    bias.raw_data = np.asarray(_bias, dtype=np.float32).tobytes()
-    weight.raw_data = np.asarray(weight_tensor.data, dtype=np.float32).tobytes()
+    bias[...] = np.asarray(_bias, dtype=np.float32).reshape(bias.shape)
+    weight[...] = np.asarray(weight_tensor.data, dtype=np.float32).reshape(weight.shape)
 
 
-def get_bn_params(model: ModelProto, bn: NodeProto, channels: int) -> libpymo.BNParams:
+def get_bn_params(model: ModelProto, bn: NodeProto, channels: int,
+                  weight_store: WeightStore = None) -> libpymo.BNParams:
     """
     Returns the populated libpymo.BNParams object for the given BatchNormalization layer with
     parameters repeated if necessary.
@@ -350,17 +348,22 @@ def get_bn_params(model: ModelProto, bn: NodeProto, channels: int) -> libpymo.BN
     :param model: model to which the bn layer belongs
     :param bn: BatchNormalization layer to retrieve the parameters from
     :param channels: The effective number of channels the BatchNorm layer operates on (needed for Gemm layers)
+    :param weight_store: Parameters of the model. If None, the parameters are read from the model
     :return: libpymo.BNParams object for the input BatchNorm layer
     """
+    def _get_param(index: int) -> np.ndarray:
+        if weight_store is not None:
+            return weight_store.read_array(bn.input[index]).reshape(-1)
+        return get_tensor_array(ParamUtils.get_param(model, bn, index)).reshape(-1)
+
     bn_params = libpymo.BNParams()
-    gamma = numpy_helper.to_array(ParamUtils.get_param(model, bn, WEIGHT_INDEX)).reshape(-1)
+    gamma = _get_param(WEIGHT_INDEX)
     # In the case of BatchNorm2d -> Flatten -> Gemm, must resize the BN parameters to the Gemm input feature length
     resize = channels / len(gamma)
     bn_params.gamma = np.repeat(gamma, resize)
-    bn_params.beta = np.repeat(numpy_helper.to_array(ParamUtils.get_param(model, bn, BIAS_INDEX)).reshape(-1), resize)
-    bn_params.runningMean = np.repeat(
-        numpy_helper.to_array(ParamUtils.get_param(model, bn, RUNNING_MEAN_INDEX)).reshape(-1), resize)
-    runningVar = numpy_helper.to_array(ParamUtils.get_param(model, bn, RUNNING_VAR_INDEX))
+    bn_params.beta = np.repeat(_get_param(BIAS_INDEX), resize)
+    bn_params.runningMean = np.repeat(_get_param(RUNNING_MEAN_INDEX), resize)
+    runningVar = _get_param(RUNNING_VAR_INDEX)
 
     epsilon = get_node_attribute(bn, "epsilon")
     sigma = np.sqrt(runningVar + epsilon)
@@ -436,50 +439,30 @@ def get_input_output_channels(node: NodeProto, model: ModelProto) -> Tuple[int,
     return num_in_channels, num_out_channels
 
 
-# pylint: disable=too-many-locals
-def _update_standalone_batchnorm_ops(model: ModelProto):
+def _update_standalone_batchnorm_ops(model: ModelProto, weight_store: WeightStore):
     """
     Update weight and bias of standalone batchnorm ops in the model.
     :param model: onnx Model for which batchnorm parameters are to be updated.
+    :param weight_store: Parameters of the model
     """
-    initalizer_dict = {initializer.name: idx for idx, initializer in enumerate(model.graph.initializer)}
-
     for node in model.graph.node:
         if node.op_type in BatchNormType:
 
-            # get parameter names and indices
+            # get parameters, updated in place
             weight_name, bias_name, running_mean_name, running_var_name = node.input[1:]
-            idx_w, idx_b = initalizer_dict[weight_name], initalizer_dict[bias_name]
-            idx_rm, idx_rv = initalizer_dict[running_mean_name], initalizer_dict[running_var_name]
-
-            init_w = model.graph.initializer[idx_w]
-            init_b = model.graph.initializer[idx_b]
-            init_rm = model.graph.initializer[idx_rm]
-            init_rv = model.graph.initializer[idx_rv]
+            tensor_w = weight_store.get_array(weight_name)
+            tensor_b = weight_store.get_array(bias_name)
+            tensor_rm = weight_store.get_array(running_mean_name)
+            tensor_rv = weight_store.get_array(running_var_name)
 
             attr = node.attribute[0]
             assert attr.name == 'epsilon'
             epsilon = attr.f
-            tensor_w = numpy_helper.to_array(init_w)
-            tensor_b = numpy_helper.to_array(init_b)
-            tensor_rm = numpy_helper.to_array(init_rm)
-            tensor_rv = numpy_helper.to_array(init_rv)
 
             # update values
             inv_sigma = np.reciprocal(np.sqrt(tensor_rv + epsilon))
-            tensor_w = tensor_w * inv_sigma
-            tensor_b = tensor_b - tensor_rm * tensor_w
-            tensor_rm = np.zeros(tensor_w.shape, tensor_w.dtype)
-            tensor_rv = np.ones(tensor_w.shape, tensor_w.dtype)
+            tensor_w *= inv_sigma
+            tensor_b -= tensor_rm * tensor_w
+            tensor_rm[...] = 0
+            tensor_rv[...] = 1
             attr.f = 0.
-
-            init_w = numpy_helper.from_array(tensor_w, weight_name)
-            init_b = numpy_helper.from_array(tensor_b, bias_name)
-            init_rm = numpy_helper.from_array(tensor_rm, running_mean_name)
-            init_rv = numpy_helper.from_array(tensor_rv, running_var_name)
-
-            # update initializers
-            model.graph.initializer[idx_w].CopyFrom(init_w)
-            model.graph.initializer[idx_b].CopyFrom(init_b)
-            model.graph.initializer[idx_rm].CopyFrom(init_rm)
-            model.graph.initializer[idx_rv].CopyFrom(init_rv)
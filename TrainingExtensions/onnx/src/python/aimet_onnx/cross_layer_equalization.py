@@ -42,10 +42,10 @@ CLS set: Set of layers (2 or 3) that can be used for cross-layer scaling
 Layer groups: Groups of layers that are immediately connected and can be decomposed further into CLS sets
 """
 
-from typing import Tuple, List, Union
+import contextlib
+from typing import Tuple, List, Union, Dict
 import numpy as np
 import onnx
-from onnx import numpy_helper
 from onnxruntime.quantization.onnx_quantizer import ONNXModel
 from packaging import version
 
@@ -58,7 +58,7 @@ import aimet_common.libpymo as libpymo      # pylint: disable=import-error
 
 from aimet_onnx.meta.connectedgraph import ConnectedGraph, WEIGHT_INDEX, BIAS_INDEX
 from aimet_onnx.meta.operations import Op
-from aimet_onnx.utils import transpose_tensor, ParamUtils, get_node_attribute, replace_relu6_with_relu
+from aimet_onnx.utils import transpose_array, get_node_attribute, replace_relu6_with_relu, WeightStore
 from aimet_onnx.batch_norm_fold import BNLayer, fold_all_batch_norms_to_weight
 
 # pylint: disable=no-name-in-module, ungrouped-imports
@@ -76,6 +76,38 @@ cls_supported_layer_types = ['Conv', 'ConvTranspose']
 cls_supported_activation_types = ['Relu', 'PRelu']
 
 
+class _WeightStoreAccess:
+    """
+    Reads and writes parameters through a WeightStore which is created on first access. Public entry points run
+    inside _batched_updates() so that the parameters are written back to the model once, when the outermost call
+    returns. Subclasses set self._model, self._external_data_path, self._weight_store and self._num_active_calls in
+    their constructor.
+    """
+    def _get_weight_store(self) -> WeightStore:
+        """ Returns the weight store of the model, creating it if needed """
+        if self._weight_store is None:
+            self._weight_store = WeightStore(self._model.model, external_data_path=self._external_data_path)
+        return self._weight_store
+
+    @contextlib.contextmanager
+    def _batched_updates(self):
+        """
+        Writes the parameters back to the model when the outermost call returns. If the call raises, the pending
+        updates are discarded and the model is left unchanged.
+        """
+        self._num_active_calls += 1
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            self._num_active_calls -= 1
+            if not self._num_active_calls and self._weight_store is not None:
+                if succeeded:
+                    self._weight_store.flush()
+                self._weight_store = None
+
+
 def get_ordered_list_of_conv_modules(list_of_starting_ops: List) -> List:
     """
     Finds order of nodes in graph
@@ -87,16 +119,21 @@ def get_ordered_list_of_conv_modules(list_of_starting_ops: List) -> List:
     return module_list
 
 
-class CrossLayerScaling(CLS):
+class CrossLayerScaling(_WeightStoreAccess, CLS):
     """
     Scales a model's layers to equalize the weights between consecutive layers
     """
-    def __init__(self, model: ModelProto):
+    def __init__(self, model: ModelProto, external_data_path: str = None):
         """
         :param model: ONNX model
+        :param external_data_path: File to write scaled params stored in external files to. If None, they are stored
+            in the model
         """
         super().__init__()
         self._model = model
+        self._external_data_path = external_data_path
+        self._weight_store = None
+        self._num_active_calls = 0
 
     def scale_model(self) -> List[ClsSetInfo]:
         """
@@ -130,21 +167,76 @@ class CrossLayerScaling(CLS):
 
         return cls_set_info_list
 
-    def _populate_libpymo_params(self, module: NodeProto,
-                                 layer_param: libpymo.EqualizationParams):
+    def scale_cls_sets(self, cls_sets: List) -> List:
         """
-        Populates libpymo weight parameter
+        Scales the given CLS sets. Parameters are read once, scaled in place and written back to the model in a
+        single batch once all sets are scaled.
+
+        :param cls_sets: List of CLS sets
+        :return: Scaling factors calculated and applied for each CLS set in order
+        """
+        with self._batched_updates():
+            return super().scale_cls_sets(cls_sets)
+
+    def scale_cls_set(self, cls_set) -> ScaleFactor:
+        """
+        Scale a CLS set and write the scaled parameters back to the model
+
+        :param cls_set: Either a pair or regular conv layers or a triplet of depthwise separable layers
+        :return: Scaling factor calculated and applied
+        """
+        with self._batched_updates():
+            return super().scale_cls_set(cls_set)
+
+    def scale_cls_set_with_conv_layers(self, cls_set) -> np.ndarray:
+        """
+        Equalize the params of a pair of conv layers and write them back to the model
+
+        :param cls_set: Consecutive Conv layers Tuple whose weights and biases need to be equalized
+        :return: Scaling factor S_12 for each conv layer pair: numpy array
+        """
+        with self._batched_updates():
+            return super().scale_cls_set_with_conv_layers(cls_set)
+
+    def scale_cls_set_with_depthwise_layers(self, cls_set) -> [np.ndarray, np.ndarray]:
+        """
+        Equalize the params of depth wise separable layers and write them back to the model
+
+        :param cls_set: Consecutive Conv layers whose weights and biases need to be equalized.
+                        Second Conv layer is a depth-wise conv and third conv layer is point-wise conv
+        :return: Scaling factors S_12 and S_23 : numpy arrays
+        """
+        with self._batched_updates():
+            return super().scale_cls_set_with_depthwise_layers(cls_set)
+
+    def _get_weight(self, module: NodeProto) -> np.ndarray:
         """
-        weight = ParamUtils.get_param(self._model.model, module, WEIGHT_INDEX)
+        Returns the weight of a module, with the first two axes swapped for transposed conv since they are flipped
+        compared to conv. The returned array is a view, so writes to it update the model parameter.
+        """
+        weight = self._get_weight_store().get_array(module.input[WEIGHT_INDEX])
         groups = get_node_attribute(module, "group")
 
         # Transpose weights to C, N, H, W from N, C, H, W since axis are flipped for transposed conv
         if module.op_type == "ConvTranspose" and groups == 1:
-            weight = transpose_tensor(weight, (1, 0, 2, 3))
+            weight = transpose_array(weight, (1, 0, 2, 3))
+        return weight
+
+    def _get_bias(self, module: NodeProto) -> Union[np.ndarray, None]:
+        """ Returns the bias of a module as a view, or None if the module has no bias """
+        bias_name = self._get_weight_store().get_param_name(module, BIAS_INDEX)
+        if bias_name is None:
+            return None
+        return self._get_weight_store().get_array(bias_name)
 
-        layer_param.weight = numpy_helper.to_array(weight).reshape(-1)
-        weight_shape = get_weight_dimensions(np.array(weight.dims))
-        layer_param.weightShape = weight_shape
+    def _populate_libpymo_params(self, module: NodeProto,
+                                 layer_param: libpymo.EqualizationParams):
+        """
+        Populates libpymo weight parameter
+        """
+        weight = self._get_weight(module)
+        layer_param.weight = weight.reshape(-1)
+        layer_param.weightShape = get_weight_dimensions(np.array(weight.shape))
 
     def _pack_params_for_conv(self,
                               cls_set,
@@ -160,9 +252,9 @@ class CrossLayerScaling(CLS):
         self._populate_libpymo_params(cls_set[0].get_module(), prev_layer_params)
         self._populate_libpymo_params(cls_set[1].get_module(), curr_layer_params)
 
-        cls_set_0_bias = ParamUtils.get_param(self._model.model, cls_set[0].get_module(), BIAS_INDEX)
+        cls_set_0_bias = self._get_bias(cls_set[0].get_module())
         if cls_set_0_bias is not None:
-            prev_layer_params.bias = numpy_helper.to_array(cls_set_0_bias).reshape(-1)
+            prev_layer_params.bias = cls_set_0_bias.reshape(-1)
         else:
             prev_layer_params.isBiasNone = True
 
@@ -171,15 +263,16 @@ class CrossLayerScaling(CLS):
         """
         Update weight parameter from libpymo object
         """
-        weight = ParamUtils.get_param(self._model.model, module, WEIGHT_INDEX)
-        weight.raw_data = np.asarray(layer_param.weight, dtype=np.float32).tobytes()
-        groups = get_node_attribute(module, "group")
-        # Transpose weight back to original configuration
-        if module.op_type == "ConvTranspose" and groups == 1:
-            weight = transpose_tensor(weight, (1, 0, 2, 3))
+        weight = self._get_weight(module)
+        weight[...] = np.asarray(layer_param.weight, dtype=np.float32).reshape(weight.shape)
 
-        weight_param = ParamUtils.get_param(self._model.model, module, WEIGHT_INDEX)
-        weight_param.raw_data = weight.raw_data
+    def _update_bias_for_layer_from_libpymo_obj(self, layer_param: libpymo.EqualizationParams,
+                                                module: NodeProto):
+        """
+        Update bias parameter from libpymo object
+        """
+        bias = self._get_bias(module)
+        bias[...] = np.asarray(layer_param.bias, dtype=np.float32).reshape(bias.shape)
 
     def _update_params_for_conv(self,
                                 cls_set,
@@ -196,9 +289,7 @@ class CrossLayerScaling(CLS):
         self._update_weight_for_layer_from_libpymo_obj(curr_layer_params, cls_set[1].get_module())
 
         if not prev_layer_params.isBiasNone:
-            bias_param = ParamUtils.get_param(self._model.model, cls_set[0].get_module(),
-                                              BIAS_INDEX)
-            bias_param.raw_data = np.asarray(prev_layer_params.bias, dtype=np.float32).tobytes()
+            self._update_bias_for_layer_from_libpymo_obj(prev_layer_params, cls_set[0].get_module())
 
     def _pack_params_for_depthwise_conv(self, cls_set,
                                         prev_layer_params: libpymo.EqualizationParams,
@@ -217,21 +308,21 @@ class CrossLayerScaling(CLS):
 
         assert cls_set[1].groups > 1
 
-        weight = ParamUtils.get_param(self._model.model, cls_set[1].get_module(), WEIGHT_INDEX)
-        curr_layer_params.weight = numpy_helper.to_array(weight).reshape(-1)
-        curr_layer_params.weightShape = np.array(weight.dims)
+        weight = self._get_weight_store().read_array(cls_set[1].get_module().input[WEIGHT_INDEX])
+        curr_layer_params.weight = weight.reshape(-1)
+        curr_layer_params.weightShape = np.array(weight.shape)
 
         self._populate_libpymo_params(cls_set[2].get_module(), next_layer_params)
 
-        cls_set_0_bias = ParamUtils.get_param(self._model.model, cls_set[0].get_module(), BIAS_INDEX)
+        cls_set_0_bias = self._get_bias(cls_set[0].get_module())
         if cls_set_0_bias is not None:
-            prev_layer_params.bias = numpy_helper.to_array(cls_set_0_bias).reshape(-1)
+            prev_layer_params.bias = cls_set_0_bias.reshape(-1)
         else:
             prev_layer_params.isBiasNone = True
 
-        cls_set_1_bias = ParamUtils.get_param(self._model.model, cls_set[1].get_module(), BIAS_INDEX)
+        cls_set_1_bias = self._get_bias(cls_set[1].get_module())
         if cls_set_1_bias is not None:
-            curr_layer_params.bias = numpy_helper.to_array(cls_set_1_bias).reshape(-1)
+            curr_layer_params.bias = cls_set_1_bias.reshape(-1)
         else:
             curr_layer_params.isBiasNone = True
 
@@ -252,27 +343,41 @@ class CrossLayerScaling(CLS):
         self._update_weight_for_layer_from_libpymo_obj(next_layer_params, cls_set[2].get_module())
 
         if not prev_layer_params.isBiasNone:
-            bias_param = ParamUtils.get_param(self._model.model, cls_set[0].get_module(),
-                                              BIAS_INDEX)
-            bias_param.raw_data = np.asarray(prev_layer_params.bias, dtype=np.float32).tobytes()
+            self._update_bias_for_layer_from_libpymo_obj(prev_layer_params, cls_set[0].get_module())
 
         if not curr_layer_params.isBiasNone:
-            bias_param = ParamUtils.get_param(self._model.model, cls_set[1].get_module(),
-                                              BIAS_INDEX)
-            bias_param.raw_data = np.asarray(curr_layer_params.bias, dtype=np.float32).tobytes()
+            self._update_bias_for_layer_from_libpymo_obj(curr_layer_params, cls_set[1].get_module())
 
 
-class HighBiasFold(HBF):
+class HighBiasFold(_WeightStoreAccess, HBF):
     """
     Code to apply the high-bias-fold technique to a model
     """
-    def __init__(self, model: ModelProto):
+    def __init__(self, model: ModelProto, external_data_path: str = None):
+        """
+        :param model: ONNX model
+        :param external_data_path: File to write updated params stored in external files to. If None, they are stored
+            in the model
+        """
         self._model = model
+        self._external_data_path = external_data_path
+        self._weight_store = None
+        self._num_active_calls = 0
+
+    def bias_fold(self, cls_set_info_list: List[ClsSetInfo], bn_layers: Dict):
+        """
+        Folds bias values greater than 3 * sigma to next layer's bias. Parameters are read once and written back
+        to the model in a single batch once all layers are processed.
+
+        :param cls_set_info_list: List of info elements for each cls set
+        :param bn_layers: Key: Conv/Linear layer Value: Corresponding folded BN layer
+        """
+        with self._batched_updates():
+            super().bias_fold(cls_set_info_list, bn_layers)
 
     def _check_if_bias_is_none(self, layer: Op) -> bool:
         """ Returns if bias is a None for a layer. True if bias is None"""
-        bias = ParamUtils.get_param(self._model.model, layer.get_module(), BIAS_INDEX)
-        return not bias
+        return self._get_weight_store().get_param_name(layer.get_module(), BIAS_INDEX) is None
 
     def _populate_bn_params_in_libpymo_obj(self, prev_layer_bn_params: libpymo.BNParamsHighBiasFold,
                                            bn_layer: BNLayer):
@@ -296,33 +401,28 @@ class HighBiasFold(HBF):
         """
         prev_layer_params.activationIsRelu = cls_pair_info.relu_activation_between_layers
 
-        bias = ParamUtils.get_param(self._model.model, cls_pair_info.layer1.get_module(),
-                                    BIAS_INDEX)
-
-        prev_layer_params.bias = numpy_helper.to_array(bias).reshape(-1)
+        prev_module = cls_pair_info.layer1.get_module()
+        prev_layer_params.bias = self._get_weight_store().read_array(prev_module.input[BIAS_INDEX]).reshape(-1)
 
         module = cls_pair_info.layer2.get_module()
-        weight = ParamUtils.get_param(self._model.model, module, WEIGHT_INDEX)
-        bias = ParamUtils.get_param(self._model.model, module, BIAS_INDEX)
-
+        weight = self._get_weight_store().read_array(module.input[WEIGHT_INDEX])
         groups = get_node_attribute(module, "group")
 
         # Transpose weights to C, N, H, W from N, C, H, W since axis are flipped for transposed conv
         if module.op_type == "ConvTranspose" and groups == 1:
-            weight = transpose_tensor(weight, (1, 0, 2, 3))
+            weight = transpose_array(weight, (1, 0, 2, 3))
 
-        curr_layer_params.bias = numpy_helper.to_array(bias).reshape(-1)
-        curr_layer_params.weight = numpy_helper.to_array(weight).reshape(-1)
-        curr_layer_params.weightShape = get_weight_dimensions(np.array(weight.dims))
+        curr_layer_params.bias = self._get_weight_store().read_array(module.input[BIAS_INDEX]).reshape(-1)
+        curr_layer_params.weight = weight.reshape(-1)
+        curr_layer_params.weightShape = get_weight_dimensions(np.array(weight.shape))
 
     def _update_bias_for_layer_from_libpymo_obj(self, layer_param: libpymo.LayerParams,
                                                 module: NodeProto):
         """
         Update bias parameter from libpymo object
         """
-        bias = ParamUtils.get_param(self._model.model, module, BIAS_INDEX)
-
-        bias.raw_data = np.asarray(layer_param.bias, dtype=np.float32).tobytes()
+        bias = self._get_weight_store().get_array(module.input[BIAS_INDEX])
+        bias[...] = np.asarray(layer_param.bias, dtype=np.float32).reshape(bias.shape)
 
     def _update_previous_and_current_layer_bias(self, cls_pair_info: ClsSetInfo.ClsSetLayerPairInfo,
                                                 prev_layer_params: libpymo.LayerParams,
@@ -349,15 +449,18 @@ def get_weight_dimensions(weight_shape: np.array) -> np.array:
     return np.append(weight_shape, [1 for _ in range(4 - dims)]).astype(int)
 
 
-def equalize_model(model: ModelProto):
+def equalize_model(model: ModelProto, external_data_path: str = None):
     """
     High-level API to perform Cross-Layer Equalization (CLE) on the given model. The model is equalized in place.
 
     :param model: Model to equalize
+    :param external_data_path: File to write modified params stored in external files to, so that they are held
+        neither in memory nor in the model. The file should not be shared with other models. If None, modified params
+        are stored in the model
     """
     if not isinstance(model, ONNXModel):
         model = ONNXModel(model)
-    conv_bn_pairs, bn_conv_pairs = fold_all_batch_norms_to_weight(model)
+    conv_bn_pairs, bn_conv_pairs = fold_all_batch_norms_to_weight(model, external_data_path)
 
     replace_relu6_with_relu(model)
 
@@ -369,9 +472,9 @@ def equalize_model(model: ModelProto):
         bn_dict[bn_conv[1].name] = bn_conv[0]
 
     # perform cross-layer scaling on applicable layer sets
-    cls = CrossLayerScaling(model)
+    cls = CrossLayerScaling(model, external_data_path)
     cls_set_info = cls.scale_model()
 
     # high-bias fold
-    hbf = HighBiasFold(model)
+    hbf = HighBiasFold(model, external_data_path)
     hbf.bias_fold(cls_set_info, bn_dict)
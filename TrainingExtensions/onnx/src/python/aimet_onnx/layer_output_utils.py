@@ -37,12 +37,13 @@
 
 """ This module contains utilities to capture and save intermediate layer-outputs of a model """
 
-import copy
-from typing import List, Dict, Tuple, Union
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Union, Callable, Optional, Iterator
 import re
 import numpy as np
 import onnxruntime as ort
 import onnx
+from onnx import helper, mapping
 from packaging import version
 
 # pylint: disable=wrong-import-order
@@ -50,7 +51,7 @@ from aimet_common.utils import AimetLogger
 from aimet_common.layer_output_utils import SaveInputOutput, save_layer_output_names
 
 from aimet_onnx.quantsim import QuantizationSimModel
-from aimet_onnx.utils import create_input_dict, add_hook_to_get_activation
+from aimet_onnx.utils import create_input_dict, add_hook_to_get_activation, remove_activation_hooks
 
 # pylint: disable=no-name-in-module, ungrouped-imports
 if version.parse(onnx.__version__) >= version.parse("1.14.0"):
@@ -64,13 +65,16 @@ logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.LayerOutputs)
 class LayerOutputUtil:
     """ Implementation to capture and save outputs of intermediate layers of a model (fp32/quantsim) """
 
-    def __init__(self, model: ModelProto, dir_path: str, device: int = 0):
+    def __init__(self, model: ModelProto, dir_path: str, device: int = 0,
+                 layer_filter: Optional[Callable[[str], bool]] = None, max_outputs_per_run: Optional[int] = None):
         """
         Constructor - It initializes the utility classes that captures and saves layer-outputs
 
         :param model: ONNX model
         :param dir_path: Directory wherein layer-outputs will be saved
         :param device: CUDA device-id to be used
+        :param layer_filter: Optional function which takes a layer-output name and returns True if it has to be captured
+        :param max_outputs_per_run: Maximum number of layer-outputs held in memory at a time. See LayerOutput
         """
         self.model = model
 
@@ -80,7 +84,8 @@ class LayerOutputUtil:
             providers = [('CUDAExecutionProvider', {'device_id': device}), 'CPUExecutionProvider']
 
         # Utility to capture layer-outputs
-        self.layer_output = LayerOutput(model=model, providers=providers, dir_path=dir_path)
+        self.layer_output = LayerOutput(model=model, providers=providers, dir_path=dir_path,
+                                        layer_filter=layer_filter, max_outputs_per_run=max_outputs_per_run)
 
         # Utility to save model inputs and their corresponding layer-outputs
         self.save_input_output = SaveInputOutput(dir_path, 'NCHW')
@@ -96,37 +101,87 @@ class LayerOutputUtil:
 
         input_dict = create_input_dict(self.model, input_batch)
 
-        layer_output_dict = self.layer_output.get_outputs(input_dict)
-        self.save_input_output.save(input_batch, layer_output_dict)
+        # Layer-outputs are saved group by group so that only one group is held in memory at a time
+        input_cntr = self.save_input_output.input_cntr
+        for group_idx, layer_output_dict in enumerate(self.layer_output.iter_outputs(input_dict)):
+            self.save_input_output.input_cntr = input_cntr
+            self.save_input_output.save(input_batch, layer_output_dict, save_inputs=group_idx == 0)
 
         logger.info('Layer-outputs generated for %d input instances', len(input_batch))
 
 
+@dataclass
+class _Stage:
+    """ Contiguous range of graph nodes which is executed as a separate subgraph """
+    start: int
+    end: int
+    input_names: List[str] = field(default_factory=list)
+    output_names: List[str] = field(default_factory=list)
+    captured_names: List[str] = field(default_factory=list)
+    released_names: List[str] = field(default_factory=list)
+    session: Optional[ort.InferenceSession] = None
+
+
 class LayerOutput:
     """
     This class creates a layer-output name to layer-output dictionary.
+
+    By default all layer-outputs are fetched in a single session run, which keeps every activation of the graph alive
+    at the same time. If max_outputs_per_run is given, layer-outputs are captured in groups of at most that many
+    outputs. The graph is then split into subgraphs which are executed one after the other, each producing one group
+    of layer-outputs and passing the tensors needed by later subgraphs along. Graphs with control-flow nodes can not be
+    split and are instead run once per group.
     """
-    def __init__(self, model: ModelProto, providers: List, dir_path: str):
+    def __init__(self, model: ModelProto, providers: List, dir_path: str,
+                 layer_filter: Optional[Callable[[str], bool]] = None, max_outputs_per_run: Optional[int] = None):
         """
         Constructor - It initializes few lists that are required for capturing and naming layer-outputs.
 
         :param model: ONNX model
         :param providers: execution providers to execute onnxruntime
         :param dir_path: directory to store topological order of layer-output names
+        :param layer_filter: Optional function which takes a layer-output name and returns True if it has to be captured
+        :param max_outputs_per_run: Maximum number of layer-outputs held in memory at a time. If None, all
+            layer-outputs are captured in a single run
         """
-        self.model = copy.deepcopy(model)
-        self.activation_names = LayerOutput.get_activation_names(self.model)
+        if max_outputs_per_run is not None and max_outputs_per_run < 1:
+            raise ValueError(f'max_outputs_per_run must be positive, got {max_outputs_per_run}')
+
+        self.activation_names = LayerOutput.get_activation_names(model)
 
         quantized_activation_names = [name for name in self.activation_names if name.endswith('_updated')]
         if quantized_activation_names:
             self.activation_names = quantized_activation_names
 
-        LayerOutput.register_activations(self.model, self.activation_names)
-
-        self.session = QuantizationSimModel.build_session(self.model, providers)
+        if layer_filter is not None:
+            self.activation_names = [name for name in self.activation_names
+                                     if layer_filter(name.replace('_updated', ''))]
 
         # Replace special characters with underscore. This gives valid file names to store activation tensors.
         self.sanitized_activation_names = [re.sub(r'\W+', "_", name.replace('_updated', '')) for name in self.activation_names]
+        self._sanitized_names = dict(zip(self.activation_names, self.sanitized_activation_names))
+
+        self._model = model
+        self._providers = providers
+        self._groups = [self.activation_names]
+        if max_outputs_per_run is not None and max_outputs_per_run < len(self.activation_names):
+            self._groups = [self.activation_names[idx:idx + max_outputs_per_run]
+                            for idx in range(0, len(self.activation_names), max_outputs_per_run)]
+
+        self.session = None
+        self._stages = None
+        if len(self._groups) == 1:
+            # Register the activations only while the session is built instead of modifying a copy of the model
+            hooks = LayerOutput.register_activations(model, self.activation_names)
+            try:
+                self.session = QuantizationSimModel.build_session(model, providers)
+            finally:
+                remove_activation_hooks(model, hooks)
+        elif LayerOutput._is_splittable(model):
+            self._stages = LayerOutput._split_into_stages(model, self._groups)
+        else:
+            logger.info('Graph contains control-flow nodes, capturing %d groups of layer-outputs in separate runs',
+                        len(self._groups))
 
         # Save activation names which are in topological order of model graph. This order can be used while comparing layer-outputs.
         save_layer_output_names(self.sanitized_activation_names, dir_path)
@@ -138,8 +193,136 @@ class LayerOutput:
         :param input_dict: input name to input tensor map
         :return: layer-output name to layer-output dictionary
         """
-        activation_values = self.session.run(self.activation_names, input_dict)
-        return dict(zip(self.sanitized_activation_names, activation_values))
+        layer_output_dict = {}
+        for group_output_dict in self.iter_outputs(input_dict):
+            layer_output_dict.update(group_output_dict)
+        return layer_output_dict
+
+    def iter_outputs(self, input_dict: Dict) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Captures the layer-outputs group by group. Only the current group (and the tensors needed by later subgraphs)
+        is held in memory when the caller does not keep references to previously yielded groups.
+
+        :param input_dict: input name to input tensor map
+        :return: Iterator over layer-output name to layer-output dictionaries, one per group
+        """
+        if self.session is not None:
+            yield dict(zip(self.sanitized_activation_names, self.session.run(self.activation_names, input_dict)))
+        elif self._stages is not None:
+            yield from self._run_stages(input_dict)
+        else:
+            for group in self._groups:
+                hooks = LayerOutput.register_activations(self._model, group)
+                try:
+                    session = QuantizationSimModel.build_session(self._model, self._providers)
+                finally:
+                    remove_activation_hooks(self._model, hooks)
+                yield {self._sanitized_names[name]: value for name, value in zip(group, session.run(group, input_dict))}
+                del session
+
+    def _run_stages(self, input_dict: Dict) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Executes the subgraphs sequentially, passing boundary tensors from one subgraph to the next
+
+        :param input_dict: input name to input tensor map
+        :return: Iterator over layer-output name to layer-output dictionaries, one per stage
+        """
+        available = dict(input_dict)
+        for stage_idx, stage in enumerate(self._stages):
+            if stage.start < stage.end:
+                if stage.session is None:
+                    # Sessions are built on first use since the types of the boundary tensors are known only then
+                    stage.session = self._build_stage_session(stage_idx, stage, available)
+                feed = {name: available[name] for name in stage.input_names}
+                available.update(zip(stage.output_names, stage.session.run(stage.output_names, feed)))
+            yield {self._sanitized_names[name]: available[name] for name in stage.captured_names}
+            for name in stage.released_names:
+                available.pop(name, None)
+
+    def _build_stage_session(self, stage_idx: int, stage: _Stage, available: Dict) -> ort.InferenceSession:
+        """
+        Builds the session of a subgraph
+
+        :param stage_idx: Index of the stage
+        :param stage: Stage to build the session for
+        :param available: Dictionary of tensors computed so far, used to type the subgraph inputs
+        :return: Inference session
+        """
+        graph = self._model.graph
+        nodes = graph.node[stage.start:stage.end]
+        used_names = {name for node in nodes for name in node.input}
+        initializers = [init for init in graph.initializer if init.name in used_names]
+        inputs = [helper.make_tensor_value_info(name, mapping.NP_TYPE_TO_TENSOR_TYPE[np.asarray(available[name]).dtype],
+                                                None)
+                  for name in stage.input_names]
+        outputs = [onnx.ValueInfoProto(name=name) for name in stage.output_names]
+        stage_graph = helper.make_graph(nodes, f'{graph.name}_stage_{stage_idx}', inputs, outputs,
+                                        initializer=initializers)
+        stage_model = helper.make_model(stage_graph, opset_imports=self._model.opset_import,
+                                        ir_version=self._model.ir_version)
+        return QuantizationSimModel.build_session(stage_model, self._providers)
+
+    @staticmethod
+    def _is_splittable(model: ModelProto) -> bool:
+        """
+        Returns True if none of the nodes has a subgraph attribute, since subgraphs may refer to outer-scope tensors
+
+        :param model: ONNX model
+        :return: True if the graph can be split into stages
+        """
+        return not any(attr.type in (onnx.AttributeProto.GRAPH, onnx.AttributeProto.GRAPHS)
+                       for node in model.graph.node for attr in node.attribute)
+
+    @staticmethod
+    def _split_into_stages(model: ModelProto, groups: List[List[str]]) -> List[_Stage]:
+        """
+        Splits the graph nodes, which are topologically sorted, into one stage per group of layer-outputs. Each stage
+        ends with the node producing the last layer-output of its group.
+
+        :param model: ONNX model
+        :param groups: Groups of layer-output names in topological order
+        :return: List of stages
+        """
+        graph = model.graph
+        initializer_names = {init.name for init in graph.initializer}
+        producer = {}
+        for node_idx, node in enumerate(graph.node):
+            for name in node.output:
+                producer[name] = node_idx
+
+        stages = []
+        start = 0
+        for group in groups:
+            end = max([start] + [producer[name] + 1 for name in group if name in producer])
+            stages.append(_Stage(start=start, end=end, captured_names=list(group)))
+            start = end
+
+        # Index of the last stage which needs each tensor, either as subgraph input or as captured layer-output
+        last_use = {}
+        for stage_idx, stage in enumerate(stages):
+            for node in graph.node[stage.start:stage.end]:
+                for name in node.input:
+                    if name and name not in initializer_names:
+                        last_use[name] = stage_idx
+            for name in stage.captured_names:
+                last_use[name] = stage_idx
+
+        for stage_idx, stage in enumerate(stages):
+            produced = []
+            for node in graph.node[stage.start:stage.end]:
+                for name in node.input:
+                    if name and name not in initializer_names and name not in produced and \
+                            name not in stage.input_names:
+                        stage.input_names.append(name)
+                produced.extend(node.output)
+            # Outputs are the captured layer-outputs and the tensors needed by later stages
+            captured_names = set(stage.captured_names)
+            stage.output_names = [name for name in dict.fromkeys(produced)
+                                  if name in captured_names or last_use.get(name, -1) > stage_idx]
+
+        for name, stage_idx in last_use.items():
+            stages[stage_idx].released_names.append(name)
+        return stages
 
     @staticmethod
     def get_activation_names(model: ModelProto) -> List[str]:
@@ -171,7 +354,6 @@ class LayerOutput:
 
         :param model: ONNX model
         :param activation_names: list of activation names to be registered
-        :return:
+        :return: list of the registered hooks
         """
-        for act_name in activation_names:
-            _ = add_hook_to_get_activation(model, act_name)
+        return [add_hook_to_get_activation(model, act_name) for act_name in activation_names]
@@ -366,6 +366,59 @@ class QcQuantizeOp:
             return encodings
         return None
 
+    def clone(self) -> 'QcQuantizeOp':
+        """
+        Create a copy of this QcQuantizeOp with its own QcQuantizeInfo and tensor quantizers.
+        Quantizer settings and encodings are copied, but the collected statistics are not.
+
+        :return: Copy of this QcQuantizeOp
+        """
+        quant_info = libquant_info.QcQuantizeInfo()
+        quant_info.usePerChannelMode = False
+        quant_info.channelAxis = self.quant_info.channelAxis
+        op = QcQuantizeOp(quant_info=quant_info,
+                          quant_scheme=self.quant_scheme,
+                          rounding_mode=self.rounding_mode,
+                          encodings=None,
+                          op_mode=self.op_mode,
+                          bitwidth=self.bitwidth,
+                          use_symmetric_encodings=self.use_symmetric_encodings,
+                          tensor_quantizer_params=self.tensor_quantizer_params)
+        op.data_type = self.data_type
+        op.use_strict_symmetric = self.use_strict_symmetric
+        op.use_unsigned_symmetric = self.use_unsigned_symmetric
+        if self.quant_info.usePerChannelMode:
+            op.enable_per_channel_quantization()
+        if all(tensor_quantizer.isEncodingValid for tensor_quantizer in self._tensor_quantizer):
+            op.load_encodings(self.encodings)
+        op.op_mode = self.op_mode
+        op.enabled = self.enabled
+        op._is_encoding_frozen = self._is_encoding_frozen # pylint: disable=protected-access
+        return op
+
+    def copy_stats_layout(self, other: 'QcQuantizeOp'):
+        """
+        Reset the statistics to empty statistics with the same histogram range as the statistics of other,
+        so that the statistics collected by both QcQuantizeOps can be merged without re-bucketing.
+
+        :param other: QcQuantizeOp to copy the histogram range from
+        """
+        if not self._is_encoding_frozen:
+            for tensor_quantizer, other_tensor_quantizer in zip(self._tensor_quantizer, other._tensor_quantizer):
+                tensor_quantizer.copyStatsLayout(other_tensor_quantizer)
+
+    def merge_encoding_stats(self, other: 'QcQuantizeOp'):
+        """
+        Merge the statistics collected by other into the statistics of this QcQuantizeOp.
+        If both QcQuantizeOps share the same histogram range (see :meth:`copy_stats_layout`), the merged statistics
+        are identical to the statistics collected by observing the data of both QcQuantizeOps in a single QcQuantizeOp.
+
+        :param other: QcQuantizeOp to merge the statistics of
+        """
+        if not self._is_encoding_frozen:
+            for tensor_quantizer, other_tensor_quantizer in zip(self._tensor_quantizer, other._tensor_quantizer):
+                tensor_quantizer.mergeStats(other_tensor_quantizer)
+
     def get_stats_histogram(self) -> List[List]:
         """
         NOTE: Not to invoke when quantization scheme is not TF-Enhanced.
@@ -39,7 +39,7 @@
 
 import os
 import re
-from typing import Union, Tuple, Dict, List, Iterable
+from typing import Union, Tuple, Dict, List, Iterable, Optional
 import copy
 from collections import defaultdict
 
@@ -47,7 +47,6 @@ import numpy as np
 from onnx import ModelProto
 import onnxruntime as ort
 from onnxruntime.quantization.onnx_model import ONNXModel
-from sklearn.metrics import mean_squared_error
 
 from aimet_common.utils import AimetLogger, CallbackFunc
 from aimet_common.defs import QuantScheme
@@ -57,12 +56,14 @@ from aimet_common.quant_analyzer import save_json, export_per_layer_sensitivity_
 from aimet_onnx.qc_quantize_op import QcQuantizeOp
 from aimet_onnx.quantsim import QuantizationSimModel
 from aimet_onnx.batch_norm_fold import fold_all_batch_norms_to_weight
-from aimet_onnx.adaround.activation_sampler import ModuleData
 from aimet_onnx import utils
 from aimet_onnx.meta.operations import Op
 
 _logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.QuantAnalyzer)
 
+# Maximum number of layer output activations each session outputs at a time when computing per layer MSE loss
+DEFAULT_MAX_OUTPUTS_PER_RUN = 32
+
 
 class QuantAnalyzer:
     """
@@ -212,10 +213,7 @@ class QuantAnalyzer:
             providers = [('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'DEFAULT'}), 'CPUExecutionProvider']
         else:
             providers = ['CPUExecutionProvider']
-        session = ort.InferenceSession(
-            path_or_bytes=model.SerializeToString(),
-            providers=providers,
-        )
+        session = QuantizationSimModel.build_session(model, providers)
         return self._eval_callback.func(session, self._eval_callback.args)
 
     def _eval_weight_quantized_model(self, sim: QuantizationSimModel)-> float:
@@ -589,26 +587,38 @@ class QuantAnalyzer:
         self._unlabeled_dataset_iterable = unlabeled_dataset_iterable
         self._num_batches = num_batches
 
-    def export_per_layer_mse_loss(self, sim: QuantizationSimModel, results_dir: str) -> Dict:
+    def export_per_layer_mse_loss(self, sim: QuantizationSimModel, results_dir: str,
+                                  max_outputs_per_run: Optional[int] = DEFAULT_MAX_OUTPUTS_PER_RUN) -> Dict:
         """
         Exports MSE loss between fp32 and quantized output activations for each layer.
 
         :param sim: Quantsim model.
         :param results_dir: Directory to save the results.
+        :param max_outputs_per_run: Maximum number of layer output activations held in memory at a time per model.
+            Layers are processed in groups of at most this many, each group taking one pass over the data.
+            If None, all the layers are processed in a single pass.
         :return: layer wise MSE loss. dict[layer_name] = MSE loss.
         """
+        if max_outputs_per_run is not None and max_outputs_per_run < 1:
+            raise ValueError(f'max_outputs_per_run must be positive, got {max_outputs_per_run}')
+
         results_dir = os.path.abspath(results_dir)
         os.makedirs(results_dir, exist_ok=True)
 
-        mse_loss_dict = {}
+        act_names = {}
         for op_node in self._onnx_model.nodes():
             if op_node.op_type == 'Constant':
                 continue
             op_output = op_node.output[0]
             if op_output in sim.qc_quantize_op_dict:
-                quantized_op_output = op_output + '_updated'
-                loss = self._compute_mse_loss(op_output, quantized_op_output, self._onnx_model, sim.model)
-                mse_loss_dict[op_node.name] = loss
+                act_names[op_node.name] = (op_output, op_output + '_updated')
+
+        layer_names = list(act_names)
+        group_size = max_outputs_per_run or max(len(layer_names), 1)
+        mse_loss_dict = {}
+        for idx in range(0, len(layer_names), group_size):
+            group = {layer_name: act_names[layer_name] for layer_name in layer_names[idx:idx + group_size]}
+            mse_loss_dict.update(self._compute_per_layer_mse_loss(group, self._onnx_model, sim.model))
 
         export_per_layer_mse_plot(mse_loss_dict,
                                   results_dir,
@@ -618,44 +628,64 @@ class QuantAnalyzer:
         return mse_loss_dict
 
     # pylint: disable=too-many-locals
-    def _compute_mse_loss(self, fp32_act_name: str, quantized_act_name: str,
-                          fp32_model: ONNXModel, quantized_model: ONNXModel) -> float:
+    def _compute_per_layer_mse_loss(self, act_names: Dict[str, Tuple[str, str]],
+                                    fp32_model: ONNXModel, quantized_model: ONNXModel) -> Dict[str, float]:
         """
-        Compute MSE loss between fp32 and quantized output activations for each batch, add for
-        all the batches and return averaged mse loss.
+        Compute MSE loss between fp32 and quantized output activations of all the layers for each batch, add for
+        all the batches and return averaged mse loss per layer.
 
-        :param fp32_act_name: module from the fp32_model.
-        :param quantized_act_name: Corresponding quant wrapper from the QuantSim model.
-        :param fp32_model: PyTorch model.
-        :param sim: Quantsim model.
-        :return: MSE loss between fp32 and quantized output activations.
+        Output activations of all the given layers are added to the model outputs at once, so that each batch needs
+        only one session run for the fp32 model and one for the quantized model.
+
+        :param act_names: Dict of layer name to (fp32 activation name, quantized activation name).
+        :param fp32_model: fp32 model.
+        :param quantized_model: Quantized model.
+        :return: layer wise MSE loss. dict[layer_name] = MSE loss.
         """
+        if not act_names:
+            return {}
 
         providers = ['CPUExecutionProvider']
         if 'CUDAExecutionProvider' in ort.get_available_providers():
             providers = [('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'DEFAULT'}), 'CPUExecutionProvider']
 
-        # output activations collector.
-        orig_module_collector = ModuleData(fp32_model, fp32_act_name, providers)
-        quant_module_collector = ModuleData(quantized_model, quantized_act_name, providers)
+        fp32_act_names = [fp32_act_name for fp32_act_name, _ in act_names.values()]
+        quantized_act_names = [quantized_act_name for _, quantized_act_name in act_names.values()]
+        fp32_session = self._build_session_with_outputs(fp32_model.model, fp32_act_names, providers)
+        quantized_session = self._build_session_with_outputs(quantized_model.model, quantized_act_names, providers)
 
+        loss = np.zeros(len(act_names))
         total = 0
-        loss = 0.0
         batch_index = 0
         for model_inputs in self._unlabeled_dataset_iterable:
             model_inputs = utils.create_input_dict(fp32_model.model, model_inputs)
-            _, quantized_out_acts = quant_module_collector.collect_inp_out_data(model_inputs,
-                                                                                collect_input=False,
-                                                                                collect_output=True)
-            _, fp32_out_acts = orig_module_collector.collect_inp_out_data(model_inputs,
-                                                                          collect_input=False,
-                                                                          collect_output=True)
-            loss += mean_squared_error(fp32_out_acts[0].reshape(fp32_out_acts[0].shape[0], -1),
-                                       quantized_out_acts[0].reshape(fp32_out_acts[0].shape[0], -1)).sum()
+            fp32_out_acts = fp32_session.run(fp32_act_names, model_inputs)
+            quantized_out_acts = quantized_session.run(quantized_act_names, model_inputs)
+            for index, (fp32_out, quantized_out) in enumerate(zip(fp32_out_acts, quantized_out_acts)):
+                loss[index] += np.mean(np.square(fp32_out - quantized_out.reshape(fp32_out.shape)))
             total += fp32_out_acts[0].shape[0]
             batch_index += 1
             if batch_index == self._num_batches:
                 break
 
-        average_loss = loss/total
-        return average_loss
+        return {layer_name: loss[index] / total for index, layer_name in enumerate(act_names)}
+
+    @staticmethod
+    def _build_session_with_outputs(model: ModelProto, act_names: List[str], providers: List) -> ort.InferenceSession:
+        """
+        Build session which outputs given activations in addition to the model outputs.
+
+        :param model: ONNX model.
+        :param act_names: Names of the activations to output.
+        :param providers: CPU/GPU execution providers.
+        :return: Inference session.
+        """
+        model_output_names = {output.name for output in model.graph.output}
+        handles = []
+        for act_name in dict.fromkeys(act_names):
+            if act_name not in model_output_names:
+                handles.append(utils.add_hook_to_get_activation(model, act_name))
+        try:
+            return QuantizationSimModel.build_session(model, providers)
+        finally:
+            utils.remove_activation_hooks(model, handles)
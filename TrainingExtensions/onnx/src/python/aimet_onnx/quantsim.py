@@ -36,19 +36,22 @@
 # =============================================================================
 """ Implementation for simulating models running on Quantized hardware """
 
+import copy
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
 import os
-from typing import Dict, List, Union, Tuple, Optional
+import queue
+import threading
+from typing import Dict, List, Union, Tuple, Optional, Sequence, Any, Iterable
 import json
 import numpy as np
 import onnx
 
-from onnx import helper
+from onnx import helper, numpy_helper
 from onnxsim import simplify
 import onnxruntime as ort
-from onnxruntime import SessionOptions, GraphOptimizationLevel, InferenceSession
+from onnxruntime import GraphOptimizationLevel, InferenceSession
 from onnxruntime.quantization.onnx_quantizer import ONNXModel
 from packaging import version
 
@@ -58,13 +61,16 @@ from aimet_common import libquant_info
 from aimet_common.defs import QuantScheme, QuantizationDataType
 from aimet_common.quantsim import encoding_version, extract_global_quantizer_args
 from aimet_common.utils import save_json_yaml, AimetLogger
+from aimet_common import tracing
 from aimet_onnx import utils
 from aimet_onnx.meta.operations import Op
 from aimet_onnx.meta.utils import get_op_given_param_name, get_param_shape_using_connected_graph
 from aimet_onnx.meta.connectedgraph import ConnectedGraph
 from aimet_onnx.qc_quantize_op import QcQuantizeOp, OpMode, TensorQuantizerParams
 from aimet_onnx.quantsim_config.quantsim_config import QuantSimConfigurator
-from aimet_onnx.utils import make_dummy_input, add_hook_to_get_activation, remove_activation_hooks
+from aimet_onnx.session_factory import get_session_factory
+from aimet_onnx.utils import make_dummy_input, add_hook_to_get_activation, remove_activation_hooks, \
+    get_consumed_tensor_names
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
 
@@ -110,10 +116,89 @@ class EncodingMismatchInfo:
                 self.is_unsigned_symmetric_mismatch is not None)
 
 
+class _QcQuantizeOpSnapshot:
+    """
+    State of a single QcQuantizeOp captured by QuantizationSimModel.snapshot()
+    """
+
+    def __init__(self, qc_op: QcQuantizeOp):
+        """
+        :param qc_op: QcQuantizeOp to capture
+        """
+        # pylint: disable=protected-access
+        self.qc_op = qc_op
+        self.attrs = {'enabled': qc_op.enabled, 'bitwidth': qc_op.bitwidth, 'data_type': qc_op.data_type,
+                      'op_mode': qc_op.op_mode}
+        self.encoding_ref = qc_op._encoding
+        self.encoding = np.array([[enc.min, enc.max, enc.delta, enc.offset, enc.bw] for enc in qc_op._encoding],
+                                 dtype=np.float64).reshape(-1, 5)
+        self.is_encoding_valid = [tensor_quantizer.isEncodingValid for tensor_quantizer in qc_op._tensor_quantizer]
+
+    def restore(self) -> bool:
+        """
+        Restore the state of the QcQuantizeOp if it was modified since the snapshot
+
+        :return: True if the QcQuantizeOp was restored, False if it was left untouched
+        """
+        # pylint: disable=protected-access
+        restored = False
+        qc_op = self.qc_op
+
+        for name, value in self.attrs.items():
+            if getattr(qc_op, name) != value:
+                setattr(qc_op, name, value)
+                restored = True
+
+        if qc_op._encoding is not self.encoding_ref:
+            encodings = []
+            for enc_min, enc_max, delta, offset, bw in self.encoding.tolist():
+                encoding = libpymo.TfEncoding()
+                encoding.min = enc_min
+                encoding.max = enc_max
+                encoding.delta = delta
+                encoding.offset = offset
+                encoding.bw = int(bw)
+                encodings.append(encoding)
+            qc_op.encodings = encodings
+            for tensor_quantizer, is_encoding_valid in zip(qc_op._tensor_quantizer, self.is_encoding_valid):
+                tensor_quantizer.isEncodingValid = is_encoding_valid
+            self.encoding_ref = qc_op._encoding
+            restored = True
+
+        return restored
+
+
+class QuantSimSnapshot:
+    """
+    Snapshot of the quantizer state of a QuantizationSimModel.
+    Holds the encodings, enabled flags, bitwidths and data types of all quantizers, and optionally the weights of the
+    model, as a compact bundle of arrays. See QuantizationSimModel.snapshot() and restore().
+    """
+
+    def __init__(self, quantizers: Dict[str, _QcQuantizeOpSnapshot], params: Dict[str, onnx.TensorProto]):
+        """
+        :param quantizers: Snapshots of the QcQuantizeOps, keyed by the names of the quantized tensors
+        :param params: Copies of the quantized parameters, keyed by the names of the parameters
+        """
+        self.quantizers = quantizers
+        self.params = params
+
+    def tensors(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the arrays held by the snapshot
+
+        :return: Dictionary of arrays
+        """
+        tensors = {f'{name}.encoding': quantizer.encoding for name, quantizer in self.quantizers.items()}
+        tensors.update({name: numpy_helper.to_array(param) for name, param in self.params.items()})
+        return tensors
+
+
 class QuantizationSimModel:
     """ Creates a QuantizationSimModel model by adding quantization simulations ops to a given model """
 
     # pylint: disable=too-many-arguments, too-many-locals, too-many-instance-attributes
+    @tracing.traced("QuantizationSimModel.__init__")
     def __init__(self,
                  model: ModelProto,
                  dummy_input: Dict[str, np.ndarray] = None,
@@ -143,7 +228,8 @@ class QuantizationSimModel:
                                  default_output_bw=16 and default_param_bw=16
         :param simplify_model: Default True, uses onnx simplifier to simplify model
         :param user_onnx_libs: List of paths to all compiled ONNX custom ops libraries
-        :param path: Directory to save the artifacts.
+        :param path: Directory to save the artifacts. If None, a temporary directory is created on first use and
+            removed together with the sim
         """
         self.model = model
         if not isinstance(model, ONNXModel):
@@ -180,8 +266,10 @@ class QuantizationSimModel:
         self.input_quantizers_name = []
         self.activation_names = []
         self.activation_dtypes = {}
-        self._path = path if path else tempfile.mkdtemp()
-        if not os.path.exists(self._path):
+        self._path = path
+        # Temporary directory used in place of path if not given. Created on first use and removed together with the sim
+        self._tempdir = None
+        if self._path and not os.path.exists(self._path):
             os.makedirs(self._path, exist_ok=True)
         self._get_param_names()
         self._get_activations_to_quantize(dummy_input)
@@ -192,7 +280,7 @@ class QuantizationSimModel:
         self._add_quantization_nodes()
 
         self.session = QuantizationSimModel.build_session(self.model.model, self.providers,
-                                                          user_onnx_libs=self._user_onnx_libs, path=self._path)
+                                                          user_onnx_libs=self._user_onnx_libs)
         quantsim_configurator = self._add_configuration_(config_file)
 
         self._supported_kernels = quantsim_configurator.get_supported_kernels()
@@ -337,7 +425,7 @@ class QuantizationSimModel:
         for name in activations:
             hooks.append(add_hook_to_get_activation(self.model.model, name))
         sess = QuantizationSimModel.build_session(self.model.model, self.providers,
-                                                  user_onnx_libs=self._user_onnx_libs, path=self._path)
+                                                  user_onnx_libs=self._user_onnx_libs)
         outputs = sess.run(None, dummy_input)
         for idx in range(len(self.model.graph().output)):
             act_name = self.model.graph().output[idx].name
@@ -445,45 +533,180 @@ class QuantizationSimModel:
                                                           use_symmetric_encodings=self._use_symmetric_encodings
                                                           )
 
+    # pylint: disable=too-many-arguments
     @staticmethod
-    def build_session(model: onnx.ModelProto, providers: List, user_onnx_libs: List[str] = None, path: str = None):
+    def build_session(model: onnx.ModelProto, providers: List, user_onnx_libs: List[str] = None, path: str = None,
+                      graph_optimization_level: GraphOptimizationLevel = GraphOptimizationLevel.ORT_DISABLE_ALL,
+                      intra_op_num_threads: int = 0, inter_op_num_threads: int = 0):
         """
-        Build and return onnxruntime inference session
+        Build and return onnxruntime inference session. Models of 2GB or more are written with external data into a
+        cache directory keyed by content hash, so weights which did not change are not written again.
 
         :param model: onnx model
         :param providers: providers to execute onnxruntime
         :param user_onnx_libs: list of paths to user custom ONNX op libraries
-        :param path: path where to store model external data
-        """
-        sess_options = SessionOptions()
-        shared_library = os.path.dirname(libquant_info.__file__)
-        shared_library = os.path.join(shared_library, "libaimet_onnxrt_ops.so")
-        sess_options.register_custom_ops_library(shared_library)
-        if user_onnx_libs is not None:
-            for lib in user_onnx_libs:
-                sess_options.register_custom_ops_library(lib)
-        sess_options.graph_optimization_level = GraphOptimizationLevel.ORT_DISABLE_ALL
-
-        # Convert and save ONNX model to external data if larger than 2GB.
-        # External data will be saved under same directory.
-        path = path if path else tempfile.mkdtemp()
-        if not os.path.exists(path):
-            os.makedirs(path, exist_ok=True)
-        model_size = model.ByteSize()
-        save_as_external_data = model_size >= onnx.checker.MAXIMUM_PROTOBUF
-        output_path = os.path.join(path, 'model.onnx')
-        if save_as_external_data:
-            # Note: Saving as external data mutates the saved model, removing all initializer data
-            onnx.save_model(model, output_path, save_as_external_data=True, location=Path(output_path).name + ".data")
-            onnx.load_external_data_for_model(model, base_dir=path)
+        :param path: path where to store model external data. If None, a temporary directory which is removed on
+            exit is used
+        :param graph_optimization_level: onnxruntime graph optimization level
+        :param intra_op_num_threads: Number of threads used to parallelize the execution within nodes.
+            0 lets onnxruntime choose the default
+        :param inter_op_num_threads: Number of threads used to parallelize the execution of the graph.
+            0 lets onnxruntime choose the default
+        """
+        return get_session_factory(path).build_session(model, providers, user_onnx_libs,
+                                                       graph_optimization_level=graph_optimization_level,
+                                                       intra_op_num_threads=intra_op_num_threads,
+                                                       inter_op_num_threads=inter_op_num_threads)
+
+    def build_eval_session(self,
+                           graph_optimization_level: GraphOptimizationLevel = GraphOptimizationLevel.ORT_ENABLE_ALL,
+                           intra_op_num_threads: int = 0, inter_op_num_threads: int = 0,
+                           providers: List = None) -> InferenceSession:
+        """
+        Build an onnxruntime inference session optimized for evaluation.
+
+        Unlike :attr:`session`, the returned session bakes in the current encodings:
+
+        * Quantizers of parameters and other constant tensors are folded into quantize-dequantized initializers
+        * 8-bit per-tensor activation quantizers are lowered to standard QuantizeLinear/DequantizeLinear pairs
+        * Disabled quantizers are removed
+        * onnxruntime graph optimizations are enabled
+
+        Quantizers that can't be lowered remain as QcQuantizeOps which share their state with the sim, so changes to
+        those quantizers are visible to the session while folded and lowered quantizers are not.
+        The session needs to be rebuilt whenever the encodings or the quantizer settings change.
+
+        :param graph_optimization_level: onnxruntime graph optimization level
+        :param intra_op_num_threads: Number of threads used to parallelize the execution within nodes.
+            0 lets onnxruntime choose the default
+        :param inter_op_num_threads: Number of threads used to parallelize the execution of the graph.
+            0 lets onnxruntime choose the default
+        :param providers: providers to execute onnxruntime. Defaults to the providers of the sim
+        :return: onnxruntime inference session
+        """
+        for name, qc_op in self.qc_quantize_op_dict.items():
+            if qc_op.enabled and qc_op.op_mode not in (OpMode.quantizeDequantize, OpMode.passThrough):
+                raise RuntimeError(f"Encodings of quantizer {name} are not computed. "
+                                   "Call compute_encodings or load encodings before building an eval session.")
+
+        eval_model = self._get_eval_model()
+        return QuantizationSimModel.build_session(eval_model, providers or self.providers,
+                                                  user_onnx_libs=self._user_onnx_libs,
+                                                  graph_optimization_level=graph_optimization_level,
+                                                  intra_op_num_threads=intra_op_num_threads,
+                                                  inter_op_num_threads=inter_op_num_threads)
+
+    def _get_eval_model(self) -> ModelProto:
+        """
+        Returns a copy of the sim model with quantization nodes lowered for evaluation
+
+        :return: ONNX model for evaluation
+        """
+        model = copy.deepcopy(self.model.model)
+        initializer_names = {initializer.name for initializer in model.graph.initializer}
+        qc_quantize_nodes = [node for node in model.graph.node if node.op_type == 'QcQuantizeOp']
+
+        constant_nodes = [node for node in qc_quantize_nodes if node.input[0] in initializer_names]
+        folded_constants = self._fold_constant_quantizers(model, constant_nodes)
+
+        opset_version = max((opset.version for opset in model.opset_import if opset.domain in ('', 'ai.onnx')),
+                            default=0)
+        nodes = []
+        for node in model.graph.node:
+            if node.op_type != 'QcQuantizeOp':
+                nodes.append(node)
+                continue
+
+            if node.output[0] in folded_constants:
+                model.graph.initializer.append(numpy_helper.from_array(folded_constants[node.output[0]],
+                                                                       node.output[0]))
+                continue
+
+            qc_op = self.qc_quantize_op_dict[self._get_op_name(node)]
+            if not qc_op.enabled or qc_op.op_mode == OpMode.passThrough:
+                nodes.append(helper.make_node('Identity', inputs=[node.input[0]], outputs=[node.output[0]],
+                                              name=node.name))
+            elif opset_version >= 10 and self._is_lowerable_to_qdq(qc_op):
+                nodes.extend(self._make_qdq_nodes(model, node, qc_op.encodings[0]))
+            else:
+                nodes.append(node)
+
+        model.graph.ClearField('node')
+        model.graph.node.extend(nodes)
+
+        # Remove the original initializers that are no longer consumed by any node, including nodes of subgraphs
+        used_names = get_consumed_tensor_names(model.graph)
+        used_names.update(output.name for output in model.graph.output)
+        initializers = [initializer for initializer in model.graph.initializer if initializer.name in used_names]
+        model.graph.ClearField('initializer')
+        model.graph.initializer.extend(initializers)
+
+        return model
+
+    @staticmethod
+    def _get_op_name(node: onnx.NodeProto) -> str:
+        for attribute in node.attribute:
+            if attribute.name == 'op_name':
+                return helper.get_attribute_value(attribute).decode()
+        raise RuntimeError(f"QcQuantizeOp {node.name} doesn't have op_name attribute")
+
+    def _fold_constant_quantizers(self, model: ModelProto, nodes: List[onnx.NodeProto]) -> Dict[str, np.ndarray]:
+        """
+        Runs quantizers of constant tensors once and returns the quantize-dequantized tensors
 
-        path_or_bytes = output_path if save_as_external_data else model.SerializeToString()
-        session = InferenceSession(
-            path_or_bytes=path_or_bytes,
-            sess_options=sess_options,
-            providers=providers,
-        )
-        return session
+        :param model: ONNX model
+        :param nodes: QcQuantizeOp nodes whose inputs are initializers
+        :return: Dictionary mapping output names of the QcQuantizeOps to quantize-dequantized tensors
+        """
+        if not nodes:
+            return {}
+
+        input_names = {node.input[0] for node in nodes}
+        initializers = [initializer for initializer in model.graph.initializer if initializer.name in input_names]
+        dtypes = {initializer.name: initializer.data_type for initializer in initializers}
+        outputs = [helper.make_tensor_value_info(node.output[0], dtypes[node.input[0]], None) for node in nodes]
+        graph = helper.make_graph(nodes, 'constant_quantizers', inputs=[], outputs=outputs, initializer=initializers)
+        constant_model = helper.make_model(graph, opset_imports=model.opset_import, ir_version=model.ir_version)
+
+        session = QuantizationSimModel.build_session(constant_model, ['CPUExecutionProvider'],
+                                                     user_onnx_libs=self._user_onnx_libs)
+        output_names = [node.output[0] for node in nodes]
+        return dict(zip(output_names, session.run(output_names, {})))
+
+    @staticmethod
+    def _is_lowerable_to_qdq(qc_op: QcQuantizeOp) -> bool:
+        """
+        Returns True if the quantizer is equivalent to a uint8 QuantizeLinear/DequantizeLinear pair
+        """
+        if qc_op.data_type != QuantizationDataType.int or qc_op.quant_info.usePerChannelMode:
+            return False
+        if len(qc_op.encodings) != 1:
+            return False
+        encoding = qc_op.encodings[0]
+        return encoding.bw == 8 and 0 <= -encoding.offset <= 255 and encoding.delta > 0
+
+    @staticmethod
+    def _make_qdq_nodes(model: ModelProto, node: onnx.NodeProto, encoding: libpymo.TfEncoding) -> List[onnx.NodeProto]:
+        """
+        Creates QuantizeLinear/DequantizeLinear pair equivalent to the QcQuantizeOp
+
+        :param model: ONNX model to add scale and zero point initializers to
+        :param node: QcQuantizeOp node to lower
+        :param encoding: Encoding of the quantizer
+        :return: QuantizeLinear and DequantizeLinear nodes
+        """
+        scale_name = node.name + '_scale'
+        zero_point_name = node.name + '_zero_point'
+        quantized_name = node.name + '_quantized'
+        model.graph.initializer.append(numpy_helper.from_array(np.array(encoding.delta, dtype=np.float32),
+                                                               scale_name))
+        model.graph.initializer.append(numpy_helper.from_array(np.array(round(-encoding.offset), dtype=np.uint8),
+                                                               zero_point_name))
+        quantize_node = helper.make_node('QuantizeLinear', inputs=[node.input[0], scale_name, zero_point_name],
+                                         outputs=[quantized_name], name=node.name + '_quantize')
+        dequantize_node = helper.make_node('DequantizeLinear', inputs=[quantized_name, scale_name, zero_point_name],
+                                           outputs=[node.output[0]], name=node.name + '_dequantize')
+        return [quantize_node, dequantize_node]
 
     def get_qc_quantize_op(self):
         """
@@ -497,8 +720,20 @@ class QuantizationSimModel:
 
         :param filename_prefix: filename to save the onnx model
         """
-        self.model.save_model_to_file(os.path.join(self._path, filename_prefix) + '.onnx')
+        self.model.save_model_to_file(os.path.join(self._get_path(), filename_prefix) + '.onnx')
 
+    def _get_path(self) -> str:
+        """
+        Returns the directory to save files in. If no path was given, a temporary directory is created which is
+        removed when the sim is garbage collected or on interpreter exit
+        """
+        if self._path:
+            return self._path
+        if self._tempdir is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='aimet_onnx_quantsim_')
+        return self._tempdir.name
+
+    @tracing.traced("QuantizationSimModel.compute_encodings")
     def compute_encodings(self, forward_pass_callback, forward_pass_callback_args):
         """
         Compute and return the encodings of each tensor quantizer
@@ -512,6 +747,103 @@ class QuantizationSimModel:
             of data samples to use. Or could be a tuple of parameters or an object representing something more complex.
             If set to None, forward_pass_callback will be invoked with no parameters.
         """
+        self._prepare_for_compute_encodings()
+        forward_pass_callback(self.session, forward_pass_callback_args)
+        self._compute_encodings_from_stats()
+
+    def compute_encodings_in_parallel(self, forward_pass_callback, forward_pass_callback_args: Sequence,
+                                      num_workers: Optional[int] = None):
+        """
+        Compute encodings of each tensor quantizer by running the forward pass callback over multiple shards of the
+        calibration data in parallel.
+
+        The first shard is processed with the session and quantizers of this sim, and every other worker runs the
+        forward pass callback with its own onnxruntime session and its own copy of the quantizers. Once all shards
+        are processed, the statistics of the workers are merged into the quantizers of this sim. The histogram range
+        of each quantizer is determined by the first batch of the first shard, as in serial calibration, so the
+        resulting encodings are identical to calling :meth:`compute_encodings` with a callback that runs over all the
+        shards in order.
+
+        .. note::
+            If a tensor is all zeros in the first batch, its histogram range is determined by the workers
+            independently, and the merged statistics of that tensor are re-bucketed approximately.
+
+        :param forward_pass_callback: A callback function that runs forward passes on the given session with
+            one shard of the calibration data. The callback is invoked once per shard, concurrently from multiple
+            threads. When invoked with the first shard, the first session run returns once the other workers have
+            copied the histogram ranges determined by it.
+        :param forward_pass_callback_args: Sequence of arguments, one for each shard.
+            Each element is passed to the forward_pass_callback as-is.
+        :param num_workers: Number of workers. Defaults to the number of shards
+        """
+        forward_pass_callback_args = list(forward_pass_callback_args)
+        if not forward_pass_callback_args:
+            raise ValueError("forward_pass_callback_args must contain at least one shard")
+        num_workers = min(num_workers or len(forward_pass_callback_args), len(forward_pass_callback_args))
+
+        self._prepare_for_compute_encodings()
+
+        intra_op_num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        # The session of this sim is a worker as well; it collects statistics into the quantizers of this sim
+        workers = queue.Queue()
+        replicas = []
+        first_run_done = threading.Event()
+        stats_layout_copied = threading.Event()
+
+        def run_first_shard():
+            # The first run determines the histogram range of each quantizer. The callback is paused after it until
+            # the replicas have copied the histogram ranges, so that the statistics aren't updated while being copied
+            session = _FirstRunBarrierSession(self.session, first_run_done, stats_layout_copied)
+            try:
+                forward_pass_callback(session, forward_pass_callback_args[0])
+            finally:
+                first_run_done.set()
+                workers.put(self.session)
+
+        def run_shard(args: Any):
+            session = workers.get()
+            try:
+                forward_pass_callback(session, args)
+            finally:
+                workers.put(session)
+
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(run_first_shard)]
+                try:
+                    first_run_done.wait()
+                    if futures[0].done():
+                        # Raise errors of the first shard before creating the replicas
+                        futures[0].result()
+                    for i in range(num_workers - 1):
+                        session, qc_quantize_op_dict = self._create_calibration_replica(i, intra_op_num_threads)
+                        for name, qc_op in qc_quantize_op_dict.items():
+                            qc_op.copy_stats_layout(self.qc_quantize_op_dict[name])
+                        replicas.append(qc_quantize_op_dict)
+                        workers.put(session)
+                finally:
+                    stats_layout_copied.set()
+
+                futures.extend(executor.submit(run_shard, args) for args in forward_pass_callback_args[1:])
+                for future in futures:
+                    future.result()
+
+            for qc_quantize_op_dict in replicas:
+                for name, qc_op in self.qc_quantize_op_dict.items():
+                    qc_op.merge_encoding_stats(qc_quantize_op_dict[name])
+        finally:
+            # Release the replica sessions and quantizers right away rather than when the frame is collected,
+            # which may be delayed by a traceback referring to it
+            while not workers.empty():
+                workers.get_nowait()
+            replicas.clear()
+
+        self._compute_encodings_from_stats()
+
+    def _prepare_for_compute_encodings(self):
+        """
+        Reset the statistics and set the op mode of all the quantizers for calibration
+        """
         for op_name, qc_op in self.qc_quantize_op_dict.items():
             qc_op.reset_encoding_stats()
             if op_name in self.activation_names:
@@ -521,12 +853,48 @@ class QuantizationSimModel:
                 if qc_op.is_encoding_frozen():
                     qc_op.op_mode = OpMode.quantizeDequantize
 
-        forward_pass_callback(self.session, forward_pass_callback_args)
-        for op_name, qc_op in self.qc_quantize_op_dict.items():
+    def _compute_encodings_from_stats(self):
+        """
+        Compute encodings of all the quantizers from the collected statistics and set them to quantize-dequantize mode
+        """
+        for qc_op in self.qc_quantize_op_dict.values():
             if qc_op.data_type == QuantizationDataType.int and not qc_op.is_encoding_frozen():
                 qc_op.compute_encodings()
             qc_op.op_mode = OpMode.quantizeDequantize
 
+    def _create_calibration_replica(self, index: int, intra_op_num_threads: int) \
+            -> Tuple[InferenceSession, Dict[str, QcQuantizeOp]]:
+        """
+        Create an onnxruntime session of the sim model whose quantization nodes refer to copies of the quantizers
+
+        :param index: Index of the replica
+        :param intra_op_num_threads: Number of threads used to parallelize the execution within nodes
+        :return: Tuple of the session and the dictionary of the copied quantizers
+        """
+        # Point the quantization nodes to the copied quantizers only while building the session,
+        # so that the model doesn't need to be copied
+        qc_quantize_op_dict = {}
+        original_pointers = []
+        try:
+            for node in self.model.model.graph.node:
+                if node.op_type != 'QcQuantizeOp':
+                    continue
+                name = self._get_op_name(node)
+                qc_op = self.qc_quantize_op_dict[name].clone()
+                qc_quantize_op_dict[name] = qc_op
+                for attribute in node.attribute:
+                    if attribute.name == 'quant_info':
+                        original_pointers.append((attribute, attribute.i))
+                        attribute.i = libpymo.PtrToInt64(qc_op.quant_info)
+
+            session = QuantizationSimModel.build_session(self.model.model, self.providers,
+                                                         user_onnx_libs=self._user_onnx_libs,
+                                                         intra_op_num_threads=intra_op_num_threads)
+        finally:
+            for attribute, pointer in original_pointers:
+                attribute.i = pointer
+        return session, qc_quantize_op_dict
+
     @staticmethod
     def _create_encoding_dict(encoding: libpymo.TfEncoding, qc_quantize_op: QcQuantizeOp) -> Union[Dict, None]:
         """
@@ -597,6 +965,7 @@ class QuantizationSimModel:
         for node in self.model.graph().output:
             node.name = node.name.replace('_updated', '')
 
+    @tracing.traced("QuantizationSimModel.export")
     def export(self, path: str, filename_prefix: str):
         """
         Compute encodings and export to files
@@ -606,12 +975,17 @@ class QuantizationSimModel:
         """
         self._export_encodings(os.path.join(path, filename_prefix) + '.encodings')
         self.remove_quantization_nodes()
-        if self.model.model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF:
+        if utils.has_external_data(self.model.model):
+            # Stream the data of lazily loaded initializers instead of loading it into memory
+            utils.save_model_with_external_data(self.model.model, os.path.join(path, filename_prefix) + '.onnx')
+        elif self.model.model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF:
             # Note: Saving as external data mutates the saved model, removing all initializer data
             self.model.save_model_to_file(os.path.join(path, filename_prefix) + '.onnx', use_external_data_format=True)
             onnx.load_external_data_for_model(self.model.model, base_dir=path)
         else:
             self.model.save_model_to_file(os.path.join(path, filename_prefix) + '.onnx')
+        if tracing.is_enabled():
+            tracing.count("bytes_serialized", os.path.getsize(os.path.join(path, filename_prefix) + '.onnx'))
 
     def set_and_freeze_param_encodings(self, encoding_path: str):
         """
@@ -653,6 +1027,84 @@ class QuantizationSimModel:
 
         return param_quantizers, activation_quantizers
 
+    def snapshot(self, include_weights: bool = False, quantizer_names: Iterable[str] = None) -> QuantSimSnapshot:
+        """
+        Take a snapshot of the quantizer state of the sim, which can be brought back later with :meth:`restore`.
+        Unlike copying the model and creating a new sim, only the encodings, enabled flags, bitwidths and data types of
+        the quantizers are captured.
+
+        :param include_weights: If True, the quantized parameters of the model are captured as well
+        :param quantizer_names: Names of the quantized tensors whose quantizers are captured. If None, all quantizers
+            are captured
+        :return: Snapshot of the quantizer state
+        """
+        if quantizer_names is None:
+            quantizer_names = self.qc_quantize_op_dict.keys()
+        quantizers = {name: _QcQuantizeOpSnapshot(self.qc_quantize_op_dict[name]) for name in quantizer_names}
+        params = {}
+
+        if include_weights:
+            param_names = set(self.param_names)
+            for initializer in self.model.model.graph.initializer:
+                if initializer.name in param_names:
+                    params[initializer.name] = onnx.TensorProto()
+                    params[initializer.name].CopyFrom(initializer)
+
+        return QuantSimSnapshot(quantizers, params)
+
+    def restore(self, snapshot: QuantSimSnapshot) -> int:
+        """
+        Restore the quantizer state of the sim from a snapshot taken by :meth:`snapshot`.
+        Only the quantizers modified since the snapshot are written back. Modifications of the encodings are detected
+        from the identity of the encoding objects, so restoring a snapshot doesn't require comparing encodings.
+        Captured parameters are compared with their copies in the snapshot, and the onnxruntime session is rebuilt
+        only if any of them was restored.
+
+        A snapshot can be restored any number of times, as long as no quantizer is added to or removed from the sim
+        in between.
+
+        :param snapshot: Snapshot to restore
+        :return: Number of quantizers and parameters that were restored
+        """
+        num_restored = sum(quantizer.restore() for quantizer in snapshot.quantizers.values())
+
+        num_restored_params = 0
+        if snapshot.params:
+            for initializer in self.model.model.graph.initializer:
+                param = snapshot.params.get(initializer.name)
+                if param is not None and initializer != param:
+                    initializer.CopyFrom(param)
+                    num_restored_params += 1
+
+        if num_restored_params:
+            self.session = QuantizationSimModel.build_session(self.model.model, self.providers,
+                                                              user_onnx_libs=self._user_onnx_libs)
+
+        return num_restored + num_restored_params
+
+
+class _FirstRunBarrierSession:
+    """
+    Wrapper of onnxruntime session which signals the end of the first run and waits before returning its outputs
+    """
+    def __init__(self, session: InferenceSession, first_run_done: threading.Event, resume: threading.Event):
+        self._session = session
+        self._first_run_done = first_run_done
+        self._resume = resume
+
+    def run(self, *args, **kwargs):
+        """
+        Run the session. After the first run, set first_run_done and wait for resume to be set
+        """
+        outputs = self._session.run(*args, **kwargs)
+        if not self._first_run_done.is_set():
+            self._first_run_done.set()
+            self._resume.wait()
+        return outputs
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
 
 def load_encodings_to_sim(quant_sim_model: QuantizationSimModel, onnx_encoding_path: str, strict=True) -> \
         List[EncodingMismatchInfo]:
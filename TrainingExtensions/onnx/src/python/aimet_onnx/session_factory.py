@@ -0,0 +1,405 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Factory for onnxruntime inference sessions which avoids re-serializing large models """
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import onnx
+from onnx import numpy_helper, TensorProto
+from onnxruntime import SessionOptions, GraphOptimizationLevel, InferenceSession, OrtValue
+from packaging import version
+
+from aimet_common import libquant_info
+from aimet_common import tracing
+from aimet_onnx.utils import get_tensor_array, has_external_data
+
+# pylint: disable=no-name-in-module, ungrouped-imports
+if version.parse(onnx.__version__) >= version.parse("1.14.0"):
+    from onnx import ModelProto
+else:
+    from onnx.onnx_pb import ModelProto
+
+# Initializers smaller than this (in bytes) are kept inside the model proto
+EXTERNAL_DATA_SIZE_THRESHOLD = 1024
+
+# Default size limit (in bytes) of the files kept in the cache directory
+DEFAULT_MAX_CACHE_SIZE = 8 * 1024 ** 3
+
+
+class SessionFactory:
+    """
+    Builds onnxruntime inference sessions for ONNX models.
+
+    Models smaller than 2GB are passed to onnxruntime as bytes. Larger models are written once into a cache directory:
+    every large initializer is stored in its own file named after the hash of its content, and the model proto which
+    refers to these files is named after the hash of its serialization. Building a session for a model whose weights
+    did not change therefore writes nothing to disk, and models which share most of their weights (e.g. a model and its
+    quantsim graph) share the weight files. Models which refer to external data files, e.g. loaded with
+    aimet_onnx.utils.load_model_lazily, always take this route; their external data is streamed into the cache through
+    memory maps without being loaded as a whole. Once the files written by this factory exceed max_cache_size, the
+    least recently used ones are deleted after the session being built has loaded its data.
+
+    If use_external_initializers is set, large initializers are instead handed to onnxruntime as in-memory OrtValues
+    through SessionOptions.add_external_initializers and are not serialized at all. OrtValues are shared by content
+    hash across the sessions which are alive, and released together with the last session using them.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, use_external_initializers: bool = False,
+                 max_cache_size: int = DEFAULT_MAX_CACHE_SIZE):
+        """
+        :param cache_dir: Directory to store external data in. If None, a temporary directory is created on first use
+            and removed on interpreter exit
+        :param use_external_initializers: If True, pass large initializers to onnxruntime as OrtValues instead of
+            writing them to the cache directory
+        :param max_cache_size: Size limit in bytes of the files written into the cache directory. Files of the model
+            being built are kept even if they exceed the limit
+        """
+        self._cache_dir = cache_dir
+        self._is_managed = cache_dir is None
+        self._use_external_initializers = use_external_initializers
+        self._max_cache_size = max_cache_size
+        self._ort_values: 'weakref.WeakValueDictionary[str, _SharedOrtValue]' = weakref.WeakValueDictionary()
+        # Sizes of the files written into the cache directory, least recently used first
+        self._cached_files: 'OrderedDict[str, int]' = OrderedDict()
+        # Number of sessions being built from each cached file
+        self._pinned_files: Dict[str, int] = {}
+        # Content hashes of external data, keyed by file, offset and modification time
+        self._external_digests: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> str:
+        """ Directory in which external data of large models is stored """
+        with self._lock:
+            if self._cache_dir is None:
+                self._cache_dir = tempfile.mkdtemp(prefix='aimet_onnx_sessions_')
+                atexit.register(self.cleanup)
+            os.makedirs(self._cache_dir, exist_ok=True)
+        return self._cache_dir
+
+    @tracing.traced("SessionFactory.build_session")
+    def build_session(self, model: ModelProto, providers: List, user_onnx_libs: List[str] = None,
+                      graph_optimization_level: GraphOptimizationLevel = GraphOptimizationLevel.ORT_DISABLE_ALL,
+                      intra_op_num_threads: int = 0, inter_op_num_threads: int = 0) -> InferenceSession:
+        """
+        Build and return onnxruntime inference session. The model is not modified.
+
+        :param model: onnx model
+        :param providers: providers to execute onnxruntime
+        :param user_onnx_libs: list of paths to user custom ONNX op libraries
+        :param graph_optimization_level: onnxruntime graph optimization level
+        :param intra_op_num_threads: Number of threads used to parallelize the execution within nodes.
+            0 lets onnxruntime choose the default
+        :param inter_op_num_threads: Number of threads used to parallelize the execution of the graph.
+            0 lets onnxruntime choose the default
+        :return: Inference session
+        """
+        sess_options = SessionOptions()
+        shared_library = os.path.dirname(libquant_info.__file__)
+        shared_library = os.path.join(shared_library, "libaimet_onnxrt_ops.so")
+        sess_options.register_custom_ops_library(shared_library)
+        if user_onnx_libs is not None:
+            for lib in user_onnx_libs:
+                sess_options.register_custom_ops_library(lib)
+        sess_options.graph_optimization_level = graph_optimization_level
+        sess_options.intra_op_num_threads = intra_op_num_threads
+        sess_options.inter_op_num_threads = inter_op_num_threads
+
+        tracing.count("session_builds")
+        if model.ByteSize() < onnx.checker.MAXIMUM_PROTOBUF and not has_external_data(model):
+            return InferenceSession(path_or_bytes=model.SerializeToString(), sess_options=sess_options,
+                                    providers=providers)
+
+        if self._use_external_initializers:
+            model_bytes, names, values = self._strip_to_ort_values(model)
+            sess_options.add_external_initializers(names, [value.ort_value for value in values])
+            session = InferenceSession(path_or_bytes=model_bytes, sess_options=sess_options, providers=providers)
+            # The session refers to the memory of the OrtValues, which are cached only for as long as
+            # a session using them is alive
+            session._aimet_external_initializers = values # pylint: disable=protected-access
+            return session
+
+        model_path, cached_files = self._write_to_cache(model)
+        try:
+            return InferenceSession(path_or_bytes=model_path, sess_options=sess_options, providers=providers)
+        finally:
+            # onnxruntime has loaded the files by now, so they may be evicted
+            self._unpin_and_evict(cached_files)
+
+    def cleanup(self):
+        """
+        Release cached OrtValues and, if the cache directory was created by this factory, delete it
+        """
+        with self._lock:
+            self._ort_values.clear()
+            self._external_digests.clear()
+            self._cached_files.clear()
+            if self._is_managed and self._cache_dir is not None:
+                shutil.rmtree(self._cache_dir, ignore_errors=True)
+                self._cache_dir = None
+
+    def _write_to_cache(self, model: ModelProto) -> Tuple[str, List[str]]:
+        """
+        Write large initializers and the model referring to them into the cache directory, skipping files which
+        already exist. The files are pinned so that they are not evicted until :meth:`_unpin_and_evict` is called.
+
+        :param model: onnx model
+        :return: Path of the model file and paths of all the files the model consists of
+        """
+        cache_dir = self.cache_dir
+        tensor_dir = os.path.join(cache_dir, 'tensors')
+        os.makedirs(tensor_dir, exist_ok=True)
+        cached_files = []
+
+        def _externalize(tensor: TensorProto) -> TensorProto:
+            data = _get_tensor_bytes(tensor)
+            digest = self._get_digest(tensor, data)
+            location = f'tensors/{digest}.bin'
+            self._pin(os.path.join(cache_dir, location), len(data))
+            cached_files.append(os.path.join(cache_dir, location))
+            _write_file_once(os.path.join(cache_dir, location), data)
+
+            external_tensor = _make_tensor_header(tensor)
+            external_tensor.data_location = TensorProto.EXTERNAL
+            for key, value in (('location', location), ('offset', '0'), ('length', str(len(data)))):
+                entry = external_tensor.external_data.add()
+                entry.key = key
+                entry.value = value
+            return external_tensor
+
+        try:
+            model_bytes = _copy_model_with_initializers(model, _externalize).SerializeToString()
+            model_path = os.path.join(cache_dir, f'model_{hashlib.sha256(model_bytes).hexdigest()}.onnx')
+            self._pin(model_path, len(model_bytes))
+            cached_files.append(model_path)
+            _write_file_once(model_path, model_bytes)
+        except BaseException:
+            self._unpin_and_evict(cached_files)
+            raise
+        return model_path, cached_files
+
+    def _pin(self, path: str, size: int):
+        """ Mark a cached file as most recently used and protect it from eviction """
+        with self._lock:
+            self._cached_files.pop(path, None)
+            self._cached_files[path] = size
+            self._pinned_files[path] = self._pinned_files.get(path, 0) + 1
+
+    def _unpin_and_evict(self, paths: List[str]):
+        """
+        Release the pins of the given files and delete the least recently used files which are not pinned until the
+        cached files fit within the size limit
+        """
+        with self._lock:
+            for path in paths:
+                self._pinned_files[path] -= 1
+                if not self._pinned_files[path]:
+                    del self._pinned_files[path]
+
+            total_size = sum(self._cached_files.values())
+            for path in list(self._cached_files):
+                if total_size <= self._max_cache_size:
+                    break
+                if path in self._pinned_files:
+                    continue
+                total_size -= self._cached_files.pop(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _strip_to_ort_values(self, model: ModelProto) -> Tuple[bytes, List[str], List['_SharedOrtValue']]:
+        """
+        Replace large initializers by data-less tensors and create OrtValues holding their data
+
+        :param model: onnx model
+        :return: Serialized model, names of the external initializers and the corresponding OrtValues.
+            OrtValues are reused across calls for as long as they are referenced
+        """
+        names, values = [], []
+
+        def _strip(tensor: TensorProto) -> TensorProto:
+            data = _get_tensor_bytes(tensor)
+            digest = self._get_digest(tensor, data)
+            with self._lock:
+                value = self._ort_values.get(digest)
+                if value is None:
+                    value = _SharedOrtValue(np.ascontiguousarray(get_tensor_array(tensor)))
+                    self._ort_values[digest] = value
+            names.append(tensor.name)
+            values.append(value)
+            return _make_tensor_header(tensor)
+
+        model_bytes = _copy_model_with_initializers(model, _strip).SerializeToString()
+        return model_bytes, names, values
+
+    def _get_digest(self, tensor: TensorProto, data) -> str:
+        """
+        Content hash of a tensor. The hash of external data is remembered for as long as its file is not modified, so
+        that large external files are read only once.
+        """
+        if tensor.data_location != TensorProto.EXTERNAL:
+            return _hash_tensor(tensor, data)
+        info = {entry.key: entry.value for entry in tensor.external_data}
+        key = (os.path.abspath(info['location']), info.get('offset', '0'), tensor.data_type, tuple(tensor.dims),
+               os.stat(info['location']).st_mtime_ns)
+        with self._lock:
+            digest = self._external_digests.get(key)
+        if digest is None:
+            digest = _hash_tensor(tensor, data)
+            with self._lock:
+                self._external_digests[key] = digest
+        return digest
+
+
+class _SharedOrtValue:
+    """
+    OrtValue of an initializer which can be shared across sessions. The OrtValue shares memory with the array,
+    so the array has to be kept alive as well
+    """
+    __slots__ = ('array', 'ort_value', '__weakref__')
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.ort_value = OrtValue.ortvalue_from_numpy(array)
+
+
+def _copy_model_with_initializers(model: ModelProto, transform) -> ModelProto:
+    """
+    Copy the model without copying the data of large or external initializers, which are passed through transform
+    instead
+
+    :param model: onnx model
+    :param transform: Function mapping a large initializer to its replacement
+    :return: Copied model
+    """
+    graph = onnx.GraphProto()
+    for field, value in model.graph.ListFields():
+        if field.name != 'initializer':
+            _copy_field(graph, field, value)
+    for tensor in model.graph.initializer:
+        if tensor.data_location == TensorProto.EXTERNAL or tensor.ByteSize() >= EXTERNAL_DATA_SIZE_THRESHOLD:
+            tensor = transform(tensor)
+        graph.initializer.append(tensor)
+
+    copied_model = ModelProto()
+    for field, value in model.ListFields():
+        if field.name != 'graph':
+            _copy_field(copied_model, field, value)
+    copied_model.graph.CopyFrom(graph)
+    return copied_model
+
+
+def _copy_field(message, field, value):
+    """ Copy a field value onto message """
+    if field.label == field.LABEL_REPEATED:
+        getattr(message, field.name).extend(value)
+    elif field.message_type is not None:
+        getattr(message, field.name).CopyFrom(value)
+    else:
+        setattr(message, field.name, value)
+
+
+def _make_tensor_header(tensor: TensorProto) -> TensorProto:
+    """ Create a tensor with the name, type and shape of the given tensor but without data """
+    header = TensorProto()
+    header.name = tensor.name
+    header.data_type = tensor.data_type
+    header.dims.extend(tensor.dims)
+    return header
+
+
+def _get_tensor_bytes(tensor: TensorProto):
+    """
+    Returns the raw little-endian data of a tensor. The data of external tensors is returned as a memoryview of the
+    memory-mapped file.
+    """
+    if tensor.data_location == TensorProto.EXTERNAL:
+        array = get_tensor_array(tensor)
+        if isinstance(array, np.memmap):
+            return memoryview(array.reshape(-1).view(np.uint8))
+        return array.tobytes()
+    if tensor.HasField('raw_data'):
+        return tensor.raw_data
+    return numpy_helper.to_array(tensor).tobytes()
+
+
+def _hash_tensor(tensor: TensorProto, data: bytes) -> str:
+    """ Content hash of a tensor including its type and shape """
+    sha = hashlib.sha256(f'{tensor.data_type}:{list(tensor.dims)}:'.encode())
+    sha.update(data)
+    return sha.hexdigest()
+
+
+def _write_file_once(path: str, data):
+    """ Write data to path unless the file already exists. The file is written atomically. """
+    if os.path.exists(path):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_default_session_factory = SessionFactory()
+_session_factories: Dict[str, SessionFactory] = {}
+
+
+def get_session_factory(cache_dir: Optional[str] = None) -> SessionFactory:
+    """
+    Returns the session factory storing external data in cache_dir. Factories are shared so that files in a given
+    directory are written only once.
+
+    :param cache_dir: Directory to store external data in. If None, the default factory with a temporary directory
+        which is removed on exit is returned
+    :return: Session factory
+    """
+    if cache_dir is None:
+        return _default_session_factory
+    cache_dir = os.path.abspath(cache_dir)
+    if cache_dir not in _session_factories:
+        _session_factories[cache_dir] = SessionFactory(cache_dir)
+    return _session_factories[cache_dir]
@@ -36,7 +36,7 @@
 # =============================================================================
 """ Utility functions for ONNX """
 import itertools
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Union, Tuple, Set
 import os
 import pickle
 import numpy as np
@@ -124,6 +124,20 @@ def transpose_tensor(t: TensorProto, axes: Union[List, Tuple]) -> TensorProto:
     return numpy_helper.from_array(np.transpose(t_np, axes), name=t.name)
 
 
+def transpose_array(array: np.ndarray, axes: Union[List, Tuple]) -> np.ndarray:
+    """
+    Permutes the axes of a given array like transpose_tensor, but returns a view so that writes to the result
+    update the original array
+
+    :param array: array to transpose
+    :param axes: tuple or list containing the permuted axis ordering
+    :return: view of array permuted according to the axis ordering in axes
+    """
+    # Expand array with singleton dimensions to match axes
+    array = array.reshape(array.shape + (1,) * (len(axes) - array.ndim))
+    return array.transpose(axes)
+
+
 def replace_node_with_op(node_type: str, new_type: str, onnx_graph: onnx.GraphProto):
     """
     Replace the given op type of nodes to new op type
@@ -161,11 +175,207 @@ def get_weights(name: str, onnx_graph: onnx.GraphProto) -> bytes:
     """
     for param in onnx_graph.initializer:
         if param.name == name:
+            if param.data_location == TensorProto.EXTERNAL:
+                return get_tensor_array(param).tobytes()
             return param.raw_data
     assert Exception("Couldn't find weights by the given name")
     return None
 
 
+# Tensor types whose external data can be memory-mapped directly, i.e. whose on-disk layout is the numpy layout
+_MEMMAP_DTYPES = {
+    TensorProto.FLOAT: np.dtype('<f4'),
+    TensorProto.DOUBLE: np.dtype('<f8'),
+    TensorProto.FLOAT16: np.dtype('<f2'),
+    TensorProto.INT8: np.dtype('i1'),
+    TensorProto.UINT8: np.dtype('u1'),
+    TensorProto.INT16: np.dtype('<i2'),
+    TensorProto.UINT16: np.dtype('<u2'),
+    TensorProto.INT32: np.dtype('<i4'),
+    TensorProto.UINT32: np.dtype('<u4'),
+    TensorProto.INT64: np.dtype('<i8'),
+    TensorProto.UINT64: np.dtype('<u8'),
+    TensorProto.BOOL: np.dtype('?'),
+}
+
+# Byte alignment of tensors appended to external data files
+_EXTERNAL_DATA_ALIGNMENT = 64
+
+
+def load_model_lazily(path: str) -> ModelProto:
+    """
+    Load an ONNX model without reading the data of initializers stored in external files. The external data locations
+    are made absolute so that the model does not depend on the working directory, and the data is memory-mapped on
+    access by get_tensor_array().
+
+    :param path: Path of the ONNX model file
+    :return: ONNX model whose external initializers still refer to their files
+    """
+    model = onnx.load(path, load_external_data=False)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for tensor in _get_all_tensors(model):
+        if tensor.data_location == TensorProto.EXTERNAL:
+            for entry in tensor.external_data:
+                if entry.key == 'location' and not os.path.isabs(entry.value):
+                    entry.value = os.path.join(base_dir, entry.value)
+    return model
+
+
+def has_external_data(model: ModelProto) -> bool:
+    """
+    Returns True if any tensor of the model refers to data in an external file
+
+    :param model: ONNX model
+    """
+    return any(tensor.data_location == TensorProto.EXTERNAL for tensor in _get_all_tensors(model))
+
+
+def save_model_with_external_data(model: ModelProto, path: str):
+    """
+    Save a model with its large initializers in a single external data file next to the model file. Initializers
+    which already refer to external files are copied into the new file through memory maps, one at a time. The model
+    is not changed except that its large in-model initializers are moved into the new file, which is referred to by
+    absolute path.
+
+    :param model: ONNX model
+    :param path: Path of the model file to write. The data is written to the same path with '.data' appended.
+    """
+    location = os.path.basename(path) + '.data'
+    data_path = os.path.join(os.path.dirname(os.path.abspath(path)), location)
+    original_external_data = []
+    inline_tensors = []
+    with open(data_path, 'wb') as data_file:
+        for tensor in _get_all_tensors(model):
+            if tensor.data_location != TensorProto.EXTERNAL:
+                inline_tensors.append(tensor)
+                continue
+            array = get_tensor_array(tensor)
+            data = memoryview(array.reshape(-1).view(np.uint8)) if isinstance(array, np.memmap) else array.tobytes()
+            offset = data_file.tell()
+            data_file.write(data)
+            original_external_data.append((tensor, [(entry.key, entry.value) for entry in tensor.external_data]))
+            _set_external_data(tensor, [('location', location), ('offset', str(offset)), ('length', str(len(data)))])
+
+    try:
+        # onnx appends the data of the remaining large initializers to the same file
+        onnx.save_model(model, path, save_as_external_data=True, all_tensors_to_one_file=True, location=location)
+    finally:
+        for tensor, external_data in original_external_data:
+            _set_external_data(tensor, external_data)
+
+    for tensor in inline_tensors:
+        if tensor.data_location == TensorProto.EXTERNAL:
+            for entry in tensor.external_data:
+                if entry.key == 'location':
+                    entry.value = data_path
+
+
+def _set_external_data(tensor: TensorProto, entries: List[Tuple[str, str]]):
+    """ Replaces the external data entries of a tensor """
+    del tensor.external_data[:]
+    for key, value in entries:
+        entry = tensor.external_data.add()
+        entry.key = key
+        entry.value = value
+
+
+def _get_all_tensors(model: ModelProto):
+    """ Yields the initializers and constant tensors of the model """
+    yield from model.graph.initializer
+    for node in model.graph.node:
+        if node.op_type == 'Constant':
+            for attribute in node.attribute:
+                if attribute.name == 'value':
+                    yield attribute.t
+
+
+def _get_external_data_path(tensor: TensorProto, base_dir: str = '') -> Tuple[str, int]:
+    """ Returns the file path and byte offset of the data of an external tensor """
+    info = {entry.key: entry.value for entry in tensor.external_data}
+    return os.path.join(base_dir, info['location']), int(info.get('offset', 0))
+
+
+def get_tensor_array(tensor: TensorProto, base_dir: str = '', mode: str = 'r') -> np.ndarray:
+    """
+    Returns the data of a tensor as a numpy array. The data of external tensors is memory-mapped rather than read, so
+    that only the pages which are actually used are loaded into memory.
+
+    :param tensor: ONNX tensor
+    :param base_dir: Directory of the external data file if its location is relative
+    :param mode: Memory-map mode for external tensors. 'r' for read-only, 'r+' to write changes of the array through
+        to the file and 'c' for copy-on-write. Ignored for tensors stored in the model.
+    :return: Array holding the tensor data
+    """
+    if tensor.data_location == TensorProto.EXTERNAL and tensor.data_type in _MEMMAP_DTYPES:
+        path, offset = _get_external_data_path(tensor, base_dir)
+        shape = tuple(tensor.dims)
+        array = np.memmap(path, dtype=_MEMMAP_DTYPES[tensor.data_type], mode=mode, offset=offset,
+                          shape=shape or (1,))
+        return array.reshape(shape)
+    return numpy_helper.to_array(tensor, base_dir)
+
+
+def set_tensor_array(tensor: TensorProto, array: np.ndarray, base_dir: str = '', in_place: bool = False):
+    """
+    Sets the data of a tensor.
+
+    :param tensor: ONNX tensor to update
+    :param array: New data of the tensor
+    :param base_dir: Directory of the external data file if its location is relative
+    :param in_place: If True and the tensor is stored externally with the same type and shape as array, the data is
+        written into the external file and the tensor keeps referring to it. Otherwise the data is stored in the model.
+    """
+    if in_place and tensor.data_location == TensorProto.EXTERNAL and tensor.data_type in _MEMMAP_DTYPES and \
+            tuple(tensor.dims) == array.shape and _MEMMAP_DTYPES[tensor.data_type] == array.dtype.newbyteorder('<'):
+        target = get_tensor_array(tensor, base_dir, mode='r+')
+        target[...] = array
+        target.flush()
+        return
+
+    for field in ('float_data', 'int32_data', 'int64_data', 'double_data', 'uint64_data', 'external_data'):
+        tensor.ClearField(field)
+    tensor.data_location = TensorProto.DEFAULT
+    tensor.data_type = mapping.NP_TYPE_TO_TENSOR_TYPE[array.dtype]
+    del tensor.dims[:]
+    tensor.dims.extend(array.shape)
+    tensor.raw_data = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<')).tobytes()
+
+
+def write_tensor_array_to_file(tensor: TensorProto, array: np.ndarray, data_path: str):
+    """
+    Appends the data of a tensor to an external data file through a memory map and points the tensor to it, so that
+    the data is held neither in memory nor in the model. Data already in the file is never overwritten, since sessions
+    may still map it. Data types which can't be memory-mapped are stored in the model.
+
+    :param tensor: ONNX tensor to update
+    :param array: New data of the tensor
+    :param data_path: Path of the external data file. Created if it doesn't exist
+    """
+    data_path = os.path.abspath(data_path)
+    dtype = array.dtype.newbyteorder('<')
+    if dtype not in _MEMMAP_DTYPES.values() or array.size == 0:
+        set_tensor_array(tensor, array)
+        return
+
+    with open(data_path, 'ab'):
+        pass
+    offset = os.path.getsize(data_path)
+    offset += -offset % _EXTERNAL_DATA_ALIGNMENT
+    os.truncate(data_path, offset + array.nbytes)
+    target = np.memmap(data_path, dtype=dtype, mode='r+', offset=offset, shape=array.shape or (1,))
+    target[...] = array.reshape(target.shape)
+    target.flush()
+    del target
+
+    for field in ('float_data', 'int32_data', 'int64_data', 'double_data', 'uint64_data', 'raw_data'):
+        tensor.ClearField(field)
+    tensor.data_location = TensorProto.EXTERNAL
+    tensor.data_type = mapping.NP_TYPE_TO_TENSOR_TYPE[array.dtype]
+    del tensor.dims[:]
+    tensor.dims.extend(array.shape)
+    _set_external_data(tensor, [('location', data_path), ('offset', str(offset)), ('length', str(array.nbytes))])
+
+
 def get_ordered_dict_of_nodes(onnx_graph: onnx.GraphProto) -> Dict:
     """
     Return the ordered list of nodes
@@ -303,6 +513,25 @@ def get_graph_intermediate_activations(graph: GraphProto) -> List[str]:
     return activation_names
 
 
+def get_consumed_tensor_names(graph: GraphProto) -> Set[str]:
+    """
+    Returns the names of all tensors consumed by the nodes of a graph, including the nodes of subgraphs
+    (e.g. branches of If and bodies of Loop and Scan) which can refer to tensors of the outer graph
+    :param graph: The graph for which to retrieve the consumed tensors
+    :return: Set of names of the consumed tensors
+    """
+    names = set()
+    for node in graph.node:
+        names.update(node.input)
+        for attribute in node.attribute:
+            if attribute.type == onnx.AttributeProto.GRAPH:
+                names.update(get_consumed_tensor_names(attribute.g))
+            elif attribute.type == onnx.AttributeProto.GRAPHS:
+                for subgraph in attribute.graphs:
+                    names.update(get_consumed_tensor_names(subgraph))
+    return names
+
+
 class ParamUtils:
     """ Param utilities """
     @staticmethod
@@ -352,6 +581,130 @@ class ParamUtils:
         return None
 
 
+class WeightStore:
+    """
+    Holds the parameters of an ONNX model as numpy arrays so that they can be transformed in place without converting
+    to and from TensorProto for every access. Each parameter is loaded on first access and kept for subsequent ones.
+    Parameters stored in external files are memory-mapped instead. Modified parameters are written back to the model
+    in one batch by flush().
+    """
+    def __init__(self, model: ModelProto, base_dir: str = '', write_in_place: bool = False,
+                 external_data_path: str = None):
+        """
+        :param model: ONNX model
+        :param base_dir: Directory of the external data files, if their locations are relative
+        :param write_in_place: If True, modified external params are written back into their files on flush(). This
+            also changes every other model which shares these files.
+        :param external_data_path: If given and write_in_place is False, modified external params are written to this
+            file, which should be owned by the caller, and the params are pointed to it. Otherwise, they are stored in
+            the model.
+        """
+        self._model = model
+        self._base_dir = base_dir
+        self._write_in_place = write_in_place
+        self._external_data_path = external_data_path
+        self._tensors: Dict[str, TensorProto] = {init.name: init for init in model.graph.initializer}
+        for node in model.graph.node:
+            if node.op_type == 'Constant':
+                for attribute in node.attribute:
+                    if attribute.name == 'value':
+                        self._tensors[node.output[0]] = attribute.t
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._modified = set()
+        self._new_initializers = []
+
+    def _load(self, tensor: TensorProto) -> np.ndarray:
+        """ Reads the data of a tensor without copying if possible """
+        if tensor.data_location != TensorProto.EXTERNAL and tensor.HasField('raw_data') and \
+                tensor.data_type == TensorProto.FLOAT:
+            return np.frombuffer(tensor.raw_data, dtype='<f4')
+        return get_tensor_array(tensor, self._base_dir, mode='r+' if self._write_in_place else 'c')
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tensors or name in self._new_initializers
+
+    def get_param_name(self, node: NodeProto, param_index: int) -> Union[str, None]:
+        """
+        Returns the name of the param feeding into the node at param_index, or None if there is no such param
+
+        :param node: ONNX node to which the param feeds to
+        :param param_index: Index at which param feeds to the ONNX node
+        """
+        if len(node.input) > param_index and node.input[param_index] in self:
+            return node.input[param_index]
+        return None
+
+    def read_array(self, name: str) -> np.ndarray:
+        """
+        Returns the param as a numpy array which is not expected to be modified
+
+        :param name: Name of the param
+        :return: Array holding the param data
+        """
+        if name not in self._arrays:
+            tensor = self._tensors[name]
+            array = self._load(tensor)
+            if not isinstance(array, np.memmap):
+                array = np.array(array)
+            self._arrays[name] = array.reshape(tuple(tensor.dims))
+        return self._arrays[name]
+
+    def get_array(self, name: str) -> np.ndarray:
+        """
+        Returns the param as a numpy array. In-place modifications of the array are written back to the model by
+        flush().
+
+        :param name: Name of the param
+        :return: Array holding the param data
+        """
+        array = self.read_array(name)
+        self._modified.add(name)
+        return array
+
+    def set_array(self, name: str, array: np.ndarray):
+        """
+        Sets the data of a param. If the param does not exist, a new initializer is added to the model on flush().
+
+        :param name: Name of the param
+        :param array: New data of the param
+        """
+        current = self._arrays.get(name)
+        if current is not None and current.shape == array.shape and current.dtype == array.dtype:
+            if np.shares_memory(current, array):
+                array = array.copy()
+            current[...] = array
+        else:
+            self._arrays[name] = np.ascontiguousarray(array)
+        if name not in self:
+            self._new_initializers.append(name)
+        self._modified.add(name)
+
+    def flush(self):
+        """
+        Writes all params that were accessed through get_array() or set_array() back to the model
+        """
+        for name in self._new_initializers:
+            self._model.graph.initializer.append(numpy_helper.from_array(self._arrays[name], name))
+            self._tensors[name] = self._model.graph.initializer[-1]
+        new_initializers = set(self._new_initializers)
+        self._new_initializers = []
+
+        for name in self._modified - new_initializers:
+            array = self._arrays[name]
+            tensor = self._tensors[name]
+            if isinstance(array, np.memmap) and array.mode == 'r+':
+                # Changes were written through to the memory-mapped file
+                array.flush()
+            elif self._external_data_path and tensor.data_location == TensorProto.EXTERNAL:
+                write_tensor_array_to_file(tensor, array, self._external_data_path)
+                # Release the modified copy-on-write pages. The param is mapped again from the new file on next access
+                del self._arrays[name]
+            else:
+                set_tensor_array(tensor, array)
+        self._modified = set()
+
+
 def get_product_name_from_quantized_name(quantized_name: str):
     """
     Gets product's name from quantized name
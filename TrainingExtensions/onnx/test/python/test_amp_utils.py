@@ -39,6 +39,7 @@ import torch
 from packaging import version
 
 from aimet_onnx.quantsim import QuantizationSimModel
+from aimet_onnx.amp import utils as amp_utils
 from aimet_onnx.amp.utils import find_layer_database_for_mac_calculation, create_mac_dict, find_bit_ops_reduction, \
     calculate_running_bit_ops, find_param_name_to_parent_name_dict, get_quantizer_to_op_type_dict
 from aimet_onnx.amp.quantizer_groups import QuantizerGroup
@@ -62,6 +63,44 @@ class TestAMPUtils:
                     cost *= layer_db[node_name].weight_shape[2] * layer_db[node_name].weight_shape[3]
                 assert mac_dict[node_name] == cost
 
+    def test_activation_shapes_without_execution(self, monkeypatch):
+        """ Test activation shapes from shape inference match the shapes observed by running the model """
+        if version.parse(torch.__version__) >= version.parse("1.13"):
+            model = single_residual_model()
+            sim = QuantizationSimModel(model.model)
+            expected_shapes = amp_utils._get_activation_shapes_by_execution(sim)
+
+            def _fail(*_args, **_kwargs):
+                raise AssertionError('Model should not be executed')
+
+            monkeypatch.setattr(QuantizationSimModel, 'build_session', _fail)
+            amp_utils._activation_shape_cache.clear()
+            activation_shapes = amp_utils.get_activation_shapes(sim)
+            for name, shape in expected_shapes.items():
+                assert activation_shapes[name] == tuple(shape)
+
+            # Second call on the same graph is served from the cache
+            assert len(amp_utils._activation_shape_cache) == 1
+            assert amp_utils.get_activation_shapes(sim) == activation_shapes
+            assert len(amp_utils._activation_shape_cache) == 1
+
+    def test_activation_shapes_fall_back_to_execution(self, monkeypatch):
+        """ Test activation shapes are obtained by running the model if shape inference leaves a layer unresolved """
+        if version.parse(torch.__version__) >= version.parse("1.13"):
+            model = single_residual_model()
+            sim = QuantizationSimModel(model.model)
+            infer_activation_shapes = amp_utils.infer_activation_shapes
+
+            def _infer_without_conv1(*args, **kwargs):
+                activation_shapes = infer_activation_shapes(*args, **kwargs)
+                activation_shapes.pop('/conv1/Conv_output_0')
+                return activation_shapes
+
+            monkeypatch.setattr(amp_utils, 'infer_activation_shapes', _infer_without_conv1)
+            layer_db = find_layer_database_for_mac_calculation(sim)
+            assert len(layer_db) == 5
+            assert tuple(layer_db['/conv1/Conv'].output_shape) == (1, 32, 18, 18)
+
     def test_find_parent_name_dict(self):
         if version.parse(torch.__version__) >= version.parse("1.13"):
             model = single_residual_model()
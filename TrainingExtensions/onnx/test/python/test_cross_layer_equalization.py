@@ -123,6 +123,24 @@ class TestCLS:
         weight_5 = numpy_helper.to_array(ParamUtils.get_param(model.model, conv_5, WEIGHT_INDEX))
         assert np.allclose(np.amax(np.abs(weight_3), axis=(1, 2, 3)), np.amax(np.abs(weight_5), axis=(0, 2, 3)))
 
+    def test_scale_cls_set_with_conv_layers(self):
+        """ Public per-set API reads the params on demand and writes the scaled params back to the model """
+        model = models_for_tests.single_residual_model()
+        connected_graph = ConnectedGraph(model)
+        ordered_module_list = get_ordered_list_of_conv_modules(connected_graph.starting_ops)
+        graph_search_utils = GraphSearchUtils(connected_graph, ordered_module_list, cls_supported_layer_types,
+                                              cls_supported_activation_types)
+        layer_group = graph_search_utils.find_layer_groups_to_scale()[0]
+        cls_set = graph_search_utils.convert_layer_group_to_cls_sets(layer_group)[0]
+
+        cls = CrossLayerScaling(model)
+        cls.scale_cls_set_with_conv_layers(cls_set)
+        assert cls._weight_store is None
+
+        weight_0 = numpy_helper.to_array(ParamUtils.get_param(model.model, cls_set[0].get_module(), WEIGHT_INDEX))
+        weight_1 = numpy_helper.to_array(ParamUtils.get_param(model.model, cls_set[1].get_module(), WEIGHT_INDEX))
+        assert np.allclose(np.amax(np.abs(weight_0), axis=(1, 2, 3)), np.amax(np.abs(weight_1), axis=(0, 2, 3)))
+
     def test_scale_model_tranposed_conv(self):
         model = models_for_tests.transposed_conv_model_without_bn()
         input_shape = (10,10,4,4)
@@ -135,6 +135,48 @@ class TestLayerOutput:
         shutil.rmtree(temp_dir_path, ignore_errors=False, onerror=None)
         pass
 
+    def test_get_outputs_in_groups(self):
+        """ Test whether layer-outputs captured group by group match the ones captured in a single run """
+
+        quantsim, output_names, input_dict = get_quantsim_artifacts()
+
+        temp_dir_path = os.path.dirname(os.path.abspath(__file__))
+        temp_dir_path = os.path.join(temp_dir_path, 'temp_dir')
+
+        expected = LayerOutput(quantsim.model.model, providers, temp_dir_path).get_outputs(input_dict)
+
+        layer_output = LayerOutput(quantsim.model.model, providers, temp_dir_path, max_outputs_per_run=2)
+        assert layer_output._stages is not None
+        groups = list(layer_output.iter_outputs(input_dict))
+        assert len(groups) == (len(output_names) + 1) // 2
+        assert all(len(group) <= 2 for group in groups)
+
+        output_name_to_output_val_dict = {}
+        for group in groups:
+            output_name_to_output_val_dict.update(group)
+        assert output_name_to_output_val_dict.keys() == expected.keys()
+        for name, value in expected.items():
+            assert np.array_equal(output_name_to_output_val_dict[name], value)
+
+        # Stage sessions are reused for subsequent inputs
+        assert layer_output.get_outputs(input_dict).keys() == expected.keys()
+
+        shutil.rmtree(temp_dir_path, ignore_errors=False, onerror=None)
+
+    def test_get_filtered_outputs(self):
+        """ Test whether only the layer-outputs accepted by the filter are captured """
+
+        model, _, input_dict = get_original_model_artifacts()
+
+        temp_dir_path = os.path.dirname(os.path.abspath(__file__))
+        temp_dir_path = os.path.join(temp_dir_path, 'temp_dir')
+
+        layer_output = LayerOutput(model, providers, temp_dir_path, layer_filter=lambda name: name == 'output')
+        output_name_to_output_val_dict = layer_output.get_outputs(input_dict)
+        assert list(output_name_to_output_val_dict.keys()) == ['output']
+
+        shutil.rmtree(temp_dir_path, ignore_errors=False, onerror=None)
+
 
 def get_dataset_artifacts():
     class DummyDataset(Dataset):
@@ -196,3 +238,30 @@ class TestLayerOutputUtil:
 
         # Delete temp_dir
         shutil.rmtree(temp_dir_path, ignore_errors=False, onerror=None)
+
+    def test_generate_layer_outputs_in_groups(self):
+        """ Test whether layer-outputs saved group by group are identical to the ones saved in a single run """
+
+        quantsim, output_names, _ = get_quantsim_artifacts()
+        _, dummy_data_loader, data_count = get_dataset_artifacts()
+
+        temp_dir_path = os.path.dirname(os.path.abspath(__file__))
+        single_run_dir = os.path.join(temp_dir_path, 'temp_dir')
+        grouped_dir = os.path.join(temp_dir_path, 'temp_dir_grouped')
+
+        single_run_util = LayerOutputUtil(model=quantsim.model.model, dir_path=single_run_dir)
+        grouped_util = LayerOutputUtil(model=quantsim.model.model, dir_path=grouped_dir, max_outputs_per_run=3)
+        for input_batch in dummy_data_loader:
+            single_run_util.generate_layer_outputs(input_batch.numpy())
+            grouped_util.generate_layer_outputs(input_batch.numpy())
+
+        assert data_count == len(os.listdir(os.path.join(grouped_dir, 'inputs')))
+        assert data_count == len(os.listdir(os.path.join(grouped_dir, 'outputs')))
+        for idx in range(data_count):
+            for name in output_names:
+                file_name = os.path.join('outputs', f'layer_outputs_{idx}', name + '.raw')
+                assert np.array_equal(np.fromfile(os.path.join(single_run_dir, file_name), dtype=np.float32),
+                                      np.fromfile(os.path.join(grouped_dir, file_name), dtype=np.float32))
+
+        shutil.rmtree(single_run_dir, ignore_errors=False, onerror=None)
+        shutil.rmtree(grouped_dir, ignore_errors=False, onerror=None)
@@ -384,6 +384,15 @@ class TestQuantAnalyzer:
             # Check if it is exported to correct html file.
             assert os.path.isfile(Path(tmp_dir, "per_layer_mse_loss.html"))
 
+            # Processing the layers in bounded groups gives the same results as a single pass
+            single_pass_mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir,
+                                                                                 max_outputs_per_run=None)
+            grouped_mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir,
+                                                                             max_outputs_per_run=3)
+            assert grouped_mse_loss_dict.keys() == single_pass_mse_loss_dict.keys()
+            for op_name, loss in single_pass_mse_loss_dict.items():
+                assert np.isclose(grouped_mse_loss_dict[op_name], loss)
+
     def test_analyze(self):
         """ test end to end for analyze() method """
         input_shape = (1, 3, 32, 32)
@@ -38,6 +38,7 @@
 import json
 import os
 import tempfile
+from unittest.mock import patch
 
 import onnx.numpy_helper
 import torch
@@ -740,3 +741,133 @@ class TestQuantSim:
         for idx in range(num_layers):
             assert onnx.numpy_helper.to_array(sim.model.graph().initializer[idx])[0][0] == idx
 
+
+    @pytest.mark.parametrize("config_file", [None, get_path_for_per_channel_config()])
+    def test_build_eval_session(self, config_file):
+        """
+        Given: Sim with computed encodings
+        When: Build eval session
+        Then: 1) Eval session doesn't contain QcQuantizeOps for parameters and 8-bit per-tensor activations
+              2) Eval session output should be equal to sim session output up to one quantization step
+        """
+        model = build_dummy_model()
+        with tempfile.TemporaryDirectory() as tempdir:
+            sim = QuantizationSimModel(model, use_cuda=False, config_file=config_file, path=tempdir)
+            in_tensor = {'input': np.random.rand(1, 3, 32, 32).astype(np.float32)}
+
+            with pytest.raises(RuntimeError):
+                sim.build_eval_session()
+
+            def callback(session, args):
+                session.run(None, in_tensor)
+
+            sim.compute_encodings(callback, None)
+            sim.qc_quantize_op_dict[sim.activation_names[1]].enabled = False
+
+            eval_model = sim._get_eval_model()
+            qc_quantize_nodes = [node for node in eval_model.graph.node if node.op_type == 'QcQuantizeOp']
+            assert not qc_quantize_nodes
+            num_enabled_act_quantizers = sum(sim.qc_quantize_op_dict[name].enabled
+                                             for name in sim.activation_names
+                                             if name not in sim.input_quantizers_name)
+            assert len([node for node in eval_model.graph.node if node.op_type == 'QuantizeLinear']) == \
+                   num_enabled_act_quantizers
+
+            eval_session = sim.build_eval_session()
+            expected = sim.session.run(None, in_tensor)
+            outputs = eval_session.run(None, in_tensor)
+
+            output_scale = sim.qc_quantize_op_dict[sim.activation_names[-1]].encodings[0].delta
+            for output, exp in zip(outputs, expected):
+                assert np.allclose(output, exp, atol=output_scale * 1.001)
+
+    @pytest.mark.parametrize("quant_scheme", [QuantScheme.post_training_tf, QuantScheme.post_training_tf_enhanced])
+    def test_compute_encodings_in_parallel(self, quant_scheme):
+        """
+        Given: Calibration data split into multiple shards
+        When: Compute encodings in parallel over the shards
+        Then: Encodings should be identical to the encodings computed serially over all shards
+        """
+        np.random.seed(0)
+        shards = [[np.random.randn(1, 3, 32, 32).astype(np.float32) * (i + 1) for i in range(j, j + 2)]
+                  for j in range(0, 8, 2)]
+
+        def callback(session, shard):
+            for batch in shard:
+                session.run(None, {'input': batch})
+
+        def serial_callback(session, shards):
+            for shard in shards:
+                callback(session, shard)
+
+        invoked_shards = []
+
+        def parallel_callback(session, shard):
+            invoked_shards.append(id(shard))
+            callback(session, shard)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            serial_sim = QuantizationSimModel(build_dummy_model(), quant_scheme=quant_scheme, use_cuda=False,
+                                              path=os.path.join(tempdir, 'serial'))
+            serial_sim.compute_encodings(serial_callback, shards)
+
+            parallel_sim = QuantizationSimModel(build_dummy_model(), quant_scheme=quant_scheme, use_cuda=False,
+                                                path=os.path.join(tempdir, 'parallel'))
+            with patch.object(ort.InferenceSession, 'run', autospec=True, side_effect=ort.InferenceSession.run) as run:
+                parallel_sim.compute_encodings_in_parallel(parallel_callback, shards, num_workers=3)
+
+            # The callback should be invoked once per shard, and each batch should be run exactly once
+            assert sorted(invoked_shards) == sorted(id(shard) for shard in shards)
+            assert run.call_count == sum(len(shard) for shard in shards)
+
+            for name, qc_op in serial_sim.qc_quantize_op_dict.items():
+                parallel_qc_op = parallel_sim.qc_quantize_op_dict[name]
+                assert parallel_qc_op.op_mode == OpMode.quantizeDequantize
+                for expected, actual in zip(qc_op.encodings, parallel_qc_op.encodings):
+                    assert actual.bw == expected.bw
+                    assert actual.offset == expected.offset
+                    assert np.isclose(actual.min, expected.min)
+                    assert np.isclose(actual.max, expected.max)
+
+            in_tensor = {'input': shards[0][0]}
+            assert np.allclose(serial_sim.session.run(None, in_tensor)[0],
+                               parallel_sim.session.run(None, in_tensor)[0])
+
+    def test_snapshot_restore(self):
+        """
+        Given: Sim with computed encodings and a snapshot of its quantizer state
+        When: Modify the quantizers and weights, and restore the snapshot
+        Then: The sim should produce the same output as at the time of the snapshot,
+              and only the quantizers modified since the snapshot should be restored
+        """
+        np.random.seed(0)
+        in_tensor = {'input': np.random.randn(1, 3, 32, 32).astype(np.float32)}
+
+        def callback(session, _):
+            session.run(None, in_tensor)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            sim = QuantizationSimModel(build_dummy_model(), use_cuda=False, path=tempdir)
+            sim.compute_encodings(callback, None)
+            expected_output = sim.session.run(None, in_tensor)[0]
+
+            snapshot = sim.snapshot(include_weights=True)
+            assert sim.restore(snapshot) == 0
+
+            param_name = next(name for name in sim.param_names if sim.qc_quantize_op_dict[name].enabled)
+            param_quantizer = sim.qc_quantize_op_dict[param_name]
+            param_quantizer.bitwidth = 4
+            sim.compute_encodings(callback, None)
+            initializer = next(init for init in sim.model.model.graph.initializer if init.name == param_name)
+            initializer.CopyFrom(onnx.numpy_helper.from_array(onnx.numpy_helper.to_array(initializer) * 2, param_name))
+            sim.session = QuantizationSimModel.build_session(sim.model.model, sim.providers)
+            assert not np.allclose(sim.session.run(None, in_tensor)[0], expected_output)
+
+            assert sim.restore(snapshot) > 0
+            assert param_quantizer.bitwidth == 8
+            assert np.array_equal(sim.session.run(None, in_tensor)[0], expected_output)
+
+            # Only the quantizers modified since the last restore are restored
+            param_quantizer.enabled = False
+            assert sim.restore(snapshot) == 1
+            assert param_quantizer.enabled
@@ -0,0 +1,179 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Tests for session factory """
+import gc
+import os
+import tempfile
+
+import numpy as np
+import onnx
+from onnxruntime import InferenceSession, SessionOptions
+
+from aimet_onnx.session_factory import SessionFactory, get_session_factory
+from aimet_onnx.utils import make_dummy_input, load_model_lazily
+
+from models import models_for_tests
+
+
+class TestSessionFactory:
+    """ Tests for SessionFactory """
+
+    def test_build_session(self):
+        """ Sessions built by the factory produce the same outputs as a plain onnxruntime session """
+        model = models_for_tests.build_dummy_model()
+        dummy_input = make_dummy_input(model)
+        expected = InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider']).run(None, dummy_input)
+
+        session = SessionFactory().build_session(model, ['CPUExecutionProvider'])
+        assert np.allclose(session.run(None, dummy_input)[0], expected[0])
+
+    def test_external_data_cache(self):
+        """ Large initializers are written once into the cache directory and reused across models """
+        model = models_for_tests.build_dummy_model()
+        original_model = onnx.ModelProto()
+        original_model.CopyFrom(model)
+        dummy_input = make_dummy_input(model)
+        expected = InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider']).run(None, dummy_input)
+
+        factory = SessionFactory()
+        model_path, _ = factory._write_to_cache(model)
+        cache_dir = factory.cache_dir
+        tensor_files = os.listdir(os.path.join(cache_dir, 'tensors'))
+        assert tensor_files
+        assert model == original_model
+
+        session = InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        assert np.allclose(session.run(None, dummy_input)[0], expected[0])
+
+        # Same model maps to the same files
+        mtime = os.path.getmtime(model_path)
+        assert factory._write_to_cache(model)[0] == model_path
+        assert os.path.getmtime(model_path) == mtime
+
+        # Changing one weight only adds a single weight file and a new model file
+        weight = next(init for init in model.graph.initializer if init.name == 'fc_w')
+        weight.CopyFrom(onnx.numpy_helper.from_array(onnx.numpy_helper.to_array(weight) * 2, weight.name))
+        assert factory._write_to_cache(model)[0] != model_path
+        assert len(os.listdir(os.path.join(cache_dir, 'tensors'))) == len(tensor_files) + 1
+
+        factory.cleanup()
+        assert not os.path.exists(cache_dir)
+
+    def test_external_initializers(self):
+        """ Large initializers can be passed to onnxruntime as OrtValues """
+        model = models_for_tests.build_dummy_model()
+        dummy_input = make_dummy_input(model)
+        expected = InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider']).run(None, dummy_input)
+
+        factory = SessionFactory(use_external_initializers=True)
+        model_bytes, names, values = factory._strip_to_ort_values(model)
+        assert names
+        assert len(model_bytes) < model.ByteSize()
+
+        sess_options = SessionOptions()
+        sess_options.add_external_initializers(names, [value.ort_value for value in values])
+        session = InferenceSession(model_bytes, sess_options=sess_options, providers=['CPUExecutionProvider'])
+        assert np.allclose(session.run(None, dummy_input)[0], expected[0])
+
+        # OrtValues of unchanged weights are reused
+        _, _, values_2 = factory._strip_to_ort_values(model)
+        assert all(v1 is v2 for v1, v2 in zip(values, values_2))
+
+        # OrtValues are released once no session refers to them anymore
+        del values, values_2, session, sess_options
+        gc.collect()
+        assert not factory._ort_values
+        factory.cleanup()
+
+    def test_lazily_loaded_model(self):
+        """ Models referring to external data files are served from the cache directory """
+        model = models_for_tests.build_dummy_model()
+        dummy_input = make_dummy_input(model)
+        expected = InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider']).run(None, dummy_input)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0, location='model.onnx.data')
+            lazy_model = load_model_lazily(os.path.join(tempdir, 'model.onnx'))
+
+            for use_external_initializers in (False, True):
+                factory = SessionFactory(use_external_initializers=use_external_initializers)
+                session = factory.build_session(lazy_model, ['CPUExecutionProvider'])
+                assert np.allclose(session.run(None, dummy_input)[0], expected[0])
+                assert bool(factory._ort_values) == use_external_initializers
+                del session
+                gc.collect()
+                assert not factory._ort_values
+                factory.cleanup()
+
+    def test_cache_size_limit(self):
+        """ Least recently used files are evicted once the cache exceeds its size limit """
+        model = models_for_tests.build_dummy_model()
+        dummy_input = make_dummy_input(model)
+        expected = InferenceSession(model.SerializeToString(), providers=['CPUExecutionProvider']).run(None, dummy_input)
+
+        factory = SessionFactory(max_cache_size=1)
+        model_path, cached_files = factory._write_to_cache(model)
+        factory._unpin_and_evict(cached_files)
+
+        # Files of the most recently built model are evicted once they are unpinned
+        assert not os.path.exists(model_path)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0, location='model.onnx.data')
+            lazy_model = load_model_lazily(os.path.join(tempdir, 'model.onnx'))
+            session = factory.build_session(lazy_model, ['CPUExecutionProvider'])
+            assert np.allclose(session.run(None, dummy_input)[0], expected[0])
+            assert not factory._cached_files
+            assert not factory._pinned_files
+        factory.cleanup()
+
+        factory = SessionFactory()
+        model_path, cached_files = factory._write_to_cache(model)
+        factory._unpin_and_evict(cached_files)
+        assert os.path.exists(model_path)
+        factory.cleanup()
+
+    def test_user_cache_dir(self):
+        """ Factories with a user provided directory are shared and do not delete the directory """
+        with tempfile.TemporaryDirectory() as tempdir:
+            factory = get_session_factory(tempdir)
+            assert get_session_factory(tempdir) is factory
+            factory._write_to_cache(models_for_tests.build_dummy_model())
+            factory.cleanup()
+            assert os.listdir(tempdir)
@@ -34,6 +34,10 @@
 #
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
+import os
+import tempfile
+
+import numpy as np
 import onnx
 import torch
 from packaging import version
@@ -199,3 +203,145 @@ class TestUtils:
         model = models_for_tests.transposed_conv_model_without_bn()
         model_data = ModelData(model.model)
         assert len(model_data.module_to_info) == 3
+
+    def test_get_consumed_tensor_names(self):
+        """ Test that tensors consumed only by nodes of subgraphs are found """
+        then_branch = onnx.helper.make_graph([onnx.helper.make_node('Add', ['x', 'then_bias'], ['then_out'])],
+                                             'then', [], [onnx.helper.make_tensor_value_info('then_out',
+                                                                                            onnx.TensorProto.FLOAT,
+                                                                                            [1])])
+        else_branch = onnx.helper.make_graph([onnx.helper.make_node('Identity', ['else_bias'], ['else_out'])],
+                                             'else', [], [onnx.helper.make_tensor_value_info('else_out',
+                                                                                            onnx.TensorProto.FLOAT,
+                                                                                            [1])])
+        graph = onnx.helper.make_graph(
+            [onnx.helper.make_node('Relu', ['input'], ['x']),
+             onnx.helper.make_node('If', ['cond'], ['output'], then_branch=then_branch, else_branch=else_branch)],
+            'graph', [], [])
+        assert utils.get_consumed_tensor_names(graph) == {'input', 'x', 'cond', 'then_bias', 'else_bias'}
+
+    def test_weight_store(self):
+        """ Test that parameters are modified in place and written back to the model on flush """
+        model = models_for_tests.build_dummy_model()
+        fc_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1))
+        weight_store = utils.WeightStore(model)
+
+        # Params are loaded on first access only
+        assert np.array_equal(weight_store.read_array('fc_w'), fc_w)
+        assert list(weight_store._arrays) == ['fc_w']
+
+        weight_store.get_array('fc_w')[...] *= 2
+        utils.transpose_array(weight_store.get_array('conv_w'), (1, 0, 2, 3))[0] = 0
+        weight_store.set_array('new_bias', np.ones(10, dtype=np.float32))
+
+        # Model is not modified before flush
+        assert np.array_equal(onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1)), fc_w)
+
+        weight_store.flush()
+        assert np.array_equal(onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1)),
+                              fc_w * 2)
+        conv_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[0], 1))
+        assert np.all(conv_w[:, 0] == 0)
+        new_bias = [init for init in model.graph.initializer if init.name == 'new_bias']
+        assert len(new_bias) == 1
+        assert np.array_equal(onnx.numpy_helper.to_array(new_bias[0]), np.ones(10))
+
+    def test_weight_store_external_data(self):
+        """ Test that parameters of a model loaded without its external data are read and written back inline """
+        model = models_for_tests.build_dummy_model()
+        fc_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1))
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0)
+            model = onnx.load_model(os.path.join(tempdir, 'model.onnx'), load_external_data=False)
+            weight_store = utils.WeightStore(model, base_dir=tempdir)
+            weight_store.get_array('fc_w')[...] *= 2
+            weight_store.flush()
+
+        fc_w_tensor = ParamUtils.get_param(model, model.graph.node[4], 1)
+        assert fc_w_tensor.data_location == onnx.TensorProto.DEFAULT
+        assert np.array_equal(onnx.numpy_helper.to_array(fc_w_tensor), fc_w * 2)
+
+    def test_load_model_lazily(self):
+        """ Test that external initializers of a lazily loaded model are memory-mapped and can be saved again """
+        model = models_for_tests.build_dummy_model()
+        fc_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1))
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0, location='model.onnx.data')
+            lazy_model = utils.load_model_lazily(os.path.join(tempdir, 'model.onnx'))
+            assert utils.has_external_data(lazy_model)
+
+            fc_w_tensor = ParamUtils.get_param(lazy_model, lazy_model.graph.node[4], 1)
+            assert fc_w_tensor.data_location == onnx.TensorProto.EXTERNAL
+            fc_w_array = utils.get_tensor_array(fc_w_tensor)
+            assert isinstance(fc_w_array, np.memmap)
+            assert np.array_equal(fc_w_array, fc_w)
+            assert np.array_equal(np.frombuffer(utils.get_weights('fc_w', lazy_model.graph), dtype=np.float32),
+                                  fc_w.reshape(-1))
+
+            os.makedirs(os.path.join(tempdir, 'export'))
+            utils.save_model_with_external_data(lazy_model, os.path.join(tempdir, 'export', 'model.onnx'))
+            # The lazily loaded model still refers to the original file
+            assert utils.get_tensor_array(fc_w_tensor).filename == os.path.join(tempdir, 'model.onnx.data')
+
+            exported_model = onnx.load_model(os.path.join(tempdir, 'export', 'model.onnx'))
+            for tensor, exported_tensor in zip(model.graph.initializer, exported_model.graph.initializer):
+                assert np.array_equal(onnx.numpy_helper.to_array(tensor),
+                                      onnx.numpy_helper.to_array(exported_tensor))
+
+    def test_weight_store_write_in_place(self):
+        """ Test that the weight store writes external params back into their files if requested """
+        model = models_for_tests.build_dummy_model()
+        fc_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1))
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0, location='model.onnx.data')
+            lazy_model = utils.load_model_lazily(os.path.join(tempdir, 'model.onnx'))
+            weight_store = utils.WeightStore(lazy_model, write_in_place=True)
+            weight_store.get_array('fc_w')[...] *= 2
+            weight_store.flush()
+
+            fc_w_tensor = ParamUtils.get_param(lazy_model, lazy_model.graph.node[4], 1)
+            assert fc_w_tensor.data_location == onnx.TensorProto.EXTERNAL
+            reloaded_model = onnx.load_model(os.path.join(tempdir, 'model.onnx'))
+            fc_w_reloaded = onnx.numpy_helper.to_array(ParamUtils.get_param(reloaded_model,
+                                                                            reloaded_model.graph.node[4], 1))
+            assert np.array_equal(fc_w_reloaded, fc_w * 2)
+
+            # Without write_in_place, the file is not changed and the param is stored in the model
+            weight_store = utils.WeightStore(lazy_model)
+            weight_store.get_array('fc_w')[...] *= 2
+            weight_store.flush()
+            assert fc_w_tensor.data_location == onnx.TensorProto.DEFAULT
+            assert np.array_equal(onnx.numpy_helper.to_array(fc_w_tensor), fc_w * 4)
+            reloaded_model = onnx.load_model(os.path.join(tempdir, 'model.onnx'))
+            fc_w_reloaded = onnx.numpy_helper.to_array(ParamUtils.get_param(reloaded_model,
+                                                                            reloaded_model.graph.node[4], 1))
+            assert np.array_equal(fc_w_reloaded, fc_w * 2)
+
+    def test_weight_store_external_data_path(self):
+        """ Test that the weight store appends modified external params to the given file """
+        model = models_for_tests.build_dummy_model()
+        fc_w = onnx.numpy_helper.to_array(ParamUtils.get_param(model, model.graph.node[4], 1))
+        with tempfile.TemporaryDirectory() as tempdir:
+            onnx.save_model(model, os.path.join(tempdir, 'model.onnx'), save_as_external_data=True,
+                            size_threshold=0, location='model.onnx.data')
+            lazy_model = utils.load_model_lazily(os.path.join(tempdir, 'model.onnx'))
+            external_data_path = os.path.join(tempdir, 'sim.data')
+            for scale in (2, 4):
+                weight_store = utils.WeightStore(lazy_model, external_data_path=external_data_path)
+                weight_store.get_array('fc_w')[...] *= 2
+                weight_store.flush()
+
+                fc_w_tensor = ParamUtils.get_param(lazy_model, lazy_model.graph.node[4], 1)
+                assert fc_w_tensor.data_location == onnx.TensorProto.EXTERNAL
+                location = {entry.key: entry.value for entry in fc_w_tensor.external_data}['location']
+                assert location == os.path.abspath(external_data_path)
+                assert np.array_equal(utils.get_tensor_array(fc_w_tensor), fc_w * scale)
+
+            # The original file is not changed
+            reloaded_model = onnx.load_model(os.path.join(tempdir, 'model.onnx'))
+            fc_w_reloaded = onnx.numpy_helper.to_array(ParamUtils.get_param(reloaded_model,
+                                                                            reloaded_model.graph.node[4], 1))
+            assert np.array_equal(fc_w_reloaded, fc_w)
@@ -39,7 +39,6 @@
 
 import os
 import json
-import shutil
 from typing import List, Tuple, Callable, Union, Dict
 import numpy as np
 from tqdm import tqdm
@@ -71,7 +70,6 @@ tf_op_type_to_onnx_type_dict = {
     }
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
-WORKING_DIR = '/tmp/adaround/'
 
 
 class AdaroundParameters:
@@ -134,9 +132,6 @@ class Adaround:
          at provided path
         """
         # pylint: disable=too-many-arguments
-        if not os.path.exists(WORKING_DIR):
-            os.makedirs(WORKING_DIR)
-
         param_encodings,\
         session_soft_rounded_weight = cls._apply_adaround_helper(session,
                                                                  starting_op_names,
@@ -149,10 +144,6 @@ class Adaround:
         # Export quantization encodings to JSON-formatted file at provided path
         cls.export_encoding_to_json(path, filename_prefix, param_encodings)
 
-        if os.path.exists(WORKING_DIR):
-            logger.info('Deleting temporary working directory %s', WORKING_DIR)
-            shutil.rmtree(WORKING_DIR)
-
         logger.info('Completed Adarounding Model')
 
         return session_soft_rounded_weight
@@ -189,8 +180,8 @@ class Adaround:
          TF session with soft rounding weights.
         """
         # Create copies which will have model's weights quantized with hard and soft rounding.
-        session_hard_rounded_weight = graph_saver.save_and_load_graph(WORKING_DIR, session)
-        session_soft_rounded_weight = graph_saver.save_and_load_graph(WORKING_DIR, session)
+        session_hard_rounded_weight = graph_saver.clone_session(session)
+        session_soft_rounded_weight = graph_saver.clone_session(session)
 
         # Get parameters from config file.
         configs, strict_symmetric, unsigned_symmetric, enable_per_channel = Adaround.get_config_dict_keys(config_file)
@@ -53,7 +53,7 @@ from aimet_tensorflow.common.operation import OpWithMetaInfoType, Op
 from aimet_tensorflow.quantsim import QuantizationSimModel
 from aimet_tensorflow.utils.op.conv import WeightTensorUtils, BiasUtils
 from aimet_tensorflow.utils.op.fusedbatchnorm import BNUtils
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 from aimet_tensorflow.utils.op.conv import get_weight_tensor_with_shape
 from aimet_tensorflow.utils.common import get_ordered_conv_linears, get_ordered_ops
 from aimet_tensorflow.quantizer_info import QuantizerInfo
@@ -271,7 +271,7 @@ def _fold_given_auto_selected_batch_norms(sess: tf.compat.v1.Session, layer_pair
             BiasUtils.update_bias_for_op(sess, conv_linear, numpy_bias_reshaped)
 
         # we edited the graph, so we should load and save for the metagraph associated with the session to be updated
-        after_bn_fold_sess = save_and_load_graph('./temp_bn_fold', sess)
+        after_bn_fold_sess = clone_session(sess)
 
     return after_bn_fold_sess
 
@@ -316,7 +316,7 @@ def fold_given_batch_norms(sess: tf.compat.v1.Session, input_op_names: Union[str
     new_sess = _fold_given_auto_selected_batch_norms(sess, layer_pairs_internal_format)
 
     # save and load graph
-    after_fold_sess = save_and_load_graph('./temp_graph', new_sess)
+    after_fold_sess = clone_session(new_sess)
 
     return after_fold_sess
 
@@ -365,7 +365,7 @@ def fold_all_batch_norms(sess: tf.compat.v1.Session, input_op_names: Union[str,
         logger.info("%d BatchNorms' weights got converted", len(bn_converted))
 
         # we edited the graph, so we should load and save for the metagraph associated with the session to be updated
-        after_fold_sess = save_and_load_graph('./temp_bn_fold', after_fold_sess)
+        after_fold_sess = clone_session(after_fold_sess)
 
     return after_fold_sess, pairs_to_return
 
@@ -481,7 +481,7 @@ def _fold_given_auto_selected_batch_norms_scale(sim: QuantizationSimModel, layer
             _delete_bn_from_model(sess, bn, is_bias_valid)
 
     # we edited the graph, so we should load and save for the metagraph associated with the session to be updated
-    updated_sess = save_and_load_graph('./temp_bn_fold_to_scale', sess)
+    updated_sess = clone_session(sess)
     sim.session = updated_sess
 
 
@@ -50,7 +50,7 @@ from aimet_common.bias_correction import ConvBnPatternHandler
 from aimet_common.graph_pattern_matcher import PatternType
 
 from aimet_tensorflow.quantsim import QuantizationSimModel
-from aimet_tensorflow.utils.graph_saver import save_model_to_meta, save_and_load_graph, load_model_from_meta
+from aimet_tensorflow.utils.graph_saver import save_model_to_meta, clone_session, load_model_from_meta
 from aimet_tensorflow.utils.common import create_input_feed_dict, iter_first_x, get_ordered_conv_linears
 from aimet_tensorflow.utils.op.fusedbatchnorm import BNUtils
 from aimet_tensorflow.utils.op.conv import get_weight_tensor_with_shape, BiasUtils
@@ -515,7 +515,7 @@ class BiasCorrection:
                                                                bias_correct_params.output_op_names)
 
         # Create a copy of the model as reference model
-        corrected_model = save_and_load_graph('./temp_meta_path', reference_model)
+        corrected_model = clone_session(reference_model)
 
         # get all ordered convs/ linears and skip gradient ops
         ordered_conv_linears = get_ordered_conv_linears(reference_model.graph, bias_correct_params.input_op_names,
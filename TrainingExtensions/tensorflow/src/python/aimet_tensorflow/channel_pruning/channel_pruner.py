@@ -51,7 +51,7 @@ from aimet_common.channel_pruner import select_channels_to_prune
 from aimet_common.cost_calculator import CostCalculator, Cost
 from aimet_common.winnow.winnow_utils import update_winnowed_channels
 
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 from aimet_tensorflow.utils.common import is_op_compressible, get_ordered_ops
 from aimet_tensorflow.layer_database import Layer, LayerDatabase
 from aimet_tensorflow.utils.op.conv import WeightTensorUtils
@@ -272,7 +272,7 @@ class InputChannelPruner(Pruner):
         # winnow_tf_model, and all other newly winnowed ops are not.
         with current_sess.graph.as_default():
             initialize_uninitialized_vars(current_sess)
-        current_sess = save_and_load_graph('./saver', current_sess)
+        current_sess = clone_session(current_sess)
         comp_layer_db.update_database(current_sess, detached_op_names, update_model=True)
 
         # Perform reconstruction
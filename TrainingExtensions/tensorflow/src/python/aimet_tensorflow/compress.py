@@ -43,7 +43,7 @@ import tensorflow as tf
 from aimet_common.defs import CostMetric, CompressionScheme, EvalFunction, CompressionStats
 from aimet_common.bokeh_plots import BokehServerSession
 
-from aimet_tensorflow.utils.graph_saver import wrapper_func, save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import wrapper_func, clone_session
 from aimet_tensorflow.defs import SpatialSvdParameters, ChannelPruningParameters
 from aimet_tensorflow.compression_factory import CompressionFactory
 
@@ -109,7 +109,7 @@ class ModelCompressor:
 
         # TODO: this is a temporary fix, needs to be resolved
         # In TF after making changes to the graph you must save and reload, then evaluate
-        updated_model = save_and_load_graph('./saver', compressed_layer_db.model)
+        updated_model = clone_session(compressed_layer_db.model)
         compressed_layer_db.model.close()
 
         return updated_model, stats
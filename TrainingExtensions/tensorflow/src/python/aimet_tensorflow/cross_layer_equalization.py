@@ -47,7 +47,7 @@ import aimet_common.libpymo as libpymo
 from aimet_tensorflow.common.connectedgraph import ConnectedGraph
 from aimet_tensorflow.common.operation import Op
 from aimet_tensorflow.batch_norm_fold import fold_all_batch_norms
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 from aimet_tensorflow.utils.op.conv import WeightTensorUtils, BiasUtils
 import aimet_tensorflow.utils.op.relu as ReluUtils
 from aimet_tensorflow.utils.op.fusedbatchnorm import BNUtils
@@ -90,7 +90,7 @@ class GraphSearchUtils:
                 ReluUtils.replace_relu6_with_relu(sess, op.get_module())
 
         # in the end update the session
-        after_relu_replace_sess = save_and_load_graph('./replace_relu6_with_relu', sess)
+        after_relu_replace_sess = clone_session(sess)
 
         return after_relu_replace_sess
 
@@ -667,7 +667,7 @@ class CrossLayerScaling:
                                                                        is_relu_activation_in_cls_sets)
 
         # save and load the updated graph after scaling
-        after_cls_sess = save_and_load_graph('./temp_cls', sess)
+        after_cls_sess = clone_session(sess)
 
         return after_cls_sess, cls_set_info_list
 
@@ -813,7 +813,7 @@ class HighBiasFold:
                         logger.info("skipping layer: {%s}", cls_pair_info.layer1.name)
 
         # save and load the updated graph after high bias fold update
-        aftr_hbf_sess = save_and_load_graph('./temp_hbf', sess)
+        aftr_hbf_sess = clone_session(sess)
 
         return aftr_hbf_sess
 
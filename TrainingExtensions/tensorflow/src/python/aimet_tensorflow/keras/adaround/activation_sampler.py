@@ -35,8 +35,84 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 """ Sample input activation to quantized op and output activation from original op for Adaround feature """
+import os
+import shutil
+import tempfile
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
 import tensorflow as tf
 
+
+class ActivationCache:
+    """
+    Per-layer cache of sampled activation data. Batches are appended to one file per key as they are sampled, so that
+    the activations of many layers can be collected in a single pass over the dataset without holding all of them in
+    memory. Cached data is read back as a memory-mapped array.
+    """
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        :param cache_dir: Directory to store the activation files in. If None, a temporary directory is used which is
+         removed by cleanup()
+        """
+        self._is_managed = cache_dir is None
+        self._cache_dir = tempfile.mkdtemp(prefix='aimet_adaround_') if cache_dir is None else cache_dir
+        os.makedirs(self._cache_dir, exist_ok=True)
+        # key -> (file path, dtype, shape of one sample, number of samples)
+        self._entries: Dict[Hashable, Tuple[str, np.dtype, Tuple, int]] = {}
+
+    def append(self, key: Hashable, data: np.ndarray):
+        """
+        Append a batch of activation data to the data cached under key
+
+        :param key: Key of the activation
+        :param data: Batch of activation data
+        """
+        data = np.ascontiguousarray(data)
+        if key not in self._entries:
+            path = os.path.join(self._cache_dir, f'activation_{len(self._entries)}.bin')
+            open(path, 'wb').close()
+            self._entries[key] = (path, data.dtype, data.shape[1:], 0)
+        path, dtype, sample_shape, num_samples = self._entries[key]
+        assert data.dtype == dtype and data.shape[1:] == sample_shape, \
+            f'Batch of shape {data.shape} and type {data.dtype} does not match cached activation of {key}'
+        with open(path, 'ab') as f:
+            f.write(data.tobytes())
+        self._entries[key] = (path, dtype, sample_shape, num_samples + data.shape[0])
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> np.ndarray:
+        """
+        Return all activation data cached under key
+
+        :param key: Key of the activation
+        :return: Read-only array of shape (number of samples, *sample shape)
+        """
+        path, dtype, sample_shape, num_samples = self._entries[key]
+        if num_samples == 0:
+            return np.empty((0, *sample_shape), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(num_samples, *sample_shape))
+
+    def remove(self, key: Hashable):
+        """
+        Remove the activation data cached under key
+
+        :param key: Key of the activation
+        """
+        path, *_ = self._entries.pop(key)
+        os.remove(path)
+
+    def cleanup(self):
+        """
+        Remove all cached activation data
+        """
+        for key in list(self._entries):
+            self.remove(key)
+        if self._is_managed:
+            shutil.rmtree(self._cache_dir, ignore_errors=True)
+
 class ActivationSampler:
     """
     Collect op's output activation data from unquantized model and input activation data from quantized model with
@@ -67,3 +143,43 @@ class ActivationSampler:
         quant_input_data = temp_quant_model.predict(self._data_set, steps=self._num_batches)
         orig_output_data = temp_orig_model.predict(self._data_set, steps=self._num_batches)
         return quant_input_data, orig_output_data
+
+    def sample_layer_outputs(self, layers: List[tf.keras.layers.Layer], model: tf.keras.Model, cache: ActivationCache,
+                             keys: Optional[List[Hashable]] = None):
+        """
+        Using dataloader data, obtain the outputs of all given layers in a single pass and store them in cache.
+        :param layers: Layers to obtain output data for
+        :param model: Model containing the layers
+        :param cache: Cache to store the output data in
+        :param keys: Cache key of each layer. Defaults to the layers
+        """
+        self._sample_tensors([layer.output for layer in layers], model, cache, keys or layers)
+
+    def sample_layer_inputs(self, layers: List[tf.keras.layers.Layer], model: tf.keras.Model, cache: ActivationCache,
+                            keys: Optional[List[Hashable]] = None):
+        """
+        Using dataloader data, obtain the inputs of all given layers in a single pass and store them in cache.
+        :param layers: Layers to obtain input data for
+        :param model: Model containing the layers
+        :param cache: Cache to store the input data in
+        :param keys: Cache key of each layer. Defaults to the layers
+        """
+        self._sample_tensors([layer.input for layer in layers], model, cache, keys or layers)
+
+    def _sample_tensors(self, tensors: List[tf.Tensor], model: tf.keras.Model, cache: ActivationCache,
+                        keys: List[Hashable]):
+        """
+        Build one model which outputs all given tensors and stream its outputs for every batch into cache.
+        :param tensors: Keras tensors of the model to sample
+        :param model: Model containing the tensors
+        :param cache: Cache to store the sampled data in
+        :param keys: Cache key of each tensor
+        """
+        multi_output_model = tf.keras.Model(inputs=model.inputs, outputs=tensors)
+        for batch in self._data_set.take(self._num_batches):
+            model_inputs, _, _ = tf.keras.utils.unpack_x_y_sample_weight(batch)
+            outputs = multi_output_model.predict_on_batch(model_inputs)
+            if not isinstance(outputs, (list, tuple)):
+                outputs = [outputs]
+            for key, output in zip(keys, outputs):
+                cache.append(key, output)
@@ -36,7 +36,7 @@
 # =============================================================================
 
 """ Top level API for Adaptive Rounding - Post-Training Quantization (PTQ) """
-from typing import Dict, List, Union, Iterable
+from typing import Dict, List, Set, Union, Iterable
 import tensorflow as tf
 from tensorflow.keras.utils import Progbar
 
@@ -47,7 +47,7 @@ from aimet_common.defs import QuantScheme
 from aimet_tensorflow.adaround.adaround_weight import AdaroundParameters
 from aimet_tensorflow.adaround.adaround_weight import Adaround as TfAdaround
 from aimet_tensorflow.adaround.adaround_loss import AdaroundHyperParameters
-from aimet_tensorflow.keras.adaround.activation_sampler import ActivationSampler
+from aimet_tensorflow.keras.adaround.activation_sampler import ActivationSampler, ActivationCache
 from aimet_tensorflow.keras.adaround.adaround_wrapper import AdaroundWrapper
 from aimet_tensorflow.keras.adaround.adaround_optimizer import AdaroundOptimizer
 from aimet_tensorflow.keras.connectedgraph import ConnectedGraph, map_keras_types_to_onnx
@@ -104,15 +104,31 @@ class Adaround:
         module_act_func_pair = cls._get_module_act_func_pair(model)
         param_encodings = {}
 
-        progbar = Progbar(len(ordered_layer_indices))
-        for idx in ordered_layer_indices:
-            use_symmetric_encodings = TfAdaround.get_is_symmetric_flag_for_op_param(configs, model.layers[idx],
-                                                                                    param_name='weight',
-                                                                                    framework_to_onnx_type_dict=map_keras_types_to_onnx)
-            cls.adaround_layer(act_sampler, use_symmetric_encodings, strict_symmetric, unsigned_symmetric,
-                               default_param_bw, default_quant_scheme, model, hard_rounded_model, soft_rounded_model,
-                               idx, module_act_func_pair, opt_params, param_encodings, per_channel_enabled)
-            progbar.add(1)
+        # Outputs of the original model do not change, so they are sampled for all layers in one pass. Inputs of the
+        # hard rounded model are sampled in one pass for all layers which do not depend on a layer still to be rounded
+        activation_cache = ActivationCache()
+        try:
+            act_sampler.sample_layer_outputs([model.layers[idx] for idx in ordered_layer_indices], model,
+                                             activation_cache, keys=[('out', idx) for idx in ordered_layer_indices])
+
+            progbar = Progbar(len(ordered_layer_indices))
+            for stage in cls._get_adaround_stages(model, ordered_layer_indices):
+                act_sampler.sample_layer_inputs([hard_rounded_model.layers[idx] for idx in stage], hard_rounded_model,
+                                                activation_cache, keys=[('inp', idx) for idx in stage])
+                for idx in stage:
+                    use_symmetric_encodings = TfAdaround.get_is_symmetric_flag_for_op_param(configs, model.layers[idx],
+                                                                                            param_name='weight',
+                                                                                            framework_to_onnx_type_dict=map_keras_types_to_onnx)
+                    cls.adaround_layer(activation_cache.get(('inp', idx)), activation_cache.get(('out', idx)),
+                                       use_symmetric_encodings, strict_symmetric, unsigned_symmetric,
+                                       default_param_bw, default_quant_scheme, model, hard_rounded_model,
+                                       soft_rounded_model, idx, module_act_func_pair, opt_params, param_encodings,
+                                       per_channel_enabled)
+                    activation_cache.remove(('inp', idx))
+                    activation_cache.remove(('out', idx))
+                    progbar.add(1)
+        finally:
+            activation_cache.cleanup()
 
         # Export quantization encodings to JSON-formatted file at provided path
         TfAdaround.export_encoding_to_json(path, filename_prefix, param_encodings)
@@ -121,12 +137,13 @@ class Adaround:
     # pylint: disable=too-many-locals
     # pylint: disable=too-many-arguments
     @classmethod
-    def adaround_layer(cls, act_sampler, is_symmetric, strict_symmetric, unsigned_symmetric, default_param_bw,
-                       default_quant_scheme, orig_model, hard_rounded_model, soft_rounded_model, idx,
+    def adaround_layer(cls, all_inp_data, all_out_data, is_symmetric, strict_symmetric, unsigned_symmetric,
+                       default_param_bw, default_quant_scheme, orig_model, hard_rounded_model, soft_rounded_model, idx,
                        module_act_func_pair, opt_params, param_encodings, per_channel_enabled):
         """
         Perform adaround on a specific layer.
-        :param act_sampler: Activation sampler
+        :param all_inp_data: Input data of the layer in the hard rounded model
+        :param all_out_data: Output data of the layer in the original model
         :param is_symmetric: True if symmetric encodings is used, else asymmetric encodings
         :param strict_symmetric: Taken from config file, False by default
         :param unsigned_symmetric: Taken from config file, True by default
@@ -142,10 +159,6 @@ class Adaround:
         :param param_encodings: Dictionary holding parameter encodings information
         :param per_channel_enabled: Flag for per channel quantization
         """
-        # Collect input and output activations data
-        all_inp_data, all_out_data = act_sampler.sample_activation(orig_model.layers[idx], orig_model,
-                                                                   hard_rounded_model.layers[idx],
-                                                                   hard_rounded_model)
         # Get module's next following activation function
         act_func = module_act_func_pair[orig_model.layers[idx]]
 
@@ -227,6 +240,36 @@ class Adaround:
                                        'bitwidth': enc.bw,
                                        'is_symmetric': str(is_symmetric)} for enc in encoding]
 
+    @staticmethod
+    def _get_adaround_stages(model: tf.keras.Model, ordered_layer_indices: List[int]) -> List[List[int]]:
+        """
+        Group Adaround layers into stages such that the input of every layer only depends on Adaround layers of
+        earlier stages. The inputs of all layers of a stage can then be sampled together.
+        :param model: Model to adaround
+        :param ordered_layer_indices: Indices of the Adaround layers in the order to round them
+        :return: List of stages, each holding layer indices in the given order
+        """
+        adaround_layers = {id(model.layers[idx]): idx for idx in ordered_layer_indices}
+        # Layers are in topological order, so the ancestors of all inbound layers are known when visiting a layer
+        ancestors: Dict[int, Set[int]] = {}
+        for layer in model.layers:
+            layer_ancestors = set()
+            for node in layer.inbound_nodes:
+                for inbound_layer in tf.nest.flatten(node.inbound_layers):
+                    layer_ancestors.update(ancestors.get(id(inbound_layer), ()))
+                    if id(inbound_layer) in adaround_layers:
+                        layer_ancestors.add(adaround_layers[id(inbound_layer)])
+            ancestors[id(layer)] = layer_ancestors
+
+        stage_of_layer = {}
+        for idx in ordered_layer_indices:
+            stage_of_layer[idx] = 1 + max((stage_of_layer.get(ancestor, -1)
+                                           for ancestor in ancestors[id(model.layers[idx])]), default=-1)
+        stages = [[] for _ in range(max(stage_of_layer.values(), default=-1) + 1)]
+        for idx in ordered_layer_indices:
+            stages[stage_of_layer[idx]].append(idx)
+        return stages
+
     @staticmethod
     def _get_ordered_adaround_layer_indices(model: tf.keras.Model) -> List[int]:
         """
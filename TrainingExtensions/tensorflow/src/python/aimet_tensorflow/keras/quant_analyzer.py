@@ -37,7 +37,7 @@
 """Quant Analyzer"""
 import os
 from collections import OrderedDict, defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 
 import tensorflow as tf
 
@@ -55,6 +55,9 @@ from aimet_tensorflow.keras.utils.quantizer_utils import get_enabled_activation_
 
 _logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
 
+# Maximum number of layers whose output activations are tapped at a time when computing per layer MSE loss
+DEFAULT_MAX_OUTPUTS_PER_RUN = 32
+
 
 def _sort_quant_wrappers_based_on_occurrence(sim: QuantizationSimModel) -> Dict[str, QcQuantizeWrapper]:
     """
@@ -99,21 +102,20 @@ def _get_enabled_quantizers(sorted_quant_wrappers: Dict[str, QcQuantizeWrapper])
     return enabled_quant_wrappers
 
 
-def _get_output_of_intermediate_layer(model: tf.keras.Model,
-                                      input_tensor: tf.Tensor,
-                                      layer_index: int) -> tf.Tensor:
+def _get_outputs_of_intermediate_layers_model(model: tf.keras.Model,
+                                              layer_indices: List[int]) -> Tuple[tf.keras.Model, List[int]]:
     """
-    Return output tensor from model extracted up to target intermediate layer
+    Return model extracted from given model which outputs the output tensors of all the target intermediate layers
 
     :param model: tf.keras.Model
-    :param input_tensor: Input tensor to feed
-    :param layer_index: Index of layer
-    :return: Output tensor from intermediate layer
+    :param layer_indices: Indices of layers
+    :return: Tuple of model whose outputs are the flattened outputs of the intermediate layers, in the order of
+        layer_indices, and the number of outputs of each layer
     """
-    layer_output = model.get_layer(index=layer_index).output
-    extracted_model = tf.keras.Model(inputs=model.inputs, outputs=layer_output)
-
-    return extracted_model(input_tensor)
+    layer_outputs = [tf.nest.flatten(model.get_layer(index=layer_index).output) for layer_index in layer_indices]
+    extracted_model = tf.keras.Model(inputs=model.inputs,
+                                     outputs=[output for outputs in layer_outputs for output in outputs])
+    return extracted_model, [len(outputs) for outputs in layer_outputs]
 
 
 class QuantAnalyzer:
@@ -546,7 +548,8 @@ class QuantAnalyzer:
 
     def export_per_layer_mse_loss(self,
                                   sim: QuantizationSimModel,
-                                  results_dir: str) -> Dict[str, float]:
+                                  results_dir: str,
+                                  max_outputs_per_run: Optional[int] = DEFAULT_MAX_OUTPUTS_PER_RUN) -> Dict[str, float]:
         """
         NOTE: Need to pass same model input data through both fp32 and quantsim model to
         tap output activations of each layer.
@@ -554,20 +557,31 @@ class QuantAnalyzer:
         Export MSE loss between fp32 and quantized output activations for each layer.
         :param sim: Quantsim model.
         :param results_dir: Directory to save the results.
+        :param max_outputs_per_run: Maximum number of layers whose output activations are tapped at a time per model.
+            Layers are processed in groups of at most this many, each group taking one pass over the data.
+            If None, all the layers are processed in a single pass.
         :return layer wise MSE loss. dict[layer_name] = MSE loss.
         """
+        if max_outputs_per_run is not None and max_outputs_per_run < 1:
+            raise ValueError(f'max_outputs_per_run must be positive, got {max_outputs_per_run}')
+
         results_dir = os.path.abspath(results_dir)
         os.makedirs(results_dir, exist_ok=True)
 
+        layer_indices = OrderedDict()
+        for index, layer in enumerate(self._model.layers):
+            if isinstance(layer, tf.keras.layers.InputLayer) or \
+                    GraphSearchUtils.is_folded_batch_normalization(layer):
+                continue
+            layer_indices[layer.name] = index
+
+        layer_names = list(layer_indices)
+        group_size = max_outputs_per_run or max(len(layer_names), 1)
         mse_loss_dict = {}
         with Spinner("Calculating per-layer MSE loss"):
-            for index, layer in enumerate(self._model.layers):
-                if isinstance(layer, tf.keras.layers.InputLayer) or \
-                        GraphSearchUtils.is_folded_batch_normalization(layer):
-                    continue
-
-                loss = self._compute_mse_loss(sim, index)
-                mse_loss_dict[layer.name] = loss
+            for idx in range(0, len(layer_names), group_size):
+                group = OrderedDict((name, layer_indices[name]) for name in layer_names[idx:idx + group_size])
+                mse_loss_dict.update(self._compute_per_layer_mse_loss(sim, group))
 
         export_per_layer_mse_plot(mse_loss_dict,
                                   results_dir,
@@ -576,28 +590,50 @@ class QuantAnalyzer:
         _logger.info("Exported per layer MSE loss plot.")
         return mse_loss_dict
 
-    def _compute_mse_loss(self,
-                          sim: QuantizationSimModel,
-                          index: int) -> float:
+    def _compute_per_layer_mse_loss(self,
+                                    sim: QuantizationSimModel,
+                                    layer_indices: Dict[str, int]) -> Dict[str, float]:
         """
-        Compute MSE loss between fp32 and quantized output activations for each batch, add for
-        all the batches and return averaged mse loss.
+        Compute MSE loss between fp32 and quantized output activations of all the layers for each batch, add for
+        all the batches and return averaged mse loss per layer.
+
+        Output activations of all the given layers are tapped by a single multi-output model, so that each batch needs
+        only one forward pass through the fp32 model and one through the quantsim model. The loss of a layer with
+        multiple outputs is averaged over its outputs.
 
         :param sim: Quantsim model.
-        :param index: Index of layer
-        :return: MSE loss between fp32 and quantized output activations.
+        :param layer_indices: Ordered dict of layer name to index of layer
+        :return: layer wise MSE loss. dict[layer_name] = MSE loss.
         """
-        loss = 0.0
+        if not layer_indices:
+            return {}
+
+        indices = list(layer_indices.values())
+        fp32_model, num_outputs = _get_outputs_of_intermediate_layers_model(self._model, indices)
+        quantized_model, _ = _get_outputs_of_intermediate_layers_model(sim.model, indices)
+
+        # Outputs of each layer occupy a contiguous range of the flattened model outputs
+        output_ranges = []
+        start = 0
+        for layer_num_outputs in num_outputs:
+            output_ranges.append((start, start + layer_num_outputs))
+            start += layer_num_outputs
+
+        loss = [0.0] * len(indices)
         total = 0
         mse = tf.keras.losses.MeanSquaredError()
         for tensor in self._unlabeled_dataset.take(self._num_batches):
-            quantized_output = _get_output_of_intermediate_layer(sim.model, tensor, index)
-            fp32_output = _get_output_of_intermediate_layer(self._model, tensor, index)
-
-            loss += mse(quantized_output, fp32_output).numpy()
+            # Single output model returns output tensor of the layer as is
+            quantized_outputs = tf.nest.flatten(quantized_model(tensor))
+            fp32_outputs = tf.nest.flatten(fp32_model(tensor))
+
+            for i, (start, end) in enumerate(output_ranges):
+                layer_loss = sum(mse(quantized_output, fp32_output).numpy() for quantized_output, fp32_output
+                                 in zip(quantized_outputs[start:end], fp32_outputs[start:end]))
+                loss[i] += layer_loss / (end - start)
             total += tensor.shape[0]
 
-        return loss / total
+        return {layer_name: loss[i] / total for i, layer_name in enumerate(layer_indices)}
 
     def enable_per_layer_mse_loss(self, unlabeled_dataset: tf.data.Dataset, num_batches: int) -> None:
         """
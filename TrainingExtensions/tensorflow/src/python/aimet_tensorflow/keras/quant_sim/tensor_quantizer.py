@@ -136,6 +136,10 @@ class TensorQuantizer(tf.keras.layers.Layer, abc.ABC):
         # - Tensor quantizer cannot be disabled.
         self._is_encoding_frozen = False
 
+        # Callback which receives the [min, max] of the quantized tensor, computed in the graph, in place of updating
+        # the statistics through the quantize op. Only set while tracing a compiled calibration step.
+        self._min_max_collector = None
+
     @property
     def original_layer(self):
         """ Original layer wrapped by quantizer """
@@ -252,6 +256,12 @@ class TensorQuantizer(tf.keras.layers.Layer, abc.ABC):
         """
         if self.quant_mode == libpymo.TensorQuantizerOpMode.passThrough.value:
             return tensor
+        if self._min_max_collector is not None and \
+                self.quant_mode == libpymo.TensorQuantizerOpMode.updateStats.value:
+            # updateStats passes the tensor through unchanged
+            float_tensor = tf.cast(tensor, tf.float32)
+            self._min_max_collector(tf.stack([tf.reduce_min(float_tensor), tf.reduce_max(float_tensor)]))
+            return tensor
         return self._call_handler(tensor)
 
     def set_quantizer_encodings(self, bitwidth: int, is_symmetric: bool, encoding: libpymo.TfEncoding,
@@ -40,8 +40,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 import json
 import os
-from typing import Union, Dict, Tuple, Optional, List
+from typing import Union, Dict, Tuple, Optional, List, Iterable
 
+import numpy as np
 import tensorflow as tf
 from aimet_common import libpymo
 
@@ -465,6 +466,80 @@ class QuantizationSimModel(tf.keras.Model):
                          'If this is not desired, amend the forward pass to evaluate tensors which require these ops '
                          'to be evaluated, and recompute encodings.')
 
+    def compute_encodings_compiled(self, dataset: Iterable, jit_compile: bool = False):
+        """
+        Computes encodings for all quantization sim nodes in the model, like compute_encodings(), but runs the forward
+        pass of each calibration batch as one tf.function instead of eagerly.
+
+        Activation quantizers using the tf quant scheme reduce their statistics to [min, max] in the graph, and the
+        statistics of all these quantizers are pulled to the host together, once per batch. This is what makes
+        calibration fast, so the speedup is limited to the tf quant scheme. Quantizers using other quant schemes,
+        including the default tf_enhanced scheme, still update their histograms through the quantize ops on the host,
+        and a warning is logged if there are any.
+        :param dataset: Iterable of calibration batches, e.g. a batched tf.data.Dataset. Each element is either the
+               model input or an (input, target[, sample_weight]) tuple.
+        :param jit_compile: If True, compile the forward pass with XLA. The quantize ops have no XLA kernels, so this
+               requires that no quantize op is executed during calibration, i.e. all enabled activation quantizers use
+               the tf quant scheme and all parameter quantizers are disabled.
+        """
+        self.compute_encodings(self._compiled_calibration_forward_pass, (dataset, jit_compile))
+
+    def _compiled_calibration_forward_pass(self, model: tf.keras.Model, args: Tuple[Iterable, bool]):
+        """
+        Forward pass callback of compute_encodings_compiled()
+        :param model: Model to run calibration batches through
+        :param args: Calibration batches and whether to compile with XLA
+        """
+        # pylint: disable=protected-access
+        dataset, jit_compile = args
+        min_max_quantizers = [
+            quantizer for quant_wrapper in self.quant_wrappers()
+            for quantizer in list(quant_wrapper.input_quantizers) + list(quant_wrapper.output_quantizers)
+            if quantizer.quant_mode == int(libpymo.TensorQuantizerOpMode.updateStats) and
+            quantizer.quant_scheme in (QuantScheme.post_training_tf, QuantScheme.training_range_learning_with_tf_init)
+            and quantizer.data_type == QuantizationDataType.int
+        ]
+        collected_min_max = [[] for _ in min_max_quantizers]
+        num_histogram_quantizers = sum(
+            quantizer.quant_mode == int(libpymo.TensorQuantizerOpMode.updateStats)
+            for quant_wrapper in self.quant_wrappers()
+            for quantizer in list(quant_wrapper.input_quantizers) + list(quant_wrapper.output_quantizers)
+        ) - len(min_max_quantizers)
+        if num_histogram_quantizers:
+            _logger.warning('%d activation quantizers collect statistics with a quant scheme other than tf. Their '
+                            'statistics are updated by the quantize ops on the host, which limits the speedup of '
+                            'compute_encodings_compiled(). Use the tf quant scheme for the fastest calibration.',
+                            num_histogram_quantizers)
+
+        def calibration_step(inputs):
+            for quantizer, records in zip(min_max_quantizers, collected_min_max):
+                records.clear()
+                quantizer._min_max_collector = records.append
+            try:
+                model(inputs, training=False)
+            finally:
+                for quantizer in min_max_quantizers:
+                    quantizer._min_max_collector = None
+
+            # A quantizer can be evaluated several times per batch, or not at all, which is marked by min > max
+            min_max = [tf.zeros((0, 2))]
+            for records in collected_min_max:
+                if records:
+                    records = tf.stack(records)
+                    min_max.append(tf.stack([[tf.reduce_min(records[:, 0]), tf.reduce_max(records[:, 1])]]))
+                else:
+                    min_max.append(tf.constant([[np.inf, -np.inf]], dtype=tf.float32))
+            return tf.concat(min_max, axis=0)
+
+        compiled_calibration_step = tf.function(calibration_step, jit_compile=jit_compile)
+        for batch in dataset:
+            inputs, _, _ = tf.keras.utils.unpack_x_y_sample_weight(batch)
+            # Single device to host copy of the statistics of all quantizers
+            min_max = compiled_calibration_step(inputs).numpy()
+            for quantizer, (tensor_min, tensor_max) in zip(min_max_quantizers, min_max):
+                if tensor_min <= tensor_max:
+                    quantizer.tensor_quantizer.updateStats(np.array([tensor_min, tensor_max], dtype=np.float32), False)
+
     def _set_op_mode_parameters(self, op_mode: libpymo.TensorQuantizerOpMode):
         """
         Sets quant mode for parameters and if the encodings are invalid, then adds those wrappers
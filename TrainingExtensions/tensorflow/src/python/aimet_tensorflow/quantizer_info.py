@@ -37,9 +37,10 @@
 
 """ Qunatizer Info """
 
+import contextlib
 import io
 from enum import Enum
-from typing import Union, List
+from typing import Dict, Iterable, Iterator, Tuple, Union, List
 
 import tensorflow as tf
 import numpy as np
@@ -124,6 +125,11 @@ class QuantizerInfo:
         :param var_name: Name of the variable to be updated
         :param value: value to be assigned to the variable
         """
+        batch = QuantizerVariableBatch.get_active(self.session)
+        if batch is not None:
+            batch.write(var_name, value)
+            return
+
         with self.session.graph.as_default():
             vars_with_given_name = [var for var in tf.compat.v1.global_variables()
                                     if var.op.name == var_name]
@@ -136,13 +142,24 @@ class QuantizerInfo:
         :param var_index: Quantize op input param index corresponding to the variable to be read
         :return: variable value read from the Quantize op
         """
+        batch = QuantizerVariableBatch.get_active(self.session)
+        if batch is not None and batch.contains(self.quant_op_name, var_index):
+            return batch.read(self.quant_op_name, var_index)
+        return self.session.run(self.get_variable_tensor(var_index))
+
+    def get_variable_tensor(self, var_index) -> tf.Tensor:
+        """
+        Returns the tensor to evaluate to read a variable of the Quantize op
+        :param var_index: Quantize op input param index corresponding to the variable to be read
+        :return: Tensor holding the variable value
+        """
         quantize_op = self.session.graph.get_operation_by_name(self.quant_op_name)
         op_var_tensor = quantize_op.inputs[var_index]
         if op_var_tensor.op.type == 'ResourceGather':
             op_var_tensor = self._get_readvar_from_embedding_layer(op_var_tensor)
         elif op_var_tensor.op.type == 'Identity' and op_var_tensor.op.inputs[0].op.type == 'ResourceGather':
             op_var_tensor = self._get_readvar_from_embedding_layer(op_var_tensor.op.inputs[0])
-        return self.session.run(op_var_tensor)
+        return op_var_tensor
 
     @property
     def bitwidth(self) -> int:
@@ -323,9 +340,7 @@ class QuantizerInfo:
         Reads op mode variable from Quantize op
         :return: Op mode as pymo.TensorQuantizerOpMode type
         """
-        op = self.session.graph.get_operation_by_name(self.quant_op_name)
-        op_mode_tensor = op.inputs[QuantizeOpIndices.op_mode]
-        return self.session.run(op_mode_tensor)
+        return self.get_variable_from_op(QuantizeOpIndices.op_mode)
 
     def set_op_mode(self, op_mode: libpymo.TensorQuantizerOpMode):
         """
@@ -690,3 +705,137 @@ class QuantizerInfo:
         self.use_symmetric_encoding = is_symmetric
         self.set_encoding(encoding)
         self.set_op_mode(opmode)
+
+
+# Suffix of the name of each quantize op variable and the quantize op input index through which it is read
+_VARIABLE_SUFFIX_TO_INDEX = {'_op_mode': QuantizeOpIndices.op_mode,
+                             '_encoding_min': QuantizeOpIndices.encoding_min,
+                             '_encoding_max': QuantizeOpIndices.encoding_max,
+                             '_bit_width': QuantizeOpIndices.bit_width,
+                             '_use_symmetric_encoding': QuantizeOpIndices.use_symmetric_encoding,
+                             '_data_type': QuantizeOpIndices.is_int_data_type}
+
+
+class QuantizerVariableBatch:
+    """
+    Reads and writes the variables of many quantize ops with one session call each, instead of one call per variable.
+
+    On creation, the variables of all given quantizers are fetched in a single session.run(). While the batch is
+    active, QuantizerInfo reads are served from these values and writes are recorded, and commit() assigns all written
+    variables in a single session.run(). Reads observe earlier writes of the same batch. Since the graph only sees the
+    written values after commit(), the graph must not be evaluated while a batch is active.
+    """
+    _active_batches: Dict[int, 'QuantizerVariableBatch'] = {}
+
+    def __init__(self, session: tf.compat.v1.Session, quantizer_infos: Iterable[QuantizerInfo],
+                 read_quantized_tensors: bool = False):
+        """
+        :param session: Session holding the quantizer variables
+        :param quantizer_infos: Quantizers whose variables are to be read and written
+        :param read_quantized_tensors: If True, the tensors being quantized (input 0 of each quantize op) are
+         fetched as well, e.g. to compute parameter encodings
+        """
+        self._session = session
+        self._values: Dict[Tuple[str, int], np.ndarray] = {}
+        self._pending_writes: Dict[str, object] = {}
+        with session.graph.as_default():
+            self._variables = {var.op.name: var for var in tf.compat.v1.global_variables()}
+
+        fetch_keys = []
+        fetches = []
+        for quantizer_info in quantizer_infos:
+            quantize_op = session.graph.get_operation_by_name(quantizer_info.quant_op_name)
+            indices = [QuantizeOpIndices.op_mode, QuantizeOpIndices.encoding_min, QuantizeOpIndices.encoding_max,
+                       QuantizeOpIndices.bit_width, QuantizeOpIndices.use_symmetric_encoding]
+            if quantize_op.type == 'QcQuantize':
+                indices.append(QuantizeOpIndices.is_int_data_type)
+            if read_quantized_tensors:
+                indices.append(0)
+            for index in indices:
+                if index < len(quantize_op.inputs):
+                    fetch_keys.append((quantizer_info.quant_op_name, index))
+                    fetches.append(quantizer_info.get_variable_tensor(index))
+        if fetches:
+            self._values = dict(zip(fetch_keys, session.run(fetches)))
+
+    @classmethod
+    def get_active(cls, session: tf.compat.v1.Session) -> Union['QuantizerVariableBatch', None]:
+        """
+        Returns the batch which is active for the given session, if any
+        :param session: Session holding the quantizer variables
+        """
+        return cls._active_batches.get(id(session))
+
+    def contains(self, quant_op_name: str, var_index: int) -> bool:
+        """
+        Returns True if the variable is held by this batch
+        :param quant_op_name: Name of the quantize op
+        :param var_index: Quantize op input index of the variable
+        """
+        return (quant_op_name, var_index) in self._values
+
+    def read(self, quant_op_name: str, var_index: int):
+        """
+        Returns the value of a quantize op variable
+        :param quant_op_name: Name of the quantize op
+        :param var_index: Quantize op input index of the variable
+        """
+        return self._values[(quant_op_name, var_index)]
+
+    def write(self, var_name: str, value):
+        """
+        Records a write of a quantize op variable, which is applied by commit()
+        :param var_name: Name of the variable to be updated
+        :param value: value to be assigned to the variable
+        """
+        var = self._variables[var_name]
+        value = np.asarray(value, dtype=var.dtype.base_dtype.as_numpy_dtype)
+        if value.ndim == 0:
+            # Scalars are returned as numpy scalars by session.run() as well
+            value = value[()]
+        self._pending_writes[var_name] = value
+        for suffix, index in _VARIABLE_SUFFIX_TO_INDEX.items():
+            if var_name.endswith(suffix) and (var_name[:-len(suffix)], index) in self._values:
+                self._values[(var_name[:-len(suffix)], index)] = value
+                break
+
+    def commit(self):
+        """
+        Assign all recorded writes in a single session call
+        """
+        if not self._pending_writes:
+            return
+        # Feeding the initial value of a variable's initializer assigns the fed value, as done by Variable.load()
+        initializers = []
+        feed_dict = {}
+        for var_name, value in self._pending_writes.items():
+            initializer = self._variables[var_name].initializer
+            initializers.append(initializer)
+            feed_dict[initializer.inputs[1]] = value
+        self._session.run(initializers, feed_dict=feed_dict)
+        self._pending_writes = {}
+
+    @classmethod
+    @contextlib.contextmanager
+    def activate(cls, session: tf.compat.v1.Session, quantizer_infos: Iterable[QuantizerInfo],
+                 read_quantized_tensors: bool = False) -> Iterator['QuantizerVariableBatch']:
+        """
+        Context manager which creates a batch for the given quantizers, routes their variable reads and writes through
+        it and commits the writes on exit. Writes recorded before an exception are committed as well, since the
+        Python-side state of the quantizers was already updated along with them, as unbatched writes would have been
+        :param session: Session holding the quantizer variables
+        :param quantizer_infos: Quantizers whose variables are to be read and written
+        :param read_quantized_tensors: If True, the tensors being quantized are fetched as well
+        """
+        if cls.get_active(session) is not None:
+            # Nested use joins the outer batch
+            yield cls.get_active(session)
+            return
+
+        batch = cls(session, quantizer_infos, read_quantized_tensors)
+        cls._active_batches[id(session)] = batch
+        try:
+            yield batch
+        finally:
+            del cls._active_batches[id(session)]
+            batch.commit()
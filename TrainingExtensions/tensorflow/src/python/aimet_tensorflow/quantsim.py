@@ -53,6 +53,7 @@ from aimet_common.quantsim import encoding_version, validate_quantsim_inputs, \
     recompute_grid_params, extract_global_quantizer_args
 from aimet_common.quant_utils import get_conv_accum_bounds
 from aimet_common.utils import AimetLogger, save_json_yaml
+from aimet_common import tracing
 from aimet_tensorflow import graph_editor
 from aimet_tensorflow.utils.common import update_variables_with_values, save_data_to_pickle_file, \
     load_data_from_pickle_file, get_valid_ops
@@ -66,7 +67,8 @@ from aimet_tensorflow.utils.graph import updated_graph_flow_context_to_loop_cont
     op_not_in_loop_control_flow_context
 from aimet_tensorflow.common.connectedgraph import ConnectedGraph
 from aimet_tensorflow.defs import ParameterInfo
-from aimet_tensorflow.quantizer_info import QuantizerInfo, QuantizerType, quant_scheme_to_libpymo
+from aimet_tensorflow.quantizer_info import QuantizerInfo, QuantizerType, QuantizerVariableBatch, \
+    quant_scheme_to_libpymo
 from aimet_tensorflow.quantsim_config.quantsim_config import QuantSimConfigurator
 from aimet_tensorflow.quantsim_recurrent import _select_simple_rnn_internal_ops_to_quantize, \
     _select_lstm_internal_ops_to_quantize, SUPPORTED_RECURRENT_TYPES
@@ -129,6 +131,7 @@ class QuantizationSimModel:
     """
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-instance-attributes
+    @tracing.traced("QuantizationSimModel.__init__")
     def __init__(self, session: tf.compat.v1.Session, starting_op_names: List[str], output_op_names: List[str],
                  quant_scheme: Union[str, QuantScheme] = 'tf_enhanced', rounding_mode: str = 'nearest',
                  default_output_bw: int = 8, default_param_bw: int = 8, use_cuda: bool = True, config_file: str = None,
@@ -283,6 +286,7 @@ class QuantizationSimModel:
         self._quantsim_configurator.configure_quantizers(self._op_to_quant_ops_dict, self._param_quantizers,
                                                          self._activation_quantizers)
 
+    @tracing.traced("QuantizationSimModel.compute_encodings")
     def compute_encodings(self, forward_pass_callback: Callable[[tf.compat.v1.Session, Any], None],
                           forward_pass_callback_args):
         """
@@ -303,40 +307,46 @@ class QuantizationSimModel:
 
         """
 
-        self._compute_and_set_parameter_encodings()
+        with QuantizerVariableBatch.activate(self.session, self._param_quantizers.values(),
+                                             read_quantized_tensors=True):
+            self._compute_and_set_parameter_encodings()
 
-        # At the beginning before we do forward pass we want to set parameters to quantize dequantize mode and once we
-        # compute the encodings for activations we set it to the required op mode based on quant scheme & if per channel
-        # quantization is enabled
-        self._set_op_mode_parameters(libpymo.TensorQuantizerOpMode.quantizeDequantize, [])
+            # At the beginning before we do forward pass we want to set parameters to quantize dequantize mode and once
+            # we compute the encodings for activations we set it to the required op mode based on quant scheme & if per
+            # channel quantization is enabled
+            self._set_op_mode_parameters(libpymo.TensorQuantizerOpMode.quantizeDequantize, [])
 
         ops_with_invalid_encodings = []
 
         # Run data through the quantsim so we can compute activation encodings
         forward_pass_callback(self.session, forward_pass_callback_args)
 
-        # For activations, calculate encodings and update min-max parameters
-        for op_name, quantizer_info in self._activation_quantizers.items():
-            # Calculate encodings
-            if quantizer_info.get_op_mode() != int(libpymo.TensorQuantizerOpMode.passThrough):
-                op_bitwidth, op_use_symmetric_encodings = quantizer_info.bitwidth, quantizer_info.use_symmetric_encoding
-                encoding = quantizer_info.compute_encoding(op_bitwidth, op_use_symmetric_encodings)
-                # encoding would be invalid for dtype=fp because there is no encoding computed in float mode through the
-                # tensor_quantizer
-                if quantizer_info.data_type == QuantizationDataType.float:
-                    quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.quantizeDequantize)
-                else:
-                    if quantizer_info.is_encoding_valid():
-                        quantizer_info.set_encoding(encoding)
+        with QuantizerVariableBatch.activate(self.session, self._get_all_quantizers()):
+            # For activations, calculate encodings and update min-max parameters
+            for op_name, quantizer_info in self._activation_quantizers.items():
+                # Calculate encodings
+                if quantizer_info.get_op_mode() != int(libpymo.TensorQuantizerOpMode.passThrough):
+                    op_bitwidth, op_use_symmetric_encodings = quantizer_info.bitwidth, \
+                                                              quantizer_info.use_symmetric_encoding
+                    encoding = quantizer_info.compute_encoding(op_bitwidth, op_use_symmetric_encodings)
+                    # encoding would be invalid for dtype=fp because there is no encoding computed in float mode
+                    # through the tensor_quantizer
+                    if quantizer_info.data_type == QuantizationDataType.float:
                         quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.quantizeDequantize)
                     else:
-                        quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.passThrough)
-                        ops_with_invalid_encodings.append(op_name)
+                        if quantizer_info.is_encoding_valid():
+                            quantizer_info.set_encoding(encoding)
+                            quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.quantizeDequantize)
+                        else:
+                            quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.passThrough)
+                            ops_with_invalid_encodings.append(op_name)
 
-        # For post-training mode, params will always be in one-shot mode
-        op_mode = self._param_op_mode_after_analysis(self._quant_scheme)
+            # For post-training mode, params will always be in one-shot mode
+            op_mode = self._param_op_mode_after_analysis(self._quant_scheme)
 
-        self._set_op_mode_parameters(op_mode, ops_with_invalid_encodings)
+            self._set_op_mode_parameters(op_mode, ops_with_invalid_encodings)
+
+            self._clamp_transformer_attention_mask_encoding()
 
         if ops_with_invalid_encodings:
             _logger.info('The following quantizers did not have valid encodings and have been set to passThrough mode: '
@@ -349,7 +359,11 @@ class QuantizationSimModel:
                          'If this is not desired, amend the forward pass to evaluate tensors which require these ops '
                          'to be evaluated, and recompute encodings.')
 
-        self._clamp_transformer_attention_mask_encoding()
+    def _get_all_quantizers(self) -> List[QuantizerInfo]:
+        """
+        Returns all param and activation quantizers
+        """
+        return list(self._param_quantizers.values()) + list(self._activation_quantizers.values())
 
     def get_enabled_parameter_quantizers(self):
         """
@@ -393,6 +407,7 @@ class QuantizationSimModel:
                         quantizer_info.set_op_mode(libpymo.TensorQuantizerOpMode.passThrough)
                         ops_with_invalid_encodings.append(op_name)
 
+    @tracing.traced("QuantizationSimModel.export")
     def export(self, path: str, filename_prefix: str, orig_sess: tf.compat.v1.Session = None):
         """
         This method exports out the quant-sim model so it is ready to be run on-target.
@@ -412,7 +427,9 @@ class QuantizationSimModel:
         """
         # this is required to update the encoding for last iteration of backward pass for QAT 1.0 only
         if self._quant_scheme in [QuantScheme.post_training_tf, QuantScheme.post_training_tf_enhanced]:
-            self._compute_and_set_parameter_encodings()
+            with QuantizerVariableBatch.activate(self.session, self._param_quantizers.values(),
+                                                 read_quantized_tensors=True):
+                self._compute_and_set_parameter_encodings()
         # save session without quant nodes
         if orig_sess is not None:
             with orig_sess.graph.as_default():
@@ -421,8 +438,10 @@ class QuantizationSimModel:
         else:
             _logger.info('Original session is not provided, use orig_model_before_quantsim.meta to export')
 
-        self._remove_quantization_nodes_and_save_graph(path, filename_prefix)
-        self._export_encodings(os.path.join(path, filename_prefix) + '.encodings')
+        # Quantizer variables are only read from here on, so fetch them all at once
+        with QuantizerVariableBatch.activate(self.session, self._get_all_quantizers()):
+            self._remove_quantization_nodes_and_save_graph(path, filename_prefix)
+            self._export_encodings(os.path.join(path, filename_prefix) + '.encodings')
 
     def _compute_and_set_parameter_encodings(self):
 
@@ -474,11 +493,11 @@ class QuantizationSimModel:
             shutil.copyfile(WORKING_DIR + 'orig_model_before_quantsim.meta',
                             os.path.join(path, filename_prefix) + '.meta')
 
-    def save_to_keras(self, temp_dir_path: str = "/tmp/") -> tf.compat.v1.Session:
+    def save_to_keras(self, temp_dir_path: str = "/tmp/") -> tf.compat.v1.Session: # pylint: disable=unused-argument
         """
         This method exports out the quant-sim model so it is ready to be eval/trained using a Keras pipeline
 
-        :param temp_dir_path: temporary directory to store intermediate files
+        :param temp_dir_path: unused, the model is copied in memory
         :return: Session to import into a Keras model
 
         """
@@ -518,7 +537,7 @@ class QuantizationSimModel:
                                             can_modify=op.outputs[0].consumers())
                     graph_editor.detach_inputs(op)
 
-        new_sess = utils.graph_saver.save_and_load_graph(temp_dir_path, self.session)
+        new_sess = utils.graph_saver.clone_session(self.session)
         return new_sess
 
     def save_model_with_embedded_quantization_nodes(self, checkpoint_path: str, encoding_path: str = None,
@@ -610,16 +629,17 @@ class QuantizationSimModel:
         # op mode will be Quantize dequantize
         op_mode = libpymo.TensorQuantizerOpMode.quantizeDequantize
 
-        for op_name, quantizer_info in self._param_quantizers.items():
-            quant_op = self.session.graph.get_operation_by_name(op_name)
-            tensor_name = quant_op.inputs[0].name
-            if tensor_name in param_encodings:
-                encoding_dict = param_encodings[tensor_name] if self.per_channel_quantization_enabled else \
-                    param_encodings[tensor_name][0]
-                encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
-                quantizer_info.use_symmetric_encoding = is_symmetric
-                quantizer_info.set_and_freeze_encoding_and_op_mode(encoding, op_mode)
-                _logger.info("Setting and freezing quantization encodings for parameter: %s", tensor_name)
+        with QuantizerVariableBatch.activate(self.session, self._param_quantizers.values()):
+            for op_name, quantizer_info in self._param_quantizers.items():
+                quant_op = self.session.graph.get_operation_by_name(op_name)
+                tensor_name = quant_op.inputs[0].name
+                if tensor_name in param_encodings:
+                    encoding_dict = param_encodings[tensor_name] if self.per_channel_quantization_enabled else \
+                        param_encodings[tensor_name][0]
+                    encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
+                    quantizer_info.use_symmetric_encoding = is_symmetric
+                    quantizer_info.set_and_freeze_encoding_and_op_mode(encoding, op_mode)
+                    _logger.info("Setting and freezing quantization encodings for parameter: %s", tensor_name)
 
     def load_encodings_to_sim(self, encoding_path: str):
         """
@@ -632,48 +652,49 @@ class QuantizationSimModel:
         param_encodings = encodings['param_encodings']
         activation_encodings = encodings['activation_encodings']
 
-        for op_name, quantizer_info in self._param_quantizers.items():
-            quant_op = self.session.graph.get_operation_by_name(op_name)
-            tensor_name = quant_op.inputs[0].name
-            if tensor_name in param_encodings:
-                # Check if the quantizer is disabled
-                if not quantizer_info.enabled:
-                    _logger.info("Not loading encodings for parameter: %s as quantizer is disabled", tensor_name)
-                    continue
-                encoding_dict = param_encodings[tensor_name] if self.per_channel_quantization_enabled else \
-                    param_encodings[tensor_name][0]
-                encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
-                bitwidth = encoding_dict[0].get('bitwidth') if self.per_channel_quantization_enabled else \
-                    encoding_dict.get('bitwidth')
-                quantizer_info.set_encodings_to_quantizer(bitwidth, is_symmetric, encoding,
-                                                          libpymo.TensorQuantizerOpMode.oneShotQuantizeDequantize)
-                _logger.info("Setting quantization encodings for parameter: %s", tensor_name)
-            else:
-                # Case where encoding is not present in the encoding file
-                # So we will disable the quantizer if its active
-                if quantizer_info.enabled:
-                    quantizer_info.enabled = False
-                    _logger.info("Encoding for parameter: %s not present thus disabling this quantizer.", tensor_name)
-
-        for op_name, quantizer_info in self._activation_quantizers.items():
-            quant_op = self.session.graph.get_operation_by_name(op_name)
-            tensor_name = quant_op.inputs[0].name
-            if tensor_name in activation_encodings:
-                # Check if the quantizer is disabled
-                if not quantizer_info.enabled:
-                    _logger.info("Not loading encodings for parameter: %s as quantizer is disabled", tensor_name)
-                    continue
-                encoding_dict = activation_encodings[tensor_name][0]
-                encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
-                quantizer_info.set_encodings_to_quantizer(encoding_dict.get('bitwidth'), is_symmetric,
-                                                          encoding, libpymo.TensorQuantizerOpMode.quantizeDequantize)
-                _logger.info("Setting quantization encodings for activation: %s", tensor_name)
-            else:
-                # Case where encoding is not present in the encoding file
-                # So we will disable the quantizer if its active
-                if quantizer_info.enabled:
-                    quantizer_info.enabled = False
-                    _logger.info("Encoding for parameter: %s not present thus disabling this quantizer.", tensor_name)
+        with QuantizerVariableBatch.activate(self.session, self._get_all_quantizers()):
+            for op_name, quantizer_info in self._param_quantizers.items():
+                quant_op = self.session.graph.get_operation_by_name(op_name)
+                tensor_name = quant_op.inputs[0].name
+                if tensor_name in param_encodings:
+                    # Check if the quantizer is disabled
+                    if not quantizer_info.enabled:
+                        _logger.info("Not loading encodings for parameter: %s as quantizer is disabled", tensor_name)
+                        continue
+                    encoding_dict = param_encodings[tensor_name] if self.per_channel_quantization_enabled else \
+                        param_encodings[tensor_name][0]
+                    encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
+                    bitwidth = encoding_dict[0].get('bitwidth') if self.per_channel_quantization_enabled else \
+                        encoding_dict.get('bitwidth')
+                    quantizer_info.set_encodings_to_quantizer(bitwidth, is_symmetric, encoding,
+                                                              libpymo.TensorQuantizerOpMode.oneShotQuantizeDequantize)
+                    _logger.info("Setting quantization encodings for parameter: %s", tensor_name)
+                else:
+                    # Case where encoding is not present in the encoding file
+                    # So we will disable the quantizer if its active
+                    if quantizer_info.enabled:
+                        quantizer_info.enabled = False
+                        _logger.info("Encoding for parameter: %s not present thus disabling this quantizer.", tensor_name)
+
+            for op_name, quantizer_info in self._activation_quantizers.items():
+                quant_op = self.session.graph.get_operation_by_name(op_name)
+                tensor_name = quant_op.inputs[0].name
+                if tensor_name in activation_encodings:
+                    # Check if the quantizer is disabled
+                    if not quantizer_info.enabled:
+                        _logger.info("Not loading encodings for parameter: %s as quantizer is disabled", tensor_name)
+                        continue
+                    encoding_dict = activation_encodings[tensor_name][0]
+                    encoding, is_symmetric = create_encoding_from_dict(encoding_dict)
+                    quantizer_info.set_encodings_to_quantizer(encoding_dict.get('bitwidth'), is_symmetric,
+                                                              encoding, libpymo.TensorQuantizerOpMode.quantizeDequantize)
+                    _logger.info("Setting quantization encodings for activation: %s", tensor_name)
+                else:
+                    # Case where encoding is not present in the encoding file
+                    # So we will disable the quantizer if its active
+                    if quantizer_info.enabled:
+                        quantizer_info.enabled = False
+                        _logger.info("Encoding for parameter: %s not present thus disabling this quantizer.", tensor_name)
 
     def _param_op_mode_after_analysis(self, quant_scheme) -> libpymo.TensorQuantizerOpMode:
         """
@@ -712,6 +733,11 @@ class QuantizationSimModel:
         :param variable_dict: dictionary of min/max variable names to variable mapping for given quantized graph, optional
         :return: min and max variable values from the given quant op.
         """
+        batch = QuantizerVariableBatch.get_active(self.session)
+        if batch is not None and batch.contains(quant_op_name, QuantizeOpIndices.encoding_min):
+            return [batch.read(quant_op_name, QuantizeOpIndices.encoding_min),
+                    batch.read(quant_op_name, QuantizeOpIndices.encoding_max)]
+
         if not variable_dict:
             # get a variable dict if one is not provided
             variable_dict = self.get_min_max_var_dict()
@@ -790,7 +816,7 @@ class QuantizationSimModel:
         save_json_yaml(encoding_file_path, encodings_dict)
 
     def _save_and_load_sim_model(self):
-        self.session = utils.graph_saver.save_and_load_graph(WORKING_DIR, self.session)
+        self.session = utils.graph_saver.clone_session(self.session)
         update_tensor_quantizer_references(self.session, self._activation_quantizers)
         update_tensor_quantizer_references(self.session, self._param_quantizers)
 
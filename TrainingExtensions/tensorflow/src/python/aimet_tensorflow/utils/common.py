@@ -43,7 +43,7 @@ import os
 import numpy as np
 import tensorflow as tf
 from aimet_common.utils import AimetLogger
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Utils)
 
@@ -417,7 +417,7 @@ def deepcopy_tf_session(sess: tf.compat.v1.Session) -> tf.compat.v1.Session:
     :param sess: Session to copy.
     :returns: Copied session.
     """
-    return save_and_load_graph("/tmp/tf_session_copy", sess)
+    return clone_session(sess)
 
 
 _tf_dataset_iterables: Dict[tf.compat.v1.data.Dataset, List["_TfDatasetIterable"]]\
@@ -43,6 +43,7 @@ import shutil
 import tensorflow as tf
 
 from aimet_common.defs import EvalFunction
+from aimet_common import tracing
 
 
 def save_model_to_meta(model: tf.compat.v1.Session, meta_path: str):
@@ -109,6 +110,43 @@ def save_and_load_graph(meta_path: str, sess: tf.compat.v1.Session) -> tf.compat
     return new_sess
 
 
+@tracing.traced("clone_session")
+def clone_session(sess: tf.compat.v1.Session) -> tf.compat.v1.Session:
+    """
+    Copies the graph and the variable values of a session into a new session, without writing anything to disk.
+    The result is equivalent to save_and_load_graph(): the graph is exported to a MetaGraphDef and imported into a new
+    graph, and the values of all global variables are read with one session call and assigned with another.
+    :param sess: session to be cloned
+    :return: new session holding a copy of the graph and its variable values
+    """
+    tracing.count("session_builds")
+    with sess.graph.as_default():
+        meta_graph_def = tf.compat.v1.train.export_meta_graph(graph=sess.graph)
+        variables = tf.compat.v1.global_variables()
+    values = sess.run(variables) if variables else []
+
+    # Grow GPU memory as needed at the cost of fragmentation.
+    config = tf.compat.v1.ConfigProto()
+    config.gpu_options.allow_growth = True  # pylint: disable=no-member
+
+    new_sess = tf.compat.v1.Session(graph=tf.Graph(), config=config)
+    with new_sess.graph.as_default():
+        tf.compat.v1.train.import_meta_graph(meta_graph_def)
+        new_variables = {var.op.name: var for var in tf.compat.v1.global_variables()}
+
+    # Feeding the initial value of a variable's initializer assigns the fed value, as done by Variable.load()
+    initializers = []
+    feed_dict = {}
+    for var, value in zip(variables, values):
+        initializer = new_variables[var.op.name].initializer
+        initializers.append(initializer)
+        feed_dict[initializer.inputs[1]] = value
+    if initializers:
+        new_sess.run(initializers, feed_dict=feed_dict)
+
+    return new_sess
+
+
 def get_meta_and_checkpoint_path(working_dir: str) -> str:
     """
     Returns the path to store meta and checkpoint files
@@ -150,8 +188,8 @@ def wrapper_func(eval_func: EvalFunction):
         if not args or not isinstance(args[0], tf.compat.v1.Session):
             raise ValueError('First argument to eval function should be Session!')
 
-        # In TF after making changes to the graph you must save and reload, then evaluate
-        updated_sess = save_and_load_graph('./saver', args[0])
+        # In TF after making changes to the graph you must copy the graph into a new session, then evaluate
+        updated_sess = clone_session(args[0])
 
         # update the argument with new session
         args[args.index(args[0])] = updated_sess
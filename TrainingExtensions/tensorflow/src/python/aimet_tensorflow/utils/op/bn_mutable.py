@@ -41,7 +41,7 @@ import numpy as np
 import tensorflow as tf
 
 from aimet_tensorflow import graph_editor
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 from aimet_tensorflow.common.graph_eval import initialize_uninitialized_vars
 from aimet_tensorflow.common.connectedgraph import ConnectedGraph
 from aimet_tensorflow.common.operation import Op
@@ -130,7 +130,7 @@ def modify_sess_bn_mutable(sess: tf.compat.v1.Session,
             graph_editor.detach_inputs(tf_op.op)
 
     initialize_uninitialized_vars(sess)
-    after_bn_mutable_sess = save_and_load_graph('./temp_bn_mutable', sess)
+    after_bn_mutable_sess = clone_session(sess)
     return after_bn_mutable_sess
 
 
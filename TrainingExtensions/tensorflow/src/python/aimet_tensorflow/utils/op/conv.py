@@ -44,7 +44,7 @@ from aimet_common.utils import AimetLogger
 from aimet_tensorflow.utils.common import get_padding, create_input_feed_dict, create_rand_tensors_given_shapes, \
     get_valid_ops
 from aimet_tensorflow import graph_editor
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import clone_session
 from aimet_tensorflow.utils import constants
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Utils)
@@ -228,7 +228,7 @@ class BiasUtils:
                         zero_bias = tf.Variable(initial_value=np.zeros(bias_shape), dtype=tf.float32)
                         BiasUtils._create_bias_add_op_and_insert(sess, op, zero_bias)
 
-        new_sess = save_and_load_graph('./temp', sess)
+        new_sess = clone_session(sess)
         sess.close()
 
         return new_sess
@@ -48,7 +48,7 @@ from aimet_tensorflow.adaround.adaround_loss import AdaroundHyperParameters
 from aimet_tensorflow.keras.adaround.adaround_wrapper import AdaroundWrapper
 from aimet_tensorflow.keras.adaround.adaround_optimizer import AdaroundOptimizer
 from aimet_tensorflow.keras.adaround_weight import Adaround, AdaroundParameters
-from aimet_tensorflow.keras.adaround.activation_sampler import ActivationSampler
+from aimet_tensorflow.keras.adaround.activation_sampler import ActivationSampler, ActivationCache
 
 
 def depthwise_conv2d_model():
@@ -151,6 +151,46 @@ def test_activation_sampler():
     assert out_data.shape == (4, 2, 2, 4)
 
 
+def test_multi_layer_activation_sampler():
+    input_data = np.random.rand(32, 16, 16, 3)
+    dataset = tf.data.Dataset.from_tensor_slices(input_data).batch(batch_size=4)
+
+    model = keras_model()
+    layers = [model.layers[idx] for idx in Adaround._get_ordered_adaround_layer_indices(model)]
+
+    activation_sampler = ActivationSampler(dataset, num_batches=3)
+    cache = ActivationCache()
+    activation_sampler.sample_layer_inputs(layers, model, cache, keys=[('inp', layer.name) for layer in layers])
+    activation_sampler.sample_layer_outputs(layers, model, cache, keys=[('out', layer.name) for layer in layers])
+
+    for layer in layers:
+        inp_data, out_data = activation_sampler.sample_activation(layer, model, layer, model)
+        assert cache.get(('inp', layer.name)).shape == inp_data.shape == (12, *inp_data.shape[1:])
+        assert np.allclose(cache.get(('inp', layer.name)), inp_data, atol=1e-6)
+        assert np.allclose(cache.get(('out', layer.name)), out_data, atol=1e-6)
+
+    cache.remove(('inp', layers[0].name))
+    assert ('inp', layers[0].name) not in cache
+    cache.cleanup()
+
+
+def test_get_adaround_stages():
+    inputs = tf.keras.Input(shape=(8, 8, 3,))
+    x = tf.keras.layers.Conv2D(4, (1, 1))(inputs)
+    branch_1 = tf.keras.layers.Conv2D(4, (1, 1))(x)
+    branch_2 = tf.keras.layers.Conv2D(4, (3, 3), padding='same')(tf.keras.layers.ReLU()(x))
+    x = tf.keras.layers.Add()([branch_1, branch_2])
+    x = tf.keras.layers.Flatten()(x)
+    outputs = tf.keras.layers.Dense(10)(x)
+    model = tf.keras.Model(inputs=inputs, outputs=outputs)
+
+    ordered_layer_indices = Adaround._get_ordered_adaround_layer_indices(model)
+    stages = Adaround._get_adaround_stages(model, ordered_layer_indices)
+    # The two branches only depend on the first conv, so their inputs can be sampled together
+    assert [len(stage) for stage in stages] == [1, 2, 1]
+    assert sorted(idx for stage in stages for idx in stage) == sorted(ordered_layer_indices)
+
+
 # Adaround optimizer tests
 def test_optimize_rounding_conv2d():
     """ Test optimize rounding for Conv2d """
@@ -45,7 +45,7 @@ import pytest
 import tensorflow as tf
 
 from aimet_common.defs import QuantScheme
-from aimet_tensorflow.keras.quant_analyzer import QuantAnalyzer
+from aimet_tensorflow.keras.quant_analyzer import QuantAnalyzer, _get_outputs_of_intermediate_layers_model
 
 from aimet_common.utils import CallbackFunc
 from aimet_tensorflow.keras.quantsim import QuantizationSimModel
@@ -289,9 +289,33 @@ class TestQuantAnalyzer:
         unlabeled_dataset = tf.data.Dataset.from_tensor_slices(np.random.rand(32, 28, 28, 3)).batch(32)
         quant_analyzer.enable_per_layer_mse_loss(unlabeled_dataset, num_batches=4)
         with tempfile.TemporaryDirectory() as tmp_dir:
-            quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir)
+            mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir)
             assert os.path.isfile(Path(tmp_dir, "per_layer_mse_loss.html"))
 
+            # Processing layers in groups gives the same result as a single pass
+            grouped_mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir,
+                                                                             max_outputs_per_run=2)
+            single_pass_mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tmp_dir,
+                                                                                 max_outputs_per_run=None)
+            assert list(grouped_mse_loss_dict) == list(mse_loss_dict) == list(single_pass_mse_loss_dict)
+            for layer_name, loss in mse_loss_dict.items():
+                assert np.isclose(grouped_mse_loss_dict[layer_name], loss)
+                assert np.isclose(single_pass_mse_loss_dict[layer_name], loss)
+
+    def test_outputs_of_multi_output_layers(self, clear_session):
+        """ test outputs of intermediate layers are mapped to layers with multiple outputs """
+        inputs = tf.keras.Input(shape=(4,))
+        first, second = tf.split(inputs, 2, axis=-1)
+        outputs = tf.keras.layers.Dense(3)(first + second)
+        model = tf.keras.Model(inputs, outputs)
+        split_index = next(index for index, layer in enumerate(model.layers) if 'split' in layer.name)
+        dense_index = len(model.layers) - 1
+
+        extracted_model, num_outputs = _get_outputs_of_intermediate_layers_model(model, [split_index, dense_index])
+        assert num_outputs == [2, 1]
+        extracted_outputs = extracted_model(np.random.rand(1, 4))
+        assert [output.shape[-1] for output in extracted_outputs] == [2, 2, 3]
+
     def test_analyze(self, clear_session):
         """ test end to end for analyze() method """
         model = keras_functional_conv_net()
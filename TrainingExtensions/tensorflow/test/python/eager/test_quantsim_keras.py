@@ -37,8 +37,10 @@
 import json
 import os
 import tempfile
+import time
 from pathlib import Path
 from typing import List
+from unittest import mock
 
 import aimet_common.libpymo as libpymo
 import numpy as np
@@ -54,6 +56,7 @@ from aimet_tensorflow.examples.test_models import keras_model
 from aimet_tensorflow.keras.utils.quantizer_utils import SaveModelWithoutQuantsimWrappersCallback
 from aimet_tensorflow.keras.cross_layer_equalization import equalize_model
 from aimet_tensorflow.keras.quant_sim.qc_mha_wrapper import QcQuantizableMultiHeadAttention
+from aimet_tensorflow.keras import quantsim as quantsim_module
 from aimet_tensorflow.keras.quantsim import QuantizationSimModel
 from aimet_tensorflow.keras.rnn.qc_quant_LSTM import QuantizedLSTM
 from test_models_keras import tiny_conv_net
@@ -476,6 +479,68 @@ def test_model_with_tf_op_lambda_operators_multi_tf_static_inputs():
         assert len(encodings["activation_encodings"]) == 5
         assert len(encodings['param_encodings']) == 1, "Only the Dense layer in this model should have param_encoding"
 
+
+def test_compute_encodings_compiled():
+    """ Test that compiled calibration computes the same encodings as eager calibration """
+    model = conv_functional()
+    rand_inp = np.random.randn(40, *model.input_shape[1:]).astype(np.float32)
+
+    eager_sim = QuantizationSimModel(model, quant_scheme='tf')
+    eager_sim.compute_encodings(lambda m, _: m(rand_inp), None)
+
+    compiled_sim = QuantizationSimModel(model, quant_scheme='tf')
+    dataset = tf.data.Dataset.from_tensor_slices(rand_inp).batch(16)
+    compiled_sim.compute_encodings_compiled(dataset)
+
+    for eager_wrapper, compiled_wrapper in zip(eager_sim.quant_wrappers(), compiled_sim.quant_wrappers()):
+        eager_quantizers = list(eager_wrapper.input_quantizers) + list(eager_wrapper.output_quantizers) + \
+                           list(eager_wrapper.param_quantizers)
+        compiled_quantizers = list(compiled_wrapper.input_quantizers) + list(compiled_wrapper.output_quantizers) + \
+                              list(compiled_wrapper.param_quantizers)
+        for eager_quantizer, compiled_quantizer in zip(eager_quantizers, compiled_quantizers):
+            assert eager_quantizer.quant_mode == compiled_quantizer.quant_mode
+            if eager_quantizer.is_enabled() and not isinstance(eager_quantizer.encoding, list):
+                assert np.isclose(eager_quantizer.encoding.min, compiled_quantizer.encoding.min)
+                assert np.isclose(eager_quantizer.encoding.max, compiled_quantizer.encoding.max)
+
+    assert np.allclose(eager_sim.model.predict(rand_inp), compiled_sim.model.predict(rand_inp), atol=1e-6)
+
+
+def test_compute_encodings_compiled_warns_for_histogram_schemes():
+    """ Test that compiled calibration warns about quantizers which don't use the tf quant scheme """
+    model = conv_functional()
+    rand_inp = np.random.randn(16, *model.input_shape[1:]).astype(np.float32)
+    dataset = tf.data.Dataset.from_tensor_slices(rand_inp).batch(8)
+
+    for quant_scheme, expect_warning in (('tf', False), ('tf_enhanced', True)):
+        sim = QuantizationSimModel(model, quant_scheme=quant_scheme)
+        with mock.patch.object(quantsim_module._logger, 'warning') as warning:
+            sim.compute_encodings_compiled(dataset)
+        assert any('compute_encodings_compiled' in call.args[0] for call in warning.call_args_list) == expect_warning
+
+
+@pytest.mark.skip(reason="Benchmark only for study, there is no validation criterion")
+def test_benchmark_compute_encodings_compiled():
+    """
+    Compare time taken by eager and compiled calibration on CPU
+    """
+    num_batches, batch_size = 50, 32
+    with tf.device('/cpu:0'):
+        model = tf.keras.applications.MobileNetV2(weights=None, input_shape=(224, 224, 3))
+        batches = [np.random.randn(batch_size, 224, 224, 3).astype(np.float32) for _ in range(num_batches)]
+
+        def eager_forward_pass(m, _):
+            for batch in batches:
+                m(batch)
+
+        for name, calibrate in [('eager', lambda sim: sim.compute_encodings(eager_forward_pass, None)),
+                                ('compiled', lambda sim: sim.compute_encodings_compiled(batches))]:
+            sim = QuantizationSimModel(model, quant_scheme='tf')
+            start = time.perf_counter()
+            calibrate(sim)
+            print(f'{name} calibration: {time.perf_counter() - start:.2f}s')
+
+
 def test_qat():
     if version.parse(tf.version.VERSION) >= version.parse("2.00"):
 
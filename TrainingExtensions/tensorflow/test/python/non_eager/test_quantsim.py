@@ -57,6 +57,7 @@ from aimet_tensorflow.common.graph_eval import initialize_uninitialized_vars
 from aimet_tensorflow.defs import ParameterInfo
 from aimet_tensorflow.examples.test_models import model_with_dtype_int, keras_model
 from aimet_tensorflow.quantsim import save_checkpoint, load_checkpoint
+from aimet_tensorflow.quantizer_info import QuantizerVariableBatch
 from aimet_tensorflow.utils.constants import QuantizeOpIndices
 from aimet_tensorflow.utils import transformer_utils
 from aimet_tensorflow.examples.test_models import transposed_conv2d_model
@@ -2412,6 +2413,52 @@ class TestQuantSimRangeLearning:
         assert 100 * range_used == pytest.approx(0.5836, 0.001)
         sess.close()
 
+    def test_quantizer_variable_batch(self):
+        """ Test that batched quantizer variable reads and writes match unbatched ones and are deferred to commit """
+        tf.compat.v1.reset_default_graph()
+        with tf.device('/cpu:0'):
+            model = tf.keras.Sequential()
+            model.add(tf.keras.layers.Conv2D(32, kernel_size=3, input_shape=(28, 28, 3), activation='relu'))
+            model.add(tf.keras.layers.Conv2D(64, kernel_size=3, activation='relu'))
+
+        sess = tf.compat.v1.Session()
+        initialize_uninitialized_vars(sess)
+        sim = QuantizationSimModel(sess, ['conv2d_input'], ['conv2d_1/Relu'], use_cuda=False)
+        quantizers = list(sim._param_quantizers.values()) + list(sim._activation_quantizers.values())
+        unbatched_op_modes = [quantizer.get_op_mode() for quantizer in quantizers]
+        unbatched_bitwidths = [quantizer.bitwidth for quantizer in quantizers]
+
+        with QuantizerVariableBatch.activate(sim.session, quantizers) as batch:
+            assert [quantizer.get_op_mode() for quantizer in quantizers] == unbatched_op_modes
+            assert [quantizer.bitwidth for quantizer in quantizers] == unbatched_bitwidths
+
+            quantizer = sim._activation_quantizers['conv2d/Relu_quantized']
+            quantizer.bitwidth = 4
+            quantizer.set_op_mode(libpymo.TensorQuantizerOpMode.passThrough)
+            # Reads within the batch observe the writes, while the graph does not see them before commit
+            assert quantizer.bitwidth == 4
+            assert quantizer.get_op_mode() == int(libpymo.TensorQuantizerOpMode.passThrough)
+            quant_op = sim.session.graph.get_operation_by_name('conv2d/Relu_quantized')
+            assert sim.session.run(quant_op.inputs[QuantizeOpIndices.bit_width]) == 8
+            assert batch is QuantizerVariableBatch.get_active(sim.session)
+
+        assert QuantizerVariableBatch.get_active(sim.session) is None
+        assert sim.session.run(quant_op.inputs[QuantizeOpIndices.bit_width]) == 4
+        assert sim.session.run(quant_op.inputs[QuantizeOpIndices.op_mode]) == \
+               int(libpymo.TensorQuantizerOpMode.passThrough)
+
+        # Writes recorded before an exception are committed, so that the graph agrees with the quantizer state
+        with pytest.raises(RuntimeError):
+            with QuantizerVariableBatch.activate(sim.session, quantizers):
+                quantizer.bitwidth = 16
+                raise RuntimeError
+
+        assert QuantizerVariableBatch.get_active(sim.session) is None
+        assert quantizer.bitwidth == 16
+        assert sim.session.run(quant_op.inputs[QuantizeOpIndices.bit_width]) == 16
+        sess.close()
+        sim.session.close()
+
     def _compare_range_learning_with_default_grad(self):
         """
         Test to compare time taken by range learning grad and default grad.
@@ -60,7 +60,7 @@ from aimet_tensorflow.examples.test_models import single_residual, multiple_inpu
     keras_model_functional_for_tf2, keras_model_functional_with_non_fused_batchnorms_for_tf2
 from aimet_tensorflow.utils.op.conv import WeightTensorUtils, BiasUtils, get_output_activation_shape
 from aimet_tensorflow.utils.op.fusedbatchnorm import BNUtils
-from aimet_tensorflow.utils.graph_saver import save_and_load_graph
+from aimet_tensorflow.utils.graph_saver import save_and_load_graph, clone_session
 
 tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.WARN)
 tf.compat.v1.disable_eager_execution()
@@ -439,6 +439,45 @@ class TestTrainingExtensionsTfUtils(unittest.TestCase):
         sess.close()
         new_sess.close()
 
+    def test_clone_session(self):
+        """
+        test that cloning a session in memory matches saving and loading it
+        """
+        tf.compat.v1.reset_default_graph()
+        inputs = tf.keras.Input(shape=(32, 32, 3,), name="inputs")
+        conv_op = tf.keras.layers.Conv2D(32, (3, 3))(inputs)
+        bn_op = tf.keras.layers.BatchNormalization(fused=True)(conv_op)
+        _ = tf.nn.relu(bn_op, name='relu')
+
+        init = tf.compat.v1.global_variables_initializer()
+        sess = tf.compat.v1.Session()
+        sess.run(init)
+        with sess.graph.as_default():
+            variables = tf.compat.v1.global_variables()
+            sess.run([var.assign(tf.random.uniform(var.shape)) for var in variables])
+
+        cloned_sess = clone_session(sess)
+        loaded_sess = save_and_load_graph('./temp_clone', sess)
+        assert cloned_sess.graph is not sess.graph
+
+        dummy_input = np.random.rand(1, 32, 32, 3)
+        outputs = []
+        for session in (sess, cloned_sess, loaded_sess):
+            output = session.graph.get_tensor_by_name('relu:0')
+            model_input = session.graph.get_tensor_by_name('inputs:0')
+            outputs.append(session.run(output, feed_dict={model_input: dummy_input}))
+        assert np.allclose(outputs[0], outputs[1])
+        assert np.allclose(outputs[1], outputs[2])
+
+        with cloned_sess.graph.as_default():
+            cloned_variables = {var.op.name: var for var in tf.compat.v1.global_variables()}
+        for var in variables:
+            assert np.array_equal(sess.run(var), cloned_sess.run(cloned_variables[var.op.name]))
+
+        sess.close()
+        cloned_sess.close()
+        loaded_sess.close()
+
     def test_bias_update_to_dense(self):
         """
         test bias correction on matmul layer
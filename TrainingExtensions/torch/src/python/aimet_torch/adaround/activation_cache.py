@@ -0,0 +1,312 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+""" Tiered (device, pinned host, memory-mapped disk) cache of sampled activations for Adaround """
+
+import os
+import queue
+import threading
+from typing import List, Tuple, Iterator, Optional
+import numpy as np
+import torch
+
+from aimet_common.utils import AimetLogger
+from aimet_torch.utils import get_numpy_storage_dtypes
+
+logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
+
+class _DiskStream:
+    """
+    Append-only shard file of fixed-shape rows, memory-mapped for random reads once finalized
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, 'wb') # pylint: disable=consider-using-with
+        self._row_shape = None
+        self._dtype = None
+        self._num_rows = 0
+        self._memmap = None
+
+    def __len__(self):
+        return self._num_rows
+
+    def append(self, tensor: torch.Tensor):
+        """
+        Append rows of tensor to the shard file
+        :param tensor: Tensor whose first dimension is the row dimension
+        """
+        if self._dtype is None:
+            get_numpy_storage_dtypes(tensor.dtype)
+            self._row_shape = tuple(tensor.shape[1:])
+            self._dtype = tensor.dtype
+        assert tuple(tensor.shape[1:]) == self._row_shape and tensor.dtype == self._dtype
+
+        _, storage_dtype = get_numpy_storage_dtypes(self._dtype)
+        self._file.write(tensor.detach().cpu().contiguous().view(storage_dtype).numpy().tobytes())
+        self._num_rows += tensor.shape[0]
+
+    def finalize(self):
+        """
+        Close the shard file and memory-map it for reading
+        """
+        self._file.close()
+        if self._num_rows:
+            np_dtype, _ = get_numpy_storage_dtypes(self._dtype)
+            self._memmap = np.memmap(self._path, dtype=np_dtype, mode='r', shape=(self._num_rows, *self._row_shape))
+
+    def read(self, indices: np.ndarray) -> torch.Tensor:
+        """
+        Read rows at given (sorted) indices
+        :param indices: Row indices
+        :return: Tensor of read rows
+        """
+        return torch.from_numpy(np.ascontiguousarray(self._memmap[indices])).view(self._dtype)
+
+    def close(self):
+        """
+        Release the memory map and remove the shard file
+        """
+        if not self._file.closed:
+            self._file.close()
+        self._memmap = None
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+class TieredActivationCache:
+    """
+    Cache of activations sampled once per layer, so that no optimization iteration needs to run a model forward pass.
+    Each sampled batch is a tuple of tensors (streams) such as (input, output) which share the batch dimension.
+
+    Batches are kept in device memory while they fit in the given device memory budget, then in host memory (pinned
+    if the optimization runs on GPU) while they fit in the given host memory budget, and the rest spills to
+    memory-mapped shard files on disk. Random minibatches are served from all the tiers and prefetched on a background
+    thread. If the device tier holds any data, minibatches are returned on the device.
+    """
+    def __init__(self, working_dir: str, max_mem_bytes: int, pin_memory: bool = False,
+                 device: Optional[torch.device] = None, max_device_bytes: int = 0):
+        """
+        :param working_dir: Directory to store shard files of activations that don't fit in memory
+        :param max_mem_bytes: Maximum number of bytes to keep in host memory
+        :param pin_memory: True to keep in-memory activations in page-locked memory for faster host-to-device copies
+        :param device: Device on which the optimization runs
+        :param max_device_bytes: Maximum number of bytes to keep in device memory. Ignored if device is None
+        """
+        self._working_dir = working_dir
+        self._max_mem_bytes = max_mem_bytes
+        self._pin_memory = pin_memory
+        self._device = device
+        self._max_device_bytes = max_device_bytes if device is not None else 0
+        self._device_bytes = 0
+        self._device_batches: List[List[torch.Tensor]] = []
+        self._device_streams: Optional[List[torch.Tensor]] = None
+        self._mem_bytes = 0
+        self._mem_batches: List[List[torch.Tensor]] = []
+        self._mem_streams: Optional[List[torch.Tensor]] = None
+        self._disk_streams: Optional[List[_DiskStream]] = None
+
+    def __len__(self):
+        return self.num_on_device + self._num_mem_rows + self.num_spilled
+
+    @property
+    def num_on_device(self) -> int:
+        """ Returns number of rows stored in device memory """
+        return self._device_streams[0].shape[0] if self._device_streams else 0
+
+    @property
+    def _num_mem_rows(self) -> int:
+        return self._mem_streams[0].shape[0] if self._mem_streams else 0
+
+    @property
+    def num_spilled(self) -> int:
+        """ Returns number of rows stored on disk """
+        return len(self._disk_streams[0]) if self._disk_streams else 0
+
+    def append(self, *tensors: torch.Tensor):
+        """
+        Add a sampled batch to the cache
+        :param tensors: Tensors of the batch, one per stream
+        """
+        num_bytes = sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+        if not self._mem_batches and self._disk_streams is None and \
+                self._device_bytes + num_bytes <= self._max_device_bytes:
+            try:
+                self._device_batches.append([tensor.detach().to(self._device) for tensor in tensors])
+                self._device_bytes += num_bytes
+                return
+            except RuntimeError as error:
+                logger.debug("Could not place cached activations data on device. RuntimeError: %s", str(error))
+                self._max_device_bytes = self._device_bytes
+
+        if self._disk_streams is None and self._mem_bytes + num_bytes <= self._max_mem_bytes:
+            self._mem_batches.append([tensor.detach().cpu() for tensor in tensors])
+            self._mem_bytes += num_bytes
+            return
+
+        if self._disk_streams is None:
+            os.makedirs(self._working_dir, exist_ok=True)
+            self._disk_streams = [_DiskStream(os.path.join(self._working_dir, f'acts_stream_{idx}.bin'))
+                                  for idx in range(len(tensors))]
+        for stream, tensor in zip(self._disk_streams, tensors):
+            stream.append(tensor)
+
+    def finalize(self):
+        """
+        Finish adding batches. Must be called before reading from the cache.
+        """
+        if self._device_batches:
+            self._device_streams = [torch.cat(stream, dim=0) for stream in zip(*self._device_batches)]
+        self._device_batches = []
+
+        if self._mem_batches:
+            self._mem_streams = [torch.cat(stream, dim=0) for stream in zip(*self._mem_batches)]
+            if self._pin_memory:
+                try:
+                    self._mem_streams = [stream.pin_memory() for stream in self._mem_streams]
+                except RuntimeError as error:
+                    logger.debug("Could not pin cached activations data. RuntimeError: %s", str(error))
+        self._mem_batches = []
+
+        if self._disk_streams:
+            for stream in self._disk_streams:
+                stream.finalize()
+            logger.debug("Spilled %d of %d cached activation samples to disk", self.num_spilled, len(self))
+
+    def get(self, indices: torch.Tensor) -> List[torch.Tensor]:
+        """
+        Gather rows at given indices from all the streams
+        :param indices: Row indices
+        :return: Gathered tensors, one per stream
+        """
+        num_device_rows = self.num_on_device
+        num_host_rows = num_device_rows + self._num_mem_rows
+        indices, _ = torch.sort(indices)
+        device_indices = indices[indices < num_device_rows]
+        mem_indices = indices[(indices >= num_device_rows) & (indices < num_host_rows)] - num_device_rows
+        disk_indices = (indices[indices >= num_host_rows] - num_host_rows).numpy()
+
+        outputs = []
+        for stream_idx in range(len(self._device_streams or self._mem_streams or self._disk_streams)):
+            parts = []
+            if mem_indices.numel():
+                parts.append(self._mem_streams[stream_idx][mem_indices])
+            if disk_indices.size:
+                parts.append(self._disk_streams[stream_idx].read(disk_indices))
+            if num_device_rows:
+                parts = [self._device_streams[stream_idx][device_indices.to(self._device)]] + \
+                        [part.to(self._device, non_blocking=True) for part in parts]
+            outputs.append(torch.cat(parts, dim=0))
+        return outputs
+
+    def iter_random_minibatches(self, batch_size: int, num_prefetch: int = 2) -> Iterator[List[torch.Tensor]]:
+        """
+        Infinite iterator of random minibatches. Minibatches are gathered on a background thread so that disk reads
+        overlap with optimization.
+
+        :param batch_size: Minibatch size
+        :param num_prefetch: Number of minibatches to prefetch
+        :return: Iterator of minibatches, each of which is a list of tensors, one per stream
+        """
+        if not self.num_spilled:
+            # All the data is in memory. Gathering is cheap enough to be done in place.
+            while True:
+                yield self.get(torch.randperm(len(self))[:batch_size])
+
+        prefetch_queue = queue.Queue(maxsize=num_prefetch)
+        stop_event = threading.Event()
+
+        def _put(item):
+            while not stop_event.is_set():
+                try:
+                    prefetch_queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def _producer():
+            try:
+                while not stop_event.is_set():
+                    _put(self.get(torch.randperm(len(self))[:batch_size]))
+            except BaseException as error: # pylint: disable=broad-except
+                # Hand the error over to the consumer, which would otherwise wait for the next minibatch forever
+                _put(error)
+
+        thread = threading.Thread(target=_producer, daemon=True)
+        thread.start()
+        try:
+            while True:
+                minibatch = prefetch_queue.get()
+                if isinstance(minibatch, BaseException):
+                    raise minibatch
+                yield minibatch
+        finally:
+            stop_event.set()
+            thread.join()
+
+    def close(self):
+        """
+        Release all the cached data and remove shard files from disk
+        """
+        self._device_batches = []
+        self._device_streams = None
+        self._mem_batches = []
+        self._mem_streams = None
+        if self._disk_streams:
+            for stream in self._disk_streams:
+                stream.close()
+        self._disk_streams = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def pin_memory(*tensors: torch.Tensor) -> Tuple[torch.Tensor, ...]:
+    """
+    Try to move tensors to page-locked host memory for faster asynchronous host-to-device copies.
+    Tensors are returned unchanged if pinning fails.
+
+    :param tensors: CPU tensors
+    :return: Pinned tensors
+    """
+    try:
+        return tuple(tensor.pin_memory() for tensor in tensors)
+    except RuntimeError as error:
+        logger.debug("Could not pin cached activations data. RuntimeError: %s", str(error))
+        return tensors
@@ -43,9 +43,12 @@ from torch.utils.data import Dataset
 # Import AIMET specific modules
 from aimet_common.utils import AimetLogger
 from aimet_torch.utils import CachedDataset, ModuleData, get_named_module, cache_intermediate_datasets,\
-    change_tensor_device_placement, in_eval_mode, save_to_cache, get_ordered_list_of_modules
+    change_tensor_device_placement, in_eval_mode, save_to_cache, get_ordered_list_of_modules, get_device,\
+    nested_map, StopForwardException
 from aimet_torch.qc_quantize_op import QcQuantizeWrapper
 from aimet_torch.quantsim import QuantizationSimModel
+from aimet_torch.meta.connectedgraph import ConnectedGraph
+from aimet_torch.adaround.activation_cache import TieredActivationCache
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
 
@@ -233,6 +236,29 @@ class ActivationSampler:
 
         return all_inp_data, all_out_data
 
+    def sample_and_cache_all_acts(self, cached_dataset: Dataset, acts_cache: TieredActivationCache,
+                                  cached_quant_dataset: Dataset = None):
+        """
+        From the original module, collect output activations and input activations to corresponding quantized
+        module, and add them to the given tiered cache which spills to disk whatever does not fit in memory.
+
+        :param cached_dataset: Cached dataset for fp32 model
+        :param acts_cache: Tiered activation cache to add (input, output) batches to
+        :param cached_quant_dataset: Cached dataset for quant model
+        """
+        iterator = iter(cached_dataset)
+        if cached_quant_dataset:
+            assert len(cached_dataset) == len(cached_quant_dataset)
+            quant_iterator = iter(cached_quant_dataset)
+        for _ in range(len(cached_dataset)):
+            if cached_quant_dataset:
+                inp_data, _ = self.sample_acts(next(quant_iterator), collect_input=True, collect_output=False)
+                _, out_data = self.sample_acts(next(iterator), collect_input=False, collect_output=True)
+            else:
+                inp_data, out_data = self.sample_acts(next(iterator))
+            acts_cache.append(inp_data, out_data)
+        acts_cache.finalize()
+
     def sample_acts(self, model_inputs: Union[torch.tensor, List, Tuple], collect_input=True, collect_output=True) -> Tuple[torch.Tensor, torch.Tensor]:
         """
         For given model_inputs, collect input activations data to quant module and
@@ -257,6 +283,201 @@ class ActivationSampler:
                                                                            collect_output=True)
         return inp_data, out_data
 
+class GroupActivationSampler:
+    """
+    For a group of modules in the original model and the corresponding modules in the weight quantized QuantSim model,
+    collect the modules' output and input activation data respectively with a single forward pass per model.
+
+    NOTE: None of the modules in the group may consume (directly or indirectly) the output of another module in
+    the group, otherwise the collected input activations would depend on the rounding of that module.
+    """
+    def __init__(self, orig_modules: List[torch.nn.Module], quant_modules: List[QcQuantizeWrapper],
+                 orig_model: torch.nn.Module, quant_model: torch.nn.Module,
+                 forward_fn: Callable[[torch.nn.Module, Any], Any]):
+        """
+        :param orig_modules: Modules from original model.
+        :param quant_modules: Quant wrappers from sim model, in the same order as orig_modules.
+        :param orig_model: Original model.
+        :param quant_model: Sim model.
+        :param forward_fn: Adapter function that performs forward pass given a model and inputs
+         yielded from the data loader.
+        """
+        assert len(orig_modules) == len(quant_modules)
+        self._orig_modules = orig_modules
+        self._quant_modules = quant_modules
+        self._orig_model = orig_model
+        self._quant_model = quant_model
+        self._forward_fn = forward_fn or ModuleData.default_forward_fn
+
+    def sample_and_place_all_acts_on_cpu(self, cached_dataset: Dataset) -> Tuple[List[torch.Tensor],
+                                                                                   List[torch.Tensor]]:
+        """
+        From the original modules, collect output activations and input activations
+        to corresponding quantized modules.
+
+        NOTE: Keeps collected activation data on CPU memory so this function should only be invoked
+        if collected activation data can be fit entirely in CPU memory.
+
+        :param cached_dataset: Cached dataset
+        :return: Per-module input data, per-module output data
+        """
+        all_inp_data = [[] for _ in self._quant_modules]
+        all_out_data = [[] for _ in self._orig_modules]
+
+        iterator = iter(cached_dataset)
+        for _ in range(len(cached_dataset)):
+            inp_data, out_data = self.sample_acts(next(iterator))
+
+            # Keep activation data on CPU memory and then append.
+            for module_inp_data, inp in zip(all_inp_data, inp_data):
+                module_inp_data.append(inp.cpu())
+            for module_out_data, out in zip(all_out_data, out_data):
+                module_out_data.append(out.cpu())
+
+        all_inp_data = [torch.cat(data, dim=0) for data in all_inp_data]
+        all_out_data = [torch.cat(data, dim=0) for data in all_out_data]
+
+        return all_inp_data, all_out_data
+
+    def sample_and_cache_all_acts(self, cached_dataset: Dataset, acts_cache: TieredActivationCache):
+        """
+        From the original modules, collect output activations and input activations to corresponding quantized
+        modules, and add them to the given tiered cache which spills to disk whatever does not fit in memory.
+        The cache streams are the inputs of all the modules followed by the outputs of all the modules.
+
+        :param cached_dataset: Cached dataset
+        :param acts_cache: Tiered activation cache to add batches to
+        """
+        iterator = iter(cached_dataset)
+        for _ in range(len(cached_dataset)):
+            inp_data, out_data = self.sample_acts(next(iterator))
+            acts_cache.append(*inp_data, *out_data)
+        acts_cache.finalize()
+
+    def sample_acts(self, model_inputs: Union[torch.tensor, List, Tuple]) -> Tuple[List[torch.Tensor],
+                                                                                    List[torch.Tensor]]:
+        """
+        For given model_inputs, collect input activations data to all quant modules and
+        output activations data from all original modules.
+
+        :param model_inputs: Model inputs.
+        :return: Per-module input and output activations data.
+        """
+        # Collect input activation data to quantized wrapper modules
+        # (with all preceding weight modules quantized)
+        inp_data, _ = self._collect_inp_out_data(self._quant_model, self._quant_modules, model_inputs,
+                                                 collect_input=True, collect_output=False)
+        # Collect output activation data from original modules
+        _, out_data = self._collect_inp_out_data(self._orig_model, self._orig_modules, model_inputs,
+                                                 collect_input=False, collect_output=True)
+        return inp_data, out_data
+
+    def _collect_inp_out_data(self, model: torch.nn.Module, modules: List[torch.nn.Module],
+                              model_input: Union[torch.tensor, List, Tuple], collect_input: bool,
+                              collect_output: bool) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+        """
+        Collect input and/or output data of all the given modules in one forward pass. The forward pass is
+        early-terminated as soon as the data of every module has been collected.
+
+        :param model: Model to run forward pass on
+        :param modules: Modules of the model to collect data from
+        :param model_input: Input to model
+        :param collect_input: Boolean to collect input or not
+        :param collect_output: Boolean to collect output or not
+        :return: Per-module input and output data
+        """
+        def adjust_input_dtype(module, inp):
+            if hasattr(module, 'weight') and module.weight is not None:
+                dtype = module.weight.dtype
+                return nested_map(inp, lambda x: x.to(dtype) if x.is_floating_point() else x)
+            return inp
+
+        inp_data = {}
+        out_data = {}
+
+        def _hook_to_collect_inp_out_data(module, inp, out):
+            if module in inp_data or module in out_data:
+                # Only the first invocation of the module is collected
+                return
+
+            if collect_input:
+                inp_data[module] = inp[0].detach()
+            if collect_output:
+                out_data[module] = out.detach()
+
+            if len(inp_data) + len(out_data) == len(modules) * (int(collect_input) + int(collect_output)):
+                raise StopForwardException
+
+        handles = [mod.register_forward_pre_hook(adjust_input_dtype) for mod in model.modules()]
+        handles += [module.register_forward_hook(_hook_to_collect_inp_out_data) for module in modules]
+
+        model_input = change_tensor_device_placement(model_input, get_device(model))
+
+        try:
+            with in_eval_mode(model), torch.no_grad():
+                _ = self._forward_fn(model, model_input)
+        except StopForwardException:
+            pass
+        finally:
+            for handle in handles:
+                handle.remove()
+
+        inp_data = [inp_data.get(module) for module in modules] if collect_input else None
+        out_data = [out_data.get(module) for module in modules] if collect_output else None
+
+        return inp_data, out_data
+
+
+def create_dependency_level_schedule(model: torch.nn.Module, dummy_input: Union[torch.Tensor, Tuple],
+                                     modules: List[Tuple[str, torch.nn.Module]]) \
+        -> List[List[Tuple[str, torch.nn.Module]]]:
+    """
+    Partitions the given modules into dependency levels. A module is placed one level after the deepest module
+    (among the given modules) that it transitively consumes the output of. Hence, the input activations of all the
+    modules in a level only depend on modules in earlier levels, and modules in the same level can be optimized
+    concurrently. For example, all the projections consuming the same input in a transformer block end up in the
+    same level.
+
+    NOTE: If any of the given modules is invoked more than once in the forward pass or can't be located in the
+    connected graph, falls back to a sequential schedule with one module per level.
+
+    :param model: Original FP model.
+    :param dummy_input: Model inputs.
+    :param modules: List of (name, module) in order of occurrence.
+    :return: List of levels, each of which is a list of (name, module) in order of occurrence.
+    """
+    sequential_schedule = [[name_module_pair] for name_module_pair in modules]
+
+    graph = ConnectedGraph(model, dummy_input)
+    target_modules = {module for _, module in modules}
+
+    module_to_ops = {}
+    for op in graph.ordered_ops:
+        if op.get_module() in target_modules:
+            module_to_ops.setdefault(op.get_module(), []).append(op)
+
+    if len(module_to_ops) != len(target_modules) or any(len(ops) > 1 for ops in module_to_ops.values()):
+        logger.info('Some modules are shared or not found in the connected graph. Using sequential schedule.')
+        return sequential_schedule
+
+    # Depth of an op is the number of target modules on the longest path from model inputs to the op (exclusive).
+    # ordered_ops is topologically sorted, so producers are always visited before consumers.
+    op_depth = {}
+    for op in graph.ordered_ops:
+        depth = 0
+        for input_op in op.input_ops:
+            is_target = input_op.get_module() in target_modules
+            depth = max(depth, op_depth.get(input_op, 0) + int(is_target))
+        op_depth[op] = depth
+
+    levels = {}
+    for name, module in modules:
+        depth = op_depth[module_to_ops[module][0]]
+        levels.setdefault(depth, []).append((name, module))
+
+    return [levels[depth] for depth in sorted(levels)]
+
+
 def create_cached_block_schedule_list(model: torch.nn.Module, dummy_input, block_names: List[str], supported_modules: Tuple[Type]) \
         -> List[Tuple[Optional[Tuple[torch.nn.Module, str]], List[Tuple[str, torch.nn.Module]]]]:
     """
@@ -37,7 +37,7 @@
 
 """ Loss function for Adaround """
 
-from typing import Tuple
+from typing import Tuple, List
 import numpy as np
 import torch
 
@@ -49,17 +49,26 @@ class AdaroundHyperParameters:
     """
     Hyper parameters for Adaround
     """
-    def __init__(self, num_iterations: int, reg_param: float, beta_range: Tuple, warm_start: float):
+    def __init__(self, num_iterations: int, reg_param: float, beta_range: Tuple, warm_start: float,
+                 early_stop_tol: float = None, early_stop_check_interval: int = 100, max_extra_iterations: int = 0):
         """
         :param num_iterations: Number of maximum iterations to adaround layer
         :param reg_param: Regularization parameter, trading off between rounding loss vs reconstruction loss
         :param beta_range: Start and stop parameters for annealing of rounding loss (start_beta, end_beta)
         :param warm_start: Warm up period, during which rounding loss has zero effect
+        :param early_stop_tol: Tolerance used to terminate optimization of a layer early once it has converged.
+         None disables early stopping
+        :param early_stop_check_interval: Number of iterations between two consecutive convergence checks
+        :param max_extra_iterations: Maximum number of iterations to run past num_iterations if the optimization hasn't
+         converged by then. Warm start and annealing schedules always span num_iterations
         """
         self.num_iterations = num_iterations
         self.reg_param = reg_param
         self.beta_range = beta_range
         self.warm_start = warm_start
+        self.early_stop_tol = early_stop_tol
+        self.early_stop_check_interval = early_stop_check_interval
+        self.max_extra_iterations = max_extra_iterations
 
 
 class AdaroundLoss:
@@ -95,11 +104,11 @@ class AdaroundLoss:
 
         else:
             # compute rectified sigmoid of parameter 'alpha' which maps it between zero and one
-            h_alpha = torch.clamp(torch.sigmoid(alpha) * (AdaroundConstants.ZETA - AdaroundConstants.GAMMA) +
-                                  AdaroundConstants.GAMMA, 0, 1)
+            h_alpha = cls.compute_rectified_sigmoid(alpha)
 
-            # compute beta parameter to anneal the rounding loss
-            beta = cls._compute_beta(opt_params.num_iterations, cur_iter, opt_params.beta_range, opt_params.warm_start)
+            # compute beta parameter to anneal the rounding loss. Extra iterations past num_iterations use end beta
+            beta = cls._compute_beta(opt_params.num_iterations, min(cur_iter, opt_params.num_iterations - 1),
+                                     opt_params.beta_range, opt_params.warm_start)
 
             # calculate regularization term - which ensures parameter to converge to exactly zeros and ones
             # at the end of optimization
@@ -110,6 +119,16 @@ class AdaroundLoss:
 
         return round_loss
 
+    @staticmethod
+    def compute_rectified_sigmoid(alpha: torch.Tensor) -> torch.Tensor:
+        """
+        Compute rectified sigmoid of parameter 'alpha' which maps it between zero and one
+        :param alpha: parameter 'alpha', float32 tensor same shape as weight tensor
+        :return: rectified sigmoid of alpha
+        """
+        return torch.clamp(torch.sigmoid(alpha) * (AdaroundConstants.ZETA - AdaroundConstants.GAMMA) +
+                           AdaroundConstants.GAMMA, 0, 1)
+
     @staticmethod
     def _compute_beta(max_iter: int, cur_iter: int, beta_range: Tuple, warm_start: float) -> float:
         """
@@ -133,3 +152,83 @@ class AdaroundLoss:
         beta = end_beta + 0.5 * (start_beta - end_beta) * (1 + np.cos(rel_iter * np.pi))
 
         return beta
+
+
+class AdaroundConvergenceMonitor:
+    """
+    Monitors convergence of weight rounding optimization of a layer (or a group of layers optimized jointly).
+
+    The optimization is considered converged once the warm start period is over, at least (1 - early_stop_tol)
+    fraction of the alpha entries have been hardened to exactly zero or one by the rectified sigmoid, and the mean
+    reconstruction loss over the last check interval improved by no more than early_stop_tol relative to the
+    previous interval.
+    """
+    def __init__(self, opt_params: AdaroundHyperParameters):
+        """
+        :param opt_params: Optimization parameters for Adaround
+        """
+        self._tol = opt_params.early_stop_tol
+        self._check_interval = opt_params.early_stop_check_interval
+        self._warm_start_end_iter = opt_params.warm_start * opt_params.num_iterations
+        self._recon_loss_sum = 0
+        self._num_recon_losses = 0
+        self._prev_recon_loss = None
+        self.hardened_fraction = 0.
+
+    @property
+    def enabled(self) -> bool:
+        """ Returns True if early stopping is enabled """
+        return self._tol is not None
+
+    def update(self, recon_loss: torch.Tensor):
+        """
+        Accumulate reconstruction loss of the current iteration. The loss is kept on device to avoid
+        synchronizing every iteration.
+        :param recon_loss: reconstruction loss of the current iteration
+        """
+        if self.enabled:
+            self._recon_loss_sum = self._recon_loss_sum + recon_loss.detach()
+            self._num_recon_losses += 1
+
+    def is_check_iteration(self, cur_iter: int) -> bool:
+        """
+        Returns True if convergence should be checked at the given iteration
+        :param cur_iter: current iteration
+        """
+        return self.enabled and (cur_iter + 1) % self._check_interval == 0
+
+    def has_converged(self, cur_iter: int, alphas: List[torch.Tensor]) -> bool:
+        """
+        Check convergence. Expected to be called only at check iterations.
+        :param cur_iter: current iteration
+        :param alphas: 'alpha' parameters being optimized
+        :return: True if optimization has converged
+        """
+        recon_loss = float(self._recon_loss_sum) / max(self._num_recon_losses, 1)
+        self._recon_loss_sum = 0
+        self._num_recon_losses = 0
+        prev_recon_loss, self._prev_recon_loss = self._prev_recon_loss, recon_loss
+
+        if cur_iter < self._warm_start_end_iter or prev_recon_loss is None:
+            return False
+
+        self.hardened_fraction = self.compute_hardened_fraction(alphas)
+        rel_improvement = (prev_recon_loss - recon_loss) / max(abs(prev_recon_loss), np.finfo(np.float32).eps)
+
+        return self.hardened_fraction >= 1 - self._tol and rel_improvement <= self._tol
+
+    @staticmethod
+    def compute_hardened_fraction(alphas: List[torch.Tensor]) -> float:
+        """
+        Compute fraction of alpha entries for which rectified sigmoid is exactly zero or one
+        :param alphas: 'alpha' parameters
+        :return: fraction of hardened entries
+        """
+        num_hardened = 0
+        num_total = 0
+        with torch.no_grad():
+            for alpha in alphas:
+                h_alpha = AdaroundLoss.compute_rectified_sigmoid(alpha)
+                num_hardened += int(((h_alpha == 0) | (h_alpha == 1)).sum())
+                num_total += h_alpha.numel()
+        return num_hardened / max(num_total, 1)
@@ -37,8 +37,10 @@
 
 """ Adaround optimizer """
 
-from typing import Union, Tuple, Callable, Any
+from typing import Union, Tuple, Callable, Any, List
 from functools import reduce
+import contextlib
+import tempfile
 import psutil
 import numpy as np
 import torch
@@ -50,8 +52,9 @@ import torch.distributed as dist
 from aimet_common.utils import AimetLogger
 from aimet_torch import utils
 from aimet_torch.qc_quantize_op import StaticGridQuantWrapper
-from aimet_torch.adaround.activation_sampler import ActivationSampler
-from aimet_torch.adaround.adaround_loss import AdaroundLoss, AdaroundHyperParameters
+from aimet_torch.adaround.activation_sampler import ActivationSampler, GroupActivationSampler
+from aimet_torch.adaround.activation_cache import TieredActivationCache, pin_memory
+from aimet_torch.adaround.adaround_loss import AdaroundLoss, AdaroundHyperParameters, AdaroundConvergenceMonitor
 from aimet_torch.adaround.adaround_wrapper import AdaroundWrapper
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
@@ -70,7 +73,7 @@ class AdaroundOptimizer:
                         orig_model: torch.nn.Module, quant_model: torch.nn.Module,
                         act_func: Union[torch.nn.Module, None], cached_dataset: Dataset,
                         forward_fn: Callable[[torch.nn.Module, Any], Any],
-                        opt_params: AdaroundHyperParameters, cached_quant_dataset: Dataset = None):
+                        opt_params: AdaroundHyperParameters, cached_quant_dataset: Dataset = None) -> int:
         """
         Adaround module
         :param module: Original module
@@ -83,6 +86,7 @@ class AdaroundOptimizer:
          yielded from the data loader
         :param cached_quant_dataset: Cached dataset for quant model
         :param opt_params: Optimization parameters
+        :return: Number of iterations used to optimize the module
         """
         # pylint: disable=too-many-locals, too-many-arguments
         assert isinstance(quant_module, AdaroundWrapper), '%s is not adaround wrapper module.' % quant_module
@@ -101,8 +105,8 @@ class AdaroundOptimizer:
                      recons_err_hard)
 
         # Optimize weight rounding
-        cls._optimize_rounding(module, quant_module, orig_model, quant_model, act_func, cached_dataset, forward_fn,
-                               opt_params, cached_quant_dataset)
+        iterations_used = cls._optimize_rounding(module, quant_module, orig_model, quant_model, act_func,
+                                                 cached_dataset, forward_fn, opt_params, cached_quant_dataset)
 
         recons_err_hard, recons_err_soft = cls._compute_recons_metrics(quant_module, act_func, inp_data, out_data)
         logger.debug("After opt, Recons. error metrics using soft rounding=%f and hard rounding=%f", recons_err_soft,
@@ -111,19 +115,23 @@ class AdaroundOptimizer:
         # After optimization, set the optimized layer's rounding mode to "Hard rounding"
         quant_module.use_soft_rounding = False
 
+        return iterations_used
+
     @classmethod
     def _optimize_rounding(cls, module: torch.nn.Module, quant_module: AdaroundWrapper,
                            orig_model: torch.nn.Module, quant_model: torch.nn.Module,
                            act_func: Union[torch.nn.Module, None], cached_dataset: Dataset,
                            forward_fn: Callable[[torch.nn.Module, Any], Any],
-                           opt_params: AdaroundHyperParameters, cached_quant_dataset: Dataset = None):
+                           opt_params: AdaroundHyperParameters, cached_quant_dataset: Dataset = None) -> int:
         """
         Optimizes the weight rounding of quantized wrapper module.
 
         NOTE:
         1) Tries to cache intermediate activation data on CPU RAM. If succeeds, tries to place cached intermediate
-         activation data on GPU else keep it on CPU RAM only and incur CPU-GPU memory transfer.
-        2) If 1) fails, reads model inputs dirctly from the disk.
+         activation data on GPU else keep it on pinned CPU RAM only and incur CPU-GPU memory transfer.
+        2) If 1) fails, samples intermediate activation data once, keeps as much as fits on CPU RAM and spills the
+         rest to memory-mapped files on disk, from which random batches are prefetched in the background.
+        3) If caching is disabled, samples intermediate activation data from model inputs on every iteration.
 
         :param module: Original module
         :param quant_module: Adaround wrapper module
@@ -134,6 +142,8 @@ class AdaroundOptimizer:
         :param forward_fn: Adapter function that performs forward pass given a model and inputs
          yielded from the data loader
         :param opt_params: Optimization parameters
+        :return: Number of iterations used. Less than opt_params.num_iterations if optimization converged early, more
+         if it hadn't converged by then and extra iterations were granted
         """
         # pylint: disable=too-many-locals, too-many-arguments, too-many-branches, too-many-statements
         if dist.is_initialized():
@@ -168,58 +178,297 @@ class AdaroundOptimizer:
         del inp_data, out_data
 
         device = utils.get_device(module)
-        if use_cache_acts_data and AdaroundOptimizer.enable_caching_acts_data():
-            all_inp_data, all_orig_out_data = act_sampler.sample_and_place_all_acts_on_cpu(cached_dataset,
-                                                                                           cached_quant_dataset)
-            # Place both the models temporarily to CPU
-            # Try to put all cached activations data on GPU for faster optimization if possible.
-            if 'cuda' in str(device):
-                orig_model.cpu()
-                quant_model.cpu()
-                all_inp_data, all_orig_out_data = cls._place_cached_acts_data(all_inp_data, all_orig_out_data, device)
-
-        for iteration in range(opt_params.num_iterations // world_size):
+        with contextlib.ExitStack() as exit_stack:
+            # Activations data and models are released and placed back to original device even if optimization fails
+            exit_stack.callback(quant_model.to, device)
+            exit_stack.callback(orig_model.to, device)
+
             if use_cache_acts_data and AdaroundOptimizer.enable_caching_acts_data():
-                indices = torch.randperm(all_inp_data.size(0))[:BATCH_SIZE]
-                inp_data = all_inp_data[indices].to(device)
-                orig_out_data = all_orig_out_data[indices].to(device)
-            else:
-                model_inputs = cached_dataset[np.random.randint(len(cached_dataset))]
-                inp_data, orig_out_data = act_sampler.sample_acts(model_inputs)
+                all_inp_data, all_orig_out_data = act_sampler.sample_and_place_all_acts_on_cpu(cached_dataset,
+                                                                                               cached_quant_dataset)
+                # Place both the models temporarily to CPU
+                # Try to put all cached activations data on GPU for faster optimization if possible.
+                if 'cuda' in str(device):
+                    orig_model.cpu()
+                    quant_model.cpu()
+                    all_inp_data, all_orig_out_data = cls._place_cached_acts_data(all_inp_data, all_orig_out_data,
+                                                                                  device)
+            elif AdaroundOptimizer.enable_caching_acts_data():
+                acts_cache_dir = exit_stack.enter_context(tempfile.TemporaryDirectory())
+                acts_cache = exit_stack.enter_context(cls._create_acts_cache(acts_cache_dir, device))
+                act_sampler.sample_and_cache_all_acts(cached_dataset, acts_cache, cached_quant_dataset)
+                minibatches = acts_cache.iter_random_minibatches(BATCH_SIZE)
+                exit_stack.callback(minibatches.close)
+                # Models aren't needed anymore until the optimization is done
+                if 'cuda' in str(device):
+                    orig_model.cpu()
+                    quant_model.cpu()
+
+            num_iterations = opt_params.num_iterations // world_size
+            max_iterations = num_iterations + opt_params.max_extra_iterations // world_size
+            iterations_used = max_iterations
+            monitor = AdaroundConvergenceMonitor(opt_params)
+            for iteration in range(max_iterations):
+                if use_cache_acts_data and AdaroundOptimizer.enable_caching_acts_data():
+                    indices = torch.randperm(all_inp_data.size(0))[:BATCH_SIZE]
+                    inp_data = all_inp_data[indices].to(device, non_blocking=True)
+                    orig_out_data = all_orig_out_data[indices].to(device, non_blocking=True)
+                elif AdaroundOptimizer.enable_caching_acts_data():
+                    inp_data, orig_out_data = (data.to(device, non_blocking=True) for data in next(minibatches))
+                else:
+                    model_inputs = cached_dataset[np.random.randint(len(cached_dataset))]
+                    inp_data, orig_out_data = act_sampler.sample_acts(model_inputs)
+
+                # Clear alpha's gradients before optimization step
+                optimizer.zero_grad()
+
+                try:
+                    quant_out_data = cls._compute_output_with_adarounded_weights(quant_module, inp_data)
+                    if act_func is not None:
+                        orig_out_data = act_func(orig_out_data)
+                        quant_out_data = act_func(quant_out_data)
+
+                    # Calculate total loss
+                    recon_loss = AdaroundLoss.compute_recon_loss(quant_out_data, orig_out_data)
+                    round_loss = AdaroundLoss.compute_round_loss(quant_module.alpha, opt_params, iteration)
+                    total_loss = recon_loss + round_loss
+                    total_loss.backward()
+                    monitor.update(recon_loss)
+
+                except RuntimeError as error:
+                    if use_cache_acts_data and 'cuda' in str(device) and AdaroundOptimizer.enable_caching_acts_data():
+                        logger.debug("Not enough CUDA memory for adaround optimization."
+                                     " Placed cached activations data on CPU. RuntimeError: %s", str(error))
+                        all_inp_data = all_inp_data.cpu()
+                        all_orig_out_data = all_orig_out_data.cpu()
+                    else:
+                        raise error
+
+                if dist.is_initialized():
+                    dist.all_reduce(quant_module.alpha.grad)
+                quant_module.alpha.grad /= world_size
+
+                optimizer.step()
+
+                # Extra iterations are only spent if the optimization hasn't converged by num_iterations
+                if cls._has_converged(monitor, iteration, [quant_module.alpha],
+                                      force=iteration + 1 == num_iterations < max_iterations):
+                    iterations_used = iteration + 1
+                    break
+
+        return iterations_used * world_size
 
-            # Clear alpha's gradients before optimization step
-            optimizer.zero_grad()
+    @classmethod
+    def adaround_modules(cls, modules: List[torch.nn.Module], quant_modules: List[AdaroundWrapper],
+                         orig_model: torch.nn.Module, quant_model: torch.nn.Module,
+                         act_funcs: List[Union[torch.nn.Module, None]], cached_dataset: Dataset,
+                         forward_fn: Callable[[torch.nn.Module, Any], Any],
+                         opt_params: AdaroundHyperParameters) -> int:
+        """
+        Adaround a group of modules jointly. The input activations of the modules must not depend on the outputs
+        of each other. Rounding parameters of all the modules are optimized together with a single optimizer
+        so that every iteration runs one backward pass and one optimizer step for the whole group.
 
-            try:
-                quant_out_data = cls._compute_output_with_adarounded_weights(quant_module, inp_data)
-                if act_func is not None:
-                    orig_out_data = act_func(orig_out_data)
-                    quant_out_data = act_func(quant_out_data)
-
-                # Calculate total loss
-                recon_loss = AdaroundLoss.compute_recon_loss(quant_out_data, orig_out_data)
-                round_loss = AdaroundLoss.compute_round_loss(quant_module.alpha, opt_params, iteration)
-                total_loss = recon_loss + round_loss
-                total_loss.backward()
+        :param modules: Original modules
+        :param quant_modules: Adaround wrapper modules, in the same order as modules
+        :param orig_model: The original, un quantized, model
+        :param quant_model: QuantSim model
+        :param act_funcs: Activation function following each module
+        :param cached_dataset: Cached dataset
+        :param forward_fn: Adapter function that performs forward pass given a model and inputs
+         yielded from the data loader
+        :param opt_params: Optimization parameters
+        :return: Number of iterations used to optimize the group
+        """
+        # pylint: disable=too-many-arguments
+        if len(modules) == 1:
+            return cls.adaround_module(modules[0], quant_modules[0], orig_model, quant_model, act_funcs[0],
+                                       cached_dataset, forward_fn, opt_params)
 
-            except RuntimeError as error:
-                if use_cache_acts_data and 'cuda' in str(device) and AdaroundOptimizer.enable_caching_acts_data():
-                    logger.debug("Not enough CUDA memory for adaround optimization."
-                                 " Placed cached activations data on CPU. RuntimeError: %s", str(error))
-                    all_inp_data = all_inp_data.cpu()
-                    all_orig_out_data = all_orig_out_data.cpu()
+        for quant_module in quant_modules:
+            assert isinstance(quant_module, AdaroundWrapper), '%s is not adaround wrapper module.' % quant_module
+
+        act_sampler = GroupActivationSampler(modules, quant_modules, orig_model, quant_model, forward_fn)
+        inp_data, out_data = act_sampler.sample_acts(cached_dataset[0])
+
+        for quant_module, act_func, inp, out in zip(quant_modules, act_funcs, inp_data, out_data):
+            recons_err_hard, recons_err_soft = cls._compute_recons_metrics(quant_module, act_func, inp, out)
+            logger.debug("Before opt, Recons. error metrics using soft rounding=%f and hard rounding=%f",
+                         recons_err_soft, recons_err_hard)
+
+        # Optimize weight rounding
+        iterations_used = cls._optimize_rounding_jointly(modules, quant_modules, orig_model, quant_model, act_funcs,
+                                                         cached_dataset, forward_fn, opt_params)
+
+        for quant_module, act_func, inp, out in zip(quant_modules, act_funcs, inp_data, out_data):
+            recons_err_hard, recons_err_soft = cls._compute_recons_metrics(quant_module, act_func, inp, out)
+            logger.debug("After opt, Recons. error metrics using soft rounding=%f and hard rounding=%f",
+                         recons_err_soft, recons_err_hard)
+
+            # After optimization, set the optimized layer's rounding mode to "Hard rounding"
+            quant_module.use_soft_rounding = False
+
+        return iterations_used
+
+    @classmethod
+    def _optimize_rounding_jointly(cls, modules: List[torch.nn.Module], quant_modules: List[AdaroundWrapper],
+                                   orig_model: torch.nn.Module, quant_model: torch.nn.Module,
+                                   act_funcs: List[Union[torch.nn.Module, None]], cached_dataset: Dataset,
+                                   forward_fn: Callable[[torch.nn.Module, Any], Any],
+                                   opt_params: AdaroundHyperParameters) -> int:
+        """
+        Optimizes the weight rounding of a group of independent quantized wrapper modules.
+
+        Since Adam updates each element of its parameters independently and the reconstruction loss of a module
+        only depends on its own alpha, minimizing the sum of per-module losses is equivalent to optimizing every
+        module on its own.
+
+        :param modules: Original modules
+        :param quant_modules: Adaround wrapper modules
+        :param orig_model: The original, un quantized, model
+        :param quant_model: QuantSim model
+        :param act_funcs: Activation function following each module
+        :param cached_dataset: Cached dataset
+        :param forward_fn: Adapter function that performs forward pass given a model and inputs
+         yielded from the data loader
+        :param opt_params: Optimization parameters
+        :return: Number of iterations used. Less than opt_params.num_iterations if optimization converged early, more
+         if it hadn't converged by then and extra iterations were granted
+        """
+        # pylint: disable=too-many-locals, too-many-arguments, too-many-branches, too-many-statements
+        if dist.is_initialized():
+            rank = dist.get_rank()
+            world_size = dist.get_world_size()
+        else:
+            rank = 0
+            world_size = 1
+
+        # Shard dataset
+        indices = tuple(range(rank, len(cached_dataset), world_size))
+        cached_dataset = Subset(cached_dataset, indices=indices)
+
+        for quant_module in quant_modules:
+            assert quant_module.use_soft_rounding, 'optimization should use soft rounding only.'
+            assert quant_module.alpha is not None, 'alpha parameter should be initialized.'
+
+        # Single Adam optimizer over the 'alpha' parameters of all the modules
+        optimizer = torch.optim.Adam([quant_module.alpha for quant_module in quant_modules])
+
+        for group in optimizer.param_groups:
+            group['lr'] *= world_size # Scale up learning rate by world_size
+
+        # Check if we can cache intermediate activation data of all the modules.
+        act_sampler = GroupActivationSampler(modules, quant_modules, orig_model, quant_model, forward_fn)
+        inp_data, out_data = act_sampler.sample_acts(cached_dataset[0])
+        inp_numel = sum(inp.numel() for inp in inp_data)
+        out_numel = sum(out.numel() for out in out_data)
+        use_cache_acts_data = cls._can_cache_acts_data(len(cached_dataset), (inp_numel,), (out_numel,),
+                                                       inp_data[0].dtype)
+        use_cache_acts_data = use_cache_acts_data and AdaroundOptimizer.enable_caching_acts_data()
+        del inp_data, out_data
+
+        device = utils.get_device(modules[0])
+        with contextlib.ExitStack() as exit_stack:
+            # Activations data and models are released and placed back to original device even if optimization fails
+            exit_stack.callback(quant_model.to, device)
+            exit_stack.callback(orig_model.to, device)
+
+            if use_cache_acts_data:
+                all_inp_data, all_orig_out_data = act_sampler.sample_and_place_all_acts_on_cpu(cached_dataset)
+                # Place both the models temporarily to CPU
+                # Try to put all cached activations data on GPU for faster optimization if possible.
+                if 'cuda' in str(device):
+                    orig_model.cpu()
+                    quant_model.cpu()
+                    for idx, (inp, out) in enumerate(zip(all_inp_data, all_orig_out_data)):
+                        all_inp_data[idx], all_orig_out_data[idx] = cls._place_cached_acts_data(inp, out, device)
+            elif AdaroundOptimizer.enable_caching_acts_data():
+                acts_cache_dir = exit_stack.enter_context(tempfile.TemporaryDirectory())
+                acts_cache = exit_stack.enter_context(cls._create_acts_cache(acts_cache_dir, device))
+                act_sampler.sample_and_cache_all_acts(cached_dataset, acts_cache)
+                minibatches = acts_cache.iter_random_minibatches(BATCH_SIZE)
+                exit_stack.callback(minibatches.close)
+                # Models aren't needed anymore until the optimization is done
+                if 'cuda' in str(device):
+                    orig_model.cpu()
+                    quant_model.cpu()
+
+            num_iterations = opt_params.num_iterations // world_size
+            max_iterations = num_iterations + opt_params.max_extra_iterations // world_size
+            iterations_used = max_iterations
+            monitor = AdaroundConvergenceMonitor(opt_params)
+            for iteration in range(max_iterations):
+                if use_cache_acts_data:
+                    indices = torch.randperm(all_inp_data[0].size(0))[:BATCH_SIZE]
+                    inp_data = [inp[indices].to(device, non_blocking=True) for inp in all_inp_data]
+                    orig_out_data = [out[indices].to(device, non_blocking=True) for out in all_orig_out_data]
+                elif AdaroundOptimizer.enable_caching_acts_data():
+                    minibatch = [data.to(device, non_blocking=True) for data in next(minibatches)]
+                    inp_data, orig_out_data = minibatch[:len(quant_modules)], minibatch[len(quant_modules):]
                 else:
-                    raise error
+                    model_inputs = cached_dataset[np.random.randint(len(cached_dataset))]
+                    inp_data, orig_out_data = act_sampler.sample_acts(model_inputs)
+
+                # Clear alphas' gradients before optimization step
+                optimizer.zero_grad()
+
+                total_loss = 0
+                total_recon_loss = 0
+                for quant_module, act_func, inp, orig_out in zip(quant_modules, act_funcs, inp_data, orig_out_data):
+                    quant_out = cls._compute_output_with_adarounded_weights(quant_module, inp)
+                    if act_func is not None:
+                        orig_out = act_func(orig_out)
+                        quant_out = act_func(quant_out)
+
+                    # Calculate total loss
+                    recon_loss = AdaroundLoss.compute_recon_loss(quant_out, orig_out)
+                    round_loss = AdaroundLoss.compute_round_loss(quant_module.alpha, opt_params, iteration)
+                    total_loss = total_loss + recon_loss + round_loss
+                    total_recon_loss = total_recon_loss + recon_loss
+                total_loss.backward()
+                monitor.update(total_recon_loss)
 
-            if dist.is_initialized():
-                dist.all_reduce(quant_module.alpha.grad)
-            quant_module.alpha.grad /= world_size
+                for quant_module in quant_modules:
+                    if dist.is_initialized():
+                        dist.all_reduce(quant_module.alpha.grad)
+                    quant_module.alpha.grad /= world_size
 
-            optimizer.step()
+                optimizer.step()
 
-        # Place both the models back to original device
-        orig_model.to(device)
-        quant_model.to(device)
+                # Extra iterations are only spent if the optimization hasn't converged by num_iterations
+                if cls._has_converged(monitor, iteration, [quant_module.alpha for quant_module in quant_modules],
+                                      force=iteration + 1 == num_iterations < max_iterations):
+                    iterations_used = iteration + 1
+                    break
+
+        return iterations_used * world_size
+
+    @staticmethod
+    def _has_converged(monitor: AdaroundConvergenceMonitor, iteration: int, alphas: List[torch.Tensor],
+                       force: bool = False) -> bool:
+        """
+        Check convergence of the optimization at check iterations. In distributed setting, the decision of
+        rank 0 is broadcast so that all the ranks stop at the same iteration.
+
+        :param monitor: Convergence monitor
+        :param iteration: Current iteration
+        :param alphas: 'alpha' parameters being optimized
+        :param force: If True, check convergence even if the current iteration is not a check iteration
+        :return: True if optimization has converged
+        """
+        if not monitor.enabled or not (force or monitor.is_check_iteration(iteration)):
+            return False
+
+        converged = monitor.has_converged(iteration, alphas)
+        if dist.is_initialized():
+            converged_flag = torch.tensor(int(converged), device=alphas[0].device)
+            dist.broadcast(converged_flag, src=0)
+            converged = bool(converged_flag)
+
+        if converged:
+            logger.debug("Converged at iteration %d with %f of alpha entries hardened",
+                         iteration + 1, monitor.hardened_fraction)
+        return converged
 
     @classmethod
     def _compute_recons_metrics(cls, quant_module: AdaroundWrapper, act_func, inp_data: torch.Tensor,
@@ -358,8 +607,38 @@ class AdaroundOptimizer:
                 logger.debug("Could not place cached activations data on GPU."
                              " Placed cached activations data on CPU. RuntimeError: %s", str(error))
 
+        if inp_data.device.type == 'cpu':
+            # Page-locked memory allows asynchronous CPU-GPU memory transfer of sampled batches
+            inp_data, out_data = pin_memory(inp_data, out_data)
+
         return inp_data, out_data
 
+    @staticmethod
+    def _create_acts_cache(working_dir: str, device: torch.device) -> TieredActivationCache:
+        """
+        Create tiered activation cache for activations data which can't be fit entirely in CPU memory.
+        On GPU, as much data as the threshold GPU memory allows is kept on GPU. Then as much data as the threshold CPU
+        memory allows is kept in CPU memory and the rest is spilled to disk.
+
+        :param working_dir: Directory to spill activations data to
+        :param device: Device on which the optimization runs
+        :return: Tiered activation cache
+        """
+        threshold_mem = psutil.virtual_memory().available * EMPIRICAL_THRESHOLD
+        logger.debug("Activations data can't be fit in CPU memory. Spilling activations data exceeding %f GB to disk.",
+                     threshold_mem / (1024 * 1024 * 1024))
+
+        if 'cuda' not in str(device):
+            return TieredActivationCache(working_dir, int(threshold_mem))
+
+        torch.cuda.empty_cache()
+        threshold_device_mem = torch.cuda.get_device_properties(device).total_memory - \
+                               torch.cuda.memory_allocated(device)
+        threshold_device_mem = threshold_device_mem * EMPIRICAL_THRESHOLD
+        logger.debug("Keeping up to %f GB of activations data on GPU.", threshold_device_mem / (1024 * 1024 * 1024))
+        return TieredActivationCache(working_dir, int(threshold_mem), pin_memory=True,
+                                     device=device, max_device_bytes=int(threshold_device_mem))
+
     @staticmethod
     def enable_caching_acts_data() -> bool:
         """
@@ -38,6 +38,7 @@
 """ Top level API for Adaptive Rounding - Post-Training Quantization (PTQ) """
 
 import os
+import copy
 import contextlib
 import itertools
 import json
@@ -49,6 +50,7 @@ from tqdm import tqdm
 
 # Import AIMET specific modules
 from aimet_common.utils import AimetLogger, convert_configs_values_to_bool
+from aimet_common import tracing
 from aimet_common.defs import QuantScheme, QuantizationDataType
 
 from aimet_torch import utils
@@ -61,7 +63,7 @@ from aimet_torch.adaround.adaround_wrapper import AdaroundWrapper
 from aimet_torch.adaround.adaround_optimizer import AdaroundOptimizer
 from aimet_torch.adaround.adaround_loss import AdaroundHyperParameters
 from aimet_torch.adaround.activation_sampler import create_modulelist_for_group_modules, get_block_inputs, \
-    get_block_outputs, create_cached_block_schedule_list
+    get_block_outputs, create_cached_block_schedule_list, create_dependency_level_schedule
 from aimet_torch.utils import get_named_module
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
@@ -69,6 +71,10 @@ logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
 # The following modules with weights are supported by Adaround
 AdaroundSupportedModules = (torch.nn.Conv2d, torch.nn.ConvTranspose2d, torch.nn.Linear)
 
+# Maximum number of extra iterations, relative to num_iterations, that a layer which hasn't converged by
+# num_iterations can borrow from the iterations saved by layers that converged early
+MAX_EXTRA_ITERATIONS_RATIO = 1.0
+
 
 class AdaroundParameters:
     """
@@ -77,7 +83,8 @@ class AdaroundParameters:
     def __init__(self, data_loader: DataLoader, num_batches: int,
                  default_num_iterations: int = None, default_reg_param: float = 0.01,
                  default_beta_range: Tuple = (20, 2), default_warm_start: float = 0.2,
-                 forward_fn: Callable[[torch.nn.Module, Any], Any] = None):
+                 forward_fn: Callable[[torch.nn.Module, Any], Any] = None,
+                 optimize_independent_layers_jointly: bool = False, default_early_stop_tol: float = None):
         """
         :param data_loader: Data loader
         :param num_batches: Number of batches to be used for Adaround.
@@ -92,6 +99,17 @@ class AdaroundParameters:
         :param forward_fn: Optional adapter function that performs forward pass given a model and inputs
          yielded from the data loader. The function expects model as first argument and inputs to model
          as second argument.
+        :param optimize_independent_layers_jointly: If True, layers are grouped into dependency levels such that the
+         input activations of a layer don't depend on the rounding of any other layer in the same level
+         (e.g. all the projections consuming the same input), and the rounding of each level is optimized jointly.
+         AdaRound time then scales with the number of dependency levels rather than the number of layers.
+         Not applicable when a checkpoints config is used. Default False
+        :param default_early_stop_tol: If set, optimization of a layer terminates early once the warm up period is
+         over, all but this fraction of the rounding parameters are hardened and the reconstruction loss improves by
+         no more than this fraction between convergence checks. Iterations saved by such layers are granted as extra
+         iterations to following layers which haven't converged after num_iterations. Iterations used per layer are
+         reported in a JSON file next to the encodings.
+         Default None (always run num_iterations)
         """
         if len(data_loader) < num_batches:
             raise ValueError(f'Can not fetch {num_batches} batches from '
@@ -104,6 +122,55 @@ class AdaroundParameters:
         self.beta_range = default_beta_range
         self.warm_start = default_warm_start
         self.forward_fn = forward_fn
+        self.optimize_independent_layers_jointly = optimize_independent_layers_jointly
+        self.early_stop_tol = default_early_stop_tol
+
+
+class AdaroundIterationBudget:
+    """
+    Keeps track of iterations used to adaround each layer. When early stopping is enabled, iterations saved by
+    layers that converged early are pooled, and following layers which haven't converged after num_iterations can
+    run extra iterations drawn from the pool. Warm start and annealing schedules are not stretched by the extra
+    iterations, so layers that converge within num_iterations are unaffected.
+    """
+    def __init__(self, opt_params: AdaroundHyperParameters):
+        """
+        :param opt_params: Optimization parameters shared by all the layers
+        """
+        self._opt_params = opt_params
+        self._saved_iterations = 0
+        self.iterations_used = {}
+
+    @property
+    def enabled(self) -> bool:
+        """ Returns True if early stopping is enabled """
+        return self._opt_params.early_stop_tol is not None
+
+    def get_opt_params(self) -> AdaroundHyperParameters:
+        """
+        Returns optimization parameters for the next layer, with extra iterations granted from the saved iterations
+        """
+        if not self.enabled:
+            return self._opt_params
+
+        max_extra_iterations = int(self._opt_params.num_iterations * MAX_EXTRA_ITERATIONS_RATIO)
+        opt_params = copy.copy(self._opt_params)
+        opt_params.max_extra_iterations = max(min(self._saved_iterations, max_extra_iterations), 0)
+        return opt_params
+
+    def update(self, module_names: List[str], iterations_used: int):
+        """
+        Record iterations used to optimize the given layers
+        :param module_names: Names of the layers optimized together
+        :param iterations_used: Number of iterations used
+        """
+        for name in module_names:
+            self.iterations_used[name] = iterations_used
+
+        if self.enabled:
+            self._saved_iterations += self._opt_params.num_iterations - iterations_used
+            logger.info("Used %d iterations for %s, %d iterations saved so far",
+                        iterations_used, module_names, self._saved_iterations)
 
 
 class Adaround:
@@ -111,6 +178,7 @@ class Adaround:
     Weight-rounding mechanism for Post Training Quantization (PTQ)
     """
     @classmethod
+    @tracing.traced("Adaround.apply_adaround")
     def apply_adaround(cls, model: torch.nn.Module, dummy_input: Union[torch.Tensor, Tuple], params: AdaroundParameters,
                        path: str, filename_prefix: str, default_param_bw: int = 4,
                        param_bw_override_list: List[Tuple[torch.nn.Module, int]] = None,
@@ -157,6 +225,7 @@ class Adaround:
         return cls._apply_adaround(quant_sim, model, dummy_input, params, path, filename_prefix)
 
     @classmethod
+    @tracing.traced("Adaround._apply_adaround")
     def _apply_adaround(cls, quant_sim: QuantizationSimModel, model: torch.nn.Module,
                         dummy_input: Union[torch.Tensor, Tuple], params: AdaroundParameters,
                         path: str, filename_prefix: str, checkpoints_config: str = None) -> torch.nn.Module:
@@ -183,11 +252,15 @@ class Adaround:
         # Get the module - activation function pair using ConnectedGraph
         module_act_func_pair = connectedgraph_utils.get_module_act_func_pair(model, dummy_input)
 
-        cls._adaround_model(model, quant_sim, module_act_func_pair, params, dummy_input, checkpoints_config)
+        iteration_budget = cls._adaround_model(model, quant_sim, module_act_func_pair, params, dummy_input,
+                                               checkpoints_config)
 
         # Export quantization encodings to JSON-formatted file
         cls._export_encodings_to_json(path, filename_prefix, quant_sim)
 
+        if iteration_budget.enabled:
+            cls._export_iterations_used_to_json(path, filename_prefix, iteration_budget)
+
         cls._remove_quantization_wrappers(quant_sim.model)
         logger.info('Completed Adarounding Model')
         return quant_sim.model
@@ -195,7 +268,7 @@ class Adaround:
     @classmethod
     def _adaround_model(cls, model: torch.nn.Module, quant_sim: QuantizationSimModel, module_act_func_pair: Dict,
                         params: AdaroundParameters, dummy_input: Union[torch.Tensor, Tuple],
-                        checkpoints_config: str = None):
+                        checkpoints_config: str = None) -> AdaroundIterationBudget:
         """
         Optimize weight rounding of every module (AdaroundSupportedModules) of model in sequential manner
         based on occurrence
@@ -210,6 +283,7 @@ class Adaround:
         :param params: Adaround parameters
         :param dummy_input: Dummy input to the model
         :param checkpoints_config: Config files to split fp32/quant model by checkpoints to speedup activations sampling
+        :return: Iteration budget holding the number of iterations used per module
         """
         # pylint: disable=too-many-locals, protected-access, too-many-branches, too-many-statements
 
@@ -225,11 +299,13 @@ class Adaround:
 
         with tempfile.TemporaryDirectory() as tmp_dir:
             # Cache model input data to temporary directory
-            cached_dataset = utils.CachedDataset(params.data_loader, params.num_batches, tmp_dir)
+            with tracing.span("Adaround.cache_dataset"):
+                cached_dataset = utils.CachedDataset(params.data_loader, params.num_batches, tmp_dir)
 
             # Optimization Hyper parameters
             opt_params = AdaroundHyperParameters(num_iterations, params.reg_param, params.beta_range,
-                                                 params.warm_start)
+                                                 params.warm_start, params.early_stop_tol)
+            iteration_budget = AdaroundIterationBudget(opt_params)
 
             # AdaRound must be applied to modules in the order of occurrence
             if checkpoints_config:
@@ -275,7 +351,7 @@ class Adaround:
                         cls._run_adaround_model(modules, fp_block, quant_sim_block,
                                                 module_act_func_pair, opt_params,
                                                 fwd_mod_ls,
-                                                cached_fp_dataset, cached_quant_dataset)
+                                                cached_fp_dataset, cached_quant_dataset, iteration_budget)
 
                         # Get the outputs from the current block and assign to be the inputs for next block
                         # except for the last block
@@ -296,7 +372,8 @@ class Adaround:
                     for block_cfg, modules in tqdm(block_list, desc='block'):
                         if block_cfg is None: # doesn't belong to a cached block
                             cls._run_adaround_model(modules, model, quant_sim.model, module_act_func_pair, opt_params,
-                                                    params.forward_fn, cached_dataset)
+                                                    params.forward_fn, cached_dataset,
+                                                    iteration_budget=iteration_budget)
                         else:
                             block_name, fp_block = block_cfg
                             quant_sim_block: torch.nn.Module = get_named_module(quant_sim.model, block_name)
@@ -314,19 +391,32 @@ class Adaround:
 
                             cls._run_adaround_model(modules, fp_block, quant_sim_block, module_act_func_pair,
                                                     opt_params,
-                                                    block_fwd, cached_fp_dataset, cached_quant_dataset)
+                                                    block_fwd, cached_fp_dataset, cached_quant_dataset,
+                                                    iteration_budget)
                             del cached_fp_dataset
                             del cached_quant_dataset
+            elif params.optimize_independent_layers_jointly:
+                modules = utils.get_ordered_list_of_modules(model, dummy_input)
+                modules = [(name, module) for name, module in modules
+                           if isinstance(module, AdaroundSupportedModules)]
+                levels = create_dependency_level_schedule(model, dummy_input, modules)
+                logger.info("Scheduled %d modules into %d dependency levels", len(modules), len(levels))
+                for level in tqdm(levels, desc='level'):
+                    cls._run_adaround_model_level(level, model, quant_sim.model, module_act_func_pair, opt_params,
+                                                  params.forward_fn, cached_dataset, iteration_budget)
             else:
                 modules = utils.get_ordered_list_of_modules(model, dummy_input)
                 cls._run_adaround_model(modules, model, quant_sim.model, module_act_func_pair, opt_params,
-                                        params.forward_fn, cached_dataset)
+                                        params.forward_fn, cached_dataset, iteration_budget=iteration_budget)
+
+        return iteration_budget
 
     @classmethod
     def _run_adaround_model(cls, modules: List, model: torch.nn.Module, quant_sim_model: torch.nn.Module,
                             module_act_func_pair: Dict, opt_params: AdaroundHyperParameters, forward_fn: Callable,
                             cached_dataset: utils.CachedDataset,
-                            cached_quant_dataset: Optional[utils.CachedDataset] = None):
+                            cached_quant_dataset: Optional[utils.CachedDataset] = None,
+                            iteration_budget: Optional[AdaroundIterationBudget] = None):
         """
         Iterate through all modules to find out Adaround supported modules and
          apply Adaround optimization to those modules
@@ -340,8 +430,12 @@ class Adaround:
          yielded from the data loader
         :param cached_dataset: Cached dataset for the fp32 model
         :param cached_quant_dataset: Cached dataset for the quant model
+        :param iteration_budget: Iteration budget to draw the number of iterations from and record iterations used
         """
         # pylint: disable=too-many-arguments, too-many-locals, protected-access
+        if iteration_budget is None:
+            iteration_budget = AdaroundIterationBudget(opt_params)
+
         for name, module in tqdm(modules):
             if isinstance(module, AdaroundSupportedModules):
                 # Using name, get corresponding quantized wrapper module from Quant sim model
@@ -357,8 +451,14 @@ class Adaround:
                     act_func = module_act_func_pair[module]
 
                     logger.info("Started Optimizing weight rounding of module: %s", name)
-                    AdaroundOptimizer.adaround_module(module, adaround_wrapper, model, quant_sim_model, act_func,
-                                                      cached_dataset, forward_fn, opt_params, cached_quant_dataset)
+                    with tracing.span("Adaround.optimize_module", module=name):
+                        iterations_used = AdaroundOptimizer.adaround_module(module, adaround_wrapper, model,
+                                                                            quant_sim_model, act_func, cached_dataset,
+                                                                            forward_fn,
+                                                                            iteration_budget.get_opt_params(),
+                                                                            cached_quant_dataset)
+                    tracing.count("adaround_iterations", iterations_used)
+                    iteration_budget.update([name], iterations_used)
                     weight = adaround_wrapper.weight
 
                     # Fold trained alpha to weight
@@ -369,6 +469,58 @@ class Adaround:
                         weight.copy_(adarounded_weight)
                         del adarounded_weight
 
+    @classmethod
+    def _run_adaround_model_level(cls, modules: List, model: torch.nn.Module, quant_sim_model: torch.nn.Module,
+                                  module_act_func_pair: Dict, opt_params: AdaroundHyperParameters,
+                                  forward_fn: Callable, cached_dataset: utils.CachedDataset,
+                                  iteration_budget: Optional[AdaroundIterationBudget] = None):
+        """
+        Jointly apply Adaround optimization to all the modules of a dependency level
+
+        :param modules: Adaround supported modules of the level whose inputs are independent of each other
+        :param model: Original fp32 model
+        :param quant_sim_model: QuantSim model
+        :param module_act_func_pair: Activation function pairs
+        :param opt_params: Optimization parameters
+        :param forward_fn: Adapter function that performs forward pass given a model and inputs
+         yielded from the data loader
+        :param cached_dataset: Cached dataset for the fp32 model
+        :param iteration_budget: Iteration budget to draw the number of iterations from and record iterations used
+        """
+        # pylint: disable=too-many-arguments
+        if iteration_budget is None:
+            iteration_budget = AdaroundIterationBudget(opt_params)
+
+        modules = [(name, module) for name, module in modules if cls._get_quant_wrapper(quant_sim_model, name)]
+        if not modules:
+            return
+
+        # Wraps the quant modules with adaround wrappers
+        # and temporarily replace quant modules with wrapped modules
+        with contextlib.ExitStack() as stack:
+            adaround_wrappers = [stack.enter_context(cls._replace_quantization_layer(quant_sim_model, name))
+                                 for name, _ in modules]
+            orig_modules = [module for _, module in modules]
+            act_funcs = [module_act_func_pair[module] for module in orig_modules]
+
+            logger.info("Started Optimizing weight rounding of modules: %s", [name for name, _ in modules])
+            with tracing.span("Adaround.optimize_modules", modules=[name for name, _ in modules]):
+                iterations_used = AdaroundOptimizer.adaround_modules(orig_modules, adaround_wrappers, model,
+                                                                     quant_sim_model, act_funcs, cached_dataset,
+                                                                     forward_fn, iteration_budget.get_opt_params())
+            tracing.count("adaround_iterations", iterations_used)
+            iteration_budget.update([name for name, _ in modules], iterations_used)
+
+            # Fold trained alpha to weight
+            with torch.no_grad():
+                for adaround_wrapper in adaround_wrappers:
+                    weight = adaround_wrapper.weight
+                    # Use soft rounding to compute Adarounded weight
+                    adaround_wrapper.use_soft_rounding = True
+                    adarounded_weight = adaround_wrapper.apply_adaround(weight)
+                    weight.copy_(adarounded_weight)
+                    del adarounded_weight
+
     @staticmethod
     def _compute_param_encodings(quant_sim: QuantizationSimModel):
         """
@@ -504,6 +656,20 @@ class Adaround:
         with open(encoding_file_path, 'w') as encoding_fp:
             json.dump(encoding, encoding_fp, sort_keys=True, indent=4)
 
+    @staticmethod
+    def _export_iterations_used_to_json(path: str, filename_prefix: str, iteration_budget: AdaroundIterationBudget):
+        """
+        Save number of iterations used per Adarounded module to JSON file
+        :param path: path where to store the file
+        :param filename_prefix: filename prefix, the file is saved as <filename_prefix>_iterations.json
+        :param iteration_budget: Iteration budget holding the number of iterations used per module
+        """
+        os.makedirs(os.path.abspath(path), exist_ok=True)
+        file_path = os.path.join(path, filename_prefix + '_iterations.json')
+        with open(file_path, 'w') as iterations_fp:
+            json.dump(iteration_budget.iterations_used, iterations_fp, indent=4)
+        logger.info("Iterations used per module saved to %s", file_path)
+
     @classmethod
     def _update_param_encodings_dict(cls, quant_module: ExportableQuantModule, name: str, param_encodings: Dict):
         """
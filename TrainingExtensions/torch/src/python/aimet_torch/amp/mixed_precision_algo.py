@@ -59,7 +59,7 @@ from aimet_torch import utils
 from aimet_torch.amp import utils as mixed_precision_utils
 from aimet_torch.amp.convert_ops_reduction import ReduceConvertOps
 from aimet_torch.amp.quantizer_groups import find_quantizer_group, QuantizerGroup, get_module_name_to_module_dict, find_supported_candidates
-from aimet_torch.quantsim import QuantizationSimModel
+from aimet_torch.quantsim import QuantizationSimModel, QuantSimSnapshot
 
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.MixedPrecision)
@@ -408,10 +408,26 @@ class GreedyMixedPrecisionAlgo(MixedPrecisionAlgo):
                     logger.info("Exception occured while setting Quantizers to Candidate: %s", e)
 
         logger.info('Completed Accuracy list computation')
-        # Recompute encodings after quantizer's bitwidth is set back to self._max_bitwidth
-        self._sim.compute_encodings(self.algo_params.forward_pass_callback, self.algo_params.forward_pass_callback_args)
+        # Restore encodings after quantizer's bitwidth is set back to self._max_bitwidth
+        self._restore_baseline()
         return accuracy_list
 
+    def _snapshot_quantizer_state(self) -> QuantSimSnapshot:
+        """
+        Takes a snapshot of the quantizer state of the sim
+
+        :return: Snapshot of the quantizer state
+        """
+        return self._sim.snapshot()
+
+    def _restore_quantizer_state(self, snapshot: QuantSimSnapshot):
+        """
+        Restores the quantizer state of the sim from a snapshot
+
+        :param snapshot: Snapshot of the quantizer state
+        """
+        self._sim.restore(snapshot)
+
 
 
     def _evaluate_model(self, eval_callback) -> float:
@@ -68,6 +68,7 @@ from aimet_torch.utils import get_all_quantizers, in_eval_mode
 from aimet_torch.onnx_utils import OnnxExportApiArgs
 from aimet_torch.model_preparer import prepare_model
 from aimet_torch.model_validator.model_validator import ModelValidator
+from aimet_torch.cache import CompressedTensorSerializationProtocol, to_fingerprintable, fingerprint_data_loader
 
 from aimet_common.auto_quant import Diagnostics
 from aimet_common.cache import Cache
@@ -89,6 +90,30 @@ class _StageSkipped(Exception):
     pass
 
 
+def _fingerprint_model(_auto_quant: "AutoQuantBase", model: torch.nn.Module) -> Any:
+    """
+    Fingerprint of the inputs of batchnorm folding and cross-layer equalization
+    """
+    return to_fingerprintable(model)
+
+
+def _fingerprint_adaround_inputs(auto_quant: "AutoQuantBase", model: torch.nn.Module) -> Any:
+    """
+    Fingerprint of the inputs of adaround: model, quantsim config, adaround parameters and data
+    """
+    # pylint: disable=protected-access
+    adaround_params = {key: value for key, value in vars(auto_quant.adaround_params).items()
+                       if isinstance(value, (type(None), bool, int, float, str, tuple))}
+    config_file = auto_quant._quantsim_params["config_file"]
+    config = None
+    if config_file:
+        with open(config_file, "rb") as f:
+            config = f.read()
+    return to_fingerprintable(model), auto_quant._quantsim_params, config, adaround_params,\
+        fingerprint_data_loader(auto_quant.adaround_params.data_loader),\
+        fingerprint_data_loader(auto_quant.data_loader), auto_quant._data_fingerprint
+
+
 @dataclass(frozen=True)
 class _QuantSchemePair:
     param_quant_scheme: QuantScheme
@@ -216,7 +241,10 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
             results_dir: str = "/tmp",
             cache_id: str = None,
             strict_validation: bool = True,
-            model_prepare_required: bool = True) -> None:
+            model_prepare_required: bool = True,
+            max_cache_size: int = None,
+            compress_cache: bool = False,
+            data_fingerprint: Any = None) -> None:
         '''
         :param model: Model to be quantized. Assumes model is on the correct device
         :param dummy_input: Dummy input for the model. Assumes that dummy_input is on the correct device
@@ -231,6 +259,12 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
         :param cache_id: ID associated with cache results
         :param strict_validation: Flag set to True by default.hen False, AutoQuant will proceed with execution and handle errors internally if possible. This may produce unideal or unintuitive results.
         :param model_prepare_required: Flag set to True by default.If False, AutoQuant will skip model prepare block in the pipeline.
+        :param max_cache_size: Maximum size of the cache directory in bytes. Least recently used results are evicted
+            once the size is exceeded. Unbounded by default.
+        :param compress_cache: If True, cache results are compressed with tensor-aware serialization.
+        :param data_fingerprint: Content identifying the data of the data loaders (e.g. dataset version), used to
+            invalidate cached results which depend on the data. Data loaders are only fingerprinted by their dataset
+            and sampling configuration, so this should change whenever the content of the dataset changes.
         '''
         _validate_inputs(model, data_loader, eval_callback, dummy_input, results_dir,
                          strict_validation, quant_scheme, param_bw, output_bw, rounding_mode)
@@ -253,6 +287,9 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
             self.cache_dir = os.path.join(results_dir, ".auto_quant_cache", cache_id)
         else:
             self.cache_dir = None
+        self._max_cache_size = max_cache_size
+        self._compress_cache = compress_cache
+        self._data_fingerprint = data_fingerprint
 
         self.model_prepare_required = model_prepare_required
 
@@ -530,7 +567,7 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
             )
         return prepared_model
 
-    @cache.mark("batchnorm_folding")
+    @cache.mark("batchnorm_folding", fingerprint_fn=_fingerprint_model)
     def _apply_batchnorm_folding(self, model: torch.nn.Module)\
             -> Tuple[torch.nn.Module, List[Tuple]]:
         """
@@ -545,7 +582,7 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
         folded_pairs = fold_all_batch_norms(model, None, self.dummy_input)
         return model, folded_pairs
 
-    @cache.mark("cle")
+    @cache.mark("cle", fingerprint_fn=_fingerprint_model)
     def _apply_cross_layer_equalization(self, model: torch.nn.Module) -> torch.nn.Module:
         """
         Apply cross-layer equalization.
@@ -563,7 +600,7 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
         equalize_model(model, input_shape)
         return model
 
-    @cache.mark("adaround")
+    @cache.mark("adaround", fingerprint_fn=_fingerprint_adaround_inputs)
     def _apply_adaround(self, model: torch.nn.Module) -> Tuple[torch.nn.Module, str]:
         """
         Apply adaround.
@@ -614,7 +651,11 @@ class AutoQuantBase(abc.ABC): # pylint: disable=too-many-instance-attributes
         self.eval_manager.clear()
 
         try:
-            with in_eval_mode(self.fp32_model), cache.enable(self.cache_dir):
+            cache_protocol = CompressedTensorSerializationProtocol() if self._compress_cache else None
+            with in_eval_mode(self.fp32_model), cache.enable(self.cache_dir,
+                                                             max_cache_size=self._max_cache_size,
+                                                             context=to_fingerprintable(self.dummy_input),
+                                                             default_protocol=cache_protocol):
                 _logger.info("Starting AutoQuant")
 
                 self._fp32_acc = self._evaluate_model_performance(self.fp32_model)
@@ -0,0 +1,125 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+"""Defines PyTorch-specific serialization protocols and fingerprints for cache"""
+import pickle
+from typing import Any, Optional
+
+import torch
+from torch.utils.data import DataLoader
+
+from aimet_common.cache import CompressedPickleSerializationProtocol
+
+
+class _TensorPickler(pickle.Pickler):
+    """Pickler that serializes dense tensors and parameters as numpy arrays so that they can be pickled out-of-band"""
+
+    def reducer_override(self, obj):
+        # pylint: disable=unidiomatic-typecheck
+        if type(obj) not in (torch.Tensor, torch.nn.Parameter) or obj.layout != torch.strided or obj.is_quantized:
+            return NotImplemented
+
+        tensor = obj.detach().cpu().contiguous()
+        if tensor.dtype == torch.bfloat16:
+            tensor = tensor.view(torch.int16)
+        try:
+            array = tensor.numpy()
+        except TypeError:
+            return NotImplemented
+
+        return _rebuild_tensor, (array, obj.dtype, obj.device, obj.requires_grad, isinstance(obj, torch.nn.Parameter))
+
+
+def _rebuild_tensor(array, dtype: torch.dtype, device: torch.device, requires_grad: bool, is_parameter: bool):
+    """Rebuild tensor serialized by _TensorPickler"""
+    tensor = torch.from_numpy(array).view(dtype).to(device)
+    if is_parameter:
+        return torch.nn.Parameter(tensor, requires_grad=requires_grad)
+    return tensor.requires_grad_(requires_grad)
+
+
+class CompressedTensorSerializationProtocol(CompressedPickleSerializationProtocol):
+    """
+    Compressed serialization protocol for pickle-serializable objects containing torch tensors,
+    such as torch.nn.Module objects. Tensors are compressed as byte-shuffled arrays.
+    """
+    pickler_cls = _TensorPickler
+
+
+def to_fingerprintable(obj: Any) -> Any:
+    """
+    Convert modules and tensors in (nested) obj to content that aimet_common.cache.fingerprint supports.
+    Modules are represented by their structure and state dict, tensors by their dtype, shape and raw bytes.
+
+    :param obj: Object to convert.
+    :return: Fingerprintable content of obj.
+    """
+    if isinstance(obj, torch.nn.Module):
+        return type(obj).__qualname__, str(obj), to_fingerprintable(obj.state_dict())
+    if isinstance(obj, torch.Tensor):
+        tensor = obj.detach().cpu().contiguous().reshape(-1)
+        return str(obj.dtype), tuple(obj.shape), tensor.view(torch.uint8).numpy()
+    if isinstance(obj, dict):
+        return {key: to_fingerprintable(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [to_fingerprintable(item) for item in obj]
+    if isinstance(obj, tuple):
+        return tuple(to_fingerprintable(item) for item in obj)
+    return obj
+
+
+def _len_or_none(obj: Any) -> Optional[int]:
+    """ Length of obj, or None if obj has no length """
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+def fingerprint_data_loader(data_loader: DataLoader) -> Any:
+    """
+    Fingerprint of a data loader based on its dataset and sampling configuration.
+    No data is loaded, so the fingerprint is the same for shuffled data loaders and doesn't consume random state.
+    Changes in the content of the dataset are not detected.
+
+    :param data_loader: Data loader to fingerprint.
+    :return: Fingerprintable content of the data loader configuration.
+    """
+    if not isinstance(data_loader, DataLoader):
+        return type(data_loader).__qualname__, _len_or_none(data_loader)
+    dataset = data_loader.dataset
+    return type(dataset).__qualname__, _len_or_none(dataset), type(data_loader.sampler).__qualname__,\
+        data_loader.batch_size, data_loader.drop_last
@@ -37,7 +37,7 @@
 
 """ Provides a factory to construct various AIMET model compression classes based on a scheme """
 
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Union
 
 import torch
 
@@ -53,6 +53,7 @@ from aimet_torch.defs import SpatialSvdParameters, WeightSvdParameters, ChannelP
 from aimet_torch.layer_selector import ConvFcLayerSelector, ConvNoDepthwiseLayerSelector, ManualLayerSelector
 from aimet_torch.layer_database import LayerDatabase
 from aimet_torch.svd.svd_pruner import SpatialSvdPruner, WeightSvdPruner
+from aimet_torch.svd.svd_factorization import SvdFactorizationCache
 from aimet_torch.channel_pruning.channel_pruner import InputChannelPruner, ChannelPruningCostCalculator
 from aimet_torch import pymo_utils
 
@@ -87,8 +88,8 @@ class CompressionFactory:
         layer_db = LayerDatabase(model, dummy_input)
         use_cuda = next(model.parameters()).is_cuda
 
-        # Create a pruner
-        pruner = SpatialSvdPruner()
+        # Create a pruner. Greedy selection splits every layer at many ranks, so decompose each layer only once
+        pruner = SpatialSvdPruner(cls._create_factorization_cache(params))
         cost_calculator = SpatialSvdCostCalculator()
         comp_ratio_rounding_algo = RankRounder(params.multiplicity, cost_calculator)
 
@@ -215,8 +216,8 @@ class CompressionFactory:
         layer_db = LayerDatabase(model, dummy_input)
         use_cuda = next(model.parameters()).is_cuda
 
-        # Create a pruner
-        pruner = WeightSvdPruner()
+        # Create a pruner. Greedy selection splits every layer at many ranks, so decompose each layer only once
+        pruner = WeightSvdPruner(cls._create_factorization_cache(params))
         cost_calculator = WeightSvdCostCalculator()
         comp_ratio_rounding_algo = RankRounder(params.multiplicity, cost_calculator)
 
@@ -271,6 +272,20 @@ class CompressionFactory:
 
         return weight_svd_algo
 
+    @staticmethod
+    def _create_factorization_cache(params: Union[SpatialSvdParameters, WeightSvdParameters]) \
+            -> Optional[SvdFactorizationCache]:
+        """
+        Create the svd factorization cache for a pruner. Layers are only split once in manual mode, so no cache
+        is needed there unless randomized svd is requested.
+
+        :param params: Spatial or weight SVD compression parameters
+        :return: Factorization cache, or None to compute the svd from scratch for every split
+        """
+        if params.mode == params.Mode.auto or params.randomized_svd_min_dim is not None:
+            return SvdFactorizationCache(randomized_svd_min_dim=params.randomized_svd_min_dim)
+        return None
+
     @staticmethod
     def _get_layer_pairs(layer_db: LayerDatabase, module_comp_ratio_pairs: List[ModuleCompRatioPair]):
         layer_comp_ratio_pairs = []
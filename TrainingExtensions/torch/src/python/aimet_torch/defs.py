@@ -110,15 +110,19 @@ class SpatialSvdParameters:
         auto = 2
         """ Auto mode """
 
-    def __init__(self, mode: Mode, params: Union[ManualModeParams, AutoModeParams], multiplicity=1):
+    def __init__(self, mode: Mode, params: Union[ManualModeParams, AutoModeParams], multiplicity=1,
+                 randomized_svd_min_dim: Optional[int] = None):
         """
         :param mode: Either auto mode or manual mode
         :param params: Parameters for the mode selected
         :param multiplicity: The multiplicity to which ranks/input channels will get rounded. Default: 1
+        :param randomized_svd_min_dim: Layers whose svd matrix has both dimensions at least this large are
+            decomposed with randomized truncated svd, which is faster but approximate. None to always use exact svd
         """
         self.mode = mode
         self.mode_params = params
         self.multiplicity = multiplicity
+        self.randomized_svd_min_dim = randomized_svd_min_dim
 
 
 class ChannelPruningParameters:
@@ -211,15 +215,19 @@ class WeightSvdParameters:
         auto = 2
         """ Auto mode """
 
-    def __init__(self, mode: Mode, params: Union[ManualModeParams, AutoModeParams], multiplicity=1):
+    def __init__(self, mode: Mode, params: Union[ManualModeParams, AutoModeParams], multiplicity=1,
+                 randomized_svd_min_dim: Optional[int] = None):
         """
         :param mode: Either auto mode or manual mode
         :param params: Parameters for the mode selected
         :param multiplicity: The multiplicity to which ranks/input channels will get rounded. Default: 1
+        :param randomized_svd_min_dim: Layers whose svd matrix has both dimensions at least this large are
+            decomposed with randomized truncated svd, which is faster but approximate. None to always use exact svd
         """
         self.mode = mode
         self.mode_params = params
         self.multiplicity = multiplicity
+        self.randomized_svd_min_dim = randomized_svd_min_dim
 
 
 class PassThroughOp(torch.nn.Module):
@@ -50,7 +50,7 @@ from aimet_common.utils import Spinner, AimetLogger
 from aimet_torch import utils
 from aimet_torch.gptvq.defs import GPTVQSupportedModules, GPTVQParameters
 from aimet_torch.gptvq.gptvq_optimizer import GPTVQOptimizer
-from aimet_torch.gptvq.utils import compute_hessian_tensor
+from aimet_torch.gptvq.hessian import HessianSampler
 from aimet_torch.quantsim import ExportableQuantModule
 from aimet_torch.save_utils import SaveUtils
 from aimet_torch.utils import get_named_module
@@ -79,6 +79,7 @@ class GPTVQ:
         block_level_module_names: Optional[List[List[str]]] = None,
         file_name_prefix: str = "gptvq",
         config_file_path: Optional[str] = None,
+        hessian_cache_dir: Optional[str] = None,
     ) -> nn.Module:
         """
         Returns model with optimized weight rounding of GPTVQ supportable modules
@@ -94,6 +95,8 @@ class GPTVQ:
         :param block_level_module_names: List of module name lists to optimize block level GPTVQ optimization instead of leaf module level
         :param file_name_prefix: Prefix to use for filename of the encodings file
         :param config_file_path: Configuration file path for model quantizers
+        :param hessian_cache_dir: Directory to save sampled Hessian tensors to. Hessian tensors found in this directory
+                                  are loaded instead of being sampled again
         :return: QuantizationSimModel with GPTVQ applied weights and saves corresponding parameter encodings JSON file at provided path
         """
         if module_names_to_exclude is not None:
@@ -108,7 +111,8 @@ class GPTVQ:
             module_names_to_exclude = []
 
         with cls._disable_quantizers_for_gptvq_optimization(sim, module_name_set):
-            cls._apply_gptvq(model, sim, dummy_input, gptvq_params, set(module_names_to_exclude), block_level_module_names)
+            cls._apply_gptvq(model, sim, dummy_input, gptvq_params, set(module_names_to_exclude), block_level_module_names,
+                             hessian_cache_dir)
 
         cls._export_encodings_to_json(param_encoding_path, file_name_prefix, sim, gptvq_params.rows_per_block)
         # Restore all nn.Parameters holding DequantizedTensors to hold plain torch.Tensor
@@ -287,6 +291,7 @@ class GPTVQ:
             gptvq_params: GPTVQParameters,
             module_names_to_exclude: Set[str],
             block_level_module_names: Optional[List[List[str]]],
+            hessian_cache_dir: Optional[str] = None,
     ):
         """
         Apply GPTVQ algorithm to optimize weights
@@ -297,21 +302,20 @@ class GPTVQ:
         :param gptvq_params: Dataclass holding GPTVQ parameters
         :param module_names_to_exclude: Module names which are excluded during GPTVQ optimization
         :param block_level_module_names: List of module name lists to optimize block level GPTVQ optimization instead of leaf module level
+        :param hessian_cache_dir: Directory to save and load Hessian tensors
         """
         block_level_module_names = cls._get_block_level_module_names(
             original_model, dummy_input, block_level_module_names, module_names_to_exclude
         )
+        hessian_sampler = HessianSampler(sim.model, gptvq_params, hessian_cache_dir,
+                                         context=(block_level_module_names, sorted(module_names_to_exclude)))
         for module_names in block_level_module_names:
             name_to_quant_module = cls._get_applicable_name_to_module_dict(
                 module_names, sim, module_names_to_exclude
             )
 
-            name_to_hessian = {}
-            for name, quant_module in name_to_quant_module.items():
-                with Spinner(f"Sampling Hessian tensor of {name}"):
-                    name_to_hessian[name] = compute_hessian_tensor(
-                        quant_module, gptvq_params, sim
-                    )
+            with Spinner(f"Sampling Hessian tensors of {', '.join(name_to_quant_module)}"):
+                name_to_hessian = hessian_sampler.compute_hessians(name_to_quant_module)
 
             for name, quant_module in name_to_quant_module.items():
                 assert isinstance(quant_module, BaseQuantizationMixin), "%s is not BaseQuantizationMixin" % quant_module
@@ -0,0 +1,314 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Sampling of Hessian tensors for GPTVQ which is shared between modules consuming the same input """
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+from torch import nn
+
+from aimet_common.cache import fingerprint
+from aimet_common.utils import AimetLogger
+from aimet_torch.cache import fingerprint_data_loader
+from aimet_torch.gptvq.defs import GPTVQParameters
+from aimet_torch.gptvq.utils import get_2d_tensor_shape, get_hessian_input
+from aimet_torch.utils import StopForwardException, change_tensor_device_placement, get_device, in_eval_mode, \
+    nested_map
+from aimet_torch.v2.nn import BaseQuantizationMixin
+
+_logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Quant)
+
+HESSIAN_INDEX_FILE = "hessian_index.json"
+
+
+class HessianAccumulator:
+    """
+    Accumulates the Hessian tensor 2/N * sum(X X^T) over batches of module inputs in float64
+    """
+    def __init__(self, num_cols: int, device: torch.device):
+        """
+        :param num_cols: Column dimension of the weights of the modules consuming the input
+        :param device: Device to accumulate on
+        """
+        self._sum = torch.zeros((num_cols, num_cols), dtype=torch.float64, device=device)
+        self.num_samples = 0
+
+    def update(self, quant_module: BaseQuantizationMixin, inp: torch.Tensor):
+        """
+        Adds a batch of inputs to the Hessian
+
+        :param quant_module: Module consuming the input
+        :param inp: Input to the module
+        """
+        if inp.ndim == 2:
+            inp = inp.unsqueeze(0)
+        self.num_samples += inp.shape[0]
+        inp = get_hessian_input(quant_module, inp).to(self._sum.device, torch.float64)
+        self._sum.addmm_(inp, inp.T)
+
+    def get_hessian(self) -> torch.Tensor:
+        """
+        Returns the accumulated Hessian tensor in float32
+        """
+        if self.num_samples == 0:
+            return self._sum.float()
+        return (self._sum * (2 / self.num_samples)).float()
+
+
+class HessianSampler:
+    """
+    Computes the Hessian tensors of the modules of a GPTVQ block. All modules are sampled in the same forward passes,
+    and modules which consume the same input tensor in the same way (e.g. query/key/value or gate/up projections) share
+    a single Hessian tensor which is accumulated only once.
+
+    If a cache directory is given, computed Hessian tensors are saved to it and loaded instead of being sampled again,
+    e.g. when an interrupted GPTVQ run is resumed. Since the Hessian tensors of a module depend on the GPTVQ-updated
+    weights of the modules before it, cached tensors are keyed by a fingerprint of the model weights before GPTVQ, the
+    GPTVQ parameters and settings, the data loader configuration and the forward pass, and are sampled again if any of
+    these changes. The content of the calibration data isn't loaded to compute the fingerprint, so the cache directory
+    should be cleared when the data changes.
+    """
+    def __init__(self, model: nn.Module, gptvq_params: GPTVQParameters, cache_dir: Optional[str] = None,
+                 context: Any = None):
+        """
+        :param model: Model to run forward passes on
+        :param gptvq_params: GPTVQ parameters holding the data loader and forward function
+        :param cache_dir: Directory to save Hessian tensors to and load them from
+        :param context: Other settings the GPTVQ-updated weights depend on, e.g. excluded modules. Should be supported
+            by `fingerprint`
+        """
+        self._model = model
+        self._gptvq_params = gptvq_params
+        self._cache_dir = cache_dir
+        self._context = context
+        self._fingerprint = None
+        # Module name to the file name and the fingerprint of its cached Hessian tensor
+        self._index: Dict[str, Dict[str, str]] = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            index_path = os.path.join(cache_dir, HESSIAN_INDEX_FILE)
+            if os.path.exists(index_path):
+                with open(index_path) as index_file:
+                    self._index = json.load(index_file)
+
+    def compute_hessians(self, name_to_quant_module: Dict[str, BaseQuantizationMixin]) -> Dict[str, torch.Tensor]:
+        """
+        Compute the Hessian tensors of the given modules. Modules sharing an input get their own copy of the shared
+        Hessian tensor, since GPTVQ optimization modifies the Hessian tensor in place.
+
+        :param name_to_quant_module: Module name to quantization module of one GPTVQ block
+        :return: Module name to Hessian tensor
+        """
+        if self._cache_dir is not None and self._fingerprint is None:
+            # Computed on the first call, before GPTVQ updates any weight
+            try:
+                self._fingerprint = self._compute_fingerprint()
+            except TypeError as e:
+                _logger.warning("Cannot fingerprint the GPTVQ inputs (%s). Hessian tensors won't be cached", e)
+                self._cache_dir = None
+
+        name_to_hessian = self._load(name_to_quant_module)
+        if name_to_hessian is not None:
+            return name_to_hessian
+
+        groups, accumulators = None, None
+        for batch in self._gptvq_params.data_loader:
+            name_to_input = self._sample_inputs(name_to_quant_module, batch)
+            if groups is None:
+                groups = self._group_modules_by_input(name_to_quant_module, name_to_input)
+                accumulators = [
+                    HessianAccumulator(get_2d_tensor_shape(name_to_quant_module[names[0]])[1],
+                                       name_to_quant_module[names[0]].weight.device)
+                    for names in groups
+                ]
+            for names, accumulator in zip(groups, accumulators):
+                accumulator.update(name_to_quant_module[names[0]], name_to_input[names[0]])
+            del name_to_input
+
+        name_to_hessian = {}
+        for names, accumulator in zip(groups or [], accumulators or []):
+            if len(names) > 1:
+                _logger.info("Sharing Hessian tensor between modules with the same input: %s", ", ".join(names))
+            hessian = accumulator.get_hessian()
+            self._save(names, hessian)
+            for i, name in enumerate(names):
+                name_to_hessian[name] = hessian if i == 0 else hessian.clone()
+        return name_to_hessian
+
+    def _sample_inputs(self, name_to_quant_module: Dict[str, BaseQuantizationMixin],
+                       model_input) -> Dict[str, torch.Tensor]:
+        """
+        Run one forward pass and collect the first input of every module. The forward pass is stopped once all inputs
+        are collected.
+
+        :param name_to_quant_module: Module name to quantization module
+        :param model_input: Batch yielded by the data loader
+        :return: Module name to input tensor
+        """
+        name_to_input = {}
+
+        def adjust_input_dtype(module, inp):
+            if hasattr(module, 'weight') and isinstance(module.weight, torch.Tensor):
+                dtype = module.weight.dtype
+                return nested_map(inp, lambda x: x.to(dtype) if x.is_floating_point() else x)
+            return inp
+
+        def make_hook(name):
+            def _hook_to_collect_input(_, inp):
+                if name not in name_to_input:
+                    name_to_input[name] = inp[0].detach()
+                if len(name_to_input) == len(name_to_quant_module):
+                    raise StopForwardException
+            return _hook_to_collect_input
+
+        handles = [module.register_forward_pre_hook(adjust_input_dtype) for module in self._model.modules()]
+        handles.extend(module.register_forward_pre_hook(make_hook(name))
+                       for name, module in name_to_quant_module.items())
+
+        model_input = change_tensor_device_placement(model_input, get_device(self._model))
+        try:
+            with in_eval_mode(self._model), torch.no_grad():
+                _ = self._gptvq_params.forward_fn(self._model, model_input)
+        except StopForwardException:
+            pass
+        finally:
+            for handle in handles:
+                handle.remove()
+
+        missing = set(name_to_quant_module).difference(name_to_input)
+        if missing:
+            raise RuntimeError(f"Modules {sorted(missing)} were not executed in the forward pass")
+        return name_to_input
+
+    @staticmethod
+    def _group_modules_by_input(name_to_quant_module: Dict[str, BaseQuantizationMixin],
+                                name_to_input: Dict[str, torch.Tensor]) -> List[List[str]]:
+        """
+        Group modules whose Hessian tensors are identical, i.e. which consume the same input tensor and turn it into
+        the same Hessian input
+
+        :param name_to_quant_module: Module name to quantization module
+        :param name_to_input: Module name to input tensor
+        :return: Lists of module names which share a Hessian tensor
+        """
+        key_to_names: Dict[Tuple, List[str]] = {}
+        for name, module in name_to_quant_module.items():
+            inp = name_to_input[name]
+            if isinstance(module, nn.Conv2d):
+                signature = ("conv", module.kernel_size, module.dilation, module.padding, module.stride)
+            else:
+                signature = ("linear",)
+            key = (inp.data_ptr(), inp.shape, inp.stride(), inp.dtype, signature)
+            key_to_names.setdefault(key, []).append(name)
+        return list(key_to_names.values())
+
+    def _compute_fingerprint(self) -> str:
+        """
+        Fingerprint of everything the Hessian tensors depend on: the weights and buffers of the model, the GPTVQ
+        parameters and context which determine how the weights of preceding modules are updated, and the data loader
+        configuration and forward function used to sample the module inputs.
+
+        :return: Hex digest
+        """
+        forward_fn = self._gptvq_params.forward_fn
+        state_digests = [(name, fingerprint(_tensor_content(tensor)))
+                         for name, tensor in self._model.state_dict().items()]
+        gptvq_params = {key: value for key, value in vars(self._gptvq_params).items()
+                        if isinstance(value, (type(None), bool, int, float, str, tuple))}
+        return fingerprint(state_digests, gptvq_params, self._context,
+                           fingerprint_data_loader(self._gptvq_params.data_loader),
+                           f"{getattr(forward_fn, '__module__', '')}.{getattr(forward_fn, '__qualname__', '')}")
+
+    def _load(self, name_to_quant_module: Dict[str, BaseQuantizationMixin]) -> Optional[Dict[str, torch.Tensor]]:
+        """
+        Load the Hessian tensors of all given modules from the cache directory
+
+        :param name_to_quant_module: Module name to quantization module
+        :return: Module name to Hessian tensor, or None if any of the modules is not cached or was cached for
+            different weights, data or parameters
+        """
+        if not all(name in self._index for name in name_to_quant_module):
+            return None
+
+        stale = [name for name in name_to_quant_module if not isinstance(self._index[name], dict) or
+                 self._index[name].get("fingerprint") != self._fingerprint]
+        if stale:
+            _logger.warning("Cached Hessian tensors of %s were computed for different weights, data or parameters. "
+                            "Sampling again", ", ".join(stale))
+            return None
+
+        file_name_to_hessian = {}
+        name_to_hessian = {}
+        for name, quant_module in name_to_quant_module.items():
+            file_name = self._index[name]["file"]
+            if file_name in file_name_to_hessian:
+                hessian = file_name_to_hessian[file_name].clone()
+            else:
+                hessian = torch.load(os.path.join(self._cache_dir, file_name), map_location=quant_module.weight.device)
+                file_name_to_hessian[file_name] = hessian
+            num_cols = get_2d_tensor_shape(quant_module)[1]
+            if hessian.shape != (num_cols, num_cols):
+                _logger.warning("Cached Hessian tensor of %s has shape %s instead of %s. Sampling again",
+                                name, tuple(hessian.shape), (num_cols, num_cols))
+                return None
+            name_to_hessian[name] = hessian
+
+        _logger.info("Loaded Hessian tensors of %s from %s", ", ".join(name_to_quant_module), self._cache_dir)
+        return name_to_hessian
+
+    def _save(self, names: List[str], hessian: torch.Tensor):
+        """
+        Save a Hessian tensor shared by the given modules into the cache directory
+
+        :param names: Names of the modules sharing the Hessian tensor
+        :param hessian: Hessian tensor
+        """
+        if self._cache_dir is None:
+            return
+        file_name = f"hessian_{names[0]}.pt"
+        torch.save(hessian.cpu(), os.path.join(self._cache_dir, file_name))
+        for name in names:
+            self._index[name] = {"file": file_name, "fingerprint": self._fingerprint}
+        with open(os.path.join(self._cache_dir, HESSIAN_INDEX_FILE), "w") as index_file:
+            json.dump(self._index, index_file, indent=4)
+
+
+def _tensor_content(tensor: torch.Tensor) -> Tuple[str, Tuple[int, ...], Any]:
+    """ Returns the dtype and shape of a tensor, and its raw bytes as a numpy array """
+    tensor = tensor.detach().cpu().contiguous()
+    return str(tensor.dtype), tuple(tensor.shape), tensor.reshape(-1).view(torch.uint8).numpy()
@@ -428,21 +428,14 @@ def get_2d_tensor_shape(quant_module: BaseQuantizationMixin) -> torch.Size:
 
     return tensor_shape
 
-def update_hessian(
-    quant_module: BaseQuantizationMixin,
-    inp: torch.Tensor,
-    n_samples: int,
-    curr_batch_size: int,
-    hessian: torch.Tensor,
-):
+def get_hessian_input(quant_module: BaseQuantizationMixin, inp: torch.Tensor) -> torch.Tensor:
     """
-    Updates the hessian matrix using the passed input data to the module and applies scaling
+    Reshapes the input of a module into a 2D tensor whose rows match the column dimension of the module's weight and
+    whose columns are the samples, i.e. the Hessian contribution of the input is inp.matmul(inp.T)
 
     :param quant_module: Quantization module
     :param inp: activation input passed to the given module
-    :param hessian: hessian for the module used to do weight update
-    :param n_samples: samples seen so far for hessian computation
-    :param curr_batch_size: batch size of current input
+    :return: num_cols x num_samples tensor
     """
     # The hessian is of the shape [weight.shape[1], weight.shape[1]], i.e C*C columns
     # THIS SHOULD WORK FOR ALL THE DIMENSIONS, it makes the last dimension match the weight's column dimension, and first one as the reshaped/ adjusted sample size
@@ -464,6 +457,26 @@ def update_hessian(
     else:
         raise ValueError(f"Unsupported module type {type(quant_module)}")
 
+    return inp
+
+def update_hessian(
+    quant_module: BaseQuantizationMixin,
+    inp: torch.Tensor,
+    n_samples: int,
+    curr_batch_size: int,
+    hessian: torch.Tensor,
+):
+    """
+    Updates the hessian matrix using the passed input data to the module and applies scaling
+
+    :param quant_module: Quantization module
+    :param inp: activation input passed to the given module
+    :param hessian: hessian for the module used to do weight update
+    :param n_samples: samples seen so far for hessian computation
+    :param curr_batch_size: batch size of current input
+    """
+    inp = get_hessian_input(quant_module, inp)
+
     # scale the hessian matrix in place
     hessian *= n_samples / (n_samples + curr_batch_size)
     inp = math.sqrt(2 / (n_samples + curr_batch_size)) * inp.float()
@@ -41,6 +41,7 @@ from typing import Union, Tuple, List
 import torch
 
 from aimet_common.utils import AimetLogger
+from aimet_common import tracing
 from aimet_common.amp.utils import (
     visualize_quantizer_group_sensitivity,
     visualize_pareto_curve,
@@ -56,6 +57,7 @@ logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.MixedPrecision)
 
 
 # pylint: disable=too-many-arguments
+@tracing.traced("choose_mixed_precision")
 def choose_mixed_precision(sim: QuantizationSimModel, dummy_input: Union[torch.Tensor, Tuple],
                            candidates: List[TORCH_CANDIDATE], eval_callback_for_phase1: CallbackFunc,
                            eval_callback_for_phase2: CallbackFunc, allowed_accuracy_drop: Union[None, float],
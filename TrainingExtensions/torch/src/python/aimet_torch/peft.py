@@ -36,10 +36,11 @@
 # =============================================================================
 
 """ Implementation for handling LoRA adapters added using PEFT """
-from typing import Dict, Type
+from typing import Dict, Type, List
 import os
 import pickle
 from collections import defaultdict
+import numpy as np
 import torch.nn as nn
 import torch
 import onnx
@@ -51,10 +52,11 @@ from safetensors import safe_open
 from peft.tuners.lora.layer import LoraLayer as PeftLoraLayer
 from peft.tuners.lora.layer import Conv2d as PeftConv2d
 
-from aimet_torch.utils import replace_modules_of_type1_using_constructor
+from aimet_torch.utils import replace_modules_of_type1_using_constructor, get_numpy_storage_dtypes
 from aimet_torch.nn.modules.custom import Add, Multiply
 from aimet_torch.v2.quantsim import QuantizationSimModel
 from aimet_torch.v2.quantization.affine import QuantizeDequantize
+from aimet_torch.v2.quantization.base import QuantizerBase
 from aimet_torch.quantsim import ExportableQuantModule
 from aimet_torch.v2.nn import BaseQuantizationMixin
 from aimet_torch.onnx_utils import OnnxSaver, get_layers_in_io_tensor_map
@@ -468,6 +470,148 @@ class PeftQuantUtils:
         sim.model.load_state_dict(tensors, strict=False)
 
 
+class AdapterRegistry:
+    """
+    Registry of LoRA adapters sharing one quantized base model.
+
+    Weights and encodings of the lora layers are snapshotted per adapter into memory-mapped files, so only the pages of
+    adapters that are actually used are resident in memory. Activating an adapter maps its file again and points the
+    lora weight parameters to the freshly mapped tensors (or copies into them in place if the model is not on CPU) and
+    copies the lora quantizer encodings in place. Each activation gets a private copy-on-write mapping, so in-place
+    writes to the active lora weights (e.g. training or load_state_dict) never alter the registered adapter.
+    The sim is never rebuilt and the base model is never touched.
+
+    The registry holds references to the lora parameters and quantizers of the sim, so it should be created after
+    lora quantizers are configured (e.g. bitwidth, per channel, new quantizers) and before adapters are registered.
+    """
+    def __init__(self, sim: QuantizationSimModel, peft_utils: PeftQuantUtils, working_dir: str):
+        """
+        :param sim: QuantSim model with frozen base model
+        :param peft_utils: Peft utilities created for the model of the sim
+        :param working_dir: Directory to store memory-mapped adapter files
+        """
+        self._working_dir = working_dir
+        os.makedirs(working_dir, exist_ok=True)
+        self._lora_params, self._lora_quantizers = self._get_lora_params_and_quantizers(sim, peft_utils)
+        self._adapters = {}
+        self.active_adapter = None
+
+    @staticmethod
+    def _get_lora_params_and_quantizers(sim: QuantizationSimModel, peft_utils: PeftQuantUtils):
+        """
+        Collects weight/bias parameters and quantizers of all quantized lora layers keyed by their names
+        """
+        lora_params = {}
+        lora_quantizers = {}
+        for module_name, module in peft_utils.get_quantized_lora_layer(sim):
+            for param_name in ['weight', 'bias']:
+                param = getattr(module, param_name, None)
+                if isinstance(param, torch.nn.Parameter):
+                    lora_params[f'{module_name}.{param_name}'] = param
+            for quantizer_name, quantizer in module.named_modules():
+                if isinstance(quantizer, QuantizerBase):
+                    lora_quantizers[f'{module_name}.{quantizer_name}'] = quantizer
+        return lora_params, lora_quantizers
+
+    @property
+    def adapters(self) -> List[str]:
+        """ Names of registered adapters """
+        return list(self._adapters)
+
+    def _get_adapter_path(self, adapter_name: str) -> str:
+        return os.path.join(self._working_dir, f'{adapter_name}.adapter')
+
+    def register_adapter(self, adapter_name: str):
+        """
+        Snapshots weights and encodings of the lora layers currently in the sim as an adapter. Adapter weights should
+        be loaded (e.g. with PeftQuantUtils.enable_adapter_and_load_weights) and encodings computed before registering.
+        Registering an existing adapter name replaces the adapter.
+
+        :param adapter_name: Name of the adapter
+        """
+        tensors = {name: param.detach() for name, param in self._lora_params.items()}
+        for quantizer_name, quantizer in self._lora_quantizers.items():
+            if quantizer.is_initialized():
+                for param_name, param in quantizer.named_parameters():
+                    tensors[f'{quantizer_name}.{param_name}'] = param.detach()
+
+        # Always write a new file. Truncating a file which is still mapped by the active adapter is not safe.
+        path = self._get_adapter_path(adapter_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+        index = {}
+        offset = 0
+        with open(path, 'wb') as file:
+            for name, tensor in tensors.items():
+                _, storage_dtype = get_numpy_storage_dtypes(tensor.dtype)
+                data = tensor.cpu().contiguous().view(storage_dtype).numpy().tobytes()
+                # Keep every tensor 64-byte aligned within the file
+                padding = -len(data) % 64
+                file.write(data + bytes(padding))
+                index[name] = (offset, tensor.numel(), tuple(tensor.shape), tensor.dtype)
+                offset += len(data) + padding
+
+        self._adapters[adapter_name] = index
+
+    @torch.no_grad()
+    def activate_adapter(self, adapter_name: str):
+        """
+        Makes a registered adapter active by swapping lora weights and encodings in place
+
+        :param adapter_name: Name of the adapter
+        """
+        if adapter_name not in self._adapters:
+            raise KeyError(f"Adapter {adapter_name} is not registered")
+        # Map the file again rather than reusing an earlier mapping, which in-place writes could have modified
+        tensors = _map_adapter_file(self._get_adapter_path(adapter_name), self._adapters[adapter_name])
+
+        for name, param in self._lora_params.items():
+            tensor = tensors[name]
+            if param.device == tensor.device and param.dtype == tensor.dtype:
+                param.data = tensor
+            else:
+                param.data.copy_(tensor)
+
+        for quantizer_name, quantizer in self._lora_quantizers.items():
+            for param_name, param in quantizer.named_parameters():
+                tensor = tensors.get(f'{quantizer_name}.{param_name}')
+                if tensor is not None:
+                    param.copy_(tensor)
+
+        self.active_adapter = adapter_name
+
+    def remove_adapter(self, adapter_name: str):
+        """
+        Removes a registered adapter and its file. The active adapter can't be removed.
+
+        :param adapter_name: Name of the adapter
+        """
+        if adapter_name == self.active_adapter:
+            raise RuntimeError(f"Adapter {adapter_name} is active and can't be removed")
+        del self._adapters[adapter_name]
+        os.remove(self._get_adapter_path(adapter_name))
+
+
+def _map_adapter_file(path: str, index: Dict) -> Dict[str, torch.Tensor]:
+    """
+    Memory-maps an adapter file as copy-on-write so that no tensor write can modify the file
+
+    :param path: Path to adapter file
+    :param index: Dict mapping tensor name to (byte offset, number of elements, shape, dtype)
+    :return: Dict mapping tensor name to tensor backed by the memory map
+    """
+    if not index:
+        return {}
+    memmap = np.memmap(path, dtype=np.uint8, mode='c')
+    tensors = {}
+    for name, (offset, numel, shape, dtype) in index.items():
+        np_dtype, _ = get_numpy_storage_dtypes(dtype)
+        data = memmap[offset:offset + numel * np.dtype(np_dtype).itemsize].view(np_dtype)
+        tensors[name] = torch.from_numpy(data).view(dtype).reshape(shape)
+    return tensors
+
+
 def _load_weights(adapter_weights_path: str, use_safetensor: bool = True) -> Dict:
     """
     Util to load weights
@@ -39,7 +39,7 @@
 # pylint: disable=too-many-lines
 import contextlib
 from collections import defaultdict
-from typing import Tuple, List, Union, Dict
+from typing import Tuple, List, Union, Dict, Optional
 import torch
 from torch.nn.utils.rnn import PackedSequence, pad_packed_sequence, pack_padded_sequence
 import aimet_common.libpymo as libpymo
@@ -129,7 +129,8 @@ class QcQuantizeRecurrent(torch.nn.Module):
     def __init__(self, module_to_quantize: Union[torch.nn.RNN, torch.nn.LSTM, torch.nn.GRU],
                  weight_bw: int, activation_bw: int, round_mode: str,
                  quant_scheme: QuantScheme, is_symmetric: bool = False,
-                 num_inputs=1, num_outputs=1, data_type: QuantizationDataType = QuantizationDataType.int):
+                 num_inputs=1, num_outputs=1, data_type: QuantizationDataType = QuantizationDataType.int,
+                 use_hoisted_projection: bool = True):
         """
         Constructor
         :param module_to_quantize: Module that needs to be quantized
@@ -140,8 +141,13 @@ class QcQuantizeRecurrent(torch.nn.Module):
         :param is_symmetric: Symmetric or asymmetric quantization
         :param num_inputs: Number of inputs for this module (Added to keep a common interface with QcQuantizeWrapper)
         :param num_outputs: Number of outputs for this module (Added to keep a common interface with QcQuantizeWrapper)
+        :param data_type: Data type of the quantizers
+        :param use_hoisted_projection: If True, inference in active mode computes the input projections of all
+         timesteps in one matmul and runs only the recurrent part step by step, in a TorchScript kernel.
+         See _can_use_hoisted_projection() for the conditions
         """
         super().__init__()
+        self.use_hoisted_projection = use_hoisted_projection
 
         self._mode = QcQuantizeOpMode.ANALYSIS
         # clone parameter
@@ -828,62 +834,70 @@ class QcQuantizeRecurrent(torch.nn.Module):
         stacked_hx = []
         output = []
 
+        use_hoisted_projection = self._can_use_hoisted_projection(packed_sequence_info)
+
         with self._quantize_dequantize_params(inputs) as (quantized_params, _inputs):
             for layer in range(self.num_layers):
                 # Quantize the inputs
                 quantized_input = self._quantize_activation(self._input_quantizers['input_l{}'.format(layer)], _inputs)
 
-                output = []
-                reverse_pass_output = []
-                for direction in range(self.num_directions):
-                    permutation = None if not packed_sequence_info else packed_sequence_info.unsorted_indices
-                    update_initial_hx_encoding_stats, initial_hx = \
-                        self._intialize_quantize_hidden_state(batches, _inputs, layer, hx, permutation=permutation)
-                    cell_hx = initial_hx
-
-                    param = [quantized_params[p] for p in self._get_param_names(direction, layer)]
-                    weight_ih, weight_hh, *bias = param
-                    bias_ih, bias_hh = bias if bias else (None, None)
-
-                    if direction == 1:
-                        quantized_input = _get_flipped_input_for_reverse_pass(quantized_input, packed_sequence_info, steps)
-
-                    for iteration in range(steps):
-
-                        new_cell_hx = self.rnn_impl_map[self.mode](quantized_input[iteration],
-                                                                   cell_hx,
-                                                                   weight_ih,
-                                                                   weight_hh,
-                                                                   bias_ih,
-                                                                   bias_hh)
-
-                        # Replace rows in the hidden state corresponding to valid inputs in the batch
-                        cell_hx = _replace_appropriate_hidden_state_rows(cell_hx, new_cell_hx, packed_sequence_info,
-                                                                         iteration, batches)
-                        # Quantize the outputs
-                        cell_hx = self._quantize_hidden_cell_state(layer, cell_hx)
-
-                        if direction == 0:
-                            output.append(cell_hx[0] if isinstance(cell_hx, tuple) else cell_hx)
-                        else:
-                            if not reverse_pass_output:
-                                reverse_pass_output = [None] * (steps * batches)
-                            _fill_appropriate_rows_in_reverse_pass_output(reverse_pass_output,
-                                                                          packed_sequence_info,
-                                                                          steps,
-                                                                          batches,
-                                                                          iteration,
-                                                                          cell_hx)
-                    stacked_hx.append(cell_hx)
-                    if update_initial_hx_encoding_stats:
-                        self._update_encoding_stats_with_initial_hidden_state(initial_hx, layer)
-
-                    if reverse_pass_output:
-                        _concatenate_output_with_reverse_pass_output(output, reverse_pass_output, self.hidden_size, steps,
-                                                                     batches, _inputs.device)
-
-                # convert a list output tensors to a single tensor
-                output = torch.stack(output)
+                if use_hoisted_projection:
+                    output = self._forward_layer_with_hoisted_projection(layer, quantized_input, quantized_params, hx,
+                                                                         batches, stacked_hx)
+                else:
+                    output = []
+                    reverse_pass_output = []
+                    for direction in range(self.num_directions):
+                        permutation = None if not packed_sequence_info else packed_sequence_info.unsorted_indices
+                        update_initial_hx_encoding_stats, initial_hx = \
+                            self._intialize_quantize_hidden_state(batches, _inputs, layer, hx, permutation=permutation)
+                        cell_hx = initial_hx
+
+                        param = [quantized_params[p] for p in self._get_param_names(direction, layer)]
+                        weight_ih, weight_hh, *bias = param
+                        bias_ih, bias_hh = bias if bias else (None, None)
+
+                        if direction == 1:
+                            quantized_input = _get_flipped_input_for_reverse_pass(quantized_input,
+                                                                                  packed_sequence_info, steps)
+
+                        for iteration in range(steps):
+
+                            new_cell_hx = self.rnn_impl_map[self.mode](quantized_input[iteration],
+                                                                       cell_hx,
+                                                                       weight_ih,
+                                                                       weight_hh,
+                                                                       bias_ih,
+                                                                       bias_hh)
+
+                            # Replace rows in the hidden state corresponding to valid inputs in the batch
+                            cell_hx = _replace_appropriate_hidden_state_rows(cell_hx, new_cell_hx, packed_sequence_info,
+                                                                             iteration, batches)
+                            # Quantize the outputs
+                            cell_hx = self._quantize_hidden_cell_state(layer, cell_hx)
+
+                            if direction == 0:
+                                output.append(cell_hx[0] if isinstance(cell_hx, tuple) else cell_hx)
+                            else:
+                                if not reverse_pass_output:
+                                    reverse_pass_output = [None] * (steps * batches)
+                                _fill_appropriate_rows_in_reverse_pass_output(reverse_pass_output,
+                                                                              packed_sequence_info,
+                                                                              steps,
+                                                                              batches,
+                                                                              iteration,
+                                                                              cell_hx)
+                        stacked_hx.append(cell_hx)
+                        if update_initial_hx_encoding_stats:
+                            self._update_encoding_stats_with_initial_hidden_state(initial_hx, layer)
+
+                        if reverse_pass_output:
+                            _concatenate_output_with_reverse_pass_output(output, reverse_pass_output,
+                                                                         self.hidden_size, steps, batches,
+                                                                         _inputs.device)
+
+                    # convert a list output tensors to a single tensor
+                    output = torch.stack(output)
 
                 # if configured for more than one layer, the quantized output is fed back as input to next layer
                 if self.num_layers > 1:
@@ -901,6 +915,80 @@ class QcQuantizeRecurrent(torch.nn.Module):
 
         return output, hx
 
+    def _can_use_hoisted_projection(self, packed_sequence_info: Union[PackedSequenceInfo, None]) -> bool:
+        """
+        The hoisted projection fast path covers inference with computed encodings: active mode, no training, no
+        autograd, no PackedSequence, and hidden (and cell) state quantizers which are disabled or quantize per tensor
+        to int with an encoding and nearest rounding.
+        :param packed_sequence_info: PackedSequence information of the inputs, None if inputs are a tensor
+        :return: True if the fast path can be used for this forward pass
+        """
+        if not self.use_hoisted_projection or self._mode != QcQuantizeOpMode.ACTIVE or self.training or \
+                torch.is_grad_enabled() or packed_sequence_info is not None:
+            return False
+
+        for quantizer in self._output_quantizers.values():
+            if quantizer.enabled and quantizer.bitwidth != 32 and \
+                    (not isinstance(quantizer, StaticGridPerTensorQuantizer) or
+                     quantizer.data_type != QuantizationDataType.int or quantizer.encoding is None or
+                     quantizer.round_mode != libpymo.RoundingMode.ROUND_NEAREST):
+                return False
+        return True
+
+    @staticmethod
+    def _get_hidden_state_encoding(quantizer: StaticGridPerTensorQuantizer) -> Optional[List[float]]:
+        """
+        :param quantizer: Hidden or cell state quantizer
+        :return: [min, max, delta, offset] of the quantizer encoding, or None if the quantizer does not quantize
+        """
+        if not quantizer.enabled or quantizer.bitwidth == 32:
+            return None
+        encoding = quantizer.encoding
+        return [encoding.min, encoding.max, encoding.delta, encoding.offset]
+
+    def _forward_layer_with_hoisted_projection(self, layer: int, quantized_input: torch.Tensor,
+                                               quantized_params: Dict[str, torch.Tensor], hx: torch.Tensor,
+                                               batches: int, stacked_hx: List) -> torch.Tensor:
+        """
+        Runs one layer for all directions. The input-to-hidden projections of all timesteps are computed in one matmul,
+        and only the recurrence is computed step by step.
+        :param layer: layer index
+        :param quantized_input: quantized input of the layer, with timesteps as first dim
+        :param quantized_params: dictionary of quantized parameters
+        :param hx: user provided hidden state
+        :param batches: batch size of input Tensor
+        :param stacked_hx: list to which the final hidden (and cell) state of each direction is appended
+        :return: output of the layer, with timesteps as first dim
+        """
+        h_encoding = self._get_hidden_state_encoding(self._output_quantizers['h_l{}'.format(layer)])
+        c_encoding = self._get_hidden_state_encoding(self._output_quantizers['c_l{}'.format(layer)]) \
+            if self.mode == 'LSTM' else None
+
+        direction_outputs = []
+        for direction in range(self.num_directions):
+            _, cell_hx = self._intialize_quantize_hidden_state(batches, quantized_input, layer, hx, permutation=None)
+
+            weight_ih, weight_hh, *bias = [quantized_params[p] for p in self._get_param_names(direction, layer)]
+            bias_ih, bias_hh = bias if bias else (None, None)
+
+            direction_input = quantized_input if direction == 0 else torch.flip(quantized_input, [0])
+            projected_input = torch.nn.functional.linear(direction_input, weight_ih, bias_ih)
+
+            if self.mode == 'LSTM':
+                direction_output, h, c = _lstm_recurrence(projected_input, cell_hx[0], cell_hx[1], weight_hh, bias_hh,
+                                                          h_encoding, c_encoding)
+                cell_hx = (h, c)
+            elif self.mode == 'GRU':
+                direction_output, cell_hx = _gru_recurrence(projected_input, cell_hx, weight_hh, bias_hh, h_encoding)
+            else:
+                direction_output, cell_hx = _rnn_recurrence(projected_input, cell_hx, weight_hh, bias_hh, h_encoding,
+                                                            self.mode == 'RNN_RELU')
+
+            stacked_hx.append(cell_hx)
+            direction_outputs.append(direction_output if direction == 0 else torch.flip(direction_output, [0]))
+
+        return torch.cat(direction_outputs, dim=2)
+
     def _quantize_hidden_cell_state(self, layer_index: int, cell_hx: Union[torch.Tensor, Tuple[torch.Tensor]]) -> \
             Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
         """
@@ -975,6 +1063,79 @@ class QcQuantizeRecurrent(torch.nn.Module):
             self._input_quantizers['initial_h_l{}'.format(layer_index)].update_encoding_stats(cell_hx)
 
 
+def _quantize_dequantize_hidden_state(tensor: torch.Tensor, encoding: Optional[List[float]]) -> torch.Tensor:
+    """
+    Quantize-dequantize with nearest rounding, with the same arithmetic as libpymo. Ties are rounded away from zero
+    like std::round, rather than to even like torch.round
+    :param tensor: Tensor to quantize-dequantize
+    :param encoding: [min, max, delta, offset], or None to return the tensor as-is
+    :return: Quantized-dequantized tensor
+    """
+    if encoding is None:
+        return tensor
+    encoding_min, encoding_max, delta, offset = encoding[0], encoding[1], encoding[2], encoding[3]
+    x = torch.clamp(tensor, encoding_min, encoding_max) / delta - offset
+    return (torch.sign(x) * torch.floor(x.abs() + 0.5) + offset) * delta
+
+
+@torch.jit.script
+def _lstm_recurrence(projected_input: torch.Tensor, h: torch.Tensor, c: torch.Tensor, weight_hh: torch.Tensor,
+                     bias_hh: Optional[torch.Tensor], h_encoding: Optional[List[float]],
+                     c_encoding: Optional[List[float]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    LSTM recurrence over precomputed input projections, with the same arithmetic as torch lstm_cell
+    :return: stacked hidden states of all timesteps, final hidden state and final cell state
+    """
+    outputs = []
+    for step in range(projected_input.shape[0]):
+        gates = projected_input[step] + torch.nn.functional.linear(h, weight_hh, bias_hh)
+        input_gate, forget_gate, cell_gate, output_gate = gates.chunk(4, 1)
+        c = torch.sigmoid(forget_gate) * c + torch.sigmoid(input_gate) * torch.tanh(cell_gate)
+        h = torch.sigmoid(output_gate) * torch.tanh(c)
+        h = _quantize_dequantize_hidden_state(h, h_encoding)
+        c = _quantize_dequantize_hidden_state(c, c_encoding)
+        outputs.append(h)
+    return torch.stack(outputs), h, c
+
+
+@torch.jit.script
+def _gru_recurrence(projected_input: torch.Tensor, h: torch.Tensor, weight_hh: torch.Tensor,
+                    bias_hh: Optional[torch.Tensor], h_encoding: Optional[List[float]]) -> \
+        Tuple[torch.Tensor, torch.Tensor]:
+    """
+    GRU recurrence over precomputed input projections, with the same arithmetic as torch gru_cell
+    :return: stacked hidden states of all timesteps and final hidden state
+    """
+    outputs = []
+    for step in range(projected_input.shape[0]):
+        input_reset, input_update, input_new = projected_input[step].chunk(3, 1)
+        hidden_reset, hidden_update, hidden_new = torch.nn.functional.linear(h, weight_hh, bias_hh).chunk(3, 1)
+        reset_gate = torch.sigmoid(input_reset + hidden_reset)
+        update_gate = torch.sigmoid(input_update + hidden_update)
+        new_gate = torch.tanh(input_new + reset_gate * hidden_new)
+        h = (h - new_gate) * update_gate + new_gate
+        h = _quantize_dequantize_hidden_state(h, h_encoding)
+        outputs.append(h)
+    return torch.stack(outputs), h
+
+
+@torch.jit.script
+def _rnn_recurrence(projected_input: torch.Tensor, h: torch.Tensor, weight_hh: torch.Tensor,
+                    bias_hh: Optional[torch.Tensor], h_encoding: Optional[List[float]], use_relu: bool) -> \
+        Tuple[torch.Tensor, torch.Tensor]:
+    """
+    RNN recurrence over precomputed input projections, with the same arithmetic as torch rnn_tanh_cell/rnn_relu_cell
+    :return: stacked hidden states of all timesteps and final hidden state
+    """
+    outputs = []
+    for step in range(projected_input.shape[0]):
+        pre_activation = projected_input[step] + torch.nn.functional.linear(h, weight_hh, bias_hh)
+        h = torch.relu(pre_activation) if use_relu else torch.tanh(pre_activation)
+        h = _quantize_dequantize_hidden_state(h, h_encoding)
+        outputs.append(h)
+    return torch.stack(outputs), h
+
+
 def _get_inputs_and_packed_sequence_info(inputs: Union[torch.Tensor, PackedSequence], batch_first: bool) -> \
         Tuple[torch.Tensor, Union[PackedSequenceInfo, None]]:
     """
@@ -40,7 +40,7 @@
 import os
 import contextlib
 from collections import OrderedDict, defaultdict
-from typing import Union, Tuple, Dict, List, Collection, Type, Generator
+from typing import Union, Tuple, Dict, List, Collection, Type, Generator, Optional
 import torch
 from torch.utils.data import DataLoader
 
@@ -59,6 +59,9 @@ _logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.QuantAnalyzer)
 
 DEFAULT_BOKEH_FIGURE_HEIGHT = 300
 
+# Maximum number of fp32 layer output activations held at a time when computing per layer MSE loss
+DEFAULT_MAX_OUTPUTS_PER_RUN = 32
+
 
 class QuantAnalyzer:
     """
@@ -619,6 +622,7 @@ class QuantAnalyzer:
     def export_per_layer_mse_loss(self,
                                   sim: QuantizationSimModel,
                                   results_dir: str,
+                                  max_outputs_per_run: Optional[int] = DEFAULT_MAX_OUTPUTS_PER_RUN,
                                   ) -> Dict:
         """
         NOTE: Need to pass same model input data through both fp32 and quantsim model to
@@ -627,8 +631,14 @@ class QuantAnalyzer:
         Export MSE loss between fp32 and quantized output activations for each layer.
         :param sim: Quantsim model.
         :param results_dir: Directory to save the results.
+        :param max_outputs_per_run: Maximum number of fp32 layer output activations held in memory at a time.
+            Layers are processed in groups of at most this many, each group taking one pass over the data.
+            If None, all the layers are processed in a single pass.
         :return layer wise MSE loss. dict[layer_name] = MSE loss.
         """
+        if max_outputs_per_run is not None and max_outputs_per_run < 1:
+            raise ValueError(f'max_outputs_per_run must be positive, got {max_outputs_per_run}')
+
         results_dir = os.path.abspath(results_dir)
         os.makedirs(results_dir, exist_ok=True)
 
@@ -637,11 +647,16 @@ class QuantAnalyzer:
             name_to_quant_wrapper_dict[name] = module
 
         modules = utils.get_ordered_list_of_modules(self._model, self._dummy_input)
-        mse_loss_dict = {}
+        module_to_quant_wrapper = OrderedDict()
         for name, module in modules:
-            quant_wrapper = name_to_quant_wrapper_dict[name]
-            loss = self._compute_mse_loss(module, quant_wrapper, self._model, sim)
-            mse_loss_dict[name] = loss
+            module_to_quant_wrapper[name] = (module, name_to_quant_wrapper_dict[name])
+
+        layer_names = list(module_to_quant_wrapper)
+        group_size = max_outputs_per_run or max(len(layer_names), 1)
+        mse_loss_dict = {}
+        for idx in range(0, len(layer_names), group_size):
+            group = OrderedDict((name, module_to_quant_wrapper[name]) for name in layer_names[idx:idx + group_size])
+            mse_loss_dict.update(self._compute_per_layer_mse_loss(group, self._model, sim))
 
         export_per_layer_mse_plot(mse_loss_dict,
                                   results_dir,
@@ -650,41 +665,92 @@ class QuantAnalyzer:
         _logger.info("Exported per layer MSE loss plot.")
         return mse_loss_dict
 
-    def _compute_mse_loss(self, module: torch.nn.Module, quant_wrapper: torch.nn.Module,
-                          fp32_model: torch.nn.Module, sim: QuantizationSimModel) -> float:
+    def _compute_per_layer_mse_loss(self, module_to_quant_wrapper: Dict[str, Tuple[torch.nn.Module, torch.nn.Module]],
+                                    fp32_model: torch.nn.Module, sim: QuantizationSimModel) -> Dict[str, float]:
         """
-        Compute MSE loss between fp32 and quantized output activations for each batch, add for
-        all the batches and return averaged mse loss.
+        Compute MSE loss between fp32 and quantized output activations of all the layers for each batch, add for
+        all the batches and return averaged mse loss per layer.
+
+        Output activations of all the given layers are tapped at once, so that each batch needs only one forward pass
+        through the fp32 model and one through the quantsim model. fp32 output activations are kept until the corresponding
+        quantized output activations are available and the MSE loss is accumulated in place.
 
-        :param module: module from the fp32_model.
-        :param quant_wrapper: Corresponding quant wrapper from the QuantSim model.
+        :param module_to_quant_wrapper: Ordered dict of layer name to (module from the fp32_model,
+         corresponding quant wrapper from the QuantSim model).
         :param fp32_model: PyTorch model.
         :param sim: Quantsim model.
-        :return: MSE loss between fp32 and quantized output activations.
-        """
-        # output activations collector.
-        orig_module_collector = utils.ModuleData(fp32_model, module)
-        quant_module_collector = utils.ModuleData(sim.model, quant_wrapper)
-
-        total = 0
-        loss = 0.0
-        batch_index = 0
-        for model_inputs in self._unlabeled_dataset_iterable:
-            assert isinstance(model_inputs, (torch.Tensor, tuple, list))
-            _, quantized_out_acts = quant_module_collector.collect_inp_out_data(model_inputs,
-                                                                                collect_input=False,
-                                                                                collect_output=True)
-            _, fp32_out_acts = orig_module_collector.collect_inp_out_data(model_inputs,
-                                                                          collect_input=False,
-                                                                          collect_output=True)
-            loss += torch.nn.functional.mse_loss(fp32_out_acts, quantized_out_acts).item()
-            total += fp32_out_acts.size(0)
-            batch_index += 1
-            if batch_index == self._num_batches:
-                break
-
-        average_loss = loss/total
-        return average_loss
+        :return: layer wise MSE loss. dict[layer_name] = MSE loss.
+        """
+        fp32_out_acts = {}
+        loss = {}
+        total = defaultdict(int)
+
+        def _fp32_hook(name):
+            def hook(_, __, out):
+                # Only the first invocation of a module is considered, same as utils.ModuleData
+                if name not in fp32_out_acts and isinstance(out, torch.Tensor):
+                    fp32_out_acts[name] = out.detach()
+            return hook
+
+        def _quant_hook(name):
+            def hook(_, __, out):
+                fp32_out = fp32_out_acts.pop(name, None)
+                if fp32_out is None or not isinstance(out, torch.Tensor):
+                    return
+                batch_loss = torch.nn.functional.mse_loss(fp32_out.to(out.device), out.detach())
+                loss[name] = loss[name] + batch_loss if name in loss else batch_loss
+                total[name] += fp32_out.size(0)
+            return hook
+
+        handles = []
+        for name, (module, quant_wrapper) in module_to_quant_wrapper.items():
+            handles.append(module.register_forward_hook(_fp32_hook(name)))
+            handles.append(quant_wrapper.register_forward_hook(_quant_hook(name)))
+
+        try:
+            self._run_fp32_and_quantsim_in_lockstep(fp32_model, sim.model, fp32_out_acts)
+        finally:
+            for handle in handles:
+                handle.remove()
+
+        return {name: loss[name].item() / total[name] for name in module_to_quant_wrapper if name in loss}
+
+    def _run_fp32_and_quantsim_in_lockstep(self, fp32_model: torch.nn.Module, quant_model: torch.nn.Module,
+                                           fp32_out_acts: Dict[str, torch.Tensor]):
+        """
+        Pass each batch of the unlabeled dataset through the fp32 model followed by the quantsim model.
+
+        :param fp32_model: PyTorch model.
+        :param quant_model: Quantized model.
+        :param fp32_out_acts: fp32 output activations tapped during current batch. Cleared after every batch.
+        """
+        def adjust_input_dtype(module, inp):
+            if hasattr(module, 'weight') and module.weight is not None:
+                dtype = module.weight.dtype
+                return utils.nested_map(inp, lambda x: x.to(dtype) if x.is_floating_point() else x)
+            return inp
+
+        handles = [mod.register_forward_pre_hook(adjust_input_dtype)
+                   for model in (fp32_model, quant_model) for mod in model.modules()]
+        fp32_device = utils.get_device(fp32_model)
+        quant_device = utils.get_device(quant_model)
+
+        try:
+            with utils.in_eval_mode([fp32_model, quant_model]), torch.no_grad():
+                batch_index = 0
+                for model_inputs in self._unlabeled_dataset_iterable:
+                    assert isinstance(model_inputs, (torch.Tensor, tuple, list))
+                    utils.ModuleData.default_forward_fn(
+                        fp32_model, utils.change_tensor_device_placement(model_inputs, fp32_device))
+                    utils.ModuleData.default_forward_fn(
+                        quant_model, utils.change_tensor_device_placement(model_inputs, quant_device))
+                    fp32_out_acts.clear()
+                    batch_index += 1
+                    if batch_index == self._num_batches:
+                        break
+        finally:
+            for handle in handles:
+                handle.remove()
 
     @staticmethod
     def _exclude_modules_from_quantization(model: torch.nn.Module, sim: QuantizationSimModel,
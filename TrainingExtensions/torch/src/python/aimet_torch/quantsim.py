@@ -43,7 +43,8 @@ import os
 import io
 import copy
 import pickle
-from typing import Tuple, List, Union, Dict, Callable, Optional, Any, runtime_checkable, Protocol, Mapping
+from typing import Tuple, List, Union, Dict, Callable, Optional, Any, runtime_checkable, Protocol, Mapping, \
+    Iterable
 from collections import OrderedDict, defaultdict
 import json
 import torch
@@ -52,6 +53,7 @@ from packaging import version  # pylint: disable=wrong-import-order
 
 import aimet_common.libpymo as libpymo
 from aimet_common import quantsim
+from aimet_common import tracing
 
 from aimet_common.connected_graph.connectedgraph_utils import CG_SPLIT
 from aimet_common.utils import AimetLogger, save_json_yaml, log_with_error_and_assert_if_false
@@ -63,7 +65,8 @@ from aimet_torch.nn.modules.custom import MatMul
 from aimet_torch.quantsim_config.quantsim_config import QuantSimConfigurator
 from aimet_torch.qc_quantize_op import QcQuantizeStandAloneBase, QcQuantizeWrapper, QcQuantizeOpMode, \
     StaticGridQuantWrapper, LearnedGridQuantWrapper, NativeTorchQuantWrapper, QUANTIZER_TYPE_INPUT, QUANTIZER_TYPE_OUTPUT
-from aimet_torch.tensor_quantizer import initialize_learned_grid_quantizer_attributes, TensorQuantizer
+from aimet_torch.tensor_quantizer import initialize_learned_grid_quantizer_attributes, TensorQuantizer, \
+    StaticGridTensorQuantizer, LearnedGridTensorQuantizer
 from aimet_torch.qc_quantize_op import get_encoding_by_quantizer as _get_encoding_by_quantizer
 from aimet_torch import torchscript_utils, utils, onnx_utils
 from aimet_torch.utils import deprecated
@@ -199,6 +202,127 @@ class ExportableQuantModule(Protocol):
         """
 
 
+def _get_tensor_version(tensor: torch.Tensor) -> Tuple[int, int]:
+    """
+    Returns the version counter and data pointer of a tensor.
+    The pair changes whenever the tensor is modified in place or its data is replaced.
+
+    :param tensor: Tensor
+    :return: Version of the tensor
+    """
+    return tensor._version, tensor.data_ptr() # pylint: disable=protected-access
+
+
+class _TensorSnapshot:
+    """
+    Copy of a parameter or buffer of a module, captured by QuantizationSimModel.snapshot()
+    """
+
+    def __init__(self, owner: torch.nn.Module, name: str):
+        """
+        :param owner: Module that owns the tensor
+        :param name: Name of the parameter or buffer in the owner module
+        """
+        # pylint: disable=protected-access
+        self.owner = owner
+        self.name = name
+        self._tensors = owner._parameters if name in owner._parameters else owner._buffers
+        self.tensor = self._tensors.get(name)
+        self.value = None
+        self.version = None
+
+        if self.tensor is not None:
+            self.value = self.tensor.detach().clone()
+            self.version = _get_tensor_version(self.tensor)
+
+    def restore(self) -> bool:
+        """
+        Restore the tensor if it was replaced or modified since it was captured
+
+        :return: True if the tensor was restored, False if it was left untouched
+        """
+        restored = False
+
+        if self._tensors.get(self.name) is not self.tensor:
+            self._tensors[self.name] = self.tensor
+            restored = True
+
+        if self.tensor is not None and _get_tensor_version(self.tensor) != self.version:
+            with torch.no_grad():
+                if self.tensor.shape == self.value.shape and self.tensor.dtype == self.value.dtype and \
+                        self.tensor.device == self.value.device:
+                    self.tensor.copy_(self.value)
+                else:
+                    self.tensor.data = self.value.clone()
+            self.version = _get_tensor_version(self.tensor)
+            restored = True
+
+        return restored
+
+
+class _QuantizerSnapshot:
+    """
+    State of a single quantizer captured by QuantizationSimModel.snapshot()
+    """
+
+    def __init__(self, container: Union[List, Dict, torch.nn.Module], key: Union[int, str],
+                 attrs: Dict[str, Any], encoding: Optional[torch.Tensor], tensors: List[_TensorSnapshot],
+                 uninitialized: Tuple[str, ...] = ()):
+        """
+        :param container: List or dict of quantizers which holds the quantizer
+        :param key: Index or key of the quantizer in the container
+        :param attrs: Attributes of the quantizer such as enabled flag, bitwidth and data type
+        :param encoding: Encodings of a static grid quantizer as a tensor of shape (num_channels, 5)
+        :param tensors: Quantization parameters of the quantizer
+        :param uninitialized: Names of the quantization parameters which were not initialized yet
+        """
+        self.container = container
+        self.key = key
+        self.quantizer = container[key]
+        self.attrs = attrs
+        self.encoding = encoding
+        self.encoding_ref = getattr(self.quantizer, '_encoding', None)
+        self.tensors = tensors
+        self.uninitialized = uninitialized
+
+
+class QuantSimSnapshot:
+    """
+    Snapshot of the quantizer state of a QuantizationSimModel.
+    Holds the encodings, enabled flags, bitwidths and data types of all quantizers, and optionally the weights of the
+    quantized layers, as a compact bundle of tensors. See QuantizationSimModel.snapshot() and restore().
+    """
+
+    def __init__(self, quantizers: List[_QuantizerSnapshot], modes: Dict[torch.nn.Module, QcQuantizeOpMode],
+                 params: List[_TensorSnapshot]):
+        """
+        :param quantizers: Snapshots of the quantizers
+        :param modes: Mode of each quantized module
+        :param params: Snapshots of the weights of the quantized modules
+        """
+        self.quantizers = quantizers
+        self.modes = modes
+        self.params = params
+
+    def tensors(self) -> Dict[str, torch.Tensor]:
+        """
+        Returns the tensors held by the snapshot
+
+        :return: Dictionary of tensors
+        """
+        tensors = {}
+        for i, quantizer in enumerate(self.quantizers):
+            if quantizer.encoding is not None:
+                tensors[f'quantizer{i}.encoding'] = quantizer.encoding
+            for tensor in quantizer.tensors:
+                if tensor.value is not None:
+                    tensors[f'quantizer{i}.{tensor.name}'] = tensor.value
+        for i, param in enumerate(self.params):
+            if param.value is not None:
+                tensors[f'param{i}.{param.name}'] = param.value
+        return tensors
+
+
 # Types of modules which cannot be quantized
 unquantizable_modules = (
     QcQuantizeWrapper,
@@ -217,6 +341,7 @@ class QuantizationSimModel:
     """
 
     # pylint: disable=too-many-arguments, too-many-instance-attributes, too-many-locals, too-many-public-methods
+    @tracing.traced("QuantizationSimModel.__init__")
     def __init__(self, model: torch.nn.Module, dummy_input: Union[torch.Tensor, Tuple],
                  quant_scheme: Union[str, QuantScheme] = QuantScheme.post_training_tf_enhanced,
                  rounding_mode: str = 'nearest', default_output_bw: int = 8, default_param_bw: int = 8,
@@ -421,6 +546,7 @@ class QuantizationSimModel:
 
         sim.replace_wrappers_for_quantize_dequantize()
 
+    @tracing.traced("QuantizationSimModel.compute_encodings")
     def compute_encodings(self, forward_pass_callback, forward_pass_callback_args):
         """
         Computes encodings for all quantization sim nodes in the model. It is also used to find initial encodings for
@@ -441,10 +567,11 @@ class QuantizationSimModel:
         QuantizationSimModel.prepare_sim_for_compute_encodings(self)
 
         # Run forward iterations so we can collect statistics to compute the appropriate encodings
-        with utils.in_eval_mode(self.model), torch.no_grad():
+        with utils.in_eval_mode(self.model), torch.no_grad(), utils.trace_forward_passes(self.model):
             _ = forward_pass_callback(self.model, forward_pass_callback_args)
 
-        QuantizationSimModel.compute_layer_encodings_for_sim(self)
+        with tracing.span("QuantizationSimModel.compute_layer_encodings_for_sim"):
+            QuantizationSimModel.compute_layer_encodings_for_sim(self)
 
     @classmethod
     def set_mode_for_recurrent_module(cls, layer: QcQuantizeRecurrent, name: str):
@@ -482,6 +609,7 @@ class QuantizationSimModel:
             raise ValueError("Percentile value must be in range [90, 100]")
         self._percentile_value = percentile_value
 
+    @tracing.traced("QuantizationSimModel.export")
     def export(self, path: str, filename_prefix: str, dummy_input: Union[torch.Tensor, Tuple],
                onnx_export_args: Optional[Union[OnnxExportApiArgs, Dict]] = None, propagate_encodings: bool = False,
                export_to_torchscript: bool = False, use_embedded_encodings: bool = False, export_model: bool = True,
@@ -537,6 +665,8 @@ class QuantizationSimModel:
         model_to_export = QuantizationSimModel.get_original_model(self.model)
 
         torch.save(model_to_export, model_path)
+        if tracing.is_enabled():
+            tracing.count("bytes_serialized", os.path.getsize(model_path))
 
         if onnx_export_args is None:
             onnx_export_args = {'opset_version': None,
@@ -634,8 +764,12 @@ class QuantizationSimModel:
             filename_prefix_encodings = filename_prefix
         onnx_path = os.path.join(path, filename_prefix + '.onnx')
         if export_model:
-            OnnxSaver.create_onnx_model_with_pytorch_layer_names(onnx_path, original_model, dummy_input, is_conditional,
-                                                                 module_marker_map, onnx_export_args)
+            with tracing.span("OnnxSaver.create_onnx_model_with_pytorch_layer_names"):
+                OnnxSaver.create_onnx_model_with_pytorch_layer_names(onnx_path, original_model, dummy_input,
+                                                                     is_conditional, module_marker_map,
+                                                                     onnx_export_args)
+            if tracing.is_enabled():
+                tracing.count("bytes_serialized", os.path.getsize(onnx_path))
 
         assert os.path.exists(onnx_path), 'The onnx model does not exist in the location specified. Please re-run export' \
                                           'with export_model flag as True or check path/file_name'
@@ -1729,6 +1863,120 @@ class QuantizationSimModel:
 
     quant_wrappers = named_qmodules
 
+    def snapshot(self, include_weights: bool = False) -> QuantSimSnapshot:
+        """
+        Take a snapshot of the quantizer state of the sim, which can be brought back later with :meth:`restore`.
+        Unlike deep-copying the sim, only the encodings, enabled flags, bitwidths and data types of the quantizers
+        are captured.
+
+        :param include_weights: If True, the weights of the quantized layers are captured as well
+        :return: Snapshot of the quantizer state
+        """
+        # pylint: disable=protected-access
+        quantizers = []
+        modes = {}
+        params = []
+
+        for _, module in self.named_qmodules():
+            if hasattr(module, '_mode'):
+                modes[module] = module._mode
+
+            for container, key in _get_quantizer_slots(module):
+                quantizers.append(self._snapshot_quantizer(container, key))
+
+            if include_weights:
+                owner = getattr(module, '_module_to_wrap', module)
+                params.extend(_TensorSnapshot(owner, name) for name in module.param_quantizers
+                              if name in owner._parameters)
+
+        return QuantSimSnapshot(quantizers, modes, params)
+
+    def restore(self, snapshot: QuantSimSnapshot) -> int:
+        """
+        Restore the quantizer state of the sim from a snapshot taken by :meth:`snapshot`.
+        Only the quantizers and weights modified since the snapshot are written back. Modifications are detected
+        from the identity of the encoding objects and the version counters of the tensors, so restoring a snapshot
+        doesn't require comparing encodings or weights.
+
+        A snapshot can be restored any number of times, as long as no quantized module or quantizer is added to
+        or removed from the sim in between.
+
+        :param snapshot: Snapshot to restore
+        :return: Number of quantizers and weights that were restored
+        """
+        # pylint: disable=protected-access
+        num_restored = 0
+
+        for quantizer in snapshot.quantizers:
+            num_restored += self._restore_quantizer(quantizer)
+
+        for module, mode in snapshot.modes.items():
+            if module._mode != mode:
+                module.set_mode(mode)
+
+        for param in snapshot.params:
+            num_restored += param.restore()
+
+        return num_restored
+
+    @staticmethod
+    def _snapshot_quantizer(container: Union[List, Dict], key: Union[int, str]) -> _QuantizerSnapshot:
+        """
+        Capture the state of a quantizer
+
+        :param container: List or dict of quantizers which holds the quantizer
+        :param key: Index or key of the quantizer in the container
+        :return: Snapshot of the quantizer
+        """
+        # pylint: disable=protected-access
+        quantizer = container[key]
+        attrs = {name: getattr(quantizer, name) for name in ('enabled', 'bitwidth', 'data_type',
+                                                             'is_unsigned_symmetric')}
+        encoding = None
+        tensors = []
+
+        if isinstance(quantizer, StaticGridTensorQuantizer):
+            encoding = _encodings_to_tensor(quantizer._encoding)
+        elif isinstance(quantizer, LearnedGridTensorQuantizer):
+            tensors = [_TensorSnapshot(quantizer.wrapper_ref, quantizer.name + '_encoding_min'),
+                       _TensorSnapshot(quantizer.wrapper_ref, quantizer.name + '_encoding_max')]
+
+        return _QuantizerSnapshot(container, key, attrs, encoding, tensors)
+
+    @staticmethod
+    def _restore_quantizer(snapshot: _QuantizerSnapshot) -> bool:
+        """
+        Restore the state of a quantizer if it was modified since the snapshot
+
+        :param snapshot: Snapshot of the quantizer
+        :return: True if the quantizer was restored, False if it was left untouched
+        """
+        # pylint: disable=protected-access
+        restored = False
+        quantizer = snapshot.quantizer
+
+        if snapshot.container[snapshot.key] is not quantizer:
+            snapshot.container[snapshot.key] = quantizer
+            restored = True
+
+        if quantizer is None:
+            return restored
+
+        for name, value in snapshot.attrs.items():
+            if getattr(quantizer, name) != value:
+                setattr(quantizer, name, value)
+                restored = True
+
+        if isinstance(quantizer, StaticGridTensorQuantizer) and quantizer._encoding is not snapshot.encoding_ref:
+            quantizer._encoding = _tensor_to_encodings(snapshot.encoding)
+            snapshot.encoding_ref = quantizer._encoding
+            restored = True
+
+        for tensor in snapshot.tensors:
+            restored = tensor.restore() or restored
+
+        return restored
+
     def run_modules_for_traced_custom_marker(self, module_list: List[torch.nn.Module], dummy_input):
         """
         Given a list of modules to run and dummy input for the module, create a traced CustomMarker for each module
@@ -2076,6 +2324,54 @@ class QuantizationSimModel:
         return num_inout_tensors
 
 
+def _get_quantizer_slots(module: torch.nn.Module) -> Iterable[Tuple[Union[List, Dict], Union[int, str]]]:
+    """
+    Yields the container and the index or key of each input, output and parameter quantizer of a quantized module
+
+    :param module: Quantized module
+    :return: Generator of (container, key) pairs
+    """
+    for container in (module.input_quantizers, module.output_quantizers, module.param_quantizers):
+        keys = list(container.keys()) if hasattr(container, 'keys') else range(len(container))
+        for key in keys:
+            yield container, key
+
+
+def _encodings_to_tensor(encodings: Optional[List[libpymo.TfEncoding]]) -> Optional[torch.Tensor]:
+    """
+    Pack encodings into a tensor of shape (num_channels, 5) holding min, max, delta, offset and bitwidth
+
+    :param encodings: Encodings of a static grid quantizer
+    :return: Tensor of encodings
+    """
+    if encodings is None:
+        return None
+    return torch.tensor([[enc.min, enc.max, enc.delta, enc.offset, enc.bw] for enc in encodings],
+                        dtype=torch.float64)
+
+
+def _tensor_to_encodings(tensor: Optional[torch.Tensor]) -> Optional[List[libpymo.TfEncoding]]:
+    """
+    Unpack encodings packed by _encodings_to_tensor
+
+    :param tensor: Tensor of encodings
+    :return: Encodings of a static grid quantizer
+    """
+    if tensor is None:
+        return None
+
+    encodings = []
+    for enc_min, enc_max, delta, offset, bw in tensor.tolist():
+        encoding = libpymo.TfEncoding()
+        encoding.min = enc_min
+        encoding.max = enc_max
+        encoding.delta = delta
+        encoding.offset = offset
+        encoding.bw = int(bw)
+        encodings.append(encoding)
+    return encodings
+
+
 def save_checkpoint(quant_sim_model: QuantizationSimModel, file_path: str):
     """
     This API provides a way for the user to save a checkpoint of the quantized model which can
@@ -49,6 +49,7 @@ import torch.nn.functional as functional
 from torch.utils.data import DataLoader
 
 from aimet_common.utils import AimetLogger
+from aimet_common import tracing
 from aimet_common.defs import QuantScheme
 import aimet_common.libpymo as libpymo
 
@@ -91,12 +92,18 @@ class SeqMseParams:
     :param loss_fn: Loss function. Available options are 'mse', 'l1' and 'sqnr'. Default 'mse'.
     :param forward_fn: Optional adapter function that performs forward pass given a model and inputs
      yielded from the data loader. The function expects model as first argument and inputs to model as second argument.
+    :param early_stop_tol: If set, candidate search of a module terminates early once the loss has plateaued, i.e.
+     the best loss of no channel improved by more than this fraction for early_stop_patience consecutive candidates.
+     Default None (always evaluate all the candidates).
+    :param early_stop_patience: Number of consecutive candidates without improvement to declare a plateau. Default 3.
     """
     num_batches: int
     num_candidates: int = 20
     inp_symmetry: str = 'symqt'
     loss_fn: str = 'mse'
     forward_fn: Callable = default_forward_fn
+    early_stop_tol: Optional[float] = None
+    early_stop_patience: int = 3
 
 
 class SequentialMse:
@@ -104,6 +111,7 @@ class SequentialMse:
     Sequentially minimizing activation MSE loss in layer-wise way to decide optimal param quantization encodings.
     """
     @classmethod
+    @tracing.traced("SequentialMse.apply_seq_mse")
     def apply_seq_mse(cls,
                       model: torch.nn.Module,
                       sim: QuantizationSimModel,
@@ -269,6 +277,7 @@ class SequentialMse:
         if not cached_quant_dataset:
             cached_quant_dataset = cached_fp_dataset
 
+        candidates_evaluated = {}
         for module_qualified_name, fp32_module in fp32_modules:
             try:
                 quant_module = name_to_quant_module[module_qualified_name]
@@ -279,18 +288,26 @@ class SequentialMse:
                 continue
 
             _logger.info("Finding and freezing optimal param encodings candidate of module: %s", module_qualified_name)
-            if params.inp_symmetry == "asym":
-                fp32_inp_acts = cls.get_module_inp_acts(fp32_module, model, params, forward_fn, cached_fp_dataset)
-                quant_inp_acts = cls.get_module_inp_acts(quant_module, quant_model, params, forward_fn, cached_quant_dataset)
-                cls.optimize_module(quant_module, fp32_inp_acts, quant_inp_acts, params)
-            elif params.inp_symmetry == "symfp":
-                fp32_inp_acts = cls.get_module_inp_acts(fp32_module, model, params, forward_fn, cached_fp_dataset)
-                cls.optimize_module(quant_module, fp32_inp_acts, fp32_inp_acts, params)
-            elif params.inp_symmetry == "symqt":
-                quant_inp_acts = cls.get_module_inp_acts(quant_module, quant_model, params, forward_fn, cached_quant_dataset)
-                cls.optimize_module(quant_module, quant_inp_acts, quant_inp_acts, params)
-            else:
-                raise ValueError(f"Invalid inp_symmetry: {params.inp_symmetry}")
+            with tracing.span("SequentialMse.optimize_module", module=module_qualified_name):
+                if params.inp_symmetry == "asym":
+                    fp32_inp_acts = cls.get_module_inp_acts(fp32_module, model, params, forward_fn, cached_fp_dataset)
+                    quant_inp_acts = cls.get_module_inp_acts(quant_module, quant_model, params, forward_fn,
+                                                             cached_quant_dataset)
+                    num_evaluated = cls.optimize_module(quant_module, fp32_inp_acts, quant_inp_acts, params)
+                elif params.inp_symmetry == "symfp":
+                    fp32_inp_acts = cls.get_module_inp_acts(fp32_module, model, params, forward_fn, cached_fp_dataset)
+                    num_evaluated = cls.optimize_module(quant_module, fp32_inp_acts, fp32_inp_acts, params)
+                elif params.inp_symmetry == "symqt":
+                    quant_inp_acts = cls.get_module_inp_acts(quant_module, quant_model, params, forward_fn,
+                                                             cached_quant_dataset)
+                    num_evaluated = cls.optimize_module(quant_module, quant_inp_acts, quant_inp_acts, params)
+                else:
+                    raise ValueError(f"Invalid inp_symmetry: {params.inp_symmetry}")
+            tracing.count("seq_mse_candidates_evaluated", num_evaluated)
+            candidates_evaluated[module_qualified_name] = num_evaluated
+
+        if params.early_stop_tol is not None:
+            _logger.info("Number of candidates evaluated per module: %s", candidates_evaluated)
 
     @staticmethod
     def get_module_inp_acts(module: torch.nn.Module,
@@ -468,7 +485,7 @@ class SequentialMse:
                         quant_module: QcQuantizeWrapper,
                         x: torch.Tensor,
                         xq: torch.Tensor,
-                        params: SeqMseParams):
+                        params: SeqMseParams) -> int:
         """
         Find and freeze optimal parameter encodings candidate for given module.
 
@@ -476,12 +493,15 @@ class SequentialMse:
         :param x: Inputs to module from FP32 model
         :param xq: Inputs to module from QuantSim model
         :param params: Sequenial MSE parameters
+        :return: Number of candidates evaluated
         """
         # pylint: disable=too-many-locals
         per_channel_min, per_channel_max = cls.get_per_channel_min_and_max(quant_module)
         candidates = cls.get_candidates(params.num_candidates, per_channel_max, per_channel_min)
 
         total_loss = []
+        best_loss = None
+        num_candidates_without_improvement = 0
         for cand_max, cand_min in candidates:
             cls.compute_param_encodings(quant_module.param_quantizers['weight'], cand_min, cand_max)
             w = quant_module.weight
@@ -493,6 +513,19 @@ class SequentialMse:
                     loss += cls.compute_recon_loss(xqwq, xw, params)
                 total_loss.append(loss)
 
+            if params.early_stop_tol is not None:
+                if best_loss is not None and \
+                        torch.all(loss >= best_loss - params.early_stop_tol * best_loss.abs()):
+                    num_candidates_without_improvement += 1
+                else:
+                    num_candidates_without_improvement = 0
+                best_loss = loss if best_loss is None else torch.minimum(best_loss, loss)
+
+                if num_candidates_without_improvement >= params.early_stop_patience:
+                    break
+
+        # Only the evaluated candidates are considered
+        candidates = candidates[:len(total_loss)]
         best_indices = torch.stack(total_loss).min(0, keepdim=True)[1]
         _logger.debug("Indices of optimal candidate: %s", best_indices.squeeze(0)[:params.num_candidates].tolist())
         best_max = torch.stack([cand_max for cand_max, _ in candidates]).gather(0, best_indices)[0]
@@ -502,6 +535,8 @@ class SequentialMse:
         cls.compute_param_encodings(quant_module.param_quantizers['weight'], best_min, best_max)
         cls._freeze_quantizer_encoding(quant_module.param_quantizers['weight'])
 
+        return len(candidates)
+
     @staticmethod
     def compute_param_encodings(quantizer: Union[StaticGridPerTensorQuantizer, StaticGridPerChannelQuantizer],
                                 x_min: torch.Tensor,
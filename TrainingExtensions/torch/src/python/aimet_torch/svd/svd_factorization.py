@@ -0,0 +1,180 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Cache of truncated singular value decompositions of layer weights, shared across candidate ranks """
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+import torch
+
+from aimet_common.cache import fingerprint
+from aimet_common.utils import AimetLogger
+
+logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Svd)
+
+
+class SvdFactorization:
+    """
+    Truncated singular value decomposition u @ diag(s) @ vh of a 2D matrix
+    """
+
+    def __init__(self, u: torch.Tensor, s: torch.Tensor, vh: torch.Tensor, max_rank: int):
+        """
+        :param u: Left singular vectors of shape (m, k)
+        :param s: Singular values in descending order of shape (k,)
+        :param vh: Right singular vectors of shape (k, n)
+        :param max_rank: Largest rank for which the factorization is accurate. Less than k for randomized SVD
+        """
+        self.u = u
+        self.s = s
+        self.vh = vh
+        self.max_rank = max_rank
+
+    def split(self, rank: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Split the matrix into two factors of the given rank, distributing the singular values evenly between them
+        :param rank: Rank of the split
+        :return: Tuple of factors of shape (m, rank) and (rank, n) whose product approximates the matrix
+        """
+        assert rank <= self.max_rank
+        sqrt_s = torch.sqrt(self.s[:rank])
+        first = self.u[:, :rank] * sqrt_s
+        second = sqrt_s.unsqueeze(1) * self.vh[:rank, :]
+        return first, second
+
+
+class SvdFactorizationCache:
+    """
+    Computes one SVD per weight matrix and reuses it for every rank the matrix is split with.
+
+    Matrices are keyed by content, so copies of a layer in different layer databases share one factorization.
+    Matrices whose smaller dimension is at least randomized_svd_min_dim are factorized with randomized truncated SVD
+    up to the requested rank, all others with an exact SVD that can be batched across matrices of the same shape.
+    """
+
+    def __init__(self, randomized_svd_min_dim: Optional[int] = None, oversampling: int = 10,
+                 num_power_iterations: int = 2, max_batch_size: int = 64):
+        """
+        :param randomized_svd_min_dim: Smallest matrix dimension for which randomized SVD is used.
+            None to always use exact SVD
+        :param oversampling: Number of extra components computed by randomized SVD to improve accuracy
+        :param num_power_iterations: Number of subspace iterations of randomized SVD
+        :param max_batch_size: Maximum number of matrices factorized in one batched SVD call
+        """
+        self._randomized_svd_min_dim = randomized_svd_min_dim
+        self._oversampling = oversampling
+        self._num_power_iterations = num_power_iterations
+        self._max_batch_size = max_batch_size
+        self._factorizations: Dict[str, SvdFactorization] = {}
+
+    def __len__(self):
+        return len(self._factorizations)
+
+    def __contains__(self, matrix: torch.Tensor):
+        return self._get_key(matrix) in self._factorizations
+
+    def clear(self):
+        """
+        Drop all cached factorizations
+        """
+        self._factorizations.clear()
+
+    @staticmethod
+    def _get_key(matrix: torch.Tensor) -> str:
+        return fingerprint(matrix.detach().cpu().numpy())
+
+    def uses_randomized_svd(self, matrix: torch.Tensor) -> bool:
+        """
+        :param matrix: 2D matrix
+        :return: True if the matrix is factorized with randomized SVD
+        """
+        return self._randomized_svd_min_dim is not None and min(matrix.shape) >= self._randomized_svd_min_dim
+
+    def get(self, matrix: torch.Tensor, rank: int) -> SvdFactorization:
+        """
+        Return the factorization of a matrix, computing it if it is not cached or not accurate up to the given rank
+        :param matrix: 2D matrix to factorize
+        :param rank: Largest rank the factorization will be split with
+        :return: Factorization of the matrix
+        """
+        key = self._get_key(matrix)
+        factorization = self._factorizations.get(key)
+        if factorization is None or factorization.max_rank < rank:
+            factorization = self._factorize(matrix.detach(), rank, factorization)
+            self._factorizations[key] = factorization
+        return factorization
+
+    def _factorize(self, matrix: torch.Tensor, rank: int,
+                   previous: Optional[SvdFactorization]) -> SvdFactorization:
+        full_rank = min(matrix.shape)
+        assert rank <= full_rank
+
+        if self.uses_randomized_svd(matrix):
+            # Grow geometrically so that a sequence of increasing ranks triggers few recomputations
+            target_rank = rank if previous is None else max(rank, 2 * previous.max_rank)
+            num_components = target_rank + self._oversampling
+            if num_components < full_rank:
+                logger.debug("Randomized SVD of matrix of shape %r with %d components",
+                             tuple(matrix.shape), num_components)
+                u, s, v = torch.svd_lowrank(matrix, q=num_components, niter=self._num_power_iterations)
+                return SvdFactorization(u, s, v.transpose(0, 1), target_rank)
+
+        u, s, vh = torch.linalg.svd(matrix, full_matrices=False)
+        return SvdFactorization(u, s, vh, full_rank)
+
+    def precompute(self, matrices: Iterable[torch.Tensor]):
+        """
+        Factorize matrices that are not cached yet, batching matrices of the same shape into one SVD call.
+        Matrices that use randomized SVD are skipped since the rank to compute is not known in advance.
+        :param matrices: 2D matrices to factorize
+        """
+        groups = defaultdict(dict)
+        for matrix in matrices:
+            if self.uses_randomized_svd(matrix):
+                continue
+            key = self._get_key(matrix)
+            if key not in self._factorizations:
+                groups[(tuple(matrix.shape), matrix.dtype, matrix.device)][key] = matrix.detach()
+
+        for (shape, _, _), group in groups.items():
+            keys = list(group)
+            for start in range(0, len(keys), self._max_batch_size):
+                batch_keys = keys[start:start + self._max_batch_size]
+                logger.debug("Batched SVD of %d matrices of shape %r", len(batch_keys), shape)
+                u, s, vh = torch.linalg.svd(torch.stack([group[key] for key in batch_keys]), full_matrices=False)
+                for i, key in enumerate(batch_keys):
+                    self._factorizations[key] = SvdFactorization(u[i], s[i], vh[i], min(shape))
@@ -38,6 +38,9 @@
 """ Prunes layers using SpatialSvdModuleSplitter SVD scheme """
 
 import copy
+from typing import Callable, Optional
+
+import torch
 
 import aimet_common.libpymo as pymo
 
@@ -49,16 +52,59 @@ from aimet_common.pruner import Pruner
 
 from aimet_torch import pymo_utils
 from aimet_torch.svd.svd_splitter import SpatialSvdModuleSplitter, WeightSvdModuleSplitter
+from aimet_torch.svd.svd_factorization import SvdFactorizationCache
 from aimet_torch.layer_database import LayerDatabase, Layer
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Svd)
 
 
+def _precompute_factorizations(factorization_cache: SvdFactorizationCache, orig_layer_db: LayerDatabase,
+                               layer: Layer, get_svd_matrix: Callable[[torch.nn.Module], torch.Tensor],
+                               is_supported: Callable[[torch.nn.Module], bool]):
+    """
+    On a cache miss for the given layer, factorize it together with all selected layers whose svd matrix has the
+    same shape, so that layers of the same shape are decomposed in one batched svd call
+    :param factorization_cache: Factorization cache
+    :param orig_layer_db: Original layer database
+    :param layer: Layer about to be split
+    :param get_svd_matrix: Function returning the matrix decomposed by svd for a module
+    :param is_supported: Function returning True if a module can be split
+    """
+    matrix = get_svd_matrix(layer.module)
+    if factorization_cache.uses_randomized_svd(matrix) or matrix in factorization_cache:
+        return
+
+    matrices = [matrix]
+    for selected_layer in orig_layer_db.get_selected_layers():
+        if selected_layer.name != layer.name and is_supported(selected_layer.module):
+            selected_matrix = get_svd_matrix(selected_layer.module)
+            if selected_matrix.shape == matrix.shape:
+                matrices.append(selected_matrix)
+
+    factorization_cache.precompute(matrices)
+
+
 class SpatialSvdPruner(aimet_common.svd_pruner.SpatialSvdPruner):
     """
     Pruner for Spatial-SVD method
     """
 
+    def __init__(self, factorization_cache: Optional[SvdFactorizationCache] = None):
+        """
+        :param factorization_cache: Cache used to compute one svd per layer and reuse it across ranks.
+            If None, the svd is computed from scratch every time a layer is split
+        """
+        self._factorization_cache = factorization_cache
+
+    def _prune_layer(self, orig_layer_db: LayerDatabase, comp_layer_db: LayerDatabase, layer: Layer,
+                     comp_ratio: float, cost_metric: CostMetric):
+        if self._factorization_cache is not None:
+            _precompute_factorizations(self._factorization_cache, orig_layer_db, layer,
+                                       SpatialSvdModuleSplitter.get_svd_matrix,
+                                       lambda module: isinstance(module, torch.nn.Conv2d))
+
+        return super()._prune_layer(orig_layer_db, comp_layer_db, layer, comp_ratio, cost_metric)
+
     def _perform_svd_and_split_layer(self, layer: Layer, rank: int, comp_layer_db: LayerDatabase):
         """
         Performs spatial svd and splits given layer into two layers
@@ -67,8 +113,12 @@ class SpatialSvdPruner(aimet_common.svd_pruner.SpatialSvdPruner):
         :param comp_layer_db: Compressed layer db to update with the split layers
         :return: None
         """
+        factorization = None
+        if self._factorization_cache is not None:
+            factorization = self._factorization_cache.get(SpatialSvdModuleSplitter.get_svd_matrix(layer.module), rank)
+
         # Split module using Spatial SVD
-        module_a, module_b = SpatialSvdModuleSplitter.split_module(layer.module, rank)
+        module_a, module_b = SpatialSvdModuleSplitter.split_module(layer.module, rank, factorization)
 
         first_layer_shape = copy.copy(layer.output_shape)
 
@@ -89,6 +139,13 @@ class WeightSvdPruner(Pruner):
     Pruner for Weight-SVD method
     """
 
+    def __init__(self, factorization_cache: Optional[SvdFactorizationCache] = None):
+        """
+        :param factorization_cache: Cache used to compute one svd per layer and reuse it across ranks.
+            If None, layers are split using libpymo, which computes the svd every time a layer is split
+        """
+        self._factorization_cache = factorization_cache
+
     def _prune_layer(self, orig_layer_db: LayerDatabase, comp_layer_db: LayerDatabase, layer: Layer, comp_ratio: float,
                      cost_metric: CostMetric):
         """
@@ -112,14 +169,24 @@ class WeightSvdPruner(Pruner):
         comp_ratio = cost_calculator.WeightSvdCostCalculator.calculate_comp_ratio_given_rank(layer, rank,
                                                                                              cost_metric)
 
-        # Create a new instance of libpymo and register layers with it
-        svd_lib_ref = pymo.GetSVDInstance()
-        pymo_utils.PymoSvdUtils.configure_layers_in_pymo_svd([layer], cost_metric, svd_lib_ref)
-
-        # Split module using Weight SVD
-        logger.info("Splitting module: %s with rank: %r", layer.name, rank)
-        module_a, module_b = WeightSvdModuleSplitter.split_module(layer.module, layer.name, rank,
-                                                                  svd_lib_ref)
+        if self._factorization_cache is not None:
+            _precompute_factorizations(self._factorization_cache, orig_layer_db, layer,
+                                       WeightSvdModuleSplitter.get_svd_matrix,
+                                       lambda module: isinstance(module, (torch.nn.Conv2d, torch.nn.Linear)))
+            factorization = self._factorization_cache.get(WeightSvdModuleSplitter.get_svd_matrix(layer.module), rank)
+
+            logger.info("Splitting module: %s with rank: %r", layer.name, rank)
+            module_a, module_b = WeightSvdModuleSplitter.split_module_using_factorization(layer.module, rank,
+                                                                                          factorization)
+        else:
+            # Create a new instance of libpymo and register layers with it
+            svd_lib_ref = pymo.GetSVDInstance()
+            pymo_utils.PymoSvdUtils.configure_layers_in_pymo_svd([layer], cost_metric, svd_lib_ref)
+
+            # Split module using Weight SVD
+            logger.info("Splitting module: %s with rank: %r", layer.name, rank)
+            module_a, module_b = WeightSvdModuleSplitter.split_module(layer.module, layer.name, rank,
+                                                                      svd_lib_ref)
 
         layer_a = Layer(module_a, layer.name + '.0', layer.output_shape)
         layer_b = Layer(module_b, layer.name + '.1', layer.output_shape)
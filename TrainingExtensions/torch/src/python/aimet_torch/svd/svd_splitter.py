@@ -36,6 +36,8 @@
 # =============================================================================
 
 """ Implementation of layer splitting logic for spatial and weight svd schemes """
+from typing import Optional
+
 import numpy as np
 import torch
 from torch.nn import Conv2d, Linear
@@ -43,6 +45,7 @@ from torch.nn import Conv2d, Linear
 from aimet_torch.winnow.winnow_utils import to_numpy
 from aimet_common.utils import AimetLogger
 from aimet_common.svd_pruner import SpatialSvdPruner
+from aimet_torch.svd.svd_factorization import SvdFactorization
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Svd)
 
@@ -51,20 +54,39 @@ class SpatialSvdModuleSplitter:
     """ Spatial SVD module splitter"""
 
     @staticmethod
-    def split_module(module: Conv2d, rank: int):
+    def get_svd_matrix(module: Conv2d) -> torch.Tensor:
+        """
+        Reshape the weight of a module into the 2D matrix decomposed by spatial svd
+        :param module: Conv2d module
+        :return: Matrix of shape (in_channels * height, out_channels * width)
+        """
+        out_channels, in_channels, height, width = module.weight.shape
+        return module.weight.detach().permute(1, 2, 0, 3).reshape(in_channels * height, out_channels * width)
+
+    @staticmethod
+    def split_module(module: Conv2d, rank: int, factorization: Optional[SvdFactorization] = None):
         """
         :param module: Module to be split
         :param rank: rank for splitting
+        :param factorization: Precomputed factorization of the module's spatial svd matrix.
+            If None, the svd is computed from scratch
         :return: Two split modules
         """
         assert isinstance(module, Conv2d)
         assert module.dilation == (1, 1)
 
-        weight_tensor = to_numpy(module.weight)  # n c h w
-        out_channels, in_channels, height, width = weight_tensor.shape
+        out_channels, in_channels, height, width = module.weight.shape
 
-        h, v = SpatialSvdPruner.lingalg_spatial_svd(weight_tensor, rank, in_channels, out_channels,
-                                                    height, width)
+        if factorization is None:
+            weight_tensor = to_numpy(module.weight)  # n c h w
+            h, v = SpatialSvdPruner.lingalg_spatial_svd(weight_tensor, rank, in_channels, out_channels,
+                                                        height, width)
+        else:
+            v, h = factorization.split(rank)
+            # rank out_channels*width -> out_channels rank 1 width
+            h = h.reshape(rank, out_channels, width, 1).permute(1, 0, 3, 2).float().cpu().numpy()
+            # in_channels*height rank -> rank in_channels height 1
+            v = v.reshape(in_channels, 1, height, rank).permute(3, 0, 2, 1).float().cpu().numpy()
 
         first_module = torch.nn.Conv2d(in_channels=module.in_channels,
                                        out_channels=rank, kernel_size=(height, 1),
@@ -108,6 +130,57 @@ class WeightSvdModuleSplitter:
 
         return split_modules
 
+    @staticmethod
+    def get_svd_matrix(module) -> torch.Tensor:
+        """
+        Reshape the weight of a module into the 2D matrix decomposed by weight svd
+        :param module: Conv2d or Linear module
+        :return: Matrix of shape (out_channels * kernel height * kernel width, in_channels) for Conv2d,
+            or the weight itself for Linear
+        """
+        weight = module.weight.detach()
+        if isinstance(module, Conv2d):
+            return weight.permute(0, 2, 3, 1).reshape(-1, module.in_channels)
+        return weight
+
+    @classmethod
+    def split_module_using_factorization(cls, module, rank: int, factorization: SvdFactorization):
+        """
+        Split a given module using a precomputed factorization of its weight svd matrix
+        :param module: Conv2d or Linear module to be split
+        :param rank: Rank to use to split with
+        :param factorization: Factorization of the matrix returned by get_svd_matrix(module)
+        :return: Two split modules
+        """
+        second_weight, first_weight = factorization.split(rank)
+
+        if isinstance(module, Conv2d):
+            module_a = torch.nn.Conv2d(module.in_channels, rank, kernel_size=(1, 1),
+                                       stride=(1, 1), dilation=module.dilation, bias=module.bias is not None)
+            module_b = torch.nn.Conv2d(rank, module.out_channels, kernel_size=module.kernel_size,
+                                       stride=module.stride, padding=module.padding, dilation=module.dilation,
+                                       bias=module.bias is not None)
+            first_weight = first_weight.reshape(rank, module.in_channels, 1, 1)
+            second_weight = second_weight.reshape(module.out_channels, *module.kernel_size, rank).permute(0, 3, 1, 2)
+
+        elif isinstance(module, Linear):
+            module_a = torch.nn.Linear(module.in_features, rank, bias=module.bias is not None)
+            module_b = torch.nn.Linear(rank, module.out_features, bias=module.bias is not None)
+
+        else:
+            raise AssertionError('Weight SVD only supports Conv2d and FC modules currently')
+
+        module_a.to(device=module.weight.device)
+        module_b.to(device=module.weight.device)
+        module_a.weight.data = first_weight.to(module.weight.dtype).contiguous()
+        module_b.weight.data = second_weight.to(module.weight.dtype).contiguous()
+
+        if module.bias is not None:
+            module_a.bias.data.zero_()
+            module_b.bias.data = module.bias.detach().clone()
+
+        return module_a, module_b
+
     @classmethod
     def split_conv_module(cls, module, name, rank, svd_lib_ref):
         """
@@ -57,6 +57,7 @@ from torchvision import datasets, transforms
 from aimet_common.defs import QuantScheme, QuantizationDataType, MAP_QUANT_SCHEME_TO_PYMO
 from aimet_common.utils import AimetLogger, Handle, log_with_error_and_assert_if_false
 from aimet_common.utils import profile as _profile
+from aimet_common import tracing
 import aimet_common.libpymo as libpymo
 import aimet_torch.nn.modules.custom as aimet_modules
 from aimet_torch.tensor_quantizer import TensorQuantizer, StaticGridPerChannelQuantizer, StaticGridPerTensorQuantizer
@@ -71,6 +72,33 @@ DROPOUT_TYPES = (torch.nn.Dropout, torch.nn.Dropout2d, torch.nn.Dropout3d)
 # list of modules which need to be treated as a leaf module
 modules_to_treat_as_leaf = []
 
+# Numpy dtypes used to store torch tensors on disk. Dtypes without numpy equivalent are stored via same-size views.
+_TORCH_TO_NUMPY_STORAGE_DTYPE = {
+    torch.float32: (np.float32, torch.float32),
+    torch.float16: (np.float16, torch.float16),
+    torch.float64: (np.float64, torch.float64),
+    torch.bfloat16: (np.int16, torch.int16),
+    torch.int8: (np.int8, torch.int8),
+    torch.uint8: (np.uint8, torch.uint8),
+    torch.int16: (np.int16, torch.int16),
+    torch.int32: (np.int32, torch.int32),
+    torch.int64: (np.int64, torch.int64),
+    torch.bool: (np.bool_, torch.bool),
+}
+
+
+def get_numpy_storage_dtypes(dtype: torch.dtype) -> Tuple[type, torch.dtype]:
+    """
+    Returns numpy dtype and torch view dtype used to store tensors of the given dtype on disk
+    :param dtype: Torch dtype
+    :return: Tuple of numpy dtype and torch dtype of same item size
+    """
+    if dtype not in _TORCH_TO_NUMPY_STORAGE_DTYPE:
+        raise TypeError(f"Tensors of dtype {dtype} can't be stored on disk. "
+                        f"Supported dtypes are {list(_TORCH_TO_NUMPY_STORAGE_DTYPE)}")
+    return _TORCH_TO_NUMPY_STORAGE_DTYPE[dtype]
+
+
 class IterFirstX:
     """ Iterator for the first x samples in a given data-loader """
 
@@ -1349,6 +1377,26 @@ def profile_async(label: str, file: Union[str, os.PathLike, TextIO] = None, new_
     return _ContextManager(action=ctx.__enter__, cleanup=lambda: ctx.__exit__(None, None, None)) # pylint: disable=no-member
 
 
+@contextlib.contextmanager
+def trace_forward_passes(model: torch.nn.Module):
+    """
+    If tracing is enabled, count the forward passes of the model and record peak cuda memory within the block of code
+
+    :param model: Model to trace
+    """
+    if not tracing.is_enabled():
+        yield
+        return
+
+    handle = model.register_forward_pre_hook(lambda *_: tracing.count("forward_passes"))
+    try:
+        yield
+    finally:
+        handle.remove()
+        if torch.cuda.is_available():
+            tracing.record_max("cuda_peak_memory_bytes", torch.cuda.max_memory_allocated())
+
+
 def is_vector_encoding(encoding: Optional[List[Dict]]) -> bool:
     """
     Check if encoding is from vector quantization
@@ -37,23 +37,50 @@
 
 # pylint: disable=missing-docstring
 import contextlib
+from typing import Iterable
 import torch
 from .fake_quant import *  # pylint: disable=import-error
 from .true_quant import *  # pylint: disable=import-error
 from .base import * # pylint: disable=import-error
 from .modules import custom # pylint: disable=import-error
+from ..quantization.base import QuantizerBase
+from ..utils import patch_attr
 
 
 @contextlib.contextmanager
-def compute_encodings(model: torch.nn.Module):
+def compute_encodings(model: torch.nn.Module, *,
+                      statistics_only: bool = False,
+                      block_boundaries: Iterable[torch.nn.Module] = ()):
     """
     Compute encodings of all quantized modules in the model
 
     .. warning::
         Encodings of the quantizers loaded with :ref:`QuantizationSimModel.load_encodings`
         with ``allow_overwrite=False`` will be kept unchanged.
+
+    :param model: Model to compute encodings of
+    :param statistics_only: If True, all the quantizers only accumulate input statistics and pass the inputs through
+        untouched. Otherwise, quantizers that aren't input/output/param quantizers of a quantized module
+        quantize-dequantize the inputs with the encodings of every batch.
+    :param block_boundaries: Quantized modules whose outputs are quantize-dequantized with the encodings of every
+        batch, so that the downstream modules observe quantized inputs.
     """
+    block_boundaries = list(block_boundaries)
+    block_boundary_quantizers = set()
+    for module in block_boundaries:
+        if not isinstance(module, BaseQuantizationMixin): # pylint: disable=undefined-variable
+            raise RuntimeError(f"Block boundary must be a quantized module. Got {type(module)}")
+        block_boundary_quantizers.update(module.output_quantizers.modules())
+
     with contextlib.ExitStack() as stack:
+        if statistics_only:
+            for module in model.modules():
+                if isinstance(module, QuantizerBase) and module not in block_boundary_quantizers:
+                    stack.enter_context(patch_attr(module, '_statistics_only', True))
+
+        for module in block_boundaries:
+            stack.enter_context(patch_attr(module, '_qdq_outputs_during_compute_encodings', True))
+
         for module in model.modules():
             if isinstance(module, BaseQuantizationMixin): # pylint: disable=undefined-variable
                 ctx = module.compute_encodings()
@@ -75,6 +75,10 @@ class BaseQuantizationMixin(abc.ABC):
     output_quantizers: nn.ModuleList
     param_quantizers: nn.ModuleDict
 
+    # If True, output quantizers quantize-dequantize the outputs with the encodings of the current batch
+    # during compute_encodings instead of passing them through. Used to mark block boundaries.
+    _qdq_outputs_during_compute_encodings = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__quant_init__()
@@ -136,7 +140,9 @@ class BaseQuantizationMixin(abc.ABC):
             if not param_quantizer.is_initialized() or overwrite:
                 param = getattr(self, param_name)
                 if param is not None:
-                    with patch_attr(param_quantizer, "forward", _no_op), param_quantizer.compute_encodings():
+                    with patch_attr(param_quantizer, "forward", _no_op), \
+                            patch_attr(param_quantizer, "_statistics_only", True), \
+                            param_quantizer.compute_encodings():
                         _ = param_quantizer(param)
 
     def compute_param_encodings(self):
@@ -173,9 +179,15 @@ class BaseQuantizationMixin(abc.ABC):
                 if not quantizer._allow_overwrite: # pylint: disable=protected-access
                     continue
 
-                # Set input/output quantizers into pass-through mode during compute_encodings
-                # NOTE: This behavior is for backawrd-compatibility with V1 quantsim.
-                stack.enter_context(patch_attr(quantizer, 'forward', _no_op))
+                if self._qdq_outputs_during_compute_encodings and quantizer in output_quantizers:
+                    # Quantize-dequantize outputs with the encodings of the current batch,
+                    # so that the downstream layers observe quantized inputs.
+                    stack.enter_context(patch_attr(quantizer, '_statistics_only', False))
+                else:
+                    # Set input/output quantizers into pass-through mode during compute_encodings
+                    # NOTE: This behavior is for backawrd-compatibility with V1 quantsim.
+                    stack.enter_context(patch_attr(quantizer, 'forward', _no_op))
+                    stack.enter_context(patch_attr(quantizer, '_statistics_only', True))
 
                 ctx = quantizer.compute_encodings()
                 stack.enter_context(ctx)
@@ -0,0 +1,461 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+# pylint: disable=redefined-builtin
+""" Integer CPU kernels for true-quant modules """
+
+from typing import Callable, Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+from torch import Tensor
+
+from aimet_torch.v2.quantization.affine import AffineEncoding
+from aimet_torch.v2.quantization.tensor import QuantizedTensorBase, QuantizedTensor, DequantizedTensor
+from aimet_torch.v2.utils import _ContextManager
+from .true_quant import QuantizedLinear, QuantizedConv2d
+from .modules import custom
+
+
+__all__ = [
+    'int_linear',
+    'int_conv2d',
+    'int_matmul',
+    'int_add',
+    'int_subtract',
+    'int_multiply',
+    'register_int_kernels',
+    'unregister_int_kernels',
+    'use_int_kernels',
+]
+
+
+_INT8_MIN = torch.iinfo(torch.int8).min
+_INT8_MAX = torch.iinfo(torch.int8).max
+
+# Number of fractional bits of the fixed-point multipliers used to rescale the operands of add/subtract
+_RESCALE_FRACTIONAL_BITS = 16
+
+
+def _as_quantized_tensor(data) -> Optional[QuantizedTensor]:
+    if isinstance(data, QuantizedTensor):
+        return data
+    if isinstance(data, DequantizedTensor):
+        return data.quantize()
+    return None
+
+
+def _dequantize(data):
+    if isinstance(data, QuantizedTensorBase):
+        return data.dequantize().as_subclass(Tensor)
+    return data
+
+
+def _is_int8_representable(encoding) -> bool:
+    return isinstance(encoding, AffineEncoding) and \
+           encoding.block_size is None and \
+           encoding.bitwidth <= 8
+
+
+def _is_supported_output_encoding(encoding) -> bool:
+    return encoding is None or (isinstance(encoding, AffineEncoding) and encoding.block_size is None)
+
+
+def _to_int8(qtensor: QuantizedTensor) -> Tuple[Tensor, Tensor]:
+    """
+    Converts a quantized tensor into int8 data and int32 zero point such that
+    ``dequantized = scale * (data - zero_point)``.
+
+    Unsigned encodings are shifted down by 128 so that both signed and unsigned
+    8-bit tensors can be fed into the same int8 x int8 GEMM.
+    """
+    encoding = qtensor.encoding
+    data = qtensor.as_subclass(Tensor)
+    zero_point = -encoding.offset.detach().round()
+    if not encoding.signed:
+        data = data - 128
+        zero_point = zero_point - 128
+    return data.to(torch.int8), zero_point.to(torch.int32)
+
+
+def _is_zero_point_representable(zero_point: Tensor) -> bool:
+    return bool(((zero_point >= _INT8_MIN) & (zero_point <= _INT8_MAX)).all())
+
+
+def _has_int_mm() -> bool:
+    return hasattr(torch, '_int_mm')
+
+
+def _int8_mm(a: Tensor, b: Tensor) -> Optional[Tensor]:
+    """
+    Computes (M, K) x (K, N) int8 matrix multiplication with int32 accumulation using :func:`torch._int_mm`.
+
+    Generic int32 matmul is considerably slower than FP32 GEMM, so there is no integer fallback.
+    Returns None if :func:`torch._int_mm` is not available or doesn't support the given inputs,
+    in which case the caller should fall back to floating point computation.
+    """
+    if not _has_int_mm():
+        return None
+    try:
+        return torch._int_mm(a, b) # pylint: disable=protected-access
+    except RuntimeError:
+        # torch._int_mm imposes shape/backend constraints that may not be met
+        return None
+
+
+def _int8_linear_acc(input: Tensor, input_zero_point: Tensor,
+                     weight: Tensor, weight_zero_point: Tensor) -> Optional[Tensor]:
+    """
+    Computes int32 accumulator of ``(input - input_zero_point) @ (weight - weight_zero_point).T``
+    without materializing the zero-point-adjusted int8 tensors.
+
+    :param input: int8 tensor of shape (M, K)
+    :param input_zero_point: Scalar int32 zero point of the input
+    :param weight: int8 tensor of shape (N, K)
+    :param weight_zero_point: int32 zero point of the weight of shape () or (N,)
+    :return: int32 tensor of shape (M, N), or None if integer GEMM is not available for the inputs
+    """
+    k = input.shape[-1]
+    acc = _int8_mm(input, weight.t().contiguous())
+    if acc is None:
+        return None
+    input_row_sum = input.sum(dim=-1, keepdim=True, dtype=torch.int32)
+    weight_row_sum = weight.sum(dim=-1, dtype=torch.int32)
+    acc = acc - weight_zero_point * input_row_sum \
+              - input_zero_point * weight_row_sum \
+              + k * input_zero_point * weight_zero_point
+    return acc
+
+
+def _requantize(acc: Tensor, scale: Tensor, bias: Optional[Tensor], output_encodings: Optional[AffineEncoding]):
+    """
+    Rescales int32 accumulator to real values and requantizes with the output encodings
+    """
+    output = acc.to(scale.dtype) * scale
+    if bias is not None:
+        output = output + _dequantize(bias)
+    return _quantize_output(output, output_encodings)
+
+
+def _quantize_output(output: Tensor, output_encodings):
+    if output_encodings is None:
+        return output
+    output_q = output_encodings.quantize(output).as_subclass(QuantizedTensor)
+    output_q.encoding = output_encodings
+    return output_q
+
+
+def _fallback(fn: Callable[..., Tensor], *args, output_encodings=None, **kwargs):
+    """
+    Fallback implementation for the inputs not supported by the integer kernels
+    """
+    args = (_dequantize(arg) for arg in args)
+    kwargs = {key: _dequantize(value) for key, value in kwargs.items()}
+    return _quantize_output(fn(*args, **kwargs), output_encodings)
+
+
+def _get_per_tensor_int8(data) -> Optional[Tuple[Tensor, Tensor, Tensor]]:
+    """
+    Returns int8 data, zero point and scale of a per-tensor quantized tensor if applicable
+    """
+    data = _as_quantized_tensor(data)
+    if data is None or not _is_int8_representable(data.encoding) or data.encoding.scale.numel() != 1:
+        return None
+    data_int8, zero_point = _to_int8(data)
+    if not _is_zero_point_representable(zero_point):
+        return None
+    return data_int8, zero_point.reshape(()), data.encoding.scale.reshape(())
+
+
+def _get_per_channel_weight_int8(weight) -> Optional[Tuple[Tensor, Tensor, Tensor]]:
+    """
+    Returns int8 data, zero point and scale of a per-tensor or per-output-channel quantized weight if applicable
+    """
+    weight = _as_quantized_tensor(weight)
+    if weight is None or not _is_int8_representable(weight.encoding):
+        return None
+
+    num_out_channels = weight.shape[0]
+    scale = weight.encoding.scale
+    if scale.numel() not in (1, num_out_channels) or \
+            (scale.numel() > 1 and scale.shape[0] != num_out_channels):
+        return None
+
+    weight_int8, zero_point = _to_int8(weight)
+    if not _is_zero_point_representable(zero_point):
+        return None
+    return weight_int8, zero_point.reshape(-1), scale.reshape(-1)
+
+
+def int_linear(input, weight, bias=None, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.nn.functional.linear`.
+
+    Computes int8 x int8 -> int32 GEMM and requantizes the accumulator with ``output_encodings``.
+    Inputs must be quantized per-tensor and weights must be quantized per-tensor or per-output-channel
+    with bitwidth of 8 or lower. Otherwise, or if :func:`torch._int_mm` is not available,
+    falls back to floating point computation.
+    """
+    input_int8 = _get_per_tensor_int8(input)
+    weight_int8 = _get_per_channel_weight_int8(weight)
+
+    if not _has_int_mm() or input_int8 is None or weight_int8 is None or \
+            not _is_supported_output_encoding(output_encodings):
+        return _fallback(F.linear, input, weight, bias, output_encodings=output_encodings)
+
+    input_int8, input_zero_point, input_scale = input_int8
+    weight_int8, weight_zero_point, weight_scale = weight_int8
+
+    *batch_shape, in_features = input_int8.shape
+    acc = _int8_linear_acc(input_int8.reshape(-1, in_features), input_zero_point,
+                           weight_int8, weight_zero_point)
+    if acc is None:
+        return _fallback(F.linear, input, weight, bias, output_encodings=output_encodings)
+    acc = acc.reshape(*batch_shape, -1)
+    return _requantize(acc, input_scale * weight_scale, bias, output_encodings)
+
+
+def int_conv2d(input, weight, bias=None, stride=1, padding=0, dilation=1, groups=1, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.nn.functional.conv2d`.
+
+    Lowers convolution to int8 x int8 -> int32 GEMM using im2col.
+    Inputs must be quantized per-tensor and weights must be quantized per-tensor or per-output-channel
+    with bitwidth of 8 or lower. Grouped convolution and string paddings fall back to floating point computation,
+    as well as the case where :func:`torch._int_mm` is not available.
+    """
+    input_int8 = _get_per_tensor_int8(input)
+    weight_int8 = _get_per_channel_weight_int8(weight)
+
+    if not _has_int_mm() or input_int8 is None or weight_int8 is None or not _is_supported_output_encoding(output_encodings) or \
+            groups != 1 or isinstance(padding, str):
+        return _fallback(F.conv2d, input, weight, bias, stride, padding, dilation, groups,
+                         output_encodings=output_encodings)
+
+    input_int8, input_zero_point, input_scale = input_int8
+    weight_int8, weight_zero_point, weight_scale = weight_int8
+
+    unbatched = input_int8.dim() == 3
+    if unbatched:
+        input_int8 = input_int8.unsqueeze(0)
+
+    stride = torch.nn.modules.utils._pair(stride) # pylint: disable=protected-access
+    padding = torch.nn.modules.utils._pair(padding) # pylint: disable=protected-access
+    dilation = torch.nn.modules.utils._pair(dilation) # pylint: disable=protected-access
+    out_channels, _, kernel_h, kernel_w = weight_int8.shape
+
+    # Pad with the input zero point so that padded elements represent real zero.
+    # im2col only supports floating point; int8 values are exactly representable in float32
+    input_float = input_int8.to(torch.float32)
+    if any(padding):
+        pad_h, pad_w = padding
+        input_float = F.pad(input_float, (pad_w, pad_w, pad_h, pad_h), value=float(input_zero_point))
+
+    batch_size, _, height, width = input_float.shape
+    out_h = (height - dilation[0] * (kernel_h - 1) - 1) // stride[0] + 1
+    out_w = (width - dilation[1] * (kernel_w - 1) - 1) // stride[1] + 1
+
+    cols = F.unfold(input_float, (kernel_h, kernel_w), dilation=dilation, stride=stride)
+    cols = cols.transpose(1, 2).reshape(batch_size * out_h * out_w, -1).to(torch.int8)
+
+    acc = _int8_linear_acc(cols, input_zero_point, weight_int8.reshape(out_channels, -1), weight_zero_point)
+    if acc is None:
+        return _fallback(F.conv2d, input, weight, bias, stride, padding, dilation, groups,
+                         output_encodings=output_encodings)
+    acc = acc.reshape(batch_size, out_h, out_w, out_channels).permute(0, 3, 1, 2)
+
+    scale = (input_scale * weight_scale).reshape(-1, 1, 1)
+    if bias is not None:
+        bias = _dequantize(bias).reshape(-1, 1, 1)
+    output = _requantize(acc, scale, bias, output_encodings)
+
+    if unbatched:
+        output = output.squeeze(0)
+    return output
+
+
+def int_matmul(input, other, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.matmul`.
+
+    Both operands must be quantized per-tensor with bitwidth of 8 or lower, the input must have
+    at least two dimensions, and the other operand must be a 2D matrix so that the product can be computed
+    as a single GEMM. Otherwise, or if :func:`torch._int_mm` is not available,
+    falls back to floating point computation.
+    """
+    input_int8 = _get_per_tensor_int8(input)
+    other_int8 = _get_per_tensor_int8(other)
+
+    if not _has_int_mm() or input_int8 is None or other_int8 is None or \
+            not _is_supported_output_encoding(output_encodings) or input.dim() < 2 or other.dim() != 2:
+        return _fallback(torch.matmul, input, other, output_encodings=output_encodings)
+
+    input_int8, input_zero_point, input_scale = input_int8
+    other_int8, other_zero_point, other_scale = other_int8
+
+    # Fold batch dimensions of the input into a single GEMM
+    *batch_shape, _, in_features = input_int8.shape
+    acc = _int8_linear_acc(input_int8.reshape(-1, in_features), input_zero_point,
+                           other_int8.t(), other_zero_point)
+    if acc is None:
+        return _fallback(torch.matmul, input, other, output_encodings=output_encodings)
+    acc = acc.reshape(*batch_shape, -1, other_int8.shape[-1])
+
+    return _requantize(acc, input_scale * other_scale, None, output_encodings)
+
+
+def _int_add_or_sub(fn: Callable[[Tensor, Tensor], Tensor], input, other, *, output_encodings=None):
+    input_int8 = _get_per_tensor_int8(input)
+    other_int8 = _get_per_tensor_int8(other)
+
+    if input_int8 is None or other_int8 is None or not _is_supported_output_encoding(output_encodings):
+        return _fallback(fn, input, other, output_encodings=output_encodings)
+
+    input_int8, input_zero_point, input_scale = input_int8
+    other_int8, other_zero_point, other_scale = other_int8
+
+    # Express both operands in the larger of the two scales using fixed-point multipliers of at most 1.0
+    # so that the addition is carried out on int32 accumulators without overflow
+    scale = torch.maximum(input_scale, other_scale)
+    one = 1 << _RESCALE_FRACTIONAL_BITS
+    input_multiplier = (input_scale / scale * one).round().to(torch.int32)
+    other_multiplier = (other_scale / scale * one).round().to(torch.int32)
+
+    acc = fn((input_int8.to(torch.int32) - input_zero_point) * input_multiplier,
+             (other_int8.to(torch.int32) - other_zero_point) * other_multiplier)
+    return _requantize(acc, scale / one, None, output_encodings)
+
+
+def int_add(input, other, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.add`.
+
+    Both operands must be quantized per-tensor with bitwidth of 8 or lower.
+    Otherwise, falls back to floating point computation.
+    """
+    return _int_add_or_sub(torch.add, input, other, output_encodings=output_encodings)
+
+
+def int_subtract(input, other, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.sub`.
+
+    Both operands must be quantized per-tensor with bitwidth of 8 or lower.
+    Otherwise, falls back to floating point computation.
+    """
+    return _int_add_or_sub(torch.sub, input, other, output_encodings=output_encodings)
+
+
+def int_multiply(input, other, *, output_encodings=None):
+    """
+    Integer implementation of :func:`torch.mul`.
+
+    Both operands must be quantized per-tensor with bitwidth of 8 or lower.
+    Otherwise, falls back to floating point computation.
+    """
+    input_int8 = _get_per_tensor_int8(input)
+    other_int8 = _get_per_tensor_int8(other)
+
+    if input_int8 is None or other_int8 is None or not _is_supported_output_encoding(output_encodings):
+        return _fallback(torch.mul, input, other, output_encodings=output_encodings)
+
+    input_int8, input_zero_point, input_scale = input_int8
+    other_int8, other_zero_point, other_scale = other_int8
+
+    acc = (input_int8.to(torch.int32) - input_zero_point) * (other_int8.to(torch.int32) - other_zero_point)
+    return _requantize(acc, input_scale * other_scale, None, output_encodings)
+
+
+_INT_KERNELS = {
+    QuantizedLinear: int_linear,
+    QuantizedConv2d: int_conv2d,
+    custom.QuantizedMatMul: int_matmul,
+    custom.QuantizedAdd: int_add,
+    custom.QuantizedSubtract: int_subtract,
+    custom.QuantizedMultiply: int_multiply,
+}
+
+
+def register_int_kernels():
+    """
+    Set the integer kernels as the default kernels of
+    :class:`QuantizedLinear`, :class:`QuantizedConv2d`, :class:`QuantizedMatMul`,
+    :class:`QuantizedAdd`, :class:`QuantizedSubtract`, and :class:`QuantizedMultiply`.
+
+    Example:
+
+        >>> from aimet_torch.v2.nn import int_kernels
+        >>> int_kernels.register_int_kernels()
+        >>> QuantizedLinear.get_default_kernel()
+        <function int_linear at ...>
+    """
+    for qcls, kernel in _INT_KERNELS.items():
+        qcls.set_default_kernel(kernel)
+
+
+def unregister_int_kernels():
+    """
+    Remove the integer kernels registered by :func:`register_int_kernels`.
+    Default kernels other than the integer kernels are kept unchanged.
+    """
+    for qcls, kernel in _INT_KERNELS.items():
+        if qcls.get_default_kernel() is kernel:
+            qcls.set_default_kernel(None)
+
+
+def use_int_kernels() -> _ContextManager:
+    """
+    Context manager that sets the integer kernels as the default kernels
+    and restores the previous default kernels upon exit.
+
+    Example:
+
+        >>> from aimet_torch.v2.nn import int_kernels
+        >>> with int_kernels.use_int_kernels():
+        ...     output = sim.model(input)
+    """
+    prev_kernels = {}
+
+    def action():
+        prev_kernels.update({qcls: qcls.get_default_kernel() for qcls in _INT_KERNELS})
+        register_int_kernels()
+
+    def cleanup():
+        for qcls, kernel in prev_kernels.items():
+            qcls.set_default_kernel(kernel)
+        prev_kernels.clear()
+
+    return _ContextManager(action, cleanup)
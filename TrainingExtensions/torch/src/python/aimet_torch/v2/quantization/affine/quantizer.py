@@ -274,6 +274,9 @@ class MinMaxQuantizer(AffineQuantizerBase): # pylint: disable=abstract-method
             input = input.as_subclass(torch.Tensor)
             expanded_input = torch_builtins.reshape_tensor_for_blocks(input, self.shape, self.block_size)
             batch_statistics = self.encoding_analyzer.update_stats(expanded_input)
+            if self._statistics_only:
+                return input
+
             num_steps = math.pow(2, self.bitwidth) - 1
             dynamic_min, dynamic_max =\
                     self.encoding_analyzer.compute_encodings_from_stats(batch_statistics,
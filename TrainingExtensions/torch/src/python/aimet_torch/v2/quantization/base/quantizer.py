@@ -62,6 +62,10 @@ class QuantizerBase(abc.ABC, torch.nn.Module):
     """
     encoding_analyzer: EncodingAnalyzer
 
+    # If True, the quantizer only accumulates input statistics during compute_encodings and passes the input through
+    # untouched, instead of computing the encodings of every batch to quantize the input dynamically.
+    _statistics_only = False
+
     def __init__(self):
         super().__init__()
 
@@ -206,6 +206,12 @@ class _HistogramObserver(_Observer[_Histogram]):
         index_tensor = (data - curr_min) / bin_width
         return torch.minimum(index_tensor.to(torch.int32), bin_tensor)
 
+    def with_float32_bin_edges(self, stats: List[_Histogram]) -> List[_Histogram]:
+        """
+        Returns the histograms with float32 bin edges, so that encodings are computed in full precision
+        """
+        return stats
+
     # pylint: disable=arguments-differ
     # pylint: disable=too-many-locals
     @torch.no_grad()
@@ -270,6 +276,195 @@ class _HistogramObserver(_Observer[_Histogram]):
     def get_stats(self) -> List[_Histogram]:
         return self.stats
 
+
+class _BatchedHistogramObserver(_HistogramObserver):
+    """
+    Observer for Histogram based calibration techniques (percentile, MSE) which keeps the histograms of all the
+    channels in a single (num_histograms, num_bins) tensor. Every channel is binned and rebinned at once instead of
+    one channel at a time.
+    """
+    def __init__(self, shape: tuple, num_bins: int, *,
+                 histogram_dtype: torch.dtype = torch.float32,
+                 bin_edges_dtype: torch.dtype = torch.float32):
+        """
+        :param shape: Shape of calculated encoding
+        :param num_bins: number of bins to use per histogram
+        :param histogram_dtype: dtype of histogram counts. torch.int32 keeps counts exact beyond 2 ** 24 elements
+        :param bin_edges_dtype: dtype of bin edges returned with the statistics. torch.float16 halves their memory
+        """
+        if histogram_dtype not in (torch.float32, torch.int32):
+            raise ValueError(f'Histogram dtype must be torch.float32 or torch.int32, got {histogram_dtype}')
+        if bin_edges_dtype not in (torch.float32, torch.float16):
+            raise ValueError(f'Bin edges dtype must be torch.float32 or torch.float16, got {bin_edges_dtype}')
+        self.histogram_dtype = histogram_dtype
+        self.bin_edges_dtype = bin_edges_dtype
+        # histograms.shape = (num_histograms, num_bins), min/max.shape = (num_histograms, )
+        self._histograms = None
+        self._min = None
+        self._max = None
+        super().__init__(shape, num_bins)
+
+    @property
+    def stats(self) -> List[_Histogram]:
+        if self._histograms is None:
+            return [_Histogram() for _ in range(self.num_histograms)]
+        bin_edges = self._create_batched_bin_edges(self._min, self._max).to(self.bin_edges_dtype)
+        return self._to_histogram_list(self._histograms, bin_edges, self._min, self._max)
+
+    @stats.setter
+    def stats(self, stats: List[_Histogram]):
+        if not stats or stats[0].histogram is None:
+            self._histograms, self._min, self._max = None, None, None
+            return
+        self._histograms = torch.stack([stat.histogram for stat in stats]).to(self.histogram_dtype)
+        self._min = torch.stack([stat.min for stat in stats])
+        self._max = torch.stack([stat.max for stat in stats])
+
+    @torch.no_grad()
+    def collect_stats(self, input_tensor: torch.Tensor) -> List[_Histogram]:
+        if not _is_expandable(self.shape, input_tensor.shape):
+            raise RuntimeError(f"Shape {self.shape} is incompatible with input of shape {input_tensor.shape}")
+
+        hist_inputs = self._get_histogram_inputs(input_tensor)
+        hist_min, hist_max = self._get_finite_min_max(hist_inputs)
+        histograms = self._compute_histograms(hist_inputs, hist_min, hist_max)
+        bin_edges = self._create_batched_bin_edges(hist_min, hist_max).to(self.bin_edges_dtype)
+
+        return self._to_histogram_list(histograms, bin_edges, hist_min, hist_max)
+
+    @torch.no_grad()
+    def merge_stats(self, new_stats_list: List[_Histogram], input_tensor: torch.Tensor):
+        if self._histograms is None:
+            self.stats = new_stats_list
+            return
+
+        new_min = torch.stack([new_stats.min for new_stats in new_stats_list])
+        new_max = torch.stack([new_stats.max for new_stats in new_stats_list])
+        updated_min = torch.minimum(self._min, new_min)
+        updated_max = torch.maximum(self._max, new_max)
+
+        histogram_updates = self._rebin(self._histograms, self._min, self._max, updated_min, updated_max)
+        # create histograms given input tensor and full range
+        expanded_histograms = self._compute_histograms(self._get_histogram_inputs(input_tensor),
+                                                       updated_min, updated_max)
+
+        self._histograms = expanded_histograms + histogram_updates.to(expanded_histograms.device)
+        self._min, self._max = updated_min, updated_max
+
+    def _get_histogram_inputs(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Reshapes input tensor to (num_histograms, -1) such that each row holds all the elements of one histogram
+        """
+        padded_histogram_shape = (
+            *itertools.repeat(1, input_tensor.dim() - len(self.shape)),
+            *self.shape
+        )
+        histogram_axes = [axis for axis, dim in enumerate(padded_histogram_shape) if dim != 1]
+        other_axes = [axis for axis, dim in enumerate(padded_histogram_shape) if dim == 1]
+        return input_tensor.permute(*histogram_axes, *other_axes).reshape(self.num_histograms, -1)
+
+    @staticmethod
+    def _get_finite_min_max(hist_inputs: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        is_finite = hist_inputs.isfinite()
+        if not torch.all(torch.any(is_finite, dim=1)):
+            raise ValueError('Input tensor cannot contain only infinite values')
+
+        min = hist_inputs.masked_fill(~is_finite, float('inf')).amin(dim=1)
+        max = hist_inputs.masked_fill(~is_finite, -float('inf')).amax(dim=1)
+        return min, max
+
+    def _adjust_range(self, min_val: torch.Tensor, max_val: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        # Adjust min/max values to be in line with PyTorch's torch.histc implementation
+        min_val, max_val = min_val.float(), max_val.float()
+        is_empty_range = min_val == max_val
+        return torch.where(is_empty_range, min_val - 0.5, min_val), torch.where(is_empty_range, max_val + 0.5, max_val)
+
+    def _create_batched_bin_edges(self, min_val: torch.Tensor, max_val: torch.Tensor) -> torch.Tensor:
+        min_val, max_val = self._adjust_range(min_val, max_val)
+        step = (max_val - min_val) / self.num_bins
+        return torch.arange(0, self.num_bins + 1, device=min_val.device)[None, :] * step[:, None] + min_val[:, None]
+
+    def _get_batched_bin_num(self, bin_width: torch.Tensor, curr_min: torch.Tensor, data: torch.Tensor) -> torch.Tensor:
+        index_tensor = (data - curr_min[:, None]) / bin_width[:, None]
+        return index_tensor.to(torch.int64).clamp_(0, self.num_bins - 1)
+
+    def _compute_histograms(self, hist_inputs: torch.Tensor, min_val: torch.Tensor, max_val: torch.Tensor) \
+            -> torch.Tensor:
+        """
+        Bins all the histogram inputs at once. Values out of range, including infinite values, are clipped to the
+        first and last bins.
+        """
+        min_val, max_val = self._adjust_range(min_val, max_val)
+        hist_inputs = hist_inputs.to(torch.float)
+        bin_index = (hist_inputs - min_val[:, None]) * self.num_bins / (max_val - min_val)[:, None]
+        is_nan = bin_index.isnan()
+        bin_index = bin_index.masked_fill_(is_nan, 0).clamp_(0, self.num_bins - 1).to(torch.int64)
+
+        histograms = torch.zeros(self.num_histograms, self.num_bins,
+                                 dtype=self.histogram_dtype, device=hist_inputs.device)
+        return histograms.scatter_add_(1, bin_index, (~is_nan).to(self.histogram_dtype))
+
+    # pylint: disable=too-many-arguments
+    def _rebin(self, histograms: torch.Tensor, curr_min: torch.Tensor, curr_max: torch.Tensor,
+               updated_min: torch.Tensor, updated_max: torch.Tensor) -> torch.Tensor:
+        """
+        Redistributes histogram counts from current range to updated range, same as _HistogramObserver.merge_stats
+        """
+        compute_dtype = torch.float64 if self.histogram_dtype == torch.int32 else torch.float32
+        src_min, src_max = self._adjust_range(curr_min, curr_max)
+        dest_min, dest_max = self._adjust_range(updated_min, updated_max)
+        src_bin_width = ((src_max - src_min) / self.num_bins).to(compute_dtype)
+        dest_bin_width = ((dest_max - dest_min) / self.num_bins).to(compute_dtype)
+        src_min, dest_min = src_min.to(compute_dtype), dest_min.to(compute_dtype)
+        curr_histograms = histograms.to(compute_dtype)
+
+        bin_range = torch.arange(0, self.num_bins, device=histograms.device, dtype=compute_dtype)
+        src_bin_start = src_min[:, None] + src_bin_width[:, None] * bin_range[None, :]
+        dest_bin_index = self._get_batched_bin_num(dest_bin_width, dest_min, src_bin_start)
+        dest_bin_end = dest_min[:, None] + dest_bin_width[:, None] * (dest_bin_index + 1)
+
+        # split curr_hist if values in source bin cannot neatly fold into dest bin
+        split_hist_value = torch.round(((dest_bin_end - src_bin_start) / src_bin_width[:, None]) * curr_histograms)
+        dest_bin_updates = torch.minimum(split_hist_value, curr_histograms)
+
+        # if curr_hist is split, update other bin that the remaining values fall into
+        other_bin_index = self._get_batched_bin_num(dest_bin_width, dest_min, src_bin_start + dest_bin_width[:, None])
+        other_bin_updates = curr_histograms - dest_bin_updates
+
+        histogram_updates = torch.zeros_like(curr_histograms)
+        histogram_updates.scatter_add_(1, dest_bin_index, dest_bin_updates)
+        histogram_updates.scatter_add_(1, other_bin_index, other_bin_updates)
+
+        # histograms which can capture new stats within their range are kept as is
+        is_range_updated = (updated_min != curr_min) | (updated_max != curr_max)
+        histogram_updates = torch.where(is_range_updated[:, None], histogram_updates, curr_histograms)
+        return histogram_updates.to(self.histogram_dtype)
+
+    @staticmethod
+    def _to_histogram_list(histograms, bin_edges, min_val, max_val) -> List[_Histogram]:
+        return [_Histogram(*stats) for stats in zip(histograms, bin_edges, min_val, max_val)]
+
+    def with_float32_bin_edges(self, stats: List[_Histogram]) -> List[_Histogram]:
+        if self.bin_edges_dtype == torch.float32 or stats[0].histogram is None:
+            return stats
+        # Reduced precision bin edges can't represent large ranges (float16 overflows to inf above 65504),
+        # so recompute them from min/max which are always kept in full precision
+        min_val = torch.stack([stat.min for stat in stats])
+        max_val = torch.stack([stat.max for stat in stats])
+        bin_edges = self._create_batched_bin_edges(min_val, max_val)
+        return [_Histogram(stat.histogram, edges, stat.min, stat.max) for stat, edges in zip(stats, bin_edges)]
+
+
+def _create_histogram_observer(shape: tuple, num_bins: int, *, batched_histogram: bool,
+                               histogram_dtype: torch.dtype, bin_edges_dtype: torch.dtype) -> _HistogramObserver:
+    if batched_histogram:
+        return _BatchedHistogramObserver(shape=shape, num_bins=num_bins,
+                                         histogram_dtype=histogram_dtype, bin_edges_dtype=bin_edges_dtype)
+    if histogram_dtype != torch.float32 or bin_edges_dtype != torch.float32:
+        raise ValueError('Reduced precision histograms are only supported with batched_histogram=True.')
+    return _HistogramObserver(shape=shape, num_bins=num_bins)
+
+
 class EncodingAnalyzer(Generic[_Statistics], ABC):
     def __init__(self, observer: _Observer):
         self.observer = observer
@@ -371,11 +566,24 @@ class PercentileEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
     """
     Encoding Analyzer for Percentile calibration technique
     """
-    def __init__(self, shape: tuple, num_bins: int = 2048, percentile: float = 100):
+    def __init__(self, shape: tuple, num_bins: int = 2048, percentile: float = 100, *,
+                 batched_histogram: bool = False,
+                 histogram_dtype: torch.dtype = torch.float32,
+                 bin_edges_dtype: torch.dtype = torch.float32):
+        """
+        :param shape: Shape of calculated encoding
+        :param num_bins: number of bins to use per histogram
+        :param percentile: Value from 50.0 to 100.0 indicating the clipping percentile
+        :param batched_histogram: If True, keeps histograms of all the channels in a single tensor and bins all the
+            channels at once (faster calibration for per-channel encodings)
+        :param histogram_dtype: dtype of histogram counts, torch.float32 or torch.int32 (batched_histogram only)
+        :param bin_edges_dtype: dtype of histogram bin edges, torch.float32 or torch.float16 (batched_histogram only)
+        """
         if num_bins <= 0:
             raise ValueError('Number of bins cannot be less than or equal to 0.')
 
-        observer = _HistogramObserver(shape=shape, num_bins=num_bins)
+        observer = _create_histogram_observer(shape, num_bins, batched_histogram=batched_histogram,
+                                              histogram_dtype=histogram_dtype, bin_edges_dtype=bin_edges_dtype)
         super().__init__(observer)
         self.set_percentile(percentile)
 
@@ -408,11 +616,12 @@ class PercentileEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         if stats[0].histogram is None:
             raise StatisticsNotFoundError('No statistics present to compute encodings.')
 
+        stats = self.observer.with_float32_bin_edges(stats)
         encoding_min_list = []
         encoding_max_list = []
 
         for list_elem in stats:
-            cum_sum = torch.cumsum(list_elem.histogram, dim=0)
+            cum_sum = torch.cumsum(list_elem.histogram.to(torch.float), dim=0)
             # trim percentile value from min and max
             max_index = torch.searchsorted(cum_sum, cum_sum[-1] * self.percentile/100)
             min_index = torch.searchsorted(cum_sum, cum_sum[-1] * (1 - self.percentile/100))
@@ -447,7 +656,10 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
                  symmetric_delta_candidates=101,
                  offset_candidates=21,
                  max_parallelism=64,
-                 gamma=3.0):
+                 gamma=3.0,
+                 batched_histogram: bool = False,
+                 histogram_dtype: torch.dtype = torch.float32,
+                 bin_edges_dtype: torch.dtype = torch.float32):
         """
         :param shape: Shape of calculated encoding
         :param num_bins: number of bins to use per histogram
@@ -457,10 +669,15 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
         :param max_parallelism: maximum number of encodings to process parallely (higher number results in higher
             memory usage but faster computation)
         :param gamma: weighting factor on clipping noise (higher value results in less clipping noise)
+        :param batched_histogram: If True, keeps histograms of all the channels in a single tensor and bins all the
+            channels at once (faster calibration for per-channel encodings)
+        :param histogram_dtype: dtype of histogram counts, torch.float32 or torch.int32 (batched_histogram only)
+        :param bin_edges_dtype: dtype of histogram bin edges, torch.float32 or torch.float16 (batched_histogram only)
         """
         if num_bins <= 0:
             raise ValueError('Number of bins cannot be less than or equal to 0.')
-        observer = _HistogramObserver(shape=shape, num_bins=num_bins)
+        observer = _create_histogram_observer(shape, num_bins, batched_histogram=batched_histogram,
+                                              histogram_dtype=histogram_dtype, bin_edges_dtype=bin_edges_dtype)
         super().__init__(observer)
         self.asym_delta_candidates = asymmetric_delta_candidates
         self.sym_delta_candidates = symmetric_delta_candidates
@@ -490,6 +707,7 @@ class SqnrEncodingAnalyzer(EncodingAnalyzer[_Histogram]):
             raise StatisticsNotFoundError('No statistics present to compute encodings.')
         if num_steps <= 0:
             raise ValueError('The number of quantization bins cannot be less than or equal to 0.')
+        stats = self.observer.with_float32_bin_edges(stats)
         chunked_stats = [stats[i:min(i+self.max_parallelism, len(stats))] for i in range(0, len(stats), self.max_parallelism)]
         best_deltas, best_offsets = [], []
         for stats_ in chunked_stats:
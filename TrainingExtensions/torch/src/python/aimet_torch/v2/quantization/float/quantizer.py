@@ -239,6 +239,9 @@ class FloatQuantizeDequantize(QuantizerBase): # pylint: disable=abstract-method
         def forward_wrapper(input):
             input = input.as_subclass(torch.Tensor)
             batch_statistics = self.encoding_analyzer.update_stats(input)
+            if self._statistics_only:
+                return input
+
             num_steps = math.pow(2, self.bitwidth) - 1
             dynamic_min, dynamic_max =\
                     self.encoding_analyzer.compute_encodings_from_stats(batch_statistics,
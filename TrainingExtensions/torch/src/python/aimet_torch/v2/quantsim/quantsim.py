@@ -36,13 +36,15 @@
 # =============================================================================
 """ Top level API for performing quantization simulation of a pytorch model """
 
-from typing import Union, Tuple
+from typing import Union, Tuple, Iterable
 import itertools
 import io
 import contextlib
 import torch
 
-from aimet_torch.quantsim import QuantizationSimModel as V1QuantizationSimModel, logger
+from aimet_common import tracing
+from aimet_torch.quantsim import QuantizationSimModel as V1QuantizationSimModel, logger, _QuantizerSnapshot, \
+    _TensorSnapshot
 import aimet_torch.quantsim as quantsim_v1
 from aimet_torch.v2 import nn as aimet_nn
 from aimet_torch.v2.nn import FakeQuantizationMixin
@@ -50,6 +52,7 @@ from aimet_torch.v2.nn import BaseQuantizationMixin
 from aimet_torch.quantsim_config.builder import LazyQuantizeWrapper
 from aimet_torch.v2.quantization.base import QuantizerBase
 from aimet_torch.v2.quantization.affine import AffineQuantizerBase
+from aimet_torch.v2.quantization.float import FloatQuantizeDequantize
 from aimet_torch.v2.quantization.encoding_analyzer import PercentileEncodingAnalyzer
 from aimet_torch.v2.utils import patch_attr
 from aimet_torch import utils
@@ -109,7 +112,10 @@ class QuantizationSimModel(V1QuantizationSimModel):
         """
         return module.realize_v2_wrapper()
 
-    def compute_encodings(self, forward_pass_callback, forward_pass_callback_args):
+    @tracing.traced("QuantizationSimModel.compute_encodings")
+    def compute_encodings(self, forward_pass_callback, forward_pass_callback_args, *, # pylint: disable=arguments-differ
+                          statistics_only: bool = False,
+                          block_boundaries: Iterable[torch.nn.Module] = ()):
         """
         Computes encodings for all quantization sim nodes in the model. It is also used to find initial encodings for
         Range Learning
@@ -122,12 +128,19 @@ class QuantizationSimModel(V1QuantizationSimModel):
             the user to determine the type of this parameter. E.g. could be simply an integer representing the number
             of data samples to use. Or could be a tuple of parameters or an object representing something more complex.
             If set to None, forward_pass_callback will be invoked with no parameters.
+        :param statistics_only: If True, quantizers only accumulate statistics during the forward passes and pass
+            the activations through untouched, instead of computing encodings and quantizing the activations
+            for every batch. Calibration then costs about as much as the fp32 forward passes.
+        :param block_boundaries: Quantized modules in self.model whose outputs are still quantize-dequantized with the
+            encodings of every batch, so that the downstream blocks are calibrated with quantized inputs.
         :return: None
 
         """
         # Run forward iterations so we can collect statistics to compute the appropriate encodings
-        with utils.in_eval_mode(self.model), torch.no_grad():
-            with aimet_nn.compute_encodings(self.model):
+        with utils.in_eval_mode(self.model), torch.no_grad(), utils.trace_forward_passes(self.model):
+            with aimet_nn.compute_encodings(self.model,
+                                            statistics_only=statistics_only,
+                                            block_boundaries=block_boundaries):
                 _ = forward_pass_callback(self.model, forward_pass_callback_args)
 
     def export(self, path: str, filename_prefix: str, dummy_input: Union[torch.Tensor, Tuple],
@@ -209,6 +222,53 @@ class QuantizationSimModel(V1QuantizationSimModel):
                 if param_name_to_exclude in module.param_quantizers:
                     module.param_quantizers[param_name_to_exclude] = None
 
+    @staticmethod
+    def _snapshot_quantizer(container: Union[torch.nn.ModuleList, torch.nn.ModuleDict], # pylint: disable=arguments-renamed
+                            key: Union[int, str]) -> _QuantizerSnapshot:
+        """
+        Capture the state of a quantizer. A quantizer is considered enabled if it is present in the container
+
+        :param container: ModuleList or ModuleDict of quantizers which holds the quantizer
+        :param key: Index or key of the quantizer in the container
+        :return: Snapshot of the quantizer
+        """
+        # pylint: disable=protected-access
+        quantizer = container[key]
+
+        if quantizer is None:
+            return _QuantizerSnapshot(container, key, {}, None, [])
+
+        if isinstance(quantizer, FloatQuantizeDequantize):
+            attrs = {'exponent_bits': quantizer.exponent_bits, 'mantissa_bits': quantizer.mantissa_bits}
+        elif isinstance(quantizer, AffineQuantizerBase):
+            attrs = {'bitwidth': quantizer.bitwidth, 'signed': quantizer.signed}
+        else:
+            attrs = {}
+
+        tensors = [_TensorSnapshot(quantizer, name) for name, _ in
+                   itertools.chain(quantizer.named_parameters(recurse=False), quantizer.named_buffers(recurse=False))]
+        uninitialized = tuple(name for name, _ in quantizer.named_parameters(recurse=False)
+                              if not quantizer._is_initialized(name))
+        return _QuantizerSnapshot(container, key, attrs, None, tensors, uninitialized)
+
+    @staticmethod
+    def _restore_quantizer(snapshot: _QuantizerSnapshot) -> bool:
+        """
+        Restore the state of a quantizer if it was modified since the snapshot
+
+        :param snapshot: Snapshot of the quantizer
+        :return: True if the quantizer was restored, False if it was left untouched
+        """
+        restored = V1QuantizationSimModel._restore_quantizer(snapshot)
+
+        if restored:
+            # Restoring the quantization parameters bumps their version counters.
+            # Mark the parameters that were uninitialized at the time of the snapshot as uninitialized again
+            for name in snapshot.uninitialized:
+                snapshot.quantizer.register_quantization_parameter(name, getattr(snapshot.quantizer, name))
+
+        return restored
+
     @staticmethod
     def compute_layer_encodings_for_sim(sim: 'QuantizationSimModel'):
         raise NotImplementedError("QuantizationSimModel.compute_layer_encodings_for_sim has been removed.")
@@ -42,7 +42,7 @@ import unittest.mock
 
 import torch
 import torch.nn.functional as functional
-from aimet_torch.adaround.adaround_loss import AdaroundLoss, AdaroundHyperParameters
+from aimet_torch.adaround.adaround_loss import AdaroundLoss, AdaroundHyperParameters, AdaroundConvergenceMonitor
 
 class TestAdaroundLoss(unittest.TestCase):
     """ Test AdaroundLoss """
@@ -90,6 +90,12 @@ class TestAdaroundLoss(unittest.TestCase):
         round_loss_2 = AdaroundLoss.compute_round_loss(alpha_tensor, opt_params, cur_iter)
         self.assertAlmostEqual(round_loss_2.item(), 4.266156963161077, places=5)
 
+        # Extra iterations past num_iterations keep the fully annealed beta
+        opt_params.max_extra_iterations = 5000
+        round_loss_3 = AdaroundLoss.compute_round_loss(alpha_tensor, opt_params, 12000)
+        round_loss_4 = AdaroundLoss.compute_round_loss(alpha_tensor, opt_params, 9999)
+        self.assertEqual(round_loss_3.item(), round_loss_4.item())
+
     def test_compute_beta(self):
         """ test compute beta """
         num_iterations = 10000
@@ -98,3 +104,31 @@ class TestAdaroundLoss(unittest.TestCase):
         warm_start = 0.2
         self.assertEqual(AdaroundLoss._compute_beta(num_iterations, cur_iter, beta_range, warm_start),
                          4.636038969321072)
+
+    def test_convergence_monitor(self):
+        """ test convergence monitor declares convergence only after warm start with hardened alpha and flat loss """
+        opt_params = AdaroundHyperParameters(num_iterations=100, reg_param=0.01, beta_range=(20, 2),
+                                             warm_start=0.2, early_stop_tol=0.01, early_stop_check_interval=10)
+        monitor = AdaroundConvergenceMonitor(opt_params)
+        soft_alpha = torch.zeros(4, 4)
+        hard_alpha = torch.cat([torch.full((2, 4), 100.), torch.full((2, 4), -100.)])
+
+        self.assertEqual(AdaroundConvergenceMonitor.compute_hardened_fraction([soft_alpha]), 0)
+        self.assertEqual(AdaroundConvergenceMonitor.compute_hardened_fraction([hard_alpha, soft_alpha]), 0.5)
+
+        converged = []
+        for cur_iter in range(opt_params.num_iterations):
+            monitor.update(torch.tensor(1.0))
+            if monitor.is_check_iteration(cur_iter):
+                alpha = soft_alpha if cur_iter < 50 else hard_alpha
+                converged.append((cur_iter, monitor.has_converged(cur_iter, [alpha])))
+
+        # Not converged during warm start or while alpha is soft
+        self.assertTrue(all(not flag for cur_iter, flag in converged if cur_iter < 50))
+        self.assertTrue(all(flag for cur_iter, flag in converged if cur_iter >= 50))
+
+        # Disabled by default
+        opt_params = AdaroundHyperParameters(num_iterations=100, reg_param=0.01, beta_range=(20, 2), warm_start=0.2)
+        monitor = AdaroundConvergenceMonitor(opt_params)
+        self.assertFalse(monitor.enabled)
+        self.assertFalse(any(monitor.is_check_iteration(cur_iter) for cur_iter in range(100)))
@@ -36,6 +36,7 @@
 # =============================================================================
 
 import logging
+import os
 import unittest
 import unittest.mock
 import pytest
@@ -57,6 +58,7 @@ from aimet_torch.adaround.adaround_loss import AdaroundLoss
 from aimet_torch.adaround.adaround_optimizer import AdaroundOptimizer
 from aimet_torch.adaround.adaround_loss import AdaroundHyperParameters
 from aimet_torch.adaround.adaround_wrapper import AdaroundWrapper
+from aimet_torch.adaround.activation_cache import TieredActivationCache
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Test)
 
@@ -119,6 +121,112 @@ class TestAdaroundOptimizer(unittest.TestCase):
         warm_start = 0.2
         self._optimize_layer_rounding(warm_start)
 
+    def test_optimize_rounding_with_spilled_acts_data(self):
+        """ test optimize layer rounding when cached activations data doesn't fit in memory """
+        with unittest.mock.patch.object(AdaroundOptimizer, '_can_cache_acts_data', return_value=False), \
+                unittest.mock.patch('aimet_torch.adaround.adaround_optimizer.psutil.virtual_memory') as virtual_memory:
+            # Leave room for only a couple of batches in memory
+            virtual_memory.return_value.available = 2 * 10 * 2 * 32 * 32 * 32 * 4 / 0.75
+            self._optimize_layer_rounding(warm_start=0.2)
+
+    def test_tiered_activation_cache(self):
+        """ test tiered activation cache spills to disk and serves minibatches from both memory and disk """
+        torch.manual_seed(0)
+        inp_batches = [torch.randn(10, 4, 8) for _ in range(5)]
+        out_batches = [torch.randn(10, 6) for _ in range(5)]
+        batch_bytes = (4 * 8 + 6) * 10 * 4
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with TieredActivationCache(tmp_dir, max_mem_bytes=2 * batch_bytes) as acts_cache:
+                for inp, out in zip(inp_batches, out_batches):
+                    acts_cache.append(inp, out)
+                acts_cache.finalize()
+
+                self.assertEqual(len(acts_cache), 50)
+                self.assertEqual(acts_cache.num_spilled, 30)
+
+                all_inp = torch.cat(inp_batches)
+                all_out = torch.cat(out_batches)
+                indices = torch.tensor([45, 3, 27, 19, 0])
+                inp, out = acts_cache.get(indices)
+                sorted_indices, _ = torch.sort(indices)
+                self.assertTrue(torch.equal(inp, all_inp[sorted_indices]))
+                self.assertTrue(torch.equal(out, all_out[sorted_indices]))
+
+                minibatches = acts_cache.iter_random_minibatches(batch_size=8)
+                for _ in range(3):
+                    inp, out = next(minibatches)
+                    self.assertEqual(inp.shape, (8, 4, 8))
+                    self.assertEqual(out.shape, (8, 6))
+                minibatches.close()
+
+            # Shard files are removed once the cache is closed
+            self.assertFalse(os.listdir(tmp_dir))
+
+    def test_tiered_activation_cache_prefetch_error(self):
+        """ test errors while prefetching minibatches are raised to the consumer instead of blocking it """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with TieredActivationCache(tmp_dir, max_mem_bytes=0) as acts_cache:
+                acts_cache.append(torch.randn(10, 3))
+                acts_cache.finalize()
+
+                with unittest.mock.patch.object(acts_cache, 'get', side_effect=OSError("Failed to read shard")):
+                    minibatches = acts_cache.iter_random_minibatches(batch_size=4)
+                    with self.assertRaises(OSError):
+                        next(minibatches)
+
+    def test_tiered_activation_cache_device_tier(self):
+        """ test tiered activation cache keeps the first batches on device, then in memory, then on disk """
+        torch.manual_seed(0)
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        inp_batches = [torch.randn(10, 4, 8) for _ in range(5)]
+        out_batches = [torch.randn(10, 6) for _ in range(5)]
+        batch_bytes = (4 * 8 + 6) * 10 * 4
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with TieredActivationCache(tmp_dir, max_mem_bytes=2 * batch_bytes, device=device,
+                                       max_device_bytes=batch_bytes) as acts_cache:
+                for inp, out in zip(inp_batches, out_batches):
+                    acts_cache.append(inp, out)
+                acts_cache.finalize()
+
+                self.assertEqual(len(acts_cache), 50)
+                self.assertEqual(acts_cache.num_on_device, 10)
+                self.assertEqual(acts_cache.num_spilled, 20)
+
+                indices = torch.tensor([45, 3, 27, 19, 0])
+                inp, out = acts_cache.get(indices)
+                sorted_indices, _ = torch.sort(indices)
+                self.assertEqual(inp.device.type, device.type)
+                self.assertTrue(torch.equal(inp.cpu(), torch.cat(inp_batches)[sorted_indices]))
+                self.assertTrue(torch.equal(out.cpu(), torch.cat(out_batches)[sorted_indices]))
+
+    def test_tiered_activation_cache_dtypes(self):
+        """ test tiered activation cache spills integer activations and rejects dtypes it can't store """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with TieredActivationCache(tmp_dir, max_mem_bytes=0) as acts_cache:
+                data = torch.randint(-100, 100, (10, 3), dtype=torch.int32)
+                acts_cache.append(data)
+                acts_cache.finalize()
+                self.assertTrue(torch.equal(acts_cache.get(torch.arange(10))[0], data))
+
+            with TieredActivationCache(tmp_dir, max_mem_bytes=0) as acts_cache:
+                with self.assertRaises(TypeError):
+                    acts_cache.append(torch.randn(10, 3, dtype=torch.complex64))
+
+    def test_optimize_rounding_releases_acts_cache_on_error(self):
+        """ test spilled activations data is released if optimization fails """
+        with unittest.mock.patch.object(AdaroundOptimizer, '_can_cache_acts_data', return_value=False), \
+                unittest.mock.patch.object(AdaroundOptimizer, '_compute_output_with_adarounded_weights',
+                                           side_effect=ValueError), \
+                unittest.mock.patch.object(TieredActivationCache, 'close', autospec=True,
+                                           side_effect=TieredActivationCache.close) as close, \
+                unittest.mock.patch('aimet_torch.adaround.adaround_optimizer.psutil.virtual_memory') as virtual_memory:
+            virtual_memory.return_value.available = 2 * 10 * 2 * 32 * 32 * 32 * 4 / 0.75
+            with self.assertRaises(ValueError):
+                self._optimize_layer_rounding(warm_start=0.2)
+            close.assert_called_once()
+
     def test_compute_recons_metrics(self):
         """ Test compute reconstruction metrics function """
         np.random.seed(0)
@@ -52,11 +52,14 @@ from aimet_common.utils import AimetLogger
 from aimet_common.defs import QuantScheme
 from aimet_common.quantsim import calculate_delta_offset
 from aimet_torch.adaround.adaround_wrapper import AdaroundWrapper
+from aimet_torch.adaround.adaround_loss import AdaroundHyperParameters
 from aimet_torch.utils import create_fake_data_loader, create_rand_tensors_given_shapes, get_device
 from models.test_models import TinyModel
 from aimet_torch.quantsim import QuantizationSimModel
 from aimet_torch.qc_quantize_op import StaticGridQuantWrapper, QcQuantizeOpMode, QcQuantizeWrapper
-from aimet_torch.adaround.adaround_weight import Adaround, AdaroundOptimizer, AdaroundParameters
+from aimet_torch.adaround.adaround_weight import Adaround, AdaroundOptimizer, AdaroundParameters, \
+    AdaroundIterationBudget
+from aimet_torch.adaround.activation_sampler import create_dependency_level_schedule
 
 
 logger = AimetLogger.get_area_logger(AimetLogger.LogAreas.Test)
@@ -153,6 +156,23 @@ class ConvWithStandaloneBN(torch.nn.Module):
         return x
 
 
+class ParallelBranchesModel(torch.nn.Module):
+    """ Model with independent branches consuming the same input. Expect input shape (1, 3, 32, 32) """
+    def __init__(self):
+        super(ParallelBranchesModel, self).__init__()
+        self.conv1 = torch.nn.Conv2d(3, 8, kernel_size=3)
+        self.relu1 = torch.nn.ReLU()
+        self.branch_a = torch.nn.Conv2d(8, 8, kernel_size=3, padding=1)
+        self.branch_b = torch.nn.Conv2d(8, 8, kernel_size=3, padding=1)
+        self.branch_c = torch.nn.Conv2d(8, 8, kernel_size=1)
+        self.conv2 = torch.nn.Conv2d(8, 4, kernel_size=1)
+
+    def forward(self, x):
+        x = self.relu1(self.conv1(x))
+        x = self.branch_a(x) + self.branch_b(x) + self.branch_c(x)
+        return self.conv2(x)
+
+
 class MultiDataLoaders:
     """
     A simple implementation for supporting two data loaders, can be extended
@@ -1098,3 +1118,77 @@ class TestAdaround:
                         assert not module.param_quantizers['weight'].is_encoding_frozen and module.param_quantizers['weight'].enabled
                     else:
                         assert module.param_quantizers['weight'].is_encoding_frozen
+
+    def test_create_dependency_level_schedule(self):
+        """ test that independent modules consuming the same input are scheduled in the same level """
+        model = ParallelBranchesModel().eval()
+        dummy_input = torch.randn(1, 3, 32, 32)
+        modules = [(name, module) for name, module in model.named_children()
+                   if isinstance(module, torch.nn.Conv2d)]
+
+        levels = create_dependency_level_schedule(model, dummy_input, modules)
+        level_names = [[name for name, _ in level] for level in levels]
+        assert level_names == [['conv1'], ['branch_a', 'branch_b', 'branch_c'], ['conv2']]
+
+    def test_apply_adaround_with_independent_layers_optimized_jointly(self):
+        """ test that jointly optimizing independent layers adarounds every layer """
+        torch.manual_seed(10)
+        data_loader = create_fake_data_loader(dataset_size=64, batch_size=16, image_size=(3, 32, 32))
+        model = ParallelBranchesModel().eval()
+        dummy_input = torch.randn(1, 3, 32, 32)
+
+        params = AdaroundParameters(data_loader=data_loader, num_batches=4, default_num_iterations=5,
+                                    optimize_independent_layers_jointly=True)
+
+        with patch.object(AdaroundOptimizer, 'adaround_modules',
+                          wraps=AdaroundOptimizer.adaround_modules) as adaround_modules_fn:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                _ = Adaround.apply_adaround(model, dummy_input, params, path=temp_dir, filename_prefix='parallel')
+                with open(os.path.join(temp_dir, 'parallel.encodings')) as json_file:
+                    encoding_data = json.load(json_file)['param_encodings']
+
+        # One call per dependency level
+        assert adaround_modules_fn.call_count == 3
+        assert set(encoding_data.keys()) == {'conv1.weight', 'branch_a.weight', 'branch_b.weight',
+                                             'branch_c.weight', 'conv2.weight'}
+
+    def test_iteration_budget(self):
+        """ test saved iterations are granted as extra iterations without stretching the schedule """
+        opt_params = AdaroundHyperParameters(num_iterations=1000, reg_param=0.01, beta_range=(20, 2),
+                                             warm_start=0.2, early_stop_tol=0.01)
+        budget = AdaroundIterationBudget(opt_params)
+        assert budget.get_opt_params().max_extra_iterations == 0
+
+        budget.update(['conv1'], 400)
+        layer_opt_params = budget.get_opt_params()
+        assert layer_opt_params.num_iterations == 1000
+        assert layer_opt_params.max_extra_iterations == 600
+
+        # Extra iterations used by a layer that didn't converge are drawn from the pool
+        budget.update(['conv2'], 1500)
+        assert budget.get_opt_params().max_extra_iterations == 100
+        assert budget.iterations_used == {'conv1': 400, 'conv2': 1500}
+
+    def test_apply_adaround_with_early_stopping(self):
+        """ test that early stopping cuts iterations and that iterations used per layer are reported """
+        torch.manual_seed(10)
+        data_loader = create_fake_data_loader(dataset_size=64, batch_size=16, image_size=(3, 32, 32))
+        model = TinyModel().eval()
+        dummy_input = torch.randn(1, 3, 32, 32)
+
+        # With a tolerance of 1.0 every layer is considered converged at the second convergence check after the
+        # warm start (iteration 200 with the default check interval of 100), well before the iteration cap
+        num_iterations = 400
+        params = AdaroundParameters(data_loader=data_loader, num_batches=4, default_num_iterations=num_iterations,
+                                    default_early_stop_tol=1.0)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _ = Adaround.apply_adaround(model, dummy_input, params, path=temp_dir, filename_prefix='tiny')
+            with open(os.path.join(temp_dir, 'tiny.encodings')) as json_file:
+                encoding_data = json.load(json_file)['param_encodings']
+            with open(os.path.join(temp_dir, 'tiny_iterations.json')) as json_file:
+                iterations_used = json.load(json_file)
+
+        assert {name + '.weight' for name in iterations_used} == set(encoding_data.keys())
+        # Early stopping must have cut the optimization short
+        assert all(iterations < num_iterations for iterations in iterations_used.values())
+        assert sum(iterations_used.values()) < num_iterations * len(iterations_used)
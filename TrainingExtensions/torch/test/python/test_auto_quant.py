@@ -36,6 +36,7 @@
 # =============================================================================
 
 import contextlib
+import glob
 import tempfile
 from dataclasses import dataclass
 import itertools
@@ -51,11 +52,13 @@ from torch.utils.data import Dataset, DataLoader
 from aimet_torch import utils
 from aimet_torch.model_preparer import prepare_model
 from aimet_torch.auto_quant import AutoQuant
+from aimet_torch.cache import fingerprint_data_loader
 from aimet_torch.adaround.adaround_weight import AdaroundParameters
 from aimet_torch.quantsim import QuantizationSimModel, OnnxExportApiArgs
 from aimet_torch.qc_quantize_op import StaticGridQuantWrapper
 from aimet_torch.save_utils import SaveUtils
 from aimet_common.defs import QuantScheme
+from aimet_common.cache import fingerprint
 
 
 class Model(torch.nn.Module):
@@ -746,16 +749,16 @@ class TestAutoQuant:
                                        results_dir=results_dir,
                                        cache_id=cache_id)
 
-                cache_files  = [
-                    os.path.join(results_dir, ".auto_quant_cache", cache_id, f"{key}.pkl")
+                cache_file_patterns = [
+                    os.path.join(results_dir, ".auto_quant_cache", cache_id, f"{key}-*", f"{key}.pkl")
                     for key in ("batchnorm_folding", "cle", "adaround")
                 ]
 
                 # No previously cached results
                 auto_quant.optimize(allowed_accuracy_drop)
 
-                for cache_file in cache_files:
-                    assert os.path.exists(cache_file)
+                for cache_file_pattern in cache_file_patterns:
+                    assert len(glob.glob(cache_file_pattern)) == 1
 
                 assert mocks.fold_all_batch_norms.call_count == 1
                 assert mocks.equalize_model.call_count == 1
@@ -775,6 +778,33 @@ class TestAutoQuant:
                 assert mocks.equalize_model.call_count == 1
                 assert mocks.apply_adaround.call_count == 1
 
+                auto_quant = AutoQuant(cpu_model,
+                                       dummy_input,
+                                       unlabeled_data_loader,
+                                       mocks.eval_callback,
+                                       results_dir=results_dir,
+                                       cache_id=cache_id,
+                                       data_fingerprint="dataset_v2")
+                # Only adaround depends on the data
+                auto_quant.optimize(allowed_accuracy_drop)
+
+                assert mocks.fold_all_batch_norms.call_count == 1
+                assert mocks.equalize_model.call_count == 1
+                assert mocks.apply_adaround.call_count == 2
+
+    def testfingerprint_data_loader(self, unlabeled_data_loader):
+        dataset = unlabeled_data_loader.dataset
+        data_loader = DataLoader(dataset, batch_size=2, shuffle=True)
+
+        rng_state = torch.get_rng_state()
+        fp = fingerprint(fingerprint_data_loader(data_loader))
+        assert fp == fingerprint(fingerprint_data_loader(DataLoader(dataset, batch_size=2, shuffle=True)))
+        # Fingerprinting neither loads data nor consumes random state
+        assert torch.equal(torch.get_rng_state(), rng_state)
+
+        assert fp != fingerprint(fingerprint_data_loader(DataLoader(dataset, batch_size=4, shuffle=True)))
+        assert fp != fingerprint(fingerprint_data_loader(DataLoader(dataset, batch_size=2)))
+
     def test_auto_quant_scheme_selection(
         self, cpu_model, dummy_input, unlabeled_data_loader,
     ):
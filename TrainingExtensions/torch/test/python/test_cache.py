@@ -0,0 +1,102 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+import os
+import tempfile
+
+import torch
+
+from aimet_common.cache import Cache, fingerprint
+from aimet_torch.cache import CompressedTensorSerializationProtocol, to_fingerprintable
+from models.test_models import TinyModel
+
+
+def test_compressed_tensor_protocol():
+    model = TinyModel().eval()
+    model.bn1.running_mean.normal_()
+    dummy_input = torch.randn(1, 3, 32, 32)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        protocol = CompressedTensorSerializationProtocol()
+        protocol.save((model, model.conv1.weight, torch.randn(3, 3).bfloat16()), working_dir, "model")
+        _model, conv1_weight, bf16_tensor = protocol.load(working_dir, "model")
+
+    assert _model is not model
+    # Shared references are preserved
+    assert conv1_weight is _model.conv1.weight
+    assert isinstance(conv1_weight, torch.nn.Parameter) and conv1_weight.requires_grad
+    assert bf16_tensor.dtype == torch.bfloat16
+    for (name, param), (_name, _param) in zip(model.state_dict().items(), _model.state_dict().items()):
+        assert name == _name
+        assert param.dtype == _param.dtype
+        assert torch.equal(param, _param)
+    assert torch.equal(model(dummy_input), _model(dummy_input))
+
+
+def test_fingerprint_model():
+    model = TinyModel().eval()
+    fp = fingerprint(to_fingerprintable(model))
+    assert fp == fingerprint(to_fingerprintable(model))
+
+    with torch.no_grad():
+        model.conv1.weight[0, 0, 0, 0] += 1
+    assert fp != fingerprint(to_fingerprintable(model))
+
+
+def test_cache_model_changes():
+    cache = Cache()
+    call_count = 0
+
+    @cache.mark("test", CompressedTensorSerializationProtocol(), lambda model: to_fingerprintable(model))
+    def _fn(model):
+        nonlocal call_count
+        call_count += 1
+        return model
+
+    model = TinyModel().eval()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        with cache.enable(cache_dir):
+            _fn(model)
+            _fn(model)
+            assert call_count == 1
+
+            with torch.no_grad():
+                model.fc.bias.add_(1)
+            _model = _fn(model)
+            assert call_count == 2
+            assert torch.equal(_model.fc.bias, model.fc.bias)
+            assert len(os.listdir(cache_dir)) == 2
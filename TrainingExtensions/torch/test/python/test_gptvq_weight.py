@@ -49,6 +49,8 @@ from torch.utils.data import DataLoader, Dataset
 from aimet_common import quantsim
 from aimet_torch.gptvq.defs import GPTVQSupportedModules
 from aimet_torch.gptvq.gptvq_weight import GPTVQ, GPTVQParameters
+from aimet_torch.gptvq.hessian import HessianSampler
+from aimet_torch.gptvq.utils import compute_hessian_tensor
 from aimet_torch.utils import is_vector_encoding
 from aimet_torch.v2.nn import BaseQuantizationMixin
 from aimet_torch.v2.quantization.affine import VectorEncoding
@@ -113,6 +115,19 @@ class RandomDataset(Dataset):
         return x, y
 
 
+class ModelWithSharedInput(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.q_proj = torch.nn.Linear(64, 64)
+        self.k_proj = torch.nn.Linear(64, 64)
+        self.v_proj = torch.nn.Linear(64, 64)
+        self.o_proj = torch.nn.Linear(64, 64)
+
+    def forward(self, x):
+        q, k, v = self.q_proj(x), self.k_proj(x), self.v_proj(x)
+        return self.o_proj(torch.softmax(q @ k.transpose(-1, -2), dim=-1) @ v)
+
+
 class TestGPTVQWeight:
     @pytest.mark.parametrize("vector_bw", [4, 8, 16])
     @pytest.mark.parametrize("rows_per_block", [32, 64])
@@ -438,3 +453,63 @@ class TestGPTVQWeight:
         for i in range(0, num_scales, rows_per_block):
             # per-channel scales should be same within a block
             assert len(set(conv_encoding["scale"][i:i + rows_per_block])) == 1
+
+    def test_hessian_sharing_and_caching(self):
+        model = ModelWithSharedInput()
+        data_loader = DataLoader(RandomDataset(data_size=4, input_dim=(8, 64)), batch_size=2, shuffle=False)
+        num_forward_passes = 0
+
+        def forward_fn(m, d):
+            nonlocal num_forward_passes
+            num_forward_passes += 1
+            return m(d[0])
+
+        gptvq_parameters = GPTVQParameters(data_loader, forward_fn=forward_fn)
+        dummy_input = torch.randn(1, 8, 64)
+        module_names = ["q_proj", "k_proj", "v_proj", "o_proj"]
+        sim = GPTVQ._get_quantsim(model, dummy_input, gptvq_parameters, None, set(module_names))
+        name_to_quant_module = {name: getattr(sim.model, name) for name in module_names}
+
+        with GPTVQ._disable_quantizers_for_gptvq_optimization(sim, set(module_names)), \
+                tempfile.TemporaryDirectory() as temp_dir:
+            name_to_hessian = HessianSampler(sim.model, gptvq_parameters, temp_dir).compute_hessians(name_to_quant_module)
+            # All modules are sampled in a single forward pass per batch
+            assert num_forward_passes == len(data_loader)
+            for name, quant_module in name_to_quant_module.items():
+                expected = compute_hessian_tensor(quant_module, gptvq_parameters, sim)
+                assert torch.allclose(name_to_hessian[name], expected, atol=1e-5)
+
+            # Modules consuming the same input share the Hessian tensor, but get their own copies of it
+            assert torch.equal(name_to_hessian["q_proj"], name_to_hessian["k_proj"])
+            assert name_to_hessian["q_proj"].data_ptr() != name_to_hessian["k_proj"].data_ptr()
+            assert not torch.equal(name_to_hessian["q_proj"], name_to_hessian["o_proj"])
+            index = HessianSampler(sim.model, gptvq_parameters, temp_dir)._index
+            assert len({entry["file"] for entry in index.values()}) == 2
+
+            # Cached Hessian tensors are loaded without sampling
+            num_forward_passes = 0
+            cached = HessianSampler(sim.model, gptvq_parameters, temp_dir).compute_hessians(name_to_quant_module)
+            assert num_forward_passes == 0
+            for name, hessian in name_to_hessian.items():
+                assert torch.equal(cached[name], hessian)
+
+            # Cached Hessian tensors are invalidated if the GPTVQ parameters change
+            other_parameters = GPTVQParameters(data_loader, forward_fn=forward_fn, rows_per_block=16)
+            resampled = HessianSampler(sim.model, other_parameters, temp_dir).compute_hessians(name_to_quant_module)
+            assert num_forward_passes == len(data_loader)
+            for name, hessian in name_to_hessian.items():
+                assert torch.allclose(resampled[name], hessian, atol=1e-5)
+
+            # ... or if the data loader configuration changes
+            num_forward_passes = 0
+            other_data_loader = DataLoader(data_loader.dataset, batch_size=1, shuffle=False)
+            other_parameters = GPTVQParameters(other_data_loader, forward_fn=forward_fn, rows_per_block=16)
+            HessianSampler(sim.model, other_parameters, temp_dir).compute_hessians(name_to_quant_module)
+            assert num_forward_passes == len(other_data_loader)
+
+            # ... or if the weights change
+            num_forward_passes = 0
+            with torch.no_grad():
+                sim.model.q_proj.weight.mul_(2)
+            HessianSampler(sim.model, other_parameters, temp_dir).compute_hessians(name_to_quant_module)
+            assert num_forward_passes == len(other_data_loader)
@@ -38,6 +38,8 @@ import os
 import pytest
 
 import tempfile
+import time
+import psutil
 import torch
 from safetensors.torch import save_file
 from safetensors import safe_open
@@ -47,7 +49,7 @@ import copy
 from peft.tuners.lora.layer import LoraLayer as PeftLoraLayer
 from peft import LoraConfig, get_peft_model
 from aimet_torch.peft import replace_lora_layers_with_quantizable_layers, track_lora_meta_data, LoraLayer, \
-    PeftQuantUtils
+    PeftQuantUtils, AdapterRegistry
 from aimet_torch.v2.quantsim import QuantizationSimModel
 
 def rsetattr(obj, attr, val):
@@ -331,6 +333,128 @@ class TestLoraAdapterPeft:
                        'base_model.model.linear.lora_B.0.weight']
             assert sorted(tensor_name) == sorted(tensors)
 
+    def test_adapter_registry(self):
+        model = one_adapter_model()
+        replace_lora_layers_with_quantizable_layers(model)
+        dummy_inputs = torch.randn(10, 10)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            meta_data = track_lora_meta_data(model, tmpdir, 'meta_data')
+            peft_utils = PeftQuantUtils(meta_data)
+            sim = QuantizationSimModel(model, dummy_input=dummy_inputs)
+            sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+            peft_utils.freeze_base_model(sim)
+            qc_lora = sim.model.base_model.model.linear
+            registry = AdapterRegistry(sim, peft_utils, tmpdir)
+
+            expected_outputs = {}
+            expected_max = {}
+            for adapter_name in ['adapter_0', 'adapter_1', 'adapter_2']:
+                with torch.no_grad():
+                    qc_lora.lora_A[0].weight.copy_(torch.randn(4, 10))
+                    qc_lora.lora_B[0].weight.copy_(torch.randn(10, 4))
+                sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+                registry.register_adapter(adapter_name)
+                expected_outputs[adapter_name] = sim.model(dummy_inputs).detach().clone()
+                expected_max[adapter_name] = qc_lora.lora_B[0].output_quantizers[0].max.detach().clone()
+
+            assert registry.adapters == ['adapter_0', 'adapter_1', 'adapter_2']
+            base_weight = qc_lora.base_layer.weight.detach().clone()
+
+            for adapter_name in ['adapter_1', 'adapter_0', 'adapter_2', 'adapter_1']:
+                registry.activate_adapter(adapter_name)
+                assert registry.active_adapter == adapter_name
+                assert torch.equal(qc_lora.lora_B[0].output_quantizers[0].max, expected_max[adapter_name])
+                assert torch.equal(sim.model(dummy_inputs), expected_outputs[adapter_name])
+                assert torch.equal(qc_lora.base_layer.weight, base_weight)
+                assert qc_lora.lora_B[0].output_quantizers[0].is_initialized()
+
+            with pytest.raises(RuntimeError):
+                registry.remove_adapter('adapter_1')
+            registry.remove_adapter('adapter_0')
+            assert registry.adapters == ['adapter_1', 'adapter_2']
+            assert not os.path.exists(os.path.join(tmpdir, 'adapter_0.adapter'))
+            with pytest.raises(KeyError):
+                registry.activate_adapter('adapter_0')
+
+    def test_adapter_registry_in_place_write(self):
+        model = one_adapter_model()
+        replace_lora_layers_with_quantizable_layers(model)
+        dummy_inputs = torch.randn(10, 10)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            meta_data = track_lora_meta_data(model, tmpdir, 'meta_data')
+            peft_utils = PeftQuantUtils(meta_data)
+            sim = QuantizationSimModel(model, dummy_input=dummy_inputs)
+            sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+            peft_utils.freeze_base_model(sim)
+            qc_lora = sim.model.base_model.model.linear
+            registry = AdapterRegistry(sim, peft_utils, tmpdir)
+
+            with torch.no_grad():
+                qc_lora.lora_A[0].weight.copy_(torch.randn(4, 10))
+                qc_lora.lora_B[0].weight.copy_(torch.randn(10, 4))
+            sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+            registry.register_adapter('adapter_0')
+            expected_weight = qc_lora.lora_A[0].weight.detach().clone()
+            expected_output = sim.model(dummy_inputs).detach().clone()
+
+            registry.activate_adapter('adapter_0')
+            with torch.no_grad():
+                qc_lora.lora_A[0].weight.fill_(0)
+            sim.model.load_state_dict({'base_model.model.linear.lora_B.0.weight': torch.zeros(10, 4)}, strict=False)
+            assert torch.all(qc_lora.lora_A[0].weight == 0)
+
+            registry.activate_adapter('adapter_0')
+            assert torch.equal(qc_lora.lora_A[0].weight, expected_weight)
+            assert torch.equal(sim.model(dummy_inputs), expected_output)
+
+    @pytest.mark.skip(reason="Benchmark for adapter switch latency and memory. There is no validation criterion")
+    def test_adapter_registry_switch_latency_and_memory(self):
+        num_adapters = 32
+        model = DummyModel()
+        model.linear = torch.nn.Linear(1024, 1024)
+        model = get_peft_model(model, LoraConfig(lora_alpha=16, r=64, bias="none", target_modules=["linear"]))
+        replace_lora_layers_with_quantizable_layers(model)
+        dummy_inputs = torch.randn(16, 1024)
+        process = psutil.Process(os.getpid())
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            meta_data = track_lora_meta_data(model, tmpdir, 'meta_data')
+            peft_utils = PeftQuantUtils(meta_data)
+            sim = QuantizationSimModel(model, dummy_input=dummy_inputs)
+            sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+            peft_utils.freeze_base_model(sim)
+            qc_lora = sim.model.base_model.model.linear
+            registry = AdapterRegistry(sim, peft_utils, tmpdir)
+
+            rss_before = process.memory_info().rss
+            for i in range(num_adapters):
+                with torch.no_grad():
+                    qc_lora.lora_A[0].weight.copy_(torch.randn_like(qc_lora.lora_A[0].weight))
+                    qc_lora.lora_B[0].weight.copy_(torch.randn_like(qc_lora.lora_B[0].weight))
+                sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+                registry.register_adapter(f'adapter_{i}')
+            rss_after = process.memory_info().rss
+
+            start = time.perf_counter()
+            for i in range(10 * num_adapters):
+                registry.activate_adapter(f'adapter_{i % num_adapters}')
+            switch_time = (time.perf_counter() - start) / (10 * num_adapters)
+
+            start = time.perf_counter()
+            for i in range(num_adapters):
+                with torch.no_grad():
+                    qc_lora.lora_A[0].weight.copy_(torch.randn_like(qc_lora.lora_A[0].weight))
+                    qc_lora.lora_B[0].weight.copy_(torch.randn_like(qc_lora.lora_B[0].weight))
+                sim.compute_encodings(lambda model, _: model(dummy_inputs), None)
+            reload_time = (time.perf_counter() - start) / num_adapters
+
+            print(f"{num_adapters} adapters registered, RSS increase: {(rss_after - rss_before) / 2**20:.1f} MiB")
+            print(f"Switch latency: {switch_time * 1e6:.1f} us, "
+                  f"load weights + compute encodings latency: {reload_time * 1e6:.1f} us")
+
+
 def _is_frozen(quantizer):
     return quantizer._allow_overwrite == False and\
            quantizer.min.requires_grad == False and\
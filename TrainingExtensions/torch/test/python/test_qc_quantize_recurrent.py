@@ -38,6 +38,7 @@ import json
 import os
 import unittest
 import copy
+import time
 
 import onnx
 import pytest
@@ -49,7 +50,7 @@ import aimet_common.libpymo as libpymo
 from aimet_common.defs import QuantScheme, QuantizationDataType
 from aimet_common.utils import AimetLogger
 from aimet_torch.qc_quantize_op import QcQuantizeOpMode
-from aimet_torch.qc_quantize_recurrent import QcQuantizeRecurrent
+from aimet_torch.qc_quantize_recurrent import QcQuantizeRecurrent, _quantize_dequantize_hidden_state
 from aimet_torch.quantsim import QuantizationSimModel
 from aimet_torch.tensor_quantizer import LearnedGridTensorQuantizer
 
@@ -496,6 +497,104 @@ class TestQcQuantizeRecurrentOp(unittest.TestCase):
         for tc in TestQcQuantizeRecurrentOp.testcases:
             self.verify_packed_sequence_inputs(tc)
 
+    @staticmethod
+    def _create_calibrated_quant_op(model: torch.nn.Module, x: torch.Tensor, hx=None) -> QcQuantizeRecurrent:
+        """ Create a quant op in eval and active mode, with encodings computed from x """
+        quant_op = QcQuantizeRecurrent(module_to_quantize=model, weight_bw=8, activation_bw=8, is_symmetric=False,
+                                       quant_scheme=QuantScheme.post_training_tf, round_mode='nearest',
+                                       data_type=QuantizationDataType.int)
+        quant_op.eval()
+        with torch.no_grad():
+            quant_op(x, hx=hx)
+        quant_op.compute_encoding()
+        quant_op.set_mode(QcQuantizeOpMode.ACTIVE)
+        return quant_op
+
+    def test_hoisted_projection_equivalence(self):
+        """
+        Unit test to validate that the hoisted projection fast path matches the step by step implementation
+        """
+        torch.manual_seed(0)
+        for tc in TestQcQuantizeRecurrentOp.testcases:
+            if tc.sequence_lens is not None:
+                continue
+            x = torch.rand(tc.input_shape).to(tc.device)
+            h = None
+            if tc.valid_hx:
+                with torch.no_grad():
+                    _, h = tc.model(x)
+            quant_op = self._create_calibrated_quant_op(copy.deepcopy(tc.model), x, h)
+
+            with torch.no_grad():
+                self.assertTrue(quant_op._can_use_hoisted_projection(None))
+                o_fast, h_fast = quant_op(x, hx=h)
+                quant_op.use_hoisted_projection = False
+                o_slow, h_slow = quant_op(x, hx=h)
+
+            self.assertTrue(torch.allclose(o_fast, o_slow, atol=1e-05),
+                            msg="output mismatched, Failed TestCase:{}".format(tc.test_name))
+            if not isinstance(h_fast, tuple):
+                h_fast, h_slow = [h_fast], [h_slow]
+            for h_f, h_s in zip(h_fast, h_slow):
+                self.assertTrue(torch.allclose(h_f, h_s, atol=1e-05),
+                                msg="h/c mismatched, Failed TestCase:{}".format(tc.test_name))
+
+    def test_hoisted_projection_conditions(self):
+        """
+        Unit test to validate that the hoisted projection fast path is only used when enabled and with nearest rounding
+        """
+        torch.manual_seed(0)
+        model = torch.nn.LSTM(input_size=8, hidden_size=16)
+        x = torch.rand(4, 2, 8)
+        quant_op = self._create_calibrated_quant_op(model, x)
+        with torch.no_grad():
+            self.assertTrue(quant_op._can_use_hoisted_projection(None))
+
+            quant_op.output_quantizers['h_l0'].round_mode = libpymo.RoundingMode.ROUND_STOCHASTIC
+            self.assertFalse(quant_op._can_use_hoisted_projection(None))
+
+            quant_op = QcQuantizeRecurrent(module_to_quantize=model, weight_bw=8, activation_bw=8,
+                                           quant_scheme=QuantScheme.post_training_tf, round_mode='nearest',
+                                           use_hoisted_projection=False)
+            quant_op.eval()
+            quant_op(x)
+            quant_op.compute_encoding()
+            quant_op.set_mode(QcQuantizeOpMode.ACTIVE)
+            self.assertFalse(quant_op._can_use_hoisted_projection(None))
+
+    def test_hidden_state_rounding_ties(self):
+        """
+        Unit test to validate that the hidden state is rounded half away from zero like libpymo
+        """
+        tensor = torch.tensor([-2.5, -1.5, -0.5, 0.5, 1.5, 2.5])
+        # delta=1 and offset=0, so the ties stay ties after scaling
+        quantized = _quantize_dequantize_hidden_state(tensor, [-4.0, 4.0, 1.0, 0.0])
+        self.assertTrue(torch.equal(quantized, torch.tensor([-3.0, -2.0, -1.0, 1.0, 2.0, 3.0])))
+
+    @pytest.mark.skip(reason="Benchmark only for study, there is no validation criterion")
+    def test_hoisted_projection_sequence_length_scaling(self):
+        """
+        Compare time taken by the step by step implementation and the hoisted projection fast path as the sequence
+        length grows
+        """
+        torch.manual_seed(0)
+        batch_size, input_size, hidden_size = 8, 64, 128
+        for model in [torch.nn.LSTM(input_size, hidden_size), torch.nn.GRU(input_size, hidden_size),
+                      torch.nn.RNN(input_size, hidden_size)]:
+            quant_op = self._create_calibrated_quant_op(model, torch.rand(16, batch_size, input_size))
+            for steps in [16, 64, 256, 1024]:
+                x = torch.rand(steps, batch_size, input_size)
+                times = {}
+                for use_hoisted_projection in [False, True]:
+                    quant_op.use_hoisted_projection = use_hoisted_projection
+                    with torch.no_grad():
+                        quant_op(x)
+                        start_time = time.perf_counter()
+                        quant_op(x)
+                        times[use_hoisted_projection] = time.perf_counter() - start_time
+                print('{} steps={}: step by step {:.4f}s, hoisted projection {:.4f}s, speedup {:.2f}x'.format(
+                    model.mode, steps, times[False], times[True], times[False] / times[True]))
+
 class GruModel(torch.nn.Module):
     def __init__(self):
         super().__init__()
@@ -43,6 +43,7 @@ import torch
 from torch.utils.data import Dataset, DataLoader
 
 from aimet_common.defs import QuantScheme
+from aimet_torch import utils
 from aimet_torch.batch_norm_fold import fold_all_batch_norms
 from models.test_models import TinyModel
 from aimet_torch.tensor_quantizer import TensorQuantizer
@@ -359,6 +360,43 @@ class TestQuantAnalyzer:
             quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tempdir)
             assert os.path.isfile(os.path.join(tempdir, "per_layer_mse_loss.html"))
 
+    def test_export_per_layer_mse_loss_matches_per_layer_collection(self):
+        """ test single sweep per layer MSE loss matches MSE loss collected separately for each layer """
+        torch.manual_seed(0)
+        input_shape = (1, 3, 32, 32)
+        dummy_input = torch.randn(*input_shape)
+        unlabeled_dataset_iterable = unlabeled_data_loader(dummy_input)
+        model = TinyModel().eval()
+        sim = QuantizationSimModel(model, dummy_input)
+        sim.compute_encodings(evaluate, dummy_input)
+        forward_pass_callback = CallbackFunc(calibrate, dummy_input)
+        eval_callback = CallbackFunc(evaluate, dummy_input)
+        quant_analyzer = QuantAnalyzer(model, dummy_input, forward_pass_callback, eval_callback)
+        quant_analyzer.enable_per_layer_mse_loss(unlabeled_dataset_iterable, num_batches=4)
+        with tempfile.TemporaryDirectory() as tempdir:
+            mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tempdir,
+                                                                     max_outputs_per_run=None)
+            # Processing the layers in bounded groups gives the same results
+            grouped_mse_loss_dict = quant_analyzer.export_per_layer_mse_loss(sim, results_dir=tempdir,
+                                                                             max_outputs_per_run=2)
+        assert grouped_mse_loss_dict.keys() == mse_loss_dict.keys()
+        for name, loss in mse_loss_dict.items():
+            assert grouped_mse_loss_dict[name] == pytest.approx(loss)
+
+        quant_wrappers = dict(sim.model.named_modules())
+        for name, module in utils.get_ordered_list_of_modules(model, dummy_input):
+            orig_module_collector = utils.ModuleData(model, module)
+            quant_module_collector = utils.ModuleData(sim.model, quant_wrappers[name])
+            loss, total = 0.0, 0
+            for batch_index, model_inputs in enumerate(unlabeled_dataset_iterable):
+                if batch_index == 4:
+                    break
+                _, fp32_out = orig_module_collector.collect_inp_out_data(model_inputs, False, True)
+                _, quantized_out = quant_module_collector.collect_inp_out_data(model_inputs, False, True)
+                loss += torch.nn.functional.mse_loss(fp32_out, quantized_out).item()
+                total += fp32_out.size(0)
+            assert mse_loss_dict[name] == pytest.approx(loss / total)
+
     @pytest.mark.cuda
     def test_analyze(self):
         """ test end to end for analyze() method """
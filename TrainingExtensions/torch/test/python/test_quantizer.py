@@ -59,6 +59,7 @@ import aimet_common.utils
 from aimet_common.defs import QuantScheme, QuantizationDataType, MAP_ROUND_MODE_TO_PYMO
 from aimet_common.quantsim_config.utils import get_path_for_per_channel_config
 from aimet_common.utils import AimetLogger
+from aimet_common import tracing
 from aimet_torch import onnx_utils
 from aimet_torch import utils
 import aimet_torch.nn.modules.custom as aimet_modules
@@ -5190,6 +5191,78 @@ def test_multiple_references_to_same_module():
     assert isinstance(qsim.model.two_relu.relu1._module_to_wrap, torch.nn.ReLU)
 
 
+def test_tracing_quantsim():
+    model = SmallMnist()
+    dummy_input = torch.rand(1, 1, 28, 28)
+
+    def forward_pass(model, num_batches):
+        for _ in range(num_batches):
+            model(dummy_input)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with tracing.trace(os.path.join(tmp_dir, 'trace.json')) as tracer:
+            sim = QuantizationSimModel(model, dummy_input)
+            sim.compute_encodings(forward_pass, 3)
+            sim.export(tmp_dir, 'model', dummy_input)
+
+        with open(os.path.join(tmp_dir, 'trace.json')) as f:
+            span_names = {event['name'] for event in json.load(f)['traceEvents'] if event['ph'] == 'X'}
+
+        expected_bytes = sum(os.path.getsize(os.path.join(tmp_dir, filename))
+                             for filename in ('model.pth', 'model.onnx', 'model.encodings', 'model_torch.encodings'))
+
+    assert {'QuantizationSimModel.__init__', 'QuantizationSimModel.compute_encodings',
+            'QuantizationSimModel.export'} <= span_names
+    assert tracer.counters['forward_passes'] == 3
+    assert tracer.counters['bytes_serialized'] == expected_bytes
+
+    # Nothing is recorded once tracing is disabled
+    sim.compute_encodings(forward_pass, 3)
+    assert tracer.counters['forward_passes'] == 3
+
+
+@pytest.mark.parametrize('quant_scheme', [QuantScheme.post_training_tf, QuantScheme.training_range_learning_with_tf_init])
+def test_snapshot_restore(quant_scheme):
+    model = SmallMnist().eval()
+    dummy_input = torch.rand(1, 1, 28, 28)
+
+    def forward_pass(model, _):
+        model(dummy_input)
+
+    sim = QuantizationSimModel(model, dummy_input, quant_scheme=quant_scheme)
+    sim.compute_encodings(forward_pass, None)
+    with torch.no_grad():
+        expected_output = sim.model(dummy_input)
+
+    conv1 = sim.model.conv1
+    fc2 = sim.model.fc2
+    fc2_output_enabled = fc2.output_quantizers[0].enabled
+    snapshot = sim.snapshot(include_weights=True)
+    assert snapshot.tensors()
+
+    # Nothing to restore right after taking a snapshot
+    assert sim.restore(snapshot) == 0
+
+    conv1.param_quantizers['weight'].bitwidth = 4
+    fc2.output_quantizers[0].enabled = not fc2_output_enabled
+    sim.compute_encodings(forward_pass, None)
+    with torch.no_grad():
+        conv1._module_to_wrap.weight.mul_(2)
+        assert not torch.equal(sim.model(dummy_input), expected_output)
+
+    assert sim.restore(snapshot) > 0
+    assert conv1.param_quantizers['weight'].bitwidth == 8
+    assert fc2.output_quantizers[0].enabled == fc2_output_enabled
+    with torch.no_grad():
+        assert torch.equal(sim.model(dummy_input), expected_output)
+
+    # Only the quantizers modified since the snapshot are restored
+    snapshot = sim.snapshot()
+    conv1.param_quantizers['weight'].bitwidth = 4
+    assert sim.restore(snapshot) == 1
+    assert conv1.param_quantizers['weight'].bitwidth == 8
+
+
 def _assert_same_results_with_or_without_recompute(wrapper: LearnedGridQuantWrapper, x):
     with no_recompute():
         # If recomputation is disabled, we use the default forward/backward functions
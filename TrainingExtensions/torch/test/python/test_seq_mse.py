@@ -193,6 +193,24 @@ class TestSeqMse:
                 assert not numpy.isclose(before.min, after.min)
                 assert not numpy.isclose(before.max, after.max)
 
+    @pytest.mark.parametrize("early_stop_tol, expected_num_candidates", [(None, 20), (1.0, 3)])
+    def test_optimize_module_early_stop(self, early_stop_tol, expected_num_candidates):
+        """ test candidate search terminates once the loss plateaus """
+        torch.manual_seed(0)
+        linear = torch.nn.Linear(64, 128)
+        wrapper = StaticGridQuantWrapper(linear, 4, 16, 'nearest', QuantScheme.post_training_tf)
+        wrapper.input_quantizers[0].enabled = False
+        wrapper.output_quantizers[0].enabled = False
+        wrapper.param_quantizers['weight'].reset_encoding_stats()
+        wrapper.param_quantizers['weight'].update_encoding_stats(wrapper.weight.data)
+        wrapper.param_quantizers['weight'].compute_encoding()
+        xq = torch.randn(4, 4, 32, 64)
+
+        # With tolerance of 1.0, no candidate is considered an improvement over the first one
+        params = SeqMseParams(num_batches=4, num_candidates=20, early_stop_tol=early_stop_tol, early_stop_patience=2)
+        assert optimize_module(wrapper, xq, xq, params) == expected_num_candidates
+        assert wrapper.param_quantizers['weight'].is_encoding_frozen
+
     @pytest.mark.parametrize("enable_pcq", [True, False])
     @pytest.mark.parametrize("param_bw", [2, 31])
     @pytest.mark.parametrize("loss_fn", ['mse', 'l1', 'sqnr'])
@@ -0,0 +1,229 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+""" Tests for the svd factorization cache used by spatial and weight svd """
+
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from aimet_common.defs import CostMetric, LayerCompRatioPair
+from aimet_torch.layer_database import LayerDatabase
+from aimet_torch.svd.svd_factorization import SvdFactorizationCache
+from aimet_torch.svd.svd_pruner import SpatialSvdPruner, WeightSvdPruner
+from aimet_torch.svd.svd_splitter import SpatialSvdModuleSplitter, WeightSvdModuleSplitter
+from aimet_torch.utils import create_rand_tensors_given_shapes, get_device
+from models import mnist_torch_model
+
+
+def _low_rank_matrix(rows, cols, rank):
+    return torch.randn(rows, rank) @ torch.randn(rank, cols)
+
+
+class TestSvdFactorizationCache:
+
+    def test_factorization_reused_across_ranks(self):
+        torch.manual_seed(0)
+        matrix = torch.randn(64, 48)
+        cache = SvdFactorizationCache()
+
+        with patch('torch.linalg.svd', wraps=torch.linalg.svd) as svd:
+            for rank in (4, 16, 48):
+                first, second = cache.get(matrix, rank).split(rank)
+                assert first.shape == (64, rank)
+                assert second.shape == (rank, 48)
+
+            # Copies of the matrix with the same content share the factorization
+            cache.get(matrix.clone(), 8)
+            assert svd.call_count == 1
+
+        assert len(cache) == 1
+        first, second = cache.get(matrix, 48).split(48)
+        assert torch.allclose(first @ second, matrix, atol=1e-4)
+
+        # Changing the matrix content invalidates the entry
+        assert (matrix + 1) not in cache
+
+    def test_batched_precompute(self):
+        torch.manual_seed(0)
+        matrices = [torch.randn(32, 16) for _ in range(5)] + [torch.randn(8, 8)]
+        cache = SvdFactorizationCache(max_batch_size=4)
+
+        with patch('torch.linalg.svd', wraps=torch.linalg.svd) as svd:
+            cache.precompute(matrices)
+            # 5 matrices of shape (32, 16) in batches of 4, and one matrix of shape (8, 8)
+            assert svd.call_count == 3
+
+            for matrix in matrices:
+                rank = min(matrix.shape)
+                first, second = cache.get(matrix, rank).split(rank)
+                assert torch.allclose(first @ second, matrix, atol=1e-4)
+            assert svd.call_count == 3
+
+    def test_randomized_svd(self):
+        torch.manual_seed(0)
+        matrix = _low_rank_matrix(256, 128, 8)
+        cache = SvdFactorizationCache(randomized_svd_min_dim=64)
+        assert cache.uses_randomized_svd(matrix)
+
+        with patch('torch.linalg.svd', wraps=torch.linalg.svd) as svd:
+            factorization = cache.get(matrix, 8)
+            assert svd.call_count == 0
+
+        assert factorization.max_rank == 8
+        first, second = factorization.split(8)
+        assert torch.allclose(first @ second, matrix, rtol=1e-3, atol=1e-3)
+
+        # Requesting a higher rank than computed grows the factorization
+        assert cache.get(matrix, 12).max_rank >= 16
+        assert len(cache) == 1
+
+        # Randomized matrices are not batched
+        cache.clear()
+        cache.precompute([matrix])
+        assert len(cache) == 0
+
+    def test_spatial_svd_split_matches_numpy(self):
+        torch.manual_seed(0)
+        module = torch.nn.Conv2d(20, 50, kernel_size=5, padding=2)
+        factorization = SvdFactorizationCache().get(SpatialSvdModuleSplitter.get_svd_matrix(module), 30)
+        inp = torch.randn(2, 20, 12, 12)
+
+        expected = torch.nn.Sequential(*SpatialSvdModuleSplitter.split_module(module, 30))(inp)
+        actual = torch.nn.Sequential(*SpatialSvdModuleSplitter.split_module(module, 30, factorization))(inp)
+
+        assert torch.allclose(actual, expected, atol=1e-4)
+
+    @pytest.mark.parametrize('module, input_shape', [(torch.nn.Conv2d(16, 24, kernel_size=3, padding=1), (2, 16, 8, 8)),
+                                                      (torch.nn.Linear(40, 30), (4, 40))])
+    def test_weight_svd_split_at_full_rank(self, module, input_shape):
+        torch.manual_seed(0)
+        matrix = WeightSvdModuleSplitter.get_svd_matrix(module)
+        rank = min(matrix.shape)
+        factorization = SvdFactorizationCache().get(matrix, rank)
+        module_a, module_b = WeightSvdModuleSplitter.split_module_using_factorization(module, rank, factorization)
+        inp = torch.randn(*input_shape)
+
+        assert module_a.weight.shape[0] == rank
+        assert torch.allclose(module_b(module_a(inp)), module(inp), atol=1e-4)
+
+    @pytest.mark.parametrize('pruner_type, layer_names', [(SpatialSvdPruner, ('conv2',)),
+                                                          (WeightSvdPruner, ('conv2', 'fc1'))])
+    def test_pruner_decomposes_each_layer_once(self, pruner_type, layer_names):
+        torch.manual_seed(0)
+        model = mnist_torch_model.Net().eval()
+        dummy_input = create_rand_tensors_given_shapes((1, 1, 28, 28), get_device(model))
+        layer_db = LayerDatabase(model, dummy_input)
+        layers = [layer_db.find_layer_by_name(name) for name in layer_names]
+        layer_db.mark_picked_layers(layers)
+
+        cache = SvdFactorizationCache()
+        pruner = pruner_type(cache)
+
+        with patch('torch.linalg.svd', wraps=torch.linalg.svd) as svd:
+            # Evaluate the candidates the way greedy comp-ratio selection does
+            for layer in layers:
+                for comp_ratio in (Decimal('0.25'), Decimal('0.5'), Decimal('0.75')):
+                    comp_layer_db = pruner.prune_model(layer_db, [LayerCompRatioPair(layer, comp_ratio)],
+                                                       CostMetric.mac, trainer=None)
+                    comp_layer_db.model(*dummy_input)
+            assert svd.call_count == len(layers)
+
+        assert len(cache) == len(layers)
+
+    @pytest.mark.skip(reason="Benchmark only for study, there is no validation criterion")
+    def test_benchmark_factorization_cache(self):
+        """
+        Compares the time to split a set of layers at several candidate ranks on CPU
+        with and without factorization cache, with exact and randomized svd, and reports the relative
+        reconstruction error of the randomized decomposition.
+        """
+        torch.manual_seed(0)
+        num_layers = 16
+        num_candidates = 10
+        device = torch.device('cpu')
+
+        for shape in ((256, 256), (1024, 512), (2048, 2048)):
+            # Trained weights have decaying spectra, so emulate one
+            matrices = [(torch.randn(shape[0], min(shape)) * torch.logspace(0, -3, min(shape))) @
+                        torch.randn(min(shape), shape[1]) for _ in range(num_layers)]
+            matrices = [matrix.to(device) for matrix in matrices]
+            ranks = [max(1, int(min(shape) * (i + 1) / (num_candidates + 1))) for i in range(num_candidates)]
+
+            start = time.perf_counter()
+            for matrix in matrices:
+                for rank in ranks:
+                    SvdFactorizationCache().get(matrix, rank).split(rank)
+            no_cache = time.perf_counter() - start
+
+            cache = SvdFactorizationCache()
+            start = time.perf_counter()
+            for matrix in matrices:
+                for rank in ranks:
+                    cache.get(matrix, rank).split(rank)
+            cached = time.perf_counter() - start
+
+            cache = SvdFactorizationCache()
+            start = time.perf_counter()
+            cache.precompute(matrices)
+            for matrix in matrices:
+                for rank in ranks:
+                    cache.get(matrix, rank).split(rank)
+            batched = time.perf_counter() - start
+
+            cache = SvdFactorizationCache(randomized_svd_min_dim=0)
+            start = time.perf_counter()
+            for matrix in matrices:
+                for rank in ranks:
+                    cache.get(matrix, rank).split(rank)
+            randomized = time.perf_counter() - start
+
+            # Reconstruction error of randomized svd relative to the optimal error of exact svd at the median rank
+            rank = ranks[len(ranks) // 2]
+            errors = []
+            for matrix in matrices:
+                first, second = SvdFactorizationCache(randomized_svd_min_dim=0).get(matrix, rank).split(rank)
+                exact_first, exact_second = SvdFactorizationCache().get(matrix, rank).split(rank)
+                exact_error = torch.linalg.norm(matrix - exact_first @ exact_second)
+                errors.append(float(torch.linalg.norm(matrix - first @ second) / exact_error))
+
+            print(f"shape={shape}: no cache {no_cache:.3f}s, cache {cached:.3f}s, "
+                  f"cache+batched {batched:.3f}s, randomized {randomized:.3f}s "
+                  f"(mean error relative to exact svd at rank {rank}: "
+                  f"{sum(errors) / len(errors):.4f})")
@@ -0,0 +1,203 @@
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2024, Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright notice,
+#     this list of conditions and the following disclaimer in the documentation
+#     and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its contributors
+#     may be used to endorse or promote products derived from this software
+#     without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+#  POSSIBILITY OF SUCH DAMAGE.
+#
+#  SPDX-License-Identifier: BSD-3-Clause
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+import time
+from unittest.mock import patch
+
+import pytest
+import torch
+from aimet_torch.v2.quantization.affine import Quantize
+from aimet_torch.v2.nn import QuantizedLinear, QuantizedConv2d
+from aimet_torch.v2.nn import custom, int_kernels
+
+
+def _set_quantizers(qmodule, weight_shape=None, weight_symmetric=True, input_symmetric=False):
+    for i, _ in enumerate(qmodule.input_quantizers):
+        qmodule.input_quantizers[i] = Quantize(shape=(), bitwidth=8, symmetric=input_symmetric)
+    qmodule.output_quantizers[0] = Quantize(shape=(), bitwidth=8, symmetric=False)
+    if weight_shape is not None:
+        qmodule.param_quantizers['weight'] = Quantize(shape=weight_shape, bitwidth=8, symmetric=weight_symmetric)
+
+
+def _assert_close_to_fake_quant(qmodule, *inputs):
+    with qmodule.compute_encodings():
+        qmodule(*inputs)
+
+    expected = qmodule(*inputs)
+
+    with int_kernels.use_int_kernels():
+        assert qmodule.get_kernel() is not None
+        output = qmodule(*inputs)
+
+    assert qmodule.get_kernel() is None
+
+    # Integer kernels are allowed to differ from fake quantization by at most one quantization step
+    # due to the rounding error of floating point accumulation in fake quantization
+    scale = qmodule.output_quantizers[0].get_scale()
+    assert torch.all((output - expected).abs() <= scale * 1.001)
+
+
+class TestIntKernels:
+    @pytest.mark.parametrize('weight_shape', [(), (16, 1)])
+    @pytest.mark.parametrize('weight_symmetric', [True, False])
+    def test_int_linear(self, weight_shape, weight_symmetric):
+        torch.manual_seed(0)
+        qlinear = QuantizedLinear(32, 16)
+        _set_quantizers(qlinear, weight_shape, weight_symmetric)
+        _assert_close_to_fake_quant(qlinear, torch.randn(4, 8, 32))
+
+    @pytest.mark.parametrize('padding', [0, 1, 2])
+    @pytest.mark.parametrize('stride', [1, 2])
+    @pytest.mark.parametrize('input_symmetric', [True, False])
+    def test_int_conv2d(self, padding, stride, input_symmetric):
+        torch.manual_seed(0)
+        qconv = QuantizedConv2d(3, 8, kernel_size=3, padding=padding, stride=stride, dilation=2)
+        _set_quantizers(qconv, (8, 1, 1, 1), input_symmetric=input_symmetric)
+        _assert_close_to_fake_quant(qconv, torch.randn(2, 3, 16, 16))
+        _assert_close_to_fake_quant(qconv, torch.randn(3, 16, 16))
+
+    @pytest.mark.parametrize('shapes', [((4, 8, 32), (32, 16)),
+                                        ((2, 4, 8, 32), (2, 4, 32, 16)),
+                                        ((4, 8, 32), (1, 32, 16))])
+    def test_int_matmul(self, shapes):
+        torch.manual_seed(0)
+        qmatmul = custom.QuantizedMatMul()
+        _set_quantizers(qmatmul)
+        _assert_close_to_fake_quant(qmatmul, *(torch.randn(shape) for shape in shapes))
+
+    @pytest.mark.parametrize('qcls', [custom.QuantizedAdd, custom.QuantizedSubtract, custom.QuantizedMultiply])
+    def test_int_elementwise(self, qcls):
+        torch.manual_seed(0)
+        qmodule = qcls()
+        _set_quantizers(qmodule)
+        _assert_close_to_fake_quant(qmodule, torch.randn(4, 8), torch.rand(8) * 3)
+
+    def test_fallback(self):
+        """
+        Given: QuantizedLinear with per-channel input quantizer and blockwise weight quantizer
+        When: Run forward with integer kernels
+        Then: Output should be equal to the fake-quantized output
+        """
+        torch.manual_seed(0)
+        qlinear = QuantizedLinear(32, 16)
+        _set_quantizers(qlinear)
+        qlinear.input_quantizers[0] = Quantize(shape=(32,), bitwidth=8, symmetric=False)
+        qlinear.param_quantizers['weight'] = Quantize(shape=(16, 4), bitwidth=8, symmetric=True, block_size=(-1, -1))
+        _assert_close_to_fake_quant(qlinear, torch.randn(4, 32))
+
+    @pytest.mark.parametrize('int_mm', [None, RuntimeError])
+    def test_int_mm_unavailable(self, int_mm):
+        """
+        Given: torch._int_mm is missing or rejects the given inputs
+        When: Run forward with integer kernels
+        Then: Kernels should fall back to floating point computation
+        """
+        torch.manual_seed(0)
+        qlinear = QuantizedLinear(32, 16)
+        _set_quantizers(qlinear, (16, 1))
+
+        if int_mm is None:
+            ctx = patch.object(int_kernels, '_has_int_mm', return_value=False)
+        else:
+            ctx = patch.object(torch, '_int_mm', side_effect=int_mm, create=True)
+
+        with ctx, patch.object(int_kernels, '_fallback', wraps=int_kernels._fallback) as fallback:
+            _assert_close_to_fake_quant(qlinear, torch.randn(4, 32))
+        assert fallback.call_count == 1
+
+    def test_int_add_with_different_scales(self):
+        """
+        Given: Two operands with very different scales
+        When: Add them with integer kernel
+        Then: Output should be close to the fake-quantized output
+        """
+        torch.manual_seed(0)
+        qadd = custom.QuantizedAdd()
+        _set_quantizers(qadd)
+        _assert_close_to_fake_quant(qadd, torch.randn(4, 8) * 1000, torch.randn(8) * 1e-3)
+        _assert_close_to_fake_quant(qadd, torch.randn(4, 8) * 1e-3, torch.randn(8) * 1000)
+
+    @pytest.mark.skip(reason="Benchmark only for study, there is no validation criterion")
+    def test_benchmark_int_kernels(self):
+        """
+        Compare CPU throughput of float linear, fake-quantized linear and integer kernel linear
+        """
+        torch.manual_seed(0)
+        num_iterations = 20
+        for batch_size, in_features, out_features in [(1, 1024, 1024), (64, 1024, 1024), (512, 4096, 4096)]:
+            linear = torch.nn.Linear(in_features, out_features)
+            qlinear = QuantizedLinear(in_features, out_features)
+            qlinear.load_state_dict(linear.state_dict(), strict=False)
+            _set_quantizers(qlinear, (out_features, 1))
+            x = torch.randn(batch_size, in_features)
+            with qlinear.compute_encodings():
+                qlinear(x)
+
+            def _measure(fn):
+                with torch.no_grad():
+                    fn()
+                    start_time = time.perf_counter()
+                    for _ in range(num_iterations):
+                        fn()
+                    return (time.perf_counter() - start_time) / num_iterations
+
+            float_time = _measure(lambda: linear(x))
+            fake_quant_time = _measure(lambda: qlinear(x))
+            with int_kernels.use_int_kernels():
+                int_time = _measure(lambda: qlinear(x))
+
+            print('batch={} in={} out={}: float {:.2f}ms, fake quant {:.2f}ms, int kernel {:.2f}ms'.format(
+                batch_size, in_features, out_features, float_time * 1e3, fake_quant_time * 1e3, int_time * 1e3))
+
+    def test_register_int_kernels(self):
+        def dummy_kernel(*_, **__):
+            raise NotImplementedError
+
+        QuantizedLinear.set_default_kernel(dummy_kernel)
+        try:
+            with int_kernels.use_int_kernels():
+                assert QuantizedLinear.get_default_kernel() is int_kernels.int_linear
+                assert custom.QuantizedAdd.get_default_kernel() is int_kernels.int_add
+            assert QuantizedLinear.get_default_kernel() is dummy_kernel
+            assert custom.QuantizedAdd.get_default_kernel() is None
+
+            int_kernels.register_int_kernels()
+            assert QuantizedConv2d.get_default_kernel() is int_kernels.int_conv2d
+            int_kernels.unregister_int_kernels()
+            assert QuantizedConv2d.get_default_kernel() is None
+        finally:
+            QuantizedLinear.set_default_kernel(None)
@@ -39,7 +39,8 @@ import math
 import pytest
 import numpy as np
 import random
-from aimet_torch.v2.quantization.encoding_analyzer import SqnrEncodingAnalyzer, PercentileEncodingAnalyzer, MinMaxEncodingAnalyzer, _HistogramObserver
+from aimet_torch.v2.quantization.encoding_analyzer import SqnrEncodingAnalyzer, PercentileEncodingAnalyzer, MinMaxEncodingAnalyzer, _HistogramObserver, \
+    _BatchedHistogramObserver
 
 @pytest.fixture(autouse=True)
 def set_seed():
@@ -210,8 +211,10 @@ class TestHistogramEncodingAnalyzer:
         num_bins = request.param[1]
 
         percentile_encoding_analyzer = PercentileEncodingAnalyzer(min_max_shape, num_bins = num_bins, percentile = 99)
+        batched_percentile_encoding_analyzer = PercentileEncodingAnalyzer(min_max_shape, num_bins = num_bins, percentile = 99,
+                                                                          batched_histogram=True)
         #sqnr_encoding_analyzer = SqnrEncodingAnalyzer(min_max_shape, num_bins)
-        encoding_analyzer_list = [percentile_encoding_analyzer]
+        encoding_analyzer_list = [percentile_encoding_analyzer, batched_percentile_encoding_analyzer]
         yield encoding_analyzer_list
     
     @pytest.mark.parametrize("histogram_based_encoding_analyzers", [((), 3)], indirect=True)
@@ -540,6 +543,95 @@ class TestHistogramEncodingAnalyzer:
         #                                       (new_histogram)
             
 
+    @pytest.mark.parametrize('shape', [(4,), (3, 1), (2, 1, 1), (3, 4), (2, 3, 1), (2, 1, 4), (2, 3, 4)])
+    def test_batched_collect_stats_multidimensional(self, shape):
+        x = torch.randn(2, 3, 4)
+        histograms = _HistogramObserver(shape, num_bins=5).collect_stats(x)
+        batched_histograms = _BatchedHistogramObserver(shape, num_bins=5).collect_stats(x)
+        assert len(batched_histograms) == len(histograms)
+        for hist, batched_hist in zip(histograms, batched_histograms):
+            assert torch.equal(batched_hist.min, hist.min)
+            assert torch.equal(batched_hist.max, hist.max)
+            assert torch.equal(batched_hist.histogram, hist.histogram)
+            assert torch.allclose(batched_hist.bin_edges, hist.bin_edges)
+
+    def test_batched_histogram_during_merging(self):
+        observer = _HistogramObserver((3, 1), num_bins=64)
+        batched_observer = _BatchedHistogramObserver((3, 1), num_bins=64)
+        for scale in (1.0, 0.5, 2.0, 3.0):
+            # expand the range of some of the channels only
+            input = torch.randn(3, 1000) * torch.tensor([[scale], [1.0], [1 / scale]])
+            observer.merge_stats(observer.collect_stats(input), input)
+            batched_observer.merge_stats(batched_observer.collect_stats(input), input)
+
+        for hist, batched_hist in zip(observer.stats, batched_observer.stats):
+            assert torch.equal(batched_hist.min, hist.min)
+            assert torch.equal(batched_hist.max, hist.max)
+            assert batched_hist.histogram.sum() == 4000
+            assert torch.allclose(batched_hist.histogram, hist.histogram, atol=1)
+            assert torch.allclose(batched_hist.bin_edges, hist.bin_edges)
+
+    @pytest.mark.parametrize('symmetric', [True, False])
+    def test_batched_histogram_reduced_precision(self, symmetric):
+        encoding_analyzer = PercentileEncodingAnalyzer((4, 1), num_bins=128, percentile=99)
+        reduced_precision_encoding_analyzer = PercentileEncodingAnalyzer((4, 1), num_bins=128, percentile=99,
+                                                                         batched_histogram=True,
+                                                                         histogram_dtype=torch.int32,
+                                                                         bin_edges_dtype=torch.float16)
+        for _ in range(3):
+            x = torch.randn(4, 500) * torch.rand(4, 1) * 10
+            encoding_analyzer.update_stats(x)
+            reduced_precision_encoding_analyzer.update_stats(x)
+
+        for stats in reduced_precision_encoding_analyzer.observer.stats:
+            assert stats.histogram.dtype == torch.int32
+            assert stats.bin_edges.dtype == torch.float16
+            assert stats.histogram.sum() == 1500
+
+        num_steps = 2 ** 8 - 1
+        encoding_min, encoding_max = encoding_analyzer.compute_encodings(num_steps, symmetric)
+        reduced_min, reduced_max = reduced_precision_encoding_analyzer.compute_encodings(num_steps, symmetric)
+        assert torch.allclose(reduced_min.float(), encoding_min, rtol=1e-2, atol=1e-2)
+        assert torch.allclose(reduced_max.float(), encoding_max, rtol=1e-2, atol=1e-2)
+
+    def test_float16_bin_edges_with_large_range(self):
+        """
+        Given: Batched histograms with float16 bin edges over a range beyond the float16 maximum (65504)
+        When: Compute encodings
+        Then: Encodings should be finite float32 values, same as with float32 bin edges
+        """
+        encoding_analyzer = PercentileEncodingAnalyzer((4, 1), num_bins=128, percentile=99, batched_histogram=True)
+        fp16_encoding_analyzer = PercentileEncodingAnalyzer((4, 1), num_bins=128, percentile=99,
+                                                            batched_histogram=True, bin_edges_dtype=torch.float16)
+        x = torch.randn(4, 500) * 1e6
+        encoding_analyzer.update_stats(x)
+        fp16_encoding_analyzer.update_stats(x)
+
+        num_steps = 2 ** 8 - 1
+        encoding_min, encoding_max = encoding_analyzer.compute_encodings(num_steps, False)
+        fp16_min, fp16_max = fp16_encoding_analyzer.compute_encodings(num_steps, False)
+        assert fp16_min.dtype == fp16_max.dtype == torch.float32
+        assert torch.all(fp16_min.isfinite()) and torch.all(fp16_max.isfinite())
+        assert torch.allclose(fp16_min, encoding_min)
+        assert torch.allclose(fp16_max, encoding_max)
+
+    def test_invalid_histogram_dtype(self):
+        with pytest.raises(ValueError):
+            PercentileEncodingAnalyzer((4, 1), batched_histogram=True, histogram_dtype=torch.int8)
+        with pytest.raises(ValueError):
+            SqnrEncodingAnalyzer((4, 1), batched_histogram=True, bin_edges_dtype=torch.bfloat16)
+        with pytest.raises(ValueError):
+            PercentileEncodingAnalyzer((4, 1), histogram_dtype=torch.int32)
+
+    def test_batched_histogram_args_keyword_only(self):
+        with pytest.raises(TypeError):
+            PercentileEncodingAnalyzer((4, 1), 128, 99, True)
+        with pytest.raises(TypeError):
+            SqnrEncodingAnalyzer((4, 1), 128, 17)
+        with pytest.raises(TypeError):
+            _BatchedHistogramObserver((4, 1), 128, torch.int32)
+
+
 class TestPercentileEncodingAnalyzer():  
     @pytest.mark.parametrize("percentile_value", [-1, 49, 5, 101])
     def test_invalid_percentile_value(self, percentile_value):
@@ -653,6 +745,32 @@ class TestPercentileEncodingAnalyzer():
 
 class TestSqnrEncodingAnalyzer:
 
+    @pytest.mark.parametrize('symmetric', [True, False])
+    @pytest.mark.parametrize('bin_edges_dtype', [torch.float32, torch.float16])
+    def test_batched_histogram(self, symmetric, bin_edges_dtype):
+        """
+        Given: Update stats of per-channel SQNR encoding analyzers with and without batched histograms
+        When: Compute encodings
+        Then: Both should compute the same encodings, including for ranges beyond the float16 maximum
+        """
+        torch.manual_seed(0)
+        encoding_analyzer = SqnrEncodingAnalyzer((4, 1), num_bins=128)
+        batched_encoding_analyzer = SqnrEncodingAnalyzer((4, 1), num_bins=128, batched_histogram=True,
+                                                         histogram_dtype=torch.int32,
+                                                         bin_edges_dtype=bin_edges_dtype)
+        # Single batch, so that both analyzers hold identical histograms (rebinning can differ by a count)
+        x = torch.randn(4, 500) * torch.tensor([[1.], [10.], [1e3], [1e5]])
+        encoding_analyzer.update_stats(x)
+        batched_encoding_analyzer.update_stats(x)
+
+        num_steps = 2 ** 8 - 1
+        encoding_min, encoding_max = encoding_analyzer.compute_encodings(num_steps, symmetric)
+        batched_min, batched_max = batched_encoding_analyzer.compute_encodings(num_steps, symmetric)
+        assert batched_min.shape == batched_max.shape == (4, 1)
+        assert torch.all(batched_min.isfinite()) and torch.all(batched_max.isfinite())
+        assert torch.allclose(batched_min, encoding_min, rtol=1e-2)
+        assert torch.allclose(batched_max, encoding_max, rtol=1e-2)
+
     def test_computed_encodings_uniform_dist(self):
         """
         Given: Update stats on an equally spaced input (no outliers)
@@ -35,6 +35,7 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 import contextlib
+import unittest.mock
 import torch
 import tempfile
 import os
@@ -50,6 +51,7 @@ from aimet_torch.v2.quantsim import QuantizationSimModel
 from aimet_torch.v2.quantization.encoding_analyzer import PercentileEncodingAnalyzer
 from aimet_torch.v2.quantization.base import QuantizerBase
 from aimet_torch.v2.quantization.affine import AffineQuantizerBase, GroupedBlockQuantizeDequantize
+from aimet_torch.v2.quantization.affine import QuantizeDequantize as AffineQuantizeDequantize
 from aimet_torch.v2.experimental import propagate_output_encodings
 from aimet_torch.v2.nn import BaseQuantizationMixin
 import aimet_torch.v2.nn.modules.custom as custom
@@ -116,6 +118,74 @@ class TestQuantsim:
 
         assert torch.all(weight_max_99p9.gt(weight_max_90p0))
 
+    @pytest.mark.parametrize("statistics_only", (False, True))
+    def test_compute_encodings_statistics_only(self, statistics_only):
+        """ Test per-batch encodings aren't computed for quantizers that pass activations through """
+        model = torch.nn.Sequential(torch.nn.Linear(10, 10), torch.nn.ReLU(), torch.nn.Linear(10, 10))
+        dummy_input = torch.randn(16, 10)
+        num_batches = 5
+
+        def forward_pass(model, _):
+            for _ in range(num_batches):
+                model(dummy_input)
+
+        sim = QuantizationSimModel(model, dummy_input, quant_scheme="percentile")
+        # Standalone quantizer which quantize-dequantizes its input with the encodings of every batch
+        standalone_qdq = AffineQuantizeDequantize((), 8, False, encoding_analyzer=PercentileEncodingAnalyzer(()))
+        sim.model = torch.nn.Sequential(standalone_qdq, sim.model)
+        num_quantizers = sum(1 for module in sim.model.modules()
+                             if isinstance(module, QuantizerBase)
+                             and isinstance(module.encoding_analyzer, PercentileEncodingAnalyzer))
+
+        compute_encodings_from_stats = PercentileEncodingAnalyzer.compute_encodings_from_stats
+        num_calls = 0
+        def count_compute_encodings_from_stats(*args, **kwargs):
+            nonlocal num_calls
+            num_calls += 1
+            return compute_encodings_from_stats(*args, **kwargs)
+
+        with unittest.mock.patch.object(PercentileEncodingAnalyzer, 'compute_encodings_from_stats',
+                                        count_compute_encodings_from_stats):
+            sim.compute_encodings(forward_pass, None, statistics_only=statistics_only)
+
+        # Encodings are computed once per quantizer. Only the standalone quantizer computes per-batch encodings
+        # unless statistics_only is set
+        expected_num_calls = num_quantizers if statistics_only else num_quantizers + num_batches
+        assert num_calls == expected_num_calls
+        assert all(module.is_initialized() for module in sim.model.modules() if isinstance(module, QuantizerBase))
+
+        if not statistics_only:
+            return
+
+        # Statistics only calibration computes same encodings as the activations are passed through anyway
+        sim_ref = QuantizationSimModel(model, dummy_input, quant_scheme="percentile")
+        sim_ref.compute_encodings(forward_pass, None)
+        for (name, qtzr), (name_ref, qtzr_ref) in zip(sim.model[1].named_modules(), sim_ref.model.named_modules()):
+            assert name == name_ref
+            if isinstance(qtzr, AffineQuantizerBase):
+                assert encodings_are_close(qtzr, qtzr_ref)
+
+    def test_compute_encodings_with_block_boundaries(self):
+        """ Test outputs of block boundaries are quantize-dequantized during statistics only calibration """
+        model = torch.nn.Sequential(torch.nn.Linear(10, 10), torch.nn.ReLU(), torch.nn.Linear(10, 10))
+        dummy_input = torch.randn(16, 10)
+        sim = QuantizationSimModel(model, dummy_input)
+        sim.model[0].output_quantizers[0] = AffineQuantizeDequantize((), 4, False)
+
+        observed_inputs = []
+        handle = sim.model[1].register_forward_pre_hook(lambda _, inp: observed_inputs.append(inp[0].clone()))
+        sim.compute_encodings(lambda model, _: model(dummy_input), None,
+                              statistics_only=True, block_boundaries=[sim.model[0]])
+        handle.remove()
+
+        # Output of block boundary is quantized to at most 2 ** 4 distinct values during calibration
+        assert len(observed_inputs) == 1
+        assert observed_inputs[0].unique().numel() <= 2 ** 4
+        assert sim.model[0].output_quantizers[0].is_initialized()
+
+        with pytest.raises(RuntimeError):
+            sim.compute_encodings(lambda model, _: model(dummy_input), None, block_boundaries=[model[0]])
+
     @pytest.mark.parametrize("config_file", (None, get_path_for_per_channel_config()))
     def test_set_and_freeze_param_encodings(self, config_file):
         model = test_models.BasicConv2d(kernel_size=3)
@@ -925,6 +995,45 @@ class TestQuantsim:
                         assert name in param_encodings_set
 
 
+    def test_snapshot_restore(self):
+        model = test_models.TinyModel().eval()
+        dummy_input = torch.randn(1, 3, 32, 32)
+
+        def forward_pass(model, _):
+            model(dummy_input)
+
+        sim = QuantizationSimModel(model, dummy_input)
+        conv1 = sim.model.conv1
+        input_quantizer = conv1.input_quantizers[0]
+        weight_quantizer = conv1.param_quantizers['weight']
+
+        uninitialized_snapshot = sim.snapshot()
+        sim.compute_encodings(forward_pass, None)
+        with torch.no_grad():
+            expected_output = sim.model(dummy_input)
+
+        snapshot = sim.snapshot(include_weights=True)
+        assert sim.restore(snapshot) == 0
+
+        conv1.input_quantizers[0] = None
+        weight_quantizer.bitwidth = 4
+        sim.compute_encodings(forward_pass, None)
+        with torch.no_grad():
+            conv1.weight.mul_(2)
+            assert not torch.equal(sim.model(dummy_input), expected_output)
+
+        assert sim.restore(snapshot) > 0
+        assert conv1.input_quantizers[0] is input_quantizer
+        assert weight_quantizer.bitwidth == 8
+        with torch.no_grad():
+            assert torch.equal(sim.model(dummy_input), expected_output)
+        assert sim.restore(snapshot) == 0
+
+        # Quantizers which were not initialized at the time of the snapshot are uninitialized again
+        sim.restore(uninitialized_snapshot)
+        assert not weight_quantizer.is_initialized()
+
+
 class TestQuantsimUtilities:
 
     def test_populate_marker_map(self):